@@ -0,0 +1,45 @@
+"""
+Roll up a range of days into the analytics fact tables.
+
+The hourly rollup_analytics task only moves forward from the latest rolled-up
+day. Use this to backfill history, or to rebuild days whose source data changed
+after they were rolled up. Each day is its own transaction and re-running a day
+overwrites it, so an interrupted backfill can simply be started again.
+
+Usage:
+    python manage.py rollup_analytics                      # yesterday
+    python manage.py rollup_analytics --start 2025-01-01   # 2025-01-01 .. yesterday
+    python manage.py rollup_analytics --start 2025-06-01 --end 2025-06-30
+"""
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from analytics.rollups import rollup_day
+
+
+class Command(BaseCommand):
+    help = 'Backfill or rebuild daily analytics rollups'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', type=datetime.date.fromisoformat,
+                            help='First day (YYYY-MM-DD), defaults to yesterday')
+        parser.add_argument('--end', type=datetime.date.fromisoformat,
+                            help='Last day (YYYY-MM-DD), defaults to yesterday')
+
+    def handle(self, *args, **options):
+        yesterday = timezone.localdate() - datetime.timedelta(days=1)
+        start = options['start'] or yesterday
+        end = options['end'] or yesterday
+        if start > end:
+            raise CommandError('--start must not be after --end')
+        if end > yesterday:
+            raise CommandError('Only complete days can be rolled up; --end must be before today')
+
+        day = start
+        while day <= end:
+            rollup = rollup_day(day)
+            self.stdout.write(f'{day}: {rollup.row_counts} in {rollup.duration_ms}ms')
+            day += datetime.timedelta(days=1)
+        self.stdout.write(self.style.SUCCESS(f'Rolled up {(end - start).days + 1} days'))
@@ -0,0 +1,37 @@
+# Generated by Django 5.1.3 on 2026-10-16 23:45
+
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0003_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyRollup',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, primary_key=True, serialize=False)),
+                ('date', models.DateField(unique=True)),
+                ('completed_at', models.DateTimeField(auto_now=True)),
+                ('duration_ms', models.PositiveIntegerField(default=0)),
+                ('row_counts', models.JSONField(blank=True, default=dict)),
+            ],
+            options={
+                'db_table': 'analytics_daily_rollups',
+                'ordering': ['-date'],
+            },
+        ),
+        migrations.AddField(
+            model_name='serviceanalytics',
+            name='reviews_received',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddConstraint(
+            model_name='financialreport',
+            constraint=models.UniqueConstraint(fields=('report_type', 'start_date', 'end_date'), name='financial_report_period_uniq'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.1.3 on 2026-10-16 23:55
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0004_daily_rollups'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='searchanalytics',
+            name='search_date',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AlterField(
+            model_name='searchlog',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
@@ -70,6 +70,7 @@ class ServiceAnalytics(models.Model):
     cancellations = models.PositiveIntegerField(default=0)
     total_revenue = models.DecimalField(max_digits=10, decimal_places=2, default=0)
     average_rating = models.DecimalField(max_digits=3, decimal_places=2, blank=True, null=True)
+    reviews_received = models.PositiveIntegerField(default=0)
     
     class Meta:
         db_table = 'service_analytics'
@@ -114,11 +115,38 @@ class FinancialReport(models.Model):
             models.Index(fields=['report_type']),
             models.Index(fields=['start_date', 'end_date']),
         ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['report_type', 'start_date', 'end_date'],
+                name='financial_report_period_uniq'
+            ),
+        ]
     
     def __str__(self):
         return f"{self.report_type.capitalize()} financial report: {self.start_date} to {self.end_date}"
 
 
+class DailyRollup(models.Model):
+    """
+    One row per day the rollup job has written to the fact tables.
+
+    The latest date is the rollup frontier: dashboards read the fact tables up
+    to it and compute anything after it live.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4)
+    date = models.DateField(unique=True)
+    completed_at = models.DateTimeField(auto_now=True)
+    duration_ms = models.PositiveIntegerField(default=0)
+    row_counts = models.JSONField(default=dict, blank=True)  # {'practitioner_performance': n, ...}
+
+    class Meta:
+        db_table = 'analytics_daily_rollups'
+        ordering = ['-date']
+
+    def __str__(self):
+        return f"Rollup for {self.date}"
+
+
 class SearchAnalytics(models.Model):
     """
     Model for tracking search patterns and behavior.
@@ -130,7 +158,7 @@ class SearchAnalytics(models.Model):
     results_count = models.PositiveIntegerField(default=0)
     clicked_results = models.PositiveIntegerField(default=0)
     conversion = models.BooleanField(default=False)  # Whether the search led to a booking
-    search_date = models.DateTimeField(auto_now_add=True)
+    search_date = models.DateTimeField(default=timezone.now)  # Time of the search
     session_id = models.CharField(max_length=100, blank=True, null=True)  # For tracking anonymous users
     
     class Meta:
@@ -158,7 +186,7 @@ class SearchLog(models.Model):
     location = models.JSONField(blank=True, null=True)  # {'lat': x, 'lng': y}
     result_count = models.PositiveIntegerField(default=0)
     clicked_position = models.PositiveIntegerField(blank=True, null=True)  # Position of clicked result
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(default=timezone.now)  # Time of the search
     ip_address = models.GenericIPAddressField(blank=True, null=True)
     user_agent = models.TextField(blank=True, null=True)
     
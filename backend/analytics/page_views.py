@@ -0,0 +1,139 @@
+"""
+Public practitioner and service page view counters (write-behind, see utils.counters).
+
+The page calls the public `view` endpoint once it is shown, which only calls
+record_practitioner_view() / record_service_view(). Each viewer is counted
+once per page per day: the viewer goes into a per-page-day HyperLogLog and,
+if it was new, the page-day's tally in a Redis hash is incremented.
+
+flush_page_views() runs from Celery beat and adds the tallies to the daily
+fact rows: PractitionerPerformance.profile_views and .service_views, and
+ServiceAnalytics.views. The daily rollup leaves these columns alone.
+
+Without Redis every view is written straight through, without deduplication.
+"""
+import hashlib
+import logging
+from collections import defaultdict
+from datetime import date
+from typing import Dict
+
+from django.db.models import F, Q, Sum
+from django.utils import timezone
+
+from analytics.models import PractitionerPerformance, ServiceAnalytics
+from utils.counters import BufferedHash, BufferedUniqueCounter
+
+logger = logging.getLogger(__name__)
+
+# "practitioner:<id>:YYYY-MM-DD" or "service:<id>:<practitioner_id>:YYYY-MM-DD" -> views
+page_daily_views = BufferedHash('analytics.page_views')
+page_daily_viewers = BufferedUniqueCounter('analytics.page_viewers')  # same keys, viewer ids
+
+
+def viewer_id(request) -> str:
+    """
+    Identify the viewer for deduplication: the signed-in user, else the
+    session_id sent by the client, else a hash of IP address and user agent.
+    """
+    if request.user.is_authenticated:
+        return f'user:{request.user.id}'
+
+    session_id = request.data.get('session_id') if isinstance(request.data, dict) else None
+    if session_id:
+        return f'session:{str(session_id)[:100]}'
+
+    forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
+    ip = forwarded_for.split(',')[0].strip() if forwarded_for else request.META.get('REMOTE_ADDR', '')
+    agent = request.META.get('HTTP_USER_AGENT', '')
+    return 'client:' + hashlib.sha1(f'{ip}|{agent}'.encode()).hexdigest()
+
+
+def record_practitioner_view(practitioner_id: int, viewer: str) -> bool:
+    """Count a view of a practitioner's public profile. Returns False for a repeat view."""
+    return _record_view(f'practitioner:{practitioner_id}:{timezone.localdate().isoformat()}', viewer)
+
+
+def record_service_view(service_id: int, practitioner_id: int, viewer: str) -> bool:
+    """Count a view of a public service page. Returns False for a repeat view."""
+    return _record_view(f'service:{service_id}:{practitioner_id}:{timezone.localdate().isoformat()}', viewer)
+
+
+def _record_view(member: str, viewer: str) -> bool:
+    new = page_daily_viewers.add_new(member, viewer)
+    if new is None:
+        # No Redis: write through
+        _write_page_views({member: 1})
+        return True
+    if new:
+        page_daily_views.incr(member)
+    return new
+
+
+def flush_page_views() -> Dict[str, int]:
+    """Write buffered page views to the daily practitioner and service analytics rows."""
+    with page_daily_views.flushing() as acquired:
+        if not acquired:
+            return {'practitioner_days': 0, 'service_days': 0}
+        views = {member: int(count) for member, count in page_daily_views.drain().items()}
+        written = _write_page_views(views)
+        page_daily_views.acknowledge()
+    return written
+
+
+def _write_page_views(views: Dict[str, int]) -> Dict[str, int]:
+    """Add views to each page-day's fact rows, creating the rows as needed."""
+    profile_views = defaultdict(int)  # (practitioner_id, day) -> views
+    service_views = defaultdict(int)  # (practitioner_id, day) -> views of their services
+    views_by_service = defaultdict(int)  # (service_id, day) -> views
+
+    for member, count in views.items():
+        kind, *ids, day = member.split(':')
+        day = date.fromisoformat(day)
+        if kind == 'practitioner':
+            profile_views[(int(ids[0]), day)] += count
+        else:
+            service_id, practitioner_id = map(int, ids)
+            views_by_service[(service_id, day)] += count
+            service_views[(practitioner_id, day)] += count
+
+    practitioner_days = profile_views.keys() | service_views.keys()
+    PractitionerPerformance.objects.bulk_create(
+        [
+            PractitionerPerformance(practitioner_id=practitioner_id, date=day)
+            for practitioner_id, day in practitioner_days
+        ],
+        ignore_conflicts=True
+    )
+    for practitioner_id, day in practitioner_days:
+        PractitionerPerformance.objects.filter(practitioner_id=practitioner_id, date=day).update(
+            profile_views=F('profile_views') + profile_views.get((practitioner_id, day), 0),
+            service_views=F('service_views') + service_views.get((practitioner_id, day), 0),
+        )
+
+    ServiceAnalytics.objects.bulk_create(
+        [ServiceAnalytics(service_id=service_id, date=day) for service_id, day in views_by_service],
+        ignore_conflicts=True
+    )
+    for (service_id, day), count in views_by_service.items():
+        ServiceAnalytics.objects.filter(service_id=service_id, date=day).update(views=F('views') + count)
+
+    return {'practitioner_days': len(practitioner_days), 'service_days': len(views_by_service)}
+
+
+def page_view_totals(practitioner_id: int, start_date: date, end_date: date, previous_start: date) -> Dict[str, int]:
+    """
+    Flushed profile and service page views for a practitioner over
+    [start_date, end_date], plus profile views over [previous_start, start_date)
+    for comparison, in one query.
+    """
+    current = Q(date__gte=start_date)
+    return PractitionerPerformance.objects.filter(
+        practitioner_id=practitioner_id,
+        date__gte=previous_start,
+        date__lte=end_date
+    ).aggregate(
+        profile_views=Sum('profile_views', filter=current, default=0),
+        service_views=Sum('service_views', filter=current, default=0),
+        previous_profile_views=Sum('profile_views', filter=~current, default=0),
+    )
@@ -0,0 +1,385 @@
+"""
+Daily rollups of bookings, orders, earnings, reviews and searches into the
+analytics fact tables.
+
+rollup_day() computes one day (in TIME_ZONE, i.e. UTC) and upserts it into
+PractitionerPerformance, ServiceAnalytics, UserEngagement and a daily
+FinancialReport, then records the day in DailyRollup. Running a day again rewrites the same rows, so retries and
+backfills are safe. The view columns (profile_views, service_views, views and
+the page counters) are not rollup-owned and are left untouched.
+
+The metric functions take a [start, end) window, so the readers below answer
+a date range from the stored rows for the days that have been rolled up and
+compute the rest live with the same code: the days after the frontier
+(normally just today) and, on a fresh install, the history before the first
+rolled-up day until it is backfilled.
+"""
+import datetime
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Callable, Dict, Optional, Tuple
+
+from django.db import transaction
+from django.db.models import Avg, Count, F, Max, Q, Sum
+from django.utils import timezone
+
+from analytics.models import (
+    DailyRollup, FinancialReport, PractitionerPerformance, SearchLog,
+    ServiceAnalytics, ServiceView, UserEngagement
+)
+from bookings.models import Booking
+from payments.models import EarningsTransaction, Order, PractitionerPayout
+from reviews.models import Review
+
+# Rows per upsert statement
+ROLLUP_BATCH_SIZE = 1000
+
+# Orders that took money, including ones refunded later
+PAID_ORDER_STATUSES = ('completed', 'refunded', 'partially_refunded')
+
+CENT = Decimal('0.01')
+
+
+def day_bounds(day: datetime.date) -> Tuple[datetime.datetime, datetime.datetime]:
+    """The [start, end) datetimes of a day in the project time zone."""
+    start = timezone.make_aware(datetime.datetime.combine(day, datetime.time.min))
+    return start, start + datetime.timedelta(days=1)
+
+
+def _days(first: datetime.date, last: datetime.date):
+    day = first
+    while day <= last:
+        yield day
+        day += datetime.timedelta(days=1)
+
+
+def _window(field: str, start, end) -> Q:
+    return Q(**{f'{field}__gte': start, f'{field}__lt': end})
+
+
+def _dollars(cents) -> Decimal:
+    return (Decimal(cents or 0) / 100).quantize(CENT)
+
+
+def _rating(value) -> Optional[Decimal]:
+    return Decimal(str(value)).quantize(CENT) if value is not None else None
+
+
+def _grouped(queryset, key: str, cents=(), **aggregates) -> Dict:
+    """One GROUP BY query, keyed by ``key``; ``cents`` aggregates become dollars."""
+    grouped = {}
+    for row in queryset.order_by().values(key).annotate(**aggregates):
+        group = row.pop(key)
+        if group is None:
+            continue
+        for field in cents:
+            row[field] = _dollars(row[field])
+        if 'average_rating' in row:
+            row['average_rating'] = _rating(row['average_rating'])
+        grouped[group] = row
+    return grouped
+
+
+def _combine(defaults: Dict, *groups: Dict) -> Dict:
+    combined = {}
+    for group in groups:
+        for key, values in group.items():
+            combined.setdefault(key, dict(defaults)).update(values)
+    return combined
+
+
+def practitioner_metrics(start, end, keys=None) -> Dict:
+    """Bookings, earnings and reviews per practitioner in a window."""
+    bookings = Booking.objects.filter(
+        _window('created_at', start, end) | _window('completed_at', start, end) | _window('canceled_at', start, end)
+    )
+    earnings = EarningsTransaction.objects.filter(_window('created_at', start, end)).exclude(status='reversed')
+    reviews = Review.objects.filter(_window('created_at', start, end), is_published=True)
+    if keys is not None:
+        bookings, earnings, reviews = (qs.filter(practitioner_id__in=keys) for qs in (bookings, earnings, reviews))
+
+    return _combine(
+        PRACTITIONER.defaults(),
+        _grouped(
+            bookings, 'practitioner_id',
+            bookings_received=Count('id', filter=_window('created_at', start, end) & ~Q(status='draft')),
+            bookings_completed=Count('id', filter=_window('completed_at', start, end)),
+            bookings_cancelled=Count('id', filter=_window('canceled_at', start, end)),
+        ),
+        _grouped(earnings, 'practitioner_id', cents=('total_earnings',), total_earnings=Sum('net_amount_cents')),
+        _grouped(reviews, 'practitioner_id', reviews_received=Count('id'), average_rating=Avg('rating')),
+    )
+
+
+def service_metrics(start, end, keys=None) -> Dict:
+    """Bookings, cancellations, revenue and reviews per service in a window."""
+    bookings = Booking.objects.filter(_window('created_at', start, end) | _window('canceled_at', start, end))
+    orders = Order.objects.filter(_window('created_at', start, end), status__in=PAID_ORDER_STATUSES)
+    reviews = Review.objects.filter(_window('created_at', start, end), is_published=True)
+    if keys is not None:
+        bookings, orders, reviews = (qs.filter(service_id__in=keys) for qs in (bookings, orders, reviews))
+
+    return _combine(
+        SERVICE.defaults(),
+        _grouped(
+            bookings, 'service_id',
+            bookings=Count('id', filter=_window('created_at', start, end) & ~Q(status='draft')),
+            cancellations=Count('id', filter=_window('canceled_at', start, end)),
+        ),
+        _grouped(orders, 'service_id', cents=('total_revenue',), total_revenue=Sum('total_amount_cents')),
+        _grouped(reviews, 'service_id', reviews_received=Count('id'), average_rating=Avg('rating')),
+    )
+
+
+def engagement_metrics(start, end, keys=None) -> Dict:
+    """Searches and service page views per signed-in user in a window."""
+    searches = SearchLog.objects.filter(_window('created_at', start, end))
+    views = ServiceView.objects.filter(_window('viewed_at', start, end))
+    if keys is not None:
+        searches, views = (qs.filter(user_id__in=keys) for qs in (searches, views))
+
+    return _combine(
+        ENGAGEMENT.defaults(),
+        _grouped(searches, 'user_id', searches_performed=Count('id')),
+        _grouped(views, 'user_id', services_viewed=Count('id')),
+    )
+
+
+def financial_metrics(start, end) -> Dict:
+    """Platform revenue, fees, payouts and refunds in a window."""
+    orders = Order.objects.filter(_window('created_at', start, end)).aggregate(
+        total_revenue=Sum('total_amount_cents', filter=Q(status__in=PAID_ORDER_STATUSES)),
+        tax_collected=Sum('tax_amount_cents', filter=Q(status__in=PAID_ORDER_STATUSES)),
+        refunds_amount=Sum('total_amount_cents', filter=Q(status='refunded')),
+    )
+    platform_fees = EarningsTransaction.objects.filter(
+        _window('created_at', start, end)
+    ).exclude(status='reversed').aggregate(total=Sum('commission_amount_cents'))['total']
+    payouts = PractitionerPayout.objects.filter(
+        _window('payout_date', start, end), status='completed'
+    ).aggregate(total=Sum('cash_payout_cents'))['total']
+
+    metrics = {
+        'total_revenue': _dollars(orders['total_revenue']),
+        'total_payouts': _dollars(payouts),
+        'platform_fees': _dollars(platform_fees),
+        'tax_collected': _dollars(orders['tax_collected']),
+        'refunds_amount': _dollars(orders['refunds_amount']),
+    }
+    metrics['net_income'] = metrics['platform_fees'] - metrics['refunds_amount']
+    return metrics
+
+
+FINANCIAL_FIELDS = ('total_revenue', 'total_payouts', 'platform_fees', 'tax_collected', 'refunds_amount', 'net_income')
+
+
+@dataclass(frozen=True)
+class Fact:
+    """A fact table keyed by (key, date) and the metric function that fills it."""
+    name: str
+    model: type
+    key: str
+    metrics: Callable
+    # Additive columns written by the rollup; average_rating is weighted by reviews_received
+    fields: Tuple[str, ...]
+    money: Tuple[str, ...] = ()
+    rated: bool = False
+
+    @property
+    def key_id(self) -> str:
+        return f'{self.key}_id'
+
+    @property
+    def owned_fields(self) -> Tuple[str, ...]:
+        return self.fields + (('average_rating',) if self.rated else ())
+
+    def defaults(self) -> Dict:
+        values = {field: Decimal('0.00') if field in self.money else 0 for field in self.fields}
+        if self.rated:
+            values['average_rating'] = None
+        return values
+
+
+PRACTITIONER = Fact(
+    'practitioner_performance', PractitionerPerformance, 'practitioner', practitioner_metrics,
+    fields=('bookings_received', 'bookings_completed', 'bookings_cancelled', 'total_earnings', 'reviews_received'),
+    money=('total_earnings',), rated=True,
+)
+SERVICE = Fact(
+    'service_analytics', ServiceAnalytics, 'service', service_metrics,
+    fields=('bookings', 'cancellations', 'total_revenue', 'reviews_received'),
+    money=('total_revenue',), rated=True,
+)
+ENGAGEMENT = Fact(
+    'user_engagement', UserEngagement, 'user', engagement_metrics,
+    fields=('searches_performed', 'services_viewed'),
+)
+FACTS = (PRACTITIONER, SERVICE, ENGAGEMENT)
+
+
+def _write_fact(fact: Fact, day: datetime.date, metrics: Dict) -> int:
+    """Replace the rollup-owned columns of one day's rows with ``metrics``."""
+    # Rows with no activity left (e.g. a review unpublished since the last run) go back to zero
+    fact.model.objects.filter(date=day).update(**fact.defaults())
+    rows = [fact.model(**{fact.key_id: key, 'date': day}, **values) for key, values in metrics.items()]
+    for offset in range(0, len(rows), ROLLUP_BATCH_SIZE):
+        fact.model.objects.bulk_create(
+            rows[offset:offset + ROLLUP_BATCH_SIZE],
+            update_conflicts=True,
+            unique_fields=[fact.key, 'date'],
+            update_fields=list(fact.owned_fields),
+        )
+    return len(rows)
+
+
+def rollup_day(day: datetime.date) -> DailyRollup:
+    """Compute one day into the fact tables. Idempotent."""
+    started = timezone.now()
+    start, end = day_bounds(day)
+    with transaction.atomic():
+        row_counts = {fact.name: _write_fact(fact, day, fact.metrics(start, end)) for fact in FACTS}
+        FinancialReport.objects.update_or_create(
+            report_type='daily', start_date=day, end_date=day,
+            defaults=financial_metrics(start, end)
+        )
+        row_counts['financial_reports'] = 1
+        rollup, _ = DailyRollup.objects.update_or_create(
+            date=day,
+            defaults={
+                'duration_ms': int((timezone.now() - started).total_seconds() * 1000),
+                'row_counts': row_counts,
+            }
+        )
+    return rollup
+
+
+def rollup_frontier() -> Optional[datetime.date]:
+    """The latest day written by the rollup job."""
+    return DailyRollup.objects.aggregate(latest=Max('date'))['latest']
+
+
+def next_day_to_roll_up(today: Optional[datetime.date] = None) -> Optional[datetime.date]:
+    """
+    The day after the frontier, or yesterday on a fresh install (older days
+    are read live until filled with the rollup_analytics command). None once
+    yesterday is done.
+    """
+    yesterday = (today or timezone.localdate()) - datetime.timedelta(days=1)
+    frontier = rollup_frontier()
+    day = frontier + datetime.timedelta(days=1) if frontier else yesterday
+    return day if day <= yesterday else None
+
+
+def split_range(start_date: datetime.date, end_date: datetime.date):
+    """
+    Split an inclusive date range into the days stored in the fact tables and
+    the days not rolled up yet, which have to be computed live: after the
+    frontier, and before the first rolled-up day until history is backfilled.
+
+    Returns (stored, live): stored is the (first, last) span of rolled-up days
+    or None, live a list of (first, last) runs of days without a rollup. A
+    live day inside the stored span has no rollup-owned values to double count.
+    """
+    rolled_up = set(
+        DailyRollup.objects.filter(date__range=(start_date, end_date)).values_list('date', flat=True)
+    )
+    stored = (min(rolled_up), max(rolled_up)) if rolled_up else None
+
+    live, run = [], None
+    for day in _days(start_date, end_date):
+        if day in rolled_up:
+            if run:
+                live.append(run)
+            run = None
+        else:
+            run = (run[0], day) if run else (day, day)
+    if run:
+        live.append(run)
+    return stored, live
+
+
+def _sums(fact: Fact) -> Dict:
+    sums = {field: Sum(field) for field in fact.fields}
+    if fact.rated:
+        sums['rating_points'] = Sum(F('average_rating') * F('reviews_received'))
+    return sums
+
+
+def _empty(fact: Fact) -> Dict:
+    return dict.fromkeys(fact.fields + ('rating_points',), 0)
+
+
+def _accumulate(fact: Fact, totals: Dict, group, values: Dict):
+    target = totals.setdefault(group, _empty(fact))
+    for field in fact.fields:
+        target[field] += values.get(field) or 0
+    if 'rating_points' in values:
+        target['rating_points'] += values['rating_points'] or 0
+    elif values.get('average_rating') is not None:
+        target['rating_points'] += values['average_rating'] * values['reviews_received']
+
+
+def _finish(fact: Fact, totals: Dict) -> Dict:
+    for values in totals.values():
+        points = values.pop('rating_points')
+        for field in fact.money:
+            values[field] = Decimal(values[field]).quantize(CENT)
+        if fact.rated:
+            values['average_rating'] = _rating(points / values['reviews_received']) if values['reviews_received'] else None
+    return totals
+
+
+def _read(fact: Fact, start_date, end_date, keys, group_by: Optional[str]) -> Dict:
+    """Sum a fact over a date range, grouped by 'date', by 'key' or not at all."""
+    stored, live = split_range(start_date, end_date)
+    totals = {None: _empty(fact)} if group_by is None else {}
+    if stored:
+        rows = fact.model.objects.filter(date__range=stored).order_by()
+        if keys is not None:
+            rows = rows.filter(**{f'{fact.key_id}__in': keys})
+        if group_by is None:
+            _accumulate(fact, totals, None, rows.aggregate(**_sums(fact)))
+        else:
+            column = 'date' if group_by == 'date' else fact.key_id
+            for row in rows.values(column).annotate(**_sums(fact)):
+                _accumulate(fact, totals, row.pop(column), row)
+    for first, last in live:
+        if group_by == 'date':
+            for day in _days(first, last):
+                for values in fact.metrics(*day_bounds(day), keys).values():
+                    _accumulate(fact, totals, day, values)
+        else:
+            # Totals need no per-day split: one window for the whole run
+            window = day_bounds(first)[0], day_bounds(last)[1]
+            for key, values in fact.metrics(*window, keys).items():
+                _accumulate(fact, totals, key if group_by == 'key' else None, values)
+    return _finish(fact, totals)
+
+
+def daily_totals(fact: Fact, start_date, end_date, keys=None) -> Dict:
+    """{date: metrics} summed over ``keys`` (or every row), for trend charts."""
+    return _read(fact, start_date, end_date, keys, 'date')
+
+
+def totals_by_key(fact: Fact, start_date, end_date, keys=None) -> Dict:
+    """{key id: metrics} summed over the date range, for top-N breakdowns."""
+    return _read(fact, start_date, end_date, keys, 'key')
+
+
+def range_totals(fact: Fact, start_date, end_date, keys=None) -> Dict:
+    """Metrics summed over the date range and ``keys``."""
+    return _read(fact, start_date, end_date, keys, None)[None]
+
+
+def financial_daily(start_date, end_date) -> Dict:
+    """{date: platform financials} from the daily reports, live after the frontier."""
+    stored, live = split_range(start_date, end_date)
+    days = {}
+    if stored:
+        reports = FinancialReport.objects.filter(report_type='daily', start_date__range=stored)
+        for row in reports.values('start_date', *FINANCIAL_FIELDS):
+            days[row.pop('start_date')] = row
+    for first, last in live:
+        for day in _days(first, last):
+            days[day] = financial_metrics(*day_bounds(day))
+    return dict(sorted(days.items()))
@@ -0,0 +1,160 @@
+"""
+Search logging (write-behind, see utils.counters).
+
+The search endpoints only call record_search(), which appends the event to a
+Redis list. flush_search_events() runs from Celery beat and writes the events
+in batches: a SearchLog row (read by the daily rollup and the search
+summaries) and a SearchAnalytics row per search, both timestamped with the
+time of the search.
+
+A batch is removed from Redis only after its rows are written, so a failed
+flush retries it and restarting the web processes loses nothing. Each event
+carries the UUID used as the primary key of both rows, so writing a batch
+again does not duplicate them. Flushes hold a Redis lock, so an overrunning
+flush and the next scheduled one never acknowledge each other's events, and
+stop well before the lock expires; the next run picks up the rest.
+
+A batch the database rejects is retried one event at a time and events that
+still fail are logged and dropped, so one bad event cannot block the queue.
+
+Without Redis each search is written straight through.
+"""
+import ipaddress
+import logging
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from django.db import transaction
+from django.utils import timezone
+
+from analytics.models import SearchAnalytics, SearchLog
+from utils.counters import BufferedQueue
+
+logger = logging.getLogger(__name__)
+
+# Events per bulk_create when flushing
+SEARCH_LOG_BATCH_SIZE = 500
+
+# Seconds a flush may keep taking batches; well inside the queue's lock_ttl
+SEARCH_LOG_FLUSH_TIME_LIMIT = 120
+
+search_events = BufferedQueue('analytics.search_events')
+
+
+def record_search(
+    *,
+    user_id: Optional[int],
+    session_id: Optional[str],
+    query: str,
+    search_type: str,
+    filters: Optional[Dict[str, Any]] = None,
+    location: Optional[Dict[str, float]] = None,
+    result_count: int = 0,
+    ip_address: Optional[str] = None,
+    user_agent: Optional[str] = None,
+) -> None:
+    """Log a search. Values are trimmed to fit the columns so a batch never fails on one event."""
+    event = {
+        'id': str(uuid.uuid4()),
+        'user_id': user_id,
+        'session_id': session_id[:100] if session_id else None,
+        'query': query[:255],
+        'search_type': search_type[:20],
+        'filters': filters or {},
+        'location': location,
+        'result_count': max(result_count, 0),
+        'ip_address': _valid_ip(ip_address),
+        'user_agent': user_agent,
+        'searched_at': timezone.now().isoformat(),
+    }
+    if not search_events.push(event):
+        # No Redis: write through
+        _write_searches([event])
+
+
+def flush_search_events() -> int:
+    """Write buffered searches to the database. Returns the number of searches written."""
+    written = 0
+    deadline = time.monotonic() + SEARCH_LOG_FLUSH_TIME_LIMIT
+    with search_events.flushing() as acquired:
+        if not acquired:
+            logger.info("[SearchLogs] Another flush is running, skipping")
+            return 0
+        while time.monotonic() < deadline:
+            batch = search_events.peek(SEARCH_LOG_BATCH_SIZE)
+            if not batch:
+                break
+            try:
+                _write_searches(batch)
+                written += len(batch)
+            except Exception:
+                logger.exception(f"[SearchLogs] Batch of {len(batch)} failed, writing one at a time")
+                written += _write_searches_individually(batch)
+            search_events.acknowledge(len(batch))
+            if len(batch) < SEARCH_LOG_BATCH_SIZE:
+                break
+    return written
+
+
+def _write_searches_individually(events: List[dict]) -> int:
+    """Write each event on its own, dropping the ones the database rejects. Returns the number written."""
+    written = 0
+    for event in events:
+        try:
+            _write_searches([event])
+            written += 1
+        except Exception:
+            logger.exception(f"[SearchLogs] Dropping search event {event.get('id')}: {event!r}")
+    return written
+
+
+def _valid_ip(value: Optional[str]) -> Optional[str]:
+    """The address if it is a valid IP, else None (e.g. test clients report a hostname)."""
+    if not value:
+        return None
+    try:
+        return str(ipaddress.ip_address(value))
+    except ValueError:
+        return None
+
+
+def _write_searches(events: List[dict]):
+    """Create the SearchLog and SearchAnalytics rows for a batch of events."""
+    from users.models import User
+
+    # Users deleted since searching are logged as anonymous
+    user_ids = {event['user_id'] for event in events if event['user_id']}
+    existing_users = set(User.objects.filter(id__in=user_ids).values_list('id', flat=True)) if user_ids else set()
+
+    logs, analytics = [], []
+    for event in events:
+        user_id = event['user_id'] if event['user_id'] in existing_users else None
+        searched_at = datetime.fromisoformat(event['searched_at'])
+        logs.append(SearchLog(
+            id=event['id'],
+            user_id=user_id,
+            session_id=event['session_id'],
+            query=event['query'],
+            search_type=event['search_type'],
+            filters=event['filters'],
+            location=event['location'],
+            result_count=event['result_count'],
+            ip_address=event['ip_address'],
+            user_agent=event['user_agent'],
+            created_at=searched_at,
+        ))
+        analytics.append(SearchAnalytics(
+            id=event['id'],
+            user_id=user_id,
+            session_id=event['session_id'],
+            query_text=event['query'],
+            filters_applied=event['filters'],
+            results_count=event['result_count'],
+            search_date=searched_at,
+        ))
+
+    with transaction.atomic():
+        SearchLog.objects.bulk_create(logs, ignore_conflicts=True)
+        SearchAnalytics.objects.bulk_create(analytics, ignore_conflicts=True)
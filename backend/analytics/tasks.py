@@ -0,0 +1,45 @@
+"""
+Analytics background tasks.
+"""
+import logging
+from celery import shared_task
+
+from analytics.page_views import flush_page_views
+from analytics.rollups import next_day_to_roll_up, rollup_day
+from analytics.search_logs import flush_search_events
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def rollup_analytics():
+    """
+    Roll up the next unprocessed day into the analytics fact tables.
+
+    Runs hourly and does one day per run, so after an outage the job catches up
+    a day at a time instead of in one long transaction.
+    """
+    day = next_day_to_roll_up()
+    if day is None:
+        return None
+    rollup = rollup_day(day)
+    logger.info(f"Rolled up analytics for {day} in {rollup.duration_ms}ms: {rollup.row_counts}")
+    return {'date': day.isoformat(), **rollup.row_counts}
+
+
+@shared_task
+def flush_page_view_counters():
+    """Write buffered public practitioner and service page views to the daily analytics rows."""
+    result = flush_page_views()
+    if any(result.values()):
+        logger.info(f"Flushed page view counters: {result}")
+    return result
+
+
+@shared_task
+def flush_search_logs():
+    """Write buffered search events to SearchLog and SearchAnalytics."""
+    written = flush_search_events()
+    if written:
+        logger.info(f"Flushed {written} search events")
+    return written
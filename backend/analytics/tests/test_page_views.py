@@ -0,0 +1,104 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from analytics.models import PractitionerPerformance, ServiceAnalytics
+from analytics.page_views import flush_page_views
+from bookings.models import Booking
+from practitioners.models import Practitioner
+from services.models import Service, ServiceSession, ServiceType
+from users.models import User
+
+
+@override_settings(REDIS_URL='')
+class PageViewsTestCase(TestCase):
+    """Without Redis, public page views are written straight to the daily analytics rows."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='pageviews-practitioner@example.com', password='testpass123')
+        self.practitioner = Practitioner.objects.create(
+            user=self.user, display_name='Views Studio', practitioner_status='active'
+        )
+        service_type, _ = ServiceType.objects.get_or_create(code='session', defaults={'name': 'Session'})
+        self.service = Service.objects.create(
+            name='Breathwork',
+            price_cents=5000,
+            duration_minutes=60,
+            service_type=service_type,
+            primary_practitioner=self.practitioner,
+            location_type='virtual',
+            is_public=True,
+        )
+        self.today = timezone.localdate()
+
+    def post(self, url, user=None, **data):
+        client = APIClient()
+        if user:
+            client.force_authenticate(user=user)
+        response = client.post(url, data, format='json')
+        self.assertEqual(response.status_code, 200)
+        return response.data['viewed']
+
+    def test_views_update_daily_rows(self):
+        visitor = User.objects.create_user(email='pageviews-visitor@example.com', password='testpass123')
+        profile_url = f'/api/v1/public-practitioners/{self.practitioner.public_uuid}/view/'
+        service_url = f'/api/v1/public-services/{self.service.public_uuid}/view/'
+
+        self.assertTrue(self.post(profile_url, user=visitor))
+        self.assertTrue(self.post(profile_url, session_id='anon-session'))
+        self.assertTrue(self.post(service_url, session_id='anon-session'))
+        # The practitioner's own visits are not counted
+        self.assertFalse(self.post(profile_url, user=self.user))
+
+        performance = PractitionerPerformance.objects.get(practitioner=self.practitioner, date=self.today)
+        self.assertEqual((performance.profile_views, performance.service_views), (2, 1))
+        self.assertEqual(ServiceAnalytics.objects.get(service=self.service, date=self.today).views, 1)
+
+        # Nothing was buffered
+        self.assertEqual(flush_page_views(), {'practitioner_days': 0, 'service_days': 0})
+
+    def test_flush_skips_while_another_flush_holds_the_lock(self):
+        client = mock.Mock()
+        client.set.return_value = None  # SET NX failed: lock is held
+
+        with mock.patch('utils.counters.get_redis', return_value=client):
+            self.assertEqual(flush_page_views(), {'practitioner_days': 0, 'service_days': 0})
+
+        client.rename.assert_not_called()
+        client.hgetall.assert_not_called()
+        client.delete.assert_not_called()
+
+    def test_unknown_page_is_not_found(self):
+        response = APIClient().post('/api/v1/public-services/00000000-0000-0000-0000-000000000000/view/')
+        self.assertEqual(response.status_code, 404)
+
+    def test_analytics_reports_views_and_conversion(self):
+        PractitionerPerformance.objects.create(practitioner=self.practitioner, date=self.today, profile_views=30)
+        PractitionerPerformance.objects.create(
+            practitioner=self.practitioner, date=self.today - timedelta(days=10), profile_views=20
+        )
+        PractitionerPerformance.objects.create(
+            practitioner=self.practitioner, date=self.today - timedelta(days=45), profile_views=25
+        )
+        client_user = User.objects.create_user(email='pageviews-client@example.com', password='testpass123')
+        start = timezone.now() + timedelta(days=1)
+        session = ServiceSession.objects.create(service=self.service, start_time=start, end_time=start + timedelta(hours=1))
+        Booking.objects.create(
+            user=client_user, practitioner=self.practitioner, service=self.service,
+            service_session=session, status='confirmed'
+        )
+
+        api = APIClient()
+        api.force_authenticate(user=self.user)
+        response = api.get(reverse('practitioner-analytics'), {'days': 30})
+        self.assertEqual(response.status_code, 200)
+
+        overview = response.data['overview']
+        self.assertEqual(overview['profile_views']['total'], 50)
+        self.assertEqual(overview['profile_views']['trend'], 100.0)
+        self.assertEqual(overview['conversion_rate'], 2.0)
+        self.assertEqual(response.data['service_popularity'][0]['title'], 'Breathwork')
@@ -0,0 +1,156 @@
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from analytics.models import DailyRollup, FinancialReport, PractitionerPerformance, ServiceAnalytics
+from analytics.rollups import (
+    PRACTITIONER, SERVICE, daily_totals, day_bounds, next_day_to_roll_up, range_totals, rollup_day
+)
+from analytics.tasks import rollup_analytics
+from bookings.models import Booking
+from payments.models import Order
+from practitioners.models import Practitioner
+from reviews.models import Review
+from services.models import Service, ServiceSession, ServiceType
+from users.models import User
+
+
+class DailyRollupTestCase(TestCase):
+    """The rollup job fills the fact tables one day at a time and readers add today live."""
+
+    def setUp(self):
+        user = User.objects.create_user(email='rollup-practitioner@example.com', password='testpass123')
+        self.practitioner = Practitioner.objects.create(user=user, display_name='Rollup Studio')
+        self.client_user = User.objects.create_user(email='rollup-client@example.com', password='testpass123')
+        service_type, _ = ServiceType.objects.get_or_create(code='session', defaults={'name': 'Session'})
+        self.service = Service.objects.create(
+            name='Breathwork',
+            price_cents=5000,
+            duration_minutes=60,
+            service_type=service_type,
+            primary_practitioner=self.practitioner,
+            location_type='virtual',
+        )
+        self.today = timezone.localdate()
+        self.yesterday = self.today - timedelta(days=1)
+
+    def at(self, day, hour=12):
+        return day_bounds(day)[0] + timedelta(hours=hour)
+
+    def booking(self, day, **kwargs):
+        start = self.at(day)
+        session = ServiceSession.objects.create(
+            service=self.service, start_time=start, end_time=start + timedelta(hours=1)
+        )
+        booking = Booking.objects.create(
+            user=self.client_user, practitioner=self.practitioner, service=self.service,
+            service_session=session, status=kwargs.pop('status', 'confirmed')
+        )
+        Booking.objects.filter(pk=booking.pk).update(created_at=self.at(day), **kwargs)
+        return booking
+
+    def order(self, day, total_cents, status='completed'):
+        order = Order.objects.create(
+            user=self.client_user, service=self.service, practitioner=self.practitioner,
+            subtotal_amount_cents=total_cents, total_amount_cents=total_cents, status=status
+        )
+        Order.objects.filter(pk=order.pk).update(created_at=self.at(day))
+        return order
+
+    def review(self, day, rating):
+        review = Review.objects.create(
+            practitioner=self.practitioner, service=self.service, user=self.client_user, rating=Decimal(rating)
+        )
+        Review.objects.filter(pk=review.pk).update(created_at=self.at(day))
+        return review
+
+    def test_rollup_day_is_idempotent_and_keeps_view_counts(self):
+        self.booking(self.yesterday)
+        self.booking(self.yesterday, status='canceled', canceled_at=self.at(self.yesterday, 15))
+        self.order(self.yesterday, 5000)
+        self.order(self.yesterday, 3000, status='refunded')
+        self.review(self.yesterday, '5')
+        self.review(self.yesterday, '4')
+
+        rollup_day(self.yesterday)
+        ServiceAnalytics.objects.filter(service=self.service).update(views=40)
+        rollup_day(self.yesterday)
+
+        row = ServiceAnalytics.objects.get(service=self.service, date=self.yesterday)
+        self.assertEqual((row.bookings, row.cancellations, row.views), (2, 1, 40))
+        self.assertEqual(row.total_revenue, Decimal('80.00'))
+        self.assertEqual((row.average_rating, row.reviews_received), (Decimal('4.50'), 2))
+
+        performance = PractitionerPerformance.objects.get(practitioner=self.practitioner, date=self.yesterday)
+        self.assertEqual((performance.bookings_received, performance.bookings_cancelled), (2, 1))
+
+        report = FinancialReport.objects.get(report_type='daily', start_date=self.yesterday)
+        self.assertEqual((report.total_revenue, report.refunds_amount), (Decimal('80.00'), Decimal('30.00')))
+        self.assertEqual(DailyRollup.objects.get().date, self.yesterday)
+
+    def test_rerun_zeroes_rows_with_no_activity_left(self):
+        review = self.review(self.yesterday, '3')
+        rollup_day(self.yesterday)
+        review.delete()
+        rollup_day(self.yesterday)
+
+        row = PractitionerPerformance.objects.get(practitioner=self.practitioner, date=self.yesterday)
+        self.assertEqual((row.reviews_received, row.average_rating), (0, None))
+
+    def test_task_processes_one_day_per_run(self):
+        rollup_day(self.today - timedelta(days=4))
+        self.assertEqual(next_day_to_roll_up(), self.today - timedelta(days=3))
+
+        rollup_analytics()
+        rollup_analytics()
+        self.assertEqual(next_day_to_roll_up(), self.yesterday)
+
+        rollup_analytics()
+        self.assertIsNone(next_day_to_roll_up())
+        self.assertIsNone(rollup_analytics())
+        self.assertEqual(DailyRollup.objects.count(), 4)
+
+    def test_readers_use_rollups_and_compute_today_live(self):
+        self.review(self.yesterday, '4')
+        rollup_day(self.yesterday)
+        # Written after the rollup: only visible once the day is rolled up again
+        self.booking(self.yesterday)
+        self.booking(self.today)
+        self.review(self.today, '2')
+
+        totals = range_totals(PRACTITIONER, self.yesterday, self.today, [self.practitioner.id])
+        self.assertEqual(totals['bookings_received'], 1)
+        self.assertEqual((totals['reviews_received'], totals['average_rating']), (2, Decimal('3.00')))
+
+        trend = daily_totals(SERVICE, self.yesterday, self.today, [self.service.id])
+        self.assertEqual(trend[self.yesterday]['bookings'], 0)
+        self.assertEqual(trend[self.today]['bookings'], 1)
+
+    def test_backfill_command(self):
+        first = self.today - timedelta(days=3)
+        self.booking(first)
+
+        call_command('rollup_analytics', '--start', first.isoformat(), stdout=StringIO())
+
+        self.assertEqual(DailyRollup.objects.count(), 3)
+        self.assertEqual(range_totals(SERVICE, first, self.yesterday, [self.service.id])['bookings'], 1)
+
+    def test_history_before_first_rollup_is_read_live(self):
+        # Fresh install: the job has only rolled up yesterday
+        older = self.today - timedelta(days=5)
+        self.booking(older)
+        self.booking(self.yesterday)
+        self.review(older, '4')
+        rollup_analytics()
+        self.assertEqual(DailyRollup.objects.get().date, self.yesterday)
+
+        totals = range_totals(SERVICE, self.today - timedelta(days=7), self.today, [self.service.id])
+        self.assertEqual((totals['bookings'], totals['reviews_received']), (2, 1))
+
+        trend = daily_totals(PRACTITIONER, self.today - timedelta(days=7), self.today, [self.practitioner.id])
+        self.assertEqual(trend[older]['bookings_received'], 1)
+        self.assertEqual(trend[self.yesterday]['bookings_received'], 1)
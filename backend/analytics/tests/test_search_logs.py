@@ -0,0 +1,97 @@
+import json
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from analytics.models import SearchAnalytics, SearchLog
+from analytics.search_logs import _write_searches, flush_search_events, record_search
+from users.models import User
+
+
+@override_settings(REDIS_URL='')
+class SearchLogsTestCase(TestCase):
+    """Searches become SearchLog and SearchAnalytics rows stamped with the time of the search."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='searcher@example.com', password='testpass123')
+
+    def test_without_redis_searches_are_written_through(self):
+        record_search(
+            user_id=self.user.id, session_id='s' * 150, query='breathwork', search_type='all',
+            filters={'price_max': 50}, result_count=7
+        )
+
+        log = SearchLog.objects.get()
+        self.assertEqual((log.user_id, log.query, log.result_count), (self.user.id, 'breathwork', 7))
+        self.assertEqual(len(log.session_id), 100)
+        analytics = SearchAnalytics.objects.get()
+        self.assertEqual((analytics.id, analytics.results_count), (log.id, 7))
+        self.assertEqual(analytics.filters_applied, {'price_max': 50})
+
+        # Nothing was buffered
+        self.assertEqual(flush_search_events(), 0)
+
+    def test_invalid_ip_address_is_dropped(self):
+        record_search(user_id=None, session_id=None, query='reiki', search_type='all', ip_address='testclient')
+        record_search(user_id=None, session_id=None, query='reiki', search_type='all', ip_address='203.0.113.7')
+
+        self.assertEqual(
+            sorted(SearchLog.objects.values_list('ip_address', flat=True), key=str), [None, '203.0.113.7']
+        )
+
+    def test_rewriting_a_batch_is_idempotent(self):
+        searched_at = timezone.now() - timedelta(minutes=5)
+        deleted = User.objects.create_user(email='gone@example.com', password='testpass123')
+        events = [
+            {
+                'id': f'00000000-0000-0000-0000-00000000000{i}', 'user_id': user_id, 'session_id': None,
+                'query': 'yoga', 'search_type': 'services', 'filters': {}, 'location': None,
+                'result_count': 3, 'ip_address': None, 'user_agent': None,
+                'searched_at': searched_at.isoformat(),
+            }
+            for i, user_id in enumerate([self.user.id, deleted.id], start=1)
+        ]
+        deleted.delete()
+
+        _write_searches(events)
+        _write_searches(events)
+
+        self.assertEqual(SearchLog.objects.count(), 2)
+        self.assertEqual(SearchAnalytics.objects.count(), 2)
+        self.assertEqual(
+            set(SearchLog.objects.values_list('user_id', flat=True)), {self.user.id, None}
+        )
+        self.assertEqual(SearchLog.objects.first().created_at, searched_at)
+
+    def test_flush_skips_while_another_flush_holds_the_lock(self):
+        client = mock.Mock()
+        client.set.return_value = None  # SET NX failed: lock is held
+
+        with mock.patch('utils.counters.get_redis', return_value=client):
+            self.assertEqual(flush_search_events(), 0)
+
+        client.lrange.assert_not_called()
+        client.ltrim.assert_not_called()
+        client.eval.assert_not_called()
+
+    def test_rejected_event_is_dropped_and_the_batch_acknowledged(self):
+        events = [
+            {
+                'id': f'00000000-0000-0000-0000-00000000001{i}', 'user_id': None, 'session_id': None,
+                'query': 'sound bath', 'search_type': 'all', 'filters': {}, 'location': None,
+                'result_count': 1, 'ip_address': ip_address, 'user_agent': None,
+                'searched_at': timezone.now().isoformat(),
+            }
+            for i, ip_address in enumerate(['198.51.100.1', 'testclient'])
+        ]
+        client = mock.Mock()
+        client.set.return_value = True
+        client.lrange.return_value = [json.dumps(event) for event in events]
+
+        with mock.patch('utils.counters.get_redis', return_value=client):
+            self.assertEqual(flush_search_events(), 1)
+
+        self.assertEqual(list(SearchLog.objects.values_list('query', flat=True)), ['sound bath'])
+        client.ltrim.assert_called_once_with('pending:analytics.search_events', 2, -1)
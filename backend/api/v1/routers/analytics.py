@@ -7,8 +7,8 @@ from uuid import UUID
 from datetime import datetime, date, timedelta
 from decimal import Decimal
 from django.db import connection
-from django.db.models import Sum, Avg, Count, Q, F, Prefetch
-from django.db.models.functions import TruncDate, TruncWeek, TruncMonth
+from django.db.models import Sum, Avg, Count, F, Prefetch
+from django.db.models.functions import TruncWeek, TruncMonth
 from django.utils import timezone
 from asgiref.sync import sync_to_async
 
@@ -21,6 +21,16 @@ from analytics.models import (
     SearchLog,
     ServiceView,
 )
+from analytics.rollups import (
+    ENGAGEMENT,
+    PAID_ORDER_STATUSES,
+    PRACTITIONER,
+    SERVICE,
+    daily_totals,
+    financial_daily,
+    range_totals,
+    totals_by_key,
+)
 from practitioners.models import Practitioner
 from bookings.models import Booking
 from services.models import Service
@@ -78,78 +88,61 @@ def get_service_by_id(service_id):
 @sync_to_async
 def get_practitioner_dashboard_data(practitioner, date_range):
     """Get all data needed for practitioner dashboard"""
-    # Get bookings data
-    bookings = Booking.objects.filter(
-        practitioner=practitioner,
-        start_time__date__gte=date_range.start_date,
-        start_time__date__lte=date_range.end_date,
-    )
+    keys = [practitioner.id]
+    totals = range_totals(PRACTITIONER, date_range.start_date, date_range.end_date, keys)
+    trend = daily_totals(PRACTITIONER, date_range.start_date, date_range.end_date, keys)
     
-    # Calculate metrics
-    total_bookings = bookings.count()
-    completed_bookings = bookings.filter(status='completed').count()
-    cancelled_bookings = bookings.filter(status='cancelled').count()
-    
-    # Revenue metrics
-    revenue_data = bookings.filter(status='completed').aggregate(
-        total=Sum('total_amount'),
-        avg=Avg('total_amount')
+    # Per-service breakdown from the service rollups
+    service_names = dict(
+        Service.objects.filter(primary_practitioner=practitioner).values_list('id', 'name')
     )
+    by_service = totals_by_key(SERVICE, date_range.start_date, date_range.end_date, list(service_names))
     
-    # Revenue by service
-    revenue_by_service = list(
-        bookings.filter(status='completed')
-        .values('service__name')
-        .annotate(
-            revenue=Sum('total_amount'),
-            count=Count('id')
-        )
-        .order_by('-revenue')[:10]
-    )
-    
-    # Revenue trend
-    revenue_trend_data = list(
-        bookings.filter(status='completed')
-        .annotate(date=TruncDate('start_time'))
-        .values('date')
-        .annotate(revenue=Sum('total_amount'))
-        .order_by('date')
-    )
-    
-    # Booking status breakdown
-    booking_status_breakdown = dict(
-        bookings.values('status').annotate(count=Count('id')).values_list('status', 'count')
-    )
+    revenue_by_service = [
+        {'service__name': service_names[key], 'revenue': values['total_revenue'], 'count': values['bookings']}
+        for key, values in sorted(by_service.items(), key=lambda item: item[1]['total_revenue'], reverse=True)[:10]
+    ]
+    service_popularity = [
+        {'service__name': service_names[key], 'service__id': key,
+         'bookings': values['bookings'], 'revenue': values['total_revenue']}
+        for key, values in sorted(by_service.items(), key=lambda item: item[1]['bookings'], reverse=True)[:10]
+    ]
     
-    # Top clients
-    top_clients = list(
-        bookings.filter(status='completed')
+    # Top clients (not rolled up: per-client rows would be as large as the orders table)
+    top_clients = [
+        {**row, 'total_spent': Decimal(row['total_spent']) / 100}
+        for row in Order.objects.filter(
+            practitioner=practitioner,
+            status__in=PAID_ORDER_STATUSES,
+            created_at__date__gte=date_range.start_date,
+            created_at__date__lte=date_range.end_date,
+        )
         .values('user__first_name', 'user__last_name', 'user__id')
         .annotate(
-            total_spent=Sum('total_amount'),
+            total_spent=Sum('total_amount_cents'),
             booking_count=Count('id')
         )
         .order_by('-total_spent')[:10]
-    )
-    
-    # Service popularity
-    service_popularity = list(
-        bookings.values('service__name', 'service__id')
-        .annotate(
-            bookings=Count('id'),
-            revenue=Sum('total_amount')
-        )
-        .order_by('-bookings')[:10]
-    )
+    ]
     
+    completed = totals['bookings_completed']
     return {
-        'total_bookings': total_bookings,
-        'completed_bookings': completed_bookings,
-        'cancelled_bookings': cancelled_bookings,
-        'revenue_data': revenue_data,
+        'total_bookings': totals['bookings_received'],
+        'completed_bookings': completed,
+        'cancelled_bookings': totals['bookings_cancelled'],
+        'revenue_data': {
+            'total': totals['total_earnings'],
+            'avg': totals['total_earnings'] / completed if completed else None,
+        },
         'revenue_by_service': revenue_by_service,
-        'revenue_trend_data': revenue_trend_data,
-        'booking_status_breakdown': booking_status_breakdown,
+        'revenue_trend_data': [
+            {'date': day, 'revenue': values['total_earnings']} for day, values in sorted(trend.items())
+        ],
+        'booking_status_breakdown': {
+            'received': totals['bookings_received'],
+            'completed': completed,
+            'canceled': totals['bookings_cancelled'],
+        },
         'top_clients': top_clients,
         'service_popularity': service_popularity,
     }
@@ -158,46 +151,39 @@ def get_practitioner_dashboard_data(practitioner, date_range):
 @sync_to_async
 def get_previous_period_revenue(practitioner, prev_start, prev_end):
     """Get revenue for previous period comparison"""
-    prev_bookings = Booking.objects.filter(
-        practitioner=practitioner,
-        start_time__date__gte=prev_start,
-        start_time__date__lte=prev_end,
-        status='completed'
-    )
-    return prev_bookings.aggregate(Sum('total_amount'))['total_amount__sum'] or Decimal('0')
+    return range_totals(PRACTITIONER, prev_start, prev_end, [practitioner.id])['total_earnings']
 
 
 @sync_to_async
 def get_practitioner_metrics_data(practitioner, date_range):
     """Get detailed practitioner metrics"""
-    # Get bookings
-    bookings = Booking.objects.filter(
-        practitioner=practitioner,
-        start_time__date__gte=date_range.start_date,
-        start_time__date__lte=date_range.end_date,
-    )
-    
-    # Calculate metrics
-    booking_stats = bookings.aggregate(
-        total=Count('id'),
-        completed=Count('id', filter=Q(status='completed')),
-        cancelled=Count('id', filter=Q(status='cancelled')),
-        no_show=Count('id', filter=Q(status='no_show')),
-    )
+    totals = range_totals(PRACTITIONER, date_range.start_date, date_range.end_date, [practitioner.id])
+    
+    booking_stats = {
+        'total': totals['bookings_received'],
+        'completed': totals['bookings_completed'],
+        'cancelled': totals['bookings_cancelled'],
+        'no_show': Booking.objects.filter(
+            practitioner=practitioner,
+            no_show_at__date__gte=date_range.start_date,
+            no_show_at__date__lte=date_range.end_date,
+        ).count(),
+    }
     
     # Financial metrics
-    financial_stats = bookings.filter(status='completed').aggregate(
-        revenue=Sum('total_amount'),
-        avg_value=Avg('total_amount'),
-    )
+    financial_stats = {
+        'revenue': totals['total_earnings'],
+        'avg_value': totals['total_earnings'] / totals['bookings_completed'] if totals['bookings_completed'] else None,
+    }
     
     # Get refunds from orders
     refunds = Order.objects.filter(
-        service__practitioner=practitioner,
+        practitioner=practitioner,
         created_at__date__gte=date_range.start_date,
         created_at__date__lte=date_range.end_date,
         status='refunded'
-    ).aggregate(total=Sum('total_amount'))['total'] or Decimal('0')
+    ).aggregate(total=Sum('total_amount_cents'))['total']
+    refunds = Decimal(refunds or 0) / 100
     
     # Engagement metrics from analytics
     performance_data = PractitionerPerformance.objects.filter(
@@ -210,18 +196,24 @@ def get_practitioner_metrics_data(practitioner, date_range):
     )
     
     # Rating metrics
-    reviews = Review.objects.filter(
+    rating_stats = {
+        'avg_rating': totals['average_rating'],
+        'total_reviews': totals['reviews_received'],
+        'five_star': Review.objects.filter(
+            practitioner=practitioner,
+            is_published=True,
+            rating=5,
+            created_at__date__gte=date_range.start_date,
+            created_at__date__lte=date_range.end_date,
+        ).count(),
+    }
+    
+    # Client metrics
+    bookings = Booking.objects.filter(
         practitioner=practitioner,
         created_at__date__gte=date_range.start_date,
         created_at__date__lte=date_range.end_date,
-    )
-    rating_stats = reviews.aggregate(
-        avg_rating=Avg('rating'),
-        total_reviews=Count('id'),
-        five_star=Count('id', filter=Q(rating=5)),
-    )
-    
-    # Client metrics
+    ).exclude(status='draft')
     unique_clients = bookings.values('user').distinct().count()
     repeat_clients = bookings.values('user').annotate(
         count=Count('id')
@@ -241,59 +233,54 @@ def get_practitioner_metrics_data(practitioner, date_range):
 @sync_to_async
 def get_admin_dashboard_data(date_range):
     """Get admin dashboard data"""
+    by_service = totals_by_key(SERVICE, date_range.start_date, date_range.end_date)
+    services = {
+        row['id']: row
+        for row in Service.objects.filter(id__in=list(by_service)).values('id', 'name', 'category__name')
+    }
+    
     # Revenue by category
-    revenue_by_category = list(
-        Booking.objects.filter(
-            start_time__date__gte=date_range.start_date,
-            start_time__date__lte=date_range.end_date,
-            status='completed'
-        )
-        .values('service__category__name')
-        .annotate(revenue=Sum('total_amount'))
-        .order_by('-revenue')[:10]
-    )
+    category_revenue = {}
+    for key, values in by_service.items():
+        if key in services:
+            category = services[key]['category__name']
+            category_revenue[category] = category_revenue.get(category, Decimal('0')) + values['total_revenue']
+    revenue_by_category = [
+        {'service__category__name': category, 'revenue': revenue}
+        for category, revenue in sorted(category_revenue.items(), key=lambda item: item[1], reverse=True)[:10]
+    ]
     
     # Revenue trend
-    revenue_trend_data = list(
-        Booking.objects.filter(
-            start_time__date__gte=date_range.start_date,
-            start_time__date__lte=date_range.end_date,
-            status='completed'
-        )
-        .annotate(date=TruncDate('start_time'))
-        .values('date')
-        .annotate(revenue=Sum('total_amount'))
-        .order_by('date')
-    )
+    revenue_trend_data = [
+        {'date': day, 'revenue': values['total_revenue']}
+        for day, values in financial_daily(date_range.start_date, date_range.end_date).items()
+    ]
     
     # Top practitioners
-    top_practitioners = list(
-        Booking.objects.filter(
-            start_time__date__gte=date_range.start_date,
-            start_time__date__lte=date_range.end_date,
-            status='completed'
-        )
-        .values('practitioner__user__first_name', 'practitioner__user__last_name', 'practitioner__id')
-        .annotate(
-            revenue=Sum('total_amount'),
-            bookings=Count('id')
-        )
-        .order_by('-revenue')[:10]
-    )
+    by_practitioner = totals_by_key(PRACTITIONER, date_range.start_date, date_range.end_date)
+    top_ids = sorted(by_practitioner, key=lambda key: by_practitioner[key]['total_earnings'], reverse=True)[:10]
+    practitioners = {
+        row['id']: row
+        for row in Practitioner.objects.filter(id__in=top_ids).values('id', 'user__first_name', 'user__last_name')
+    }
+    top_practitioners = [
+        {
+            'practitioner__user__first_name': practitioners[key]['user__first_name'],
+            'practitioner__user__last_name': practitioners[key]['user__last_name'],
+            'practitioner__id': key,
+            'revenue': by_practitioner[key]['total_earnings'],
+            'bookings': by_practitioner[key]['bookings_completed'],
+        }
+        for key in top_ids if key in practitioners
+    ]
     
     # Top services
-    top_services = list(
-        Booking.objects.filter(
-            start_time__date__gte=date_range.start_date,
-            start_time__date__lte=date_range.end_date,
-        )
-        .values('service__name', 'service__id')
-        .annotate(
-            bookings=Count('id'),
-            revenue=Sum('total_amount')
-        )
-        .order_by('-bookings')[:10]
-    )
+    top_services = [
+        {'service__name': services[key]['name'], 'service__id': key,
+         'bookings': values['bookings'], 'revenue': values['total_revenue']}
+        for key, values in sorted(by_service.items(), key=lambda item: item[1]['bookings'], reverse=True)
+        if key in services
+    ][:10]
     
     return {
         'revenue_by_category': revenue_by_category,
@@ -326,48 +313,32 @@ def get_platform_metrics_raw_data(date_range):
         created_at__date__lte=date_range.end_date,
     ).count()
     
-    # Active practitioners (had bookings)
-    active_practitioners = Practitioner.objects.filter(
-        bookings__start_time__date__gte=date_range.start_date,
-        bookings__start_time__date__lte=date_range.end_date,
-    ).distinct().count()
-    
-    # Booking metrics
-    bookings = Booking.objects.filter(
-        start_time__date__gte=date_range.start_date,
-        start_time__date__lte=date_range.end_date,
-    )
-    booking_stats = bookings.aggregate(
-        total=Count('id'),
-        completed=Count('id', filter=Q(status='completed')),
-        cancelled=Count('id', filter=Q(status='cancelled')),
-    )
+    # Booking metrics and active practitioners (had bookings) from the rollups
+    by_practitioner = totals_by_key(PRACTITIONER, date_range.start_date, date_range.end_date)
+    active_practitioners = sum(1 for values in by_practitioner.values() if values['bookings_received'])
+    booking_stats = {
+        'total': sum(values['bookings_received'] for values in by_practitioner.values()),
+        'completed': sum(values['bookings_completed'] for values in by_practitioner.values()),
+        'cancelled': sum(values['bookings_cancelled'] for values in by_practitioner.values()),
+    }
     
     # Financial metrics
-    financial_data = bookings.filter(status='completed').aggregate(
-        gross_revenue=Sum('total_amount'),
-        platform_fees=Sum('platform_fee'),
-    )
-    
-    # Refunds from orders
-    refunds = Order.objects.filter(
-        created_at__date__gte=date_range.start_date,
-        created_at__date__lte=date_range.end_date,
-        status='refunded'
-    ).aggregate(total=Sum('total_amount'))['total'] or Decimal('0')
+    financials = financial_daily(date_range.start_date, date_range.end_date).values()
+    financial_data = {
+        'gross_revenue': sum((day['total_revenue'] for day in financials), Decimal('0')),
+        'platform_fees': sum((day['platform_fees'] for day in financials), Decimal('0')),
+    }
+    refunds = sum((day['refunds_amount'] for day in financials), Decimal('0'))
     
     # Service metrics
     total_services = Service.objects.filter(is_active=True).count()
-    active_services = Service.objects.filter(
-        bookings__start_time__date__gte=date_range.start_date,
-        bookings__start_time__date__lte=date_range.end_date,
-    ).distinct().count()
+    active_services = sum(
+        1 for values in totals_by_key(SERVICE, date_range.start_date, date_range.end_date).values()
+        if values['bookings']
+    )
     
     # Average rating
-    avg_rating = Review.objects.filter(
-        created_at__date__gte=date_range.start_date,
-        created_at__date__lte=date_range.end_date,
-    ).aggregate(avg=Avg('rating'))['avg'] or 0
+    avg_rating = range_totals(PRACTITIONER, date_range.start_date, date_range.end_date)['average_rating'] or 0
     
     return {
         'total_users': total_users,
@@ -388,28 +359,30 @@ def get_platform_metrics_raw_data(date_range):
 @sync_to_async
 def get_service_analytics_data(service, date_range):
     """Get service analytics data"""
-    # Get analytics data
-    analytics = ServiceAnalytics.objects.filter(
-        service=service,
-        date__gte=date_range.start_date,
-        date__lte=date_range.end_date,
-    ).aggregate(
-        total_views=Sum('views'),
-        total_bookings=Sum('bookings'),
-        total_revenue=Sum('total_revenue'),
-        avg_rating=Avg('average_rating'),
-    )
+    totals = range_totals(SERVICE, date_range.start_date, date_range.end_date, [service.id])
+    trend = daily_totals(SERVICE, date_range.start_date, date_range.end_date, [service.id])
     
-    # Views trend
-    views_trend_data = list(ServiceAnalytics.objects.filter(
+    # Views are tracked separately from the rollup
+    views = ServiceAnalytics.objects.filter(
         service=service,
         date__gte=date_range.start_date,
         date__lte=date_range.end_date,
-    ).values('date', 'views').order_by('date'))
+    )
     
     return {
-        'analytics': analytics,
-        'views_trend_data': views_trend_data,
+        'analytics': {
+            'total_views': views.aggregate(total=Sum('views'))['total'],
+            'total_bookings': totals['bookings'],
+            'total_revenue': totals['total_revenue'],
+            'avg_rating': totals['average_rating'],
+        },
+        'views_trend_data': list(views.values('date', 'views').order_by('date')),
+        'bookings_trend_data': [
+            {'date': day, 'bookings': values['bookings']} for day, values in sorted(trend.items())
+        ],
+        'revenue_trend_data': [
+            {'date': day, 'revenue': values['total_revenue']} for day, values in sorted(trend.items())
+        ],
     }
 
 
@@ -543,12 +516,15 @@ def get_user_engagement_data(target_user_id, date_range):
         total_sessions=Sum('logins'),
         total_duration=Sum('session_duration_seconds'),
         pages_viewed=Sum('pages_viewed'),
-        searches=Sum('searches_performed'),
-        services_viewed=Sum('services_viewed'),
         practitioners_viewed=Sum('practitioners_viewed'),
         bookings_viewed=Sum('bookings_viewed'),
     )
     
+    # Searches and service views are rolled up, with today computed live
+    rolled_up = range_totals(ENGAGEMENT, date_range.start_date, date_range.end_date, [target_user_id])
+    engagement_data['searches'] = rolled_up['searches_performed']
+    engagement_data['services_viewed'] = rolled_up['services_viewed']
+    
     # Get booking data
     bookings_made = Booking.objects.filter(
         user_id=target_user_id,
@@ -956,8 +932,14 @@ async def get_service_performance(
         average_rating=data['analytics']['avg_rating'],
         conversion_rate=conversion_rate,
         views_trend=views_trend,
-        bookings_trend=[],  # TODO: Implement
-        revenue_trend=[],  # TODO: Implement
+        bookings_trend=[
+            TimeSeriesData(date=item['date'], value=Decimal(item['bookings']))
+            for item in data['bookings_trend_data']
+        ],
+        revenue_trend=[
+            TimeSeriesData(date=item['date'], value=item['revenue'])
+            for item in data['revenue_trend_data']
+        ],
     )
 
 
@@ -406,7 +406,8 @@ async def get_available_slots(
         service_id=query.service_id,
         start_date=query.start_date,
         end_date=query.end_date,
-        days_ahead=query.days_ahead
+        days_ahead=query.days_ahead,
+        use_cache=True
     )
     
     # Convert to response format
@@ -5,7 +5,7 @@ from typing import List, Optional
 from datetime import date, time
 from decimal import Decimal
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from django.db.models import Q, F, Count, Avg, Sum, Min, Max, Prefetch
+from django.db.models import Q, F, Count, Avg, Sum, Max, Prefetch
 from django.db import transaction as db_transaction
 from django.utils import timezone
 from asgiref.sync import sync_to_async
@@ -66,9 +66,6 @@ router = APIRouter(
 @sync_to_async
 def practitioner_to_dict(practitioner, include_private=False) -> dict:
     """Convert practitioner model to dict with computed fields"""
-    from services.models import Service
-    from reviews.models import Review
-    
     # Basic fields
     data = {
         'id': practitioner.id,
@@ -97,28 +94,15 @@ def practitioner_to_dict(practitioner, include_private=False) -> dict:
         data['created_at'] = practitioner.created_at
         data['updated_at'] = practitioner.updated_at
     
-    # Computed fields
-    reviews = Review.objects.filter(practitioner=practitioner, is_published=True)
-    rating_result = reviews.aggregate(avg_rating=Avg('rating'))
-    data['average_rating'] = round(rating_result['avg_rating'] or 0, 2)
-    data['total_reviews'] = reviews.count()
-    
-    # Services
-    services = Service.objects.filter(primary_practitioner=practitioner, is_active=True)
-    data['total_services'] = services.count()
-    
-    # Price range - note: price is now price_cents
-    price_result = services.aggregate(
-        min_price=Min('price_cents'),
-        max_price=Max('price_cents')
-    )
+    # Denormalized stats
+    data['average_rating'] = practitioner.rating_avg
+    data['total_reviews'] = practitioner.rating_count
+    data['total_services'] = practitioner.active_service_count
     data['price_range'] = {
-        'min': price_result['min_price'] / 100 if price_result['min_price'] else None,
-        'max': price_result['max_price'] / 100 if price_result['max_price'] else None
+        'min': practitioner.min_price_cents / 100 if practitioner.min_price_cents else None,
+        'max': practitioner.max_price_cents / 100 if practitioner.max_price_cents else None
     }
-    
-    # Sessions count
-    data['completed_sessions_count'] = practitioner.bookings.filter(status='completed').count()
+    data['completed_sessions_count'] = practitioner.completed_session_count
     
     # Cancellation rate (for private profile)
     if include_private:
@@ -253,10 +237,7 @@ def get_practitioners_queryset(filters):
     
     # Rating filter
     if filters.min_rating:
-        # Annotate with average rating and filter
-        queryset = queryset.annotate(
-            avg_rating=Avg('reviews__rating', filter=Q(reviews__is_published=True))
-        ).filter(avg_rating__gte=filters.min_rating)
+        queryset = queryset.filter(rating_avg__gte=filters.min_rating)
     
     # Language filter
     if filters.languages:
@@ -267,17 +248,11 @@ def get_practitioners_queryset(filters):
     
     # Sorting
     if filters.sort_by == 'rating':
-        queryset = queryset.annotate(
-            avg_rating=Avg('reviews__rating', filter=Q(reviews__is_published=True))
-        ).order_by('-avg_rating', '-featured')
+        queryset = queryset.order_by('-rating_avg', '-rating_count', '-featured')
     elif filters.sort_by == 'price_low':
-        queryset = queryset.annotate(
-            min_price=Min('primary_services__price_cents')
-        ).order_by('min_price')
+        queryset = queryset.order_by(F('min_price_cents').asc(nulls_last=True))
     elif filters.sort_by == 'price_high':
-        queryset = queryset.annotate(
-            max_price=Max('primary_services__price_cents')
-        ).order_by('-max_price')
+        queryset = queryset.order_by(F('max_price_cents').desc(nulls_last=True))
     elif filters.sort_by == 'experience':
         queryset = queryset.order_by('-years_of_experience', '-featured')
     elif filters.sort_by == 'availability':
@@ -4,10 +4,9 @@ from decimal import Decimal
 import time
 import logging
 
-from fastapi import APIRouter, Depends, Query, HTTPException, status
+from fastapi import APIRouter, Depends, Query, HTTPException, Request, status
 from django.db import models
-from django.db.models import Q, F, Count, Avg, Min, Max, Case, When, Value, FloatField
-from django.contrib.postgres.search import SearchVector, SearchQuery, SearchRank
+from django.db.models import Q, F, Count, Min, Max, Case, When, Value, FloatField
 from django.core.cache import cache
 from django.utils import timezone
 from geopy.distance import distance as geo_distance
@@ -31,7 +30,10 @@ from practitioners.models import Practitioner
 from locations.models import City, State, Country
 from reviews.models import Review
 from analytics.models import SearchLog, ServiceView
+from analytics.search_logs import record_search
+from locations.utils import annotate_practitioner_distance, filter_within_radius
 from users.models import User
+from utils.search import apply_text_search
 
 logger = logging.getLogger(__name__)
 
@@ -45,6 +47,7 @@ router = APIRouter(prefix="/search", tags=["Search & Discovery"])
 @router.post("/", response_model=UnifiedSearchResponse)
 async def unified_search(
     request: UnifiedSearchRequest,
+    http_request: Request,
     current_user: Optional[User] = Depends(get_current_user_optional),
     db=Depends(get_db)
 ):
@@ -61,21 +64,6 @@ async def unified_search(
     start_time = time.time()
     
     try:
-        # Log search for analytics
-        if request.session_id or current_user:
-            await sync_to_async(SearchLog.objects.create)(
-                user=current_user,
-                session_id=request.session_id,
-                query=request.query,
-                search_type=request.search_type.value,
-                filters=request.filters.model_dump() if request.filters else {},
-                location={
-                    'lat': request.location.latitude,
-                    'lng': request.location.longitude
-                } if request.location else None,
-                ip_address=None  # Set from request context if needed
-            )
-        
         results = []
         services = []
         practitioners = []
@@ -130,6 +118,23 @@ async def unified_search(
         total_results = len(services) + len(practitioners) + len(locations)
         total_pages = (total_results + request.page_size - 1) // request.page_size
         
+        # Log search for analytics; buffered and written by flush_search_logs
+        if request.session_id or current_user:
+            await sync_to_async(record_search)(
+                user_id=current_user.id if current_user else None,
+                session_id=request.session_id,
+                query=request.query,
+                search_type=request.search_type.value,
+                filters=request.filters.model_dump(mode='json') if request.filters else {},
+                location={
+                    'lat': request.location.latitude,
+                    'lng': request.location.longitude
+                } if request.location else None,
+                result_count=total_results,
+                ip_address=http_request.client.host if http_request.client else None,
+                user_agent=http_request.headers.get('user-agent')
+            )
+        
         search_time_ms = int((time.time() - start_time) * 1000)
         
         return UnifiedSearchResponse(
@@ -412,145 +417,127 @@ async def search_nearby(
     services = []
     practitioners = []
     
-    # Convert to unified search request
-    unified_request = UnifiedSearchRequest(
-        query="",  # No text query for nearby search
-        search_type=request.search_type,
-        filters=request.filters,
-        location=request.location,
-        sort_by="distance",
-        page=request.page,
-        page_size=request.page_size,
-        boost_local=True
-    )
+    latitude = request.location.latitude
+    longitude = request.location.longitude
+    offset = (request.page - 1) * request.page_size
     
     # Search based on type
     if request.search_type in [SearchType.ALL, SearchType.SERVICES]:
-        # Find services with addresses near location
-        nearby_services_qs = Service.objects.filter(
-            is_active=True,
-            is_public=True,
-            location_type__in=['in_person', 'hybrid'],
-            address__latitude__isnull=False,
-            address__longitude__isnull=False
-        ).select_related('primary_practitioner', 'address', 'category')
+        # Bounding-box prefilter on the location lat/lng index, exact distance in SQL
+        nearby_services_qs = filter_within_radius(
+            Service.objects.filter(
+                is_active=True,
+                is_public=True,
+                location_type__in=['in_person', 'hybrid']
+            ),
+            latitude, longitude, request.radius_miles,
+            lat_field='practitioner_location__latitude', lng_field='practitioner_location__longitude'
+        ).select_related(
+            'primary_practitioner', 'category', 'service_type',
+            'practitioner_location__city', 'practitioner_location__state'
+        )
         
         # Apply filters
         if request.filters:
             nearby_services_qs = apply_service_filters(nearby_services_qs, request.filters)
         
-        nearby_services = await sync_to_async(list)(nearby_services_qs)
-        
-        # Calculate distances and filter by radius
-        service_results = []
-        for service in nearby_services:
-            if service.address and service.address.latitude and service.address.longitude:
-                distance_miles = geo_distance(
-                    (request.location.latitude, request.location.longitude),
-                    (service.address.latitude, service.address.longitude)
-                ).miles
-                
-                if distance_miles <= request.radius_miles:
-                    result = ServiceSearchResult(
-                        id=str(service.public_uuid),
-                        name=service.name,
-                        short_description=service.short_description,
-                        service_type=service.service_type.name,
-                        category_name=service.category.name if service.category else None,
-                        practitioner_id=str(service.primary_practitioner.public_uuid),
-                        practitioner_name=service.primary_practitioner.display_name,
-                        price=service.price,
-                        price_display=f"${service.price}",
-                        duration_minutes=service.duration_minutes,
-                        location_type=service.location_type,
-                        experience_level=service.experience_level,
-                        max_participants=service.max_participants,
-                        city=service.address.city,
-                        state=service.address.state_province,
-                        distance_miles=round(distance_miles, 1),
-                        average_rating=service.average_rating,
-                        total_reviews=service.total_reviews,
-                        is_available=service.is_available(),
-                        image_url=service.image_url
-                    )
-                    result.score = SearchScore(
-                        total=100 - distance_miles,  # Closer = higher score
-                        location_boost=100 - distance_miles
-                    )
-                    service_results.append(result)
-        
         # Sort by distance or other criteria
-        if request.sort_by == "distance":
-            service_results.sort(key=lambda x: x.distance_miles)
-        elif request.sort_by == "rating":
-            service_results.sort(key=lambda x: x.average_rating, reverse=True)
+        if request.sort_by == "rating":
+            nearby_services_qs = nearby_services_qs.order_by('-rating_avg', 'distance_miles')
         elif request.sort_by == "popularity":
-            service_results.sort(key=lambda x: x.total_reviews, reverse=True)
+            nearby_services_qs = nearby_services_qs.order_by('-rating_count', 'distance_miles')
+        else:
+            nearby_services_qs = nearby_services_qs.order_by('distance_miles')
         
-        services = service_results[:request.page_size]
+        nearby_services = await sync_to_async(list)(
+            nearby_services_qs[offset:offset + request.page_size]
+        )
+        
+        for service in nearby_services:
+            location = service.practitioner_location
+            distance_miles = service.distance_miles
+            result = ServiceSearchResult(
+                id=str(service.public_uuid),
+                name=service.name,
+                short_description=service.short_description,
+                service_type=service.service_type.name,
+                category_name=service.category.name if service.category else None,
+                practitioner_id=str(service.primary_practitioner.public_uuid),
+                practitioner_name=service.primary_practitioner.display_name,
+                price=service.price,
+                price_display=f"${service.price}",
+                duration_minutes=service.duration_minutes,
+                location_type=service.location_type,
+                experience_level=service.experience_level,
+                max_participants=service.max_participants,
+                city=location.city.name if location.city else None,
+                state=location.state.code if location.state else None,
+                distance_miles=round(distance_miles, 1),
+                average_rating=service.average_rating,
+                total_reviews=service.total_reviews,
+                is_available=service.is_available(),
+                image_url=service.image_url
+            )
+            result.score = SearchScore(
+                total=100 - distance_miles,  # Closer = higher score
+                location_boost=100 - distance_miles
+            )
+            services.append(result)
     
-    # Similar logic for practitioners...
     if request.search_type in [SearchType.ALL, SearchType.PRACTITIONERS]:
-        # Find practitioners with locations near request
-        nearby_practitioners = await sync_to_async(list)(Practitioner.objects.filter(
-            is_verified=True,
-            practitioner_status='active',
-            locations__latitude__isnull=False,
-            locations__longitude__isnull=False
-        ).prefetch_related('locations', 'specializations', 'modalities').distinct())
+        # Closest location per practitioner, computed in SQL
+        nearby_practitioners_qs = annotate_practitioner_distance(
+            Practitioner.objects.filter(
+                is_verified=True,
+                practitioner_status='active'
+            ),
+            latitude, longitude, request.radius_miles
+        ).prefetch_related(
+            'locations__city', 'locations__state', 'specializations', 'modalities'
+        )
         
-        practitioner_results = []
-        for practitioner in nearby_practitioners:
-            # Find closest location
-            min_distance = float('inf')
-            closest_location = None
-            
-            for location in await sync_to_async(list)(practitioner.locations.all()):
-                if location.latitude and location.longitude:
-                    distance_miles = geo_distance(
-                        (request.location.latitude, request.location.longitude),
-                        (location.latitude, location.longitude)
-                    ).miles
-                    
-                    if distance_miles < min_distance and distance_miles <= request.radius_miles:
-                        min_distance = distance_miles
-                        closest_location = location
-            
-            if closest_location:
-                result = PractitionerSearchResult(
-                    id=str(practitioner.public_uuid),
-                    display_name=practitioner.display_name,
-                    professional_title=practitioner.professional_title,
-                    bio_excerpt=practitioner.bio[:200] if practitioner.bio else None,
-                    years_experience=practitioner.years_of_experience,
-                    total_sessions=practitioner.completed_sessions_count,
-                    specializations=[s.content for s in await sync_to_async(list)(practitioner.specializations.all())],
-                    modalities=[m.name for m in await sync_to_async(list)(practitioner.modalities.all())],
-                    city=closest_location.city.name if closest_location.city else None,
-                    state=closest_location.state.code if closest_location.state else None,
-                    offers_virtual=any(loc.is_virtual for loc in await sync_to_async(list)(practitioner.locations.all())),
-                    offers_in_person=True,
-                    distance_miles=round(min_distance, 1),
-                    average_rating=practitioner.average_rating,
-                    total_reviews=practitioner.total_reviews,
-                    is_available=practitioner.is_active,
-                    is_verified=practitioner.is_verified,
-                    is_featured=practitioner.featured,
-                    profile_image_url=practitioner.profile_image_url
-                )
-                result.score = SearchScore(
-                    total=100 - min_distance,
-                    location_boost=100 - min_distance
-                )
-                practitioner_results.append(result)
+        if request.sort_by == "rating":
+            nearby_practitioners_qs = nearby_practitioners_qs.order_by('-rating_avg', 'distance_miles')
+        else:
+            nearby_practitioners_qs = nearby_practitioners_qs.order_by('distance_miles')
         
-        # Sort
-        if request.sort_by == "distance":
-            practitioner_results.sort(key=lambda x: x.distance_miles)
-        elif request.sort_by == "rating":
-            practitioner_results.sort(key=lambda x: x.average_rating, reverse=True)
+        nearby_practitioners = await sync_to_async(list)(
+            nearby_practitioners_qs[offset:offset + request.page_size]
+        )
         
-        practitioners = practitioner_results[:request.page_size]
+        for practitioner in nearby_practitioners:
+            locations = await sync_to_async(list)(practitioner.locations.all())
+            closest_location = next(
+                loc for loc in locations if loc.id == practitioner.nearest_location_id
+            )
+            min_distance = practitioner.distance_miles
+            
+            result = PractitionerSearchResult(
+                id=str(practitioner.public_uuid),
+                display_name=practitioner.display_name,
+                professional_title=practitioner.professional_title,
+                bio_excerpt=practitioner.bio[:200] if practitioner.bio else None,
+                years_experience=practitioner.years_of_experience,
+                total_sessions=practitioner.completed_sessions_count,
+                specializations=[s.content for s in await sync_to_async(list)(practitioner.specializations.all())],
+                modalities=[m.name for m in await sync_to_async(list)(practitioner.modalities.all())],
+                city=closest_location.city.name if closest_location.city else None,
+                state=closest_location.state.code if closest_location.state else None,
+                offers_virtual=any(loc.is_virtual for loc in locations),
+                offers_in_person=True,
+                distance_miles=round(min_distance, 1),
+                average_rating=practitioner.average_rating,
+                total_reviews=practitioner.total_reviews,
+                is_available=practitioner.is_active,
+                is_verified=practitioner.is_verified,
+                is_featured=practitioner.featured,
+                profile_image_url=practitioner.profile_image_url
+            )
+            result.score = SearchScore(
+                total=100 - min_distance,
+                location_boost=100 - min_distance
+            )
+            practitioners.append(result)
     
     # Combine results
     if request.search_type == SearchType.ALL:
@@ -982,20 +969,14 @@ async def search_services(
         'primary_practitioner',
         'category',
         'service_type',
-        'address'
+        'practitioner_location__city',
+        'practitioner_location__state'
     ).prefetch_related('languages')
     
     # Text search
     if request.query:
-        # Use PostgreSQL full-text search
-        search_vector = SearchVector('name', weight='A') + \
-                       SearchVector('short_description', weight='B') + \
-                       SearchVector('description', weight='C')
-        search_query = SearchQuery(request.query)
-        
-        services_qs = services_qs.annotate(
-            search_rank=SearchRank(search_vector, search_query)
-        ).filter(search_rank__gte=0.1)
+        # Indexed full-text + trigram match on the stored search vector
+        services_qs = apply_text_search(services_qs, request.query, 'name')
     
     # Apply filters
     if request.filters:
@@ -1005,11 +986,12 @@ async def search_services(
     if request.location:
         # Filter by distance if specified
         if request.filters and request.filters.distance_miles:
-            # This would require a more complex geospatial query
-            # Simplified version:
-            services_qs = services_qs.filter(
-                address__latitude__isnull=False,
-                address__longitude__isnull=False
+            services_qs = filter_within_radius(
+                services_qs,
+                request.location.latitude, request.location.longitude,
+                request.filters.distance_miles,
+                lat_field='practitioner_location__latitude',
+                lng_field='practitioner_location__longitude'
             )
     
     # Advanced options
@@ -1034,13 +1016,9 @@ async def search_services(
     elif request.sort_by == "price_high_low":
         services_qs = services_qs.order_by('-price_cents')
     elif request.sort_by == "rating":
-        services_qs = services_qs.annotate(
-            avg_rating=Avg('reviews__rating', filter=Q(reviews__is_published=True))
-        ).order_by('-avg_rating')
+        services_qs = services_qs.order_by('-rating_avg', '-rating_count')
     elif request.sort_by == "reviews":
-        services_qs = services_qs.annotate(
-            review_count=Count('reviews', filter=Q(reviews__is_published=True))
-        ).order_by('-review_count')
+        services_qs = services_qs.order_by('-rating_count')
     elif request.query:
         services_qs = services_qs.order_by('-search_rank')
     else:
@@ -1056,12 +1034,14 @@ async def search_services(
     # Convert to response objects
     results = []
     for service in services:
+        location = service.practitioner_location
+        
         # Calculate distance if location provided
-        distance_miles = None
-        if request.location and service.address and service.address.latitude:
+        distance_miles = getattr(service, 'distance_miles', None)
+        if distance_miles is None and request.location and location and location.latitude:
             distance_miles = geo_distance(
                 (request.location.latitude, request.location.longitude),
-                (service.address.latitude, service.address.longitude)
+                (location.latitude, location.longitude)
             ).miles
         
         # Calculate score
@@ -1096,8 +1076,8 @@ async def search_services(
             location_type=service.location_type,
             experience_level=service.experience_level,
             max_participants=service.max_participants,
-            city=service.address.city if service.address else None,
-            state=service.address.state_province if service.address else None,
+            city=location.city.name if location and location.city else None,
+            state=location.state.code if location and location.state else None,
             distance_miles=round(distance_miles, 1) if distance_miles else None,
             average_rating=service.average_rating,
             total_reviews=service.total_reviews,
@@ -1138,11 +1118,7 @@ async def search_practitioners(
     
     # Text search
     if request.query:
-        practitioners_qs = practitioners_qs.filter(
-            Q(display_name__icontains=request.query) |
-            Q(professional_title__icontains=request.query) |
-            Q(bio__icontains=request.query)
-        )
+        practitioners_qs = apply_text_search(practitioners_qs, request.query, 'display_name')
     
     # Apply filters
     if request.filters:
@@ -1180,19 +1156,15 @@ async def search_practitioners(
         
         # Rating
         if request.filters.min_rating:
-            practitioners_qs = practitioners_qs.annotate(
-                avg_rating=Avg('reviews__rating', filter=Q(reviews__is_published=True))
-            ).filter(avg_rating__gte=request.filters.min_rating)
+            practitioners_qs = practitioners_qs.filter(rating_avg__gte=request.filters.min_rating)
     
     # Sorting
     if request.sort_by == "rating":
-        practitioners_qs = practitioners_qs.annotate(
-            avg_rating=Avg('reviews__rating', filter=Q(reviews__is_published=True))
-        ).order_by('-avg_rating')
+        practitioners_qs = practitioners_qs.order_by('-rating_avg', '-rating_count')
     elif request.sort_by == "reviews":
-        practitioners_qs = practitioners_qs.annotate(
-            review_count=Count('reviews', filter=Q(reviews__is_published=True))
-        ).order_by('-review_count')
+        practitioners_qs = practitioners_qs.order_by('-rating_count')
+    elif request.query:
+        practitioners_qs = practitioners_qs.order_by('-search_rank', '-featured')
     else:
         practitioners_qs = practitioners_qs.order_by('-featured', '-created_at')
     
@@ -1206,9 +1178,6 @@ async def search_practitioners(
     # Convert to response objects
     results = []
     for practitioner in practitioners:
-        # Get price range from services
-        price_range = await sync_to_async(lambda: practitioner.price_range)()
-        
         # Calculate distance if location provided
         distance_miles = None
         if request.location:
@@ -1241,8 +1210,8 @@ async def search_practitioners(
             distance_miles=round(distance_miles, 1) if distance_miles else None,
             average_rating=practitioner.average_rating,
             total_reviews=practitioner.total_reviews,
-            price_range_min=price_range['min'],
-            price_range_max=price_range['max'],
+            price_range_min=practitioner.min_price_cents,
+            price_range_max=practitioner.max_price_cents,
             next_available=practitioner.next_available_date,
             is_available=practitioner.is_active,
             profile_image_url=practitioner.profile_image_url,
@@ -6,7 +6,7 @@ from fastapi import APIRouter, Depends, HTTPException, status, Query
 from asgiref.sync import sync_to_async
 from django.db import transaction
 from django.core.paginator import Paginator
-from django.db.models import Q, Count, Avg, Prefetch
+from django.db.models import Q, Count, Prefetch
 from services.models import Service, ServiceRelationship, ServiceSession, ServiceType
 from api.dependencies import (
     get_current_user,
@@ -82,8 +82,7 @@ def get_services_list(
     
     # Add annotations
     queryset = queryset.annotate(
-        booking_count=Count('bookings', distinct=True),
-        avg_rating=Avg('reviews__rating')
+        booking_count=Count('bookings', distinct=True)
     )
     
     # Apply ordering
@@ -120,7 +119,7 @@ def get_services_list(
             'is_active': service.is_active,
             'is_public': service.is_public,
             'booking_count': service.booking_count,
-            'average_rating': service.avg_rating if hasattr(service, 'avg_rating') else service.average_rating,
+            'average_rating': service.rating_avg,
             'sessions_included': service.sessions_included if service.is_bundle else None,
             'created_at': service.created_at,
             'updated_at': service.updated_at,
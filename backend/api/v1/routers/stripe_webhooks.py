@@ -7,17 +7,7 @@ from fastapi import APIRouter, Request, HTTPException, Header
 from fastapi.responses import JSONResponse
 from django.conf import settings
 from asgiref.sync import sync_to_async
-from integrations.stripe.webhooks import (
-    handle_payment_intent_succeeded,
-    handle_payment_intent_failed,
-    handle_checkout_session_completed,
-    handle_charge_refunded,
-    handle_subscription_created,
-    handle_subscription_updated,
-    handle_subscription_deleted,
-    handle_invoice_payment_succeeded,
-    handle_invoice_payment_failed,
-)
+from payments.webhook_inbox import record_event
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -34,8 +24,8 @@ async def stripe_webhook(
     """
     Handle Stripe webhook events.
     
-    This endpoint receives webhook events from Stripe and processes them
-    based on the event type.
+    Verified events are written to the webhook inbox and acknowledged
+    immediately; the integration handlers run asynchronously.
     
     Configure this URL in your Stripe dashboard:
     https://yourdomain.com/api/v1/payments/webhook
@@ -52,34 +42,8 @@ async def stripe_webhook(
         # Log the event for debugging
         logger.info(f"Received Stripe webhook event: {event['type']}")
         
-        # Process the event based on its type
-        event_type = event['type']
-        event_data = event['data']['object']
-        
-        # Payment events
-        if event_type == 'payment_intent.succeeded':
-            await sync_to_async(handle_payment_intent_succeeded)(event_data)
-        elif event_type == 'payment_intent.payment_failed':
-            await sync_to_async(handle_payment_intent_failed)(event_data)
-        elif event_type == 'checkout.session.completed':
-            await sync_to_async(handle_checkout_session_completed)(event_data)
-        elif event_type == 'charge.refunded':
-            await sync_to_async(handle_charge_refunded)(event_data)
-        
-        # Subscription events
-        elif event_type == 'customer.subscription.created':
-            await sync_to_async(handle_subscription_created)(event_data)
-        elif event_type == 'customer.subscription.updated':
-            await sync_to_async(handle_subscription_updated)(event_data)
-        elif event_type == 'customer.subscription.deleted':
-            await sync_to_async(handle_subscription_deleted)(event_data)
-        elif event_type == 'invoice.payment_succeeded':
-            await sync_to_async(handle_invoice_payment_succeeded)(event_data)
-        elif event_type == 'invoice.payment_failed':
-            await sync_to_async(handle_invoice_payment_failed)(event_data)
-        
-        else:
-            logger.info(f"Unhandled event type: {event_type}")
+        # Record the event; payments.webhook_inbox runs the handlers from a worker
+        await sync_to_async(record_event)(event, handler='integrations')
         
         return JSONResponse(
             status_code=200,
@@ -96,7 +60,7 @@ async def stripe_webhook(
         raise HTTPException(status_code=400, detail="Invalid signature")
     except Exception as e:
         # Other exceptions
-        logger.exception(f"Error processing webhook: {str(e)}")
+        logger.exception(f"Error recording webhook: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
@@ -109,11 +109,12 @@ class BookingAdmin(admin.ModelAdmin):
 
 @admin.register(BookingReminder)
 class BookingReminderAdmin(admin.ModelAdmin):
-    list_display = ['booking_info', 'reminder_type', 'scheduled_time', 'is_sent', 
-                   'sent_at', 'send_attempts']
-    list_filter = ['reminder_type', 'is_sent', 'scheduled_time']
+    list_display = ['booking_info', 'reminder_type', 'recipient', 'lead_minutes', 'scheduled_time',
+                   'is_sent', 'sent_at', 'send_attempts']
+    list_filter = ['reminder_type', 'recipient', 'is_sent', 'scheduled_time']
     search_fields = ['booking__public_uuid', 'booking__user__email', 'subject']
-    readonly_fields = ['id', 'created_at', 'updated_at', 'sent_at', 'last_attempt_at']
+    readonly_fields = ['id', 'created_at', 'updated_at', 'sent_at', 'last_attempt_at', 'claimed_at']
+    raw_id_fields = ['booking', 'service_session']
     date_hierarchy = 'scheduled_time'
     
     def booking_info(self, obj):
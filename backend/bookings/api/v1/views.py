@@ -505,6 +505,7 @@ class BookingViewSet(viewsets.ModelViewSet):
             service_id=service.id,
             start_date=start_date,
             end_date=end_date,
+            use_cache=True,
         )
 
         # Group by the original schedule date (not UTC-converted date)
@@ -582,7 +583,8 @@ class BookingViewSet(viewsets.ModelViewSet):
             service_id=service.id,
             start_date=date,
             end_date=date,
-            days_ahead=1
+            days_ahead=1,
+            use_cache=True
         )
         
         # Transform slots to match serializer expectations
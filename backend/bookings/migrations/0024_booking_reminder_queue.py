@@ -0,0 +1,69 @@
+# Generated by Django 5.1.3 on 2026-10-16 20:50
+
+from datetime import timedelta
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.utils import timezone
+
+REMINDER_LEAD_MINUTES = (24 * 60, 30)
+
+
+def queue_upcoming_reminders(apps, schema_editor):
+    """Queue reminders for confirmed bookings whose sessions have not started yet."""
+    Booking = apps.get_model('bookings', 'Booking')
+    BookingReminder = apps.get_model('bookings', 'BookingReminder')
+
+    now = timezone.now()
+    bookings = Booking.objects.filter(
+        status='confirmed', service_session__start_time__gt=now
+    ).values_list('id', 'service_session__start_time')
+
+    reminders = []
+    for booking_id, start_time in bookings.iterator():
+        for lead_minutes in REMINDER_LEAD_MINUTES:
+            due = start_time - timedelta(minutes=lead_minutes)
+            if due <= now:
+                continue
+            for recipient in ('client', 'practitioner'):
+                reminders.append(BookingReminder(
+                    booking_id=booking_id, reminder_type='email', recipient=recipient,
+                    lead_minutes=lead_minutes, scheduled_time=due
+                ))
+    BookingReminder.objects.bulk_create(reminders, batch_size=1000, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0023_performance_indexes'),
+        ('services', '0029_service_rating_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bookingreminder',
+            name='claimed_at',
+            field=models.DateTimeField(blank=True, help_text='When a dispatcher handed this reminder to a worker', null=True),
+        ),
+        migrations.AddField(
+            model_name='bookingreminder',
+            name='lead_minutes',
+            field=models.PositiveIntegerField(blank=True, help_text='Minutes before the session start this reminder is sent', null=True),
+        ),
+        migrations.AddField(
+            model_name='bookingreminder',
+            name='recipient',
+            field=models.CharField(choices=[('client', 'Client'), ('practitioner', 'Practitioner')], default='client', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='bookingreminder',
+            name='service_session',
+            field=models.ForeignKey(blank=True, help_text="Course session this reminder is for, when not the booking's own session", null=True, on_delete=django.db.models.deletion.CASCADE, related_name='booking_reminders', to='services.servicesession'),
+        ),
+        migrations.AddConstraint(
+            model_name='bookingreminder',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_sent', False), ('lead_minutes__isnull', False)), fields=('booking', 'service_session', 'recipient', 'lead_minutes'), name='unique_pending_booking_reminder', nulls_distinct=False),
+        ),
+        migrations.RunPython(queue_upcoming_reminders, migrations.RunPython.noop),
+    ]
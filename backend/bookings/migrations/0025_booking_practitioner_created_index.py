@@ -0,0 +1,17 @@
+# Generated by Django 5.1.3 on 2026-10-16 23:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0024_booking_reminder_queue'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['practitioner', '-created_at', '-id'], name='booking_prac_created_idx'),
+        ),
+    ]
@@ -137,6 +137,8 @@ class Booking(PublicModel):
             models.Index(fields=['service_session']),
             models.Index(fields=['service_session', 'status']),
             models.Index(fields=['order']),  # Added order index
+            # Practitioner transactions list, paged by (created_at, id)
+            models.Index(fields=['practitioner', '-created_at', '-id'], name='booking_prac_created_idx'),
         ]
         constraints = [
             models.CheckConstraint(
@@ -405,8 +407,13 @@ class Booking(PublicModel):
             # No refund for already started bookings
             return 0
 
-    def cancel(self, reason=None, canceled_by='client', _cascade=True):
-        """Cancel this booking."""
+    def cancel(self, reason=None, canceled_by='client', _cascade=True, _refund_batch=None):
+        """
+        Cancel this booking.
+
+        When cascading, sibling credit refunds are collected in _refund_batch and
+        queued as one bulk refund instead of one task per booking.
+        """
         if self.status == 'canceled':
             return  # Already canceled, don't process again
 
@@ -485,21 +492,34 @@ class Booking(PublicModel):
                 ).exclude(
                     public_uuid=self.public_uuid
                 )
+                sibling_reason = f"Related booking {self.public_uuid} was canceled"
+                sibling_refunds = []
                 for sibling in siblings:
                     sibling.cancel(
-                        reason=f"Related booking {self.public_uuid} was canceled",
+                        reason=sibling_reason,
                         canceled_by='system',
-                        _cascade=False  # PREVENT RECURSIVE CASCADE
+                        _cascade=False,  # PREVENT RECURSIVE CASCADE
+                        _refund_batch=sibling_refunds
                     )
 
+                if sibling_refunds:
+                    from payments.tasks import process_bulk_refund_credits
+                    transaction.on_commit(lambda: process_bulk_refund_credits.delay(
+                        sibling_refunds,
+                        sibling_reason
+                    ))
+
         # Queue async tasks AFTER transaction commits
         if needs_credit_refund:
             from payments.tasks import process_refund_credits, process_stripe_refund
-            transaction.on_commit(lambda: process_refund_credits.delay(
-                booking_uuid,
-                refund_amount_cents,
-                refund_reason
-            ))
+            if _refund_batch is not None:
+                _refund_batch.append((booking_uuid, refund_amount_cents))
+            else:
+                transaction.on_commit(lambda: process_refund_credits.delay(
+                    booking_uuid,
+                    refund_amount_cents,
+                    refund_reason
+                ))
             if needs_stripe_refund:
                 transaction.on_commit(lambda: process_stripe_refund.delay(
                     order_id,
@@ -766,6 +786,10 @@ class BookingReminder(BaseModel):
     """
     Model representing a reminder for a booking.
     Updated to use BaseModel and improved structure.
+
+    Rows with a lead_minutes value are the reminder queue: they are written
+    when a booking is confirmed or its session moves (see
+    bookings.reminder_queue) and claimed by scheduled_time when due.
     """
     REMINDER_TYPE_CHOICES = [
         ('email', 'Email'),
@@ -773,11 +797,35 @@ class BookingReminder(BaseModel):
         ('push', 'Push Notification'),
         ('webhook', 'Webhook'),
     ]
+
+    RECIPIENT_CHOICES = [
+        ('client', 'Client'),
+        ('practitioner', 'Practitioner'),
+    ]
     
     booking = models.ForeignKey(Booking, on_delete=models.CASCADE, related_name='reminders')
     reminder_type = models.CharField(max_length=20, choices=REMINDER_TYPE_CHOICES)
     scheduled_time = models.DateTimeField(help_text="When to send the reminder")
     sent_at = models.DateTimeField(blank=True, null=True, help_text="When reminder was actually sent")
+
+    # Queue fields
+    recipient = models.CharField(max_length=20, choices=RECIPIENT_CHOICES, default='client')
+    lead_minutes = models.PositiveIntegerField(
+        blank=True, null=True,
+        help_text="Minutes before the session start this reminder is sent"
+    )
+    service_session = models.ForeignKey(
+        'services.ServiceSession',
+        on_delete=models.CASCADE,
+        blank=True,
+        null=True,
+        related_name='booking_reminders',
+        help_text="Course session this reminder is for, when not the booking's own session"
+    )
+    claimed_at = models.DateTimeField(
+        blank=True, null=True,
+        help_text="When a dispatcher handed this reminder to a worker"
+    )
     
     # Reminder content
     subject = models.CharField(max_length=255, blank=True, null=True)
@@ -798,6 +846,14 @@ class BookingReminder(BaseModel):
             models.Index(fields=['is_sent', 'scheduled_time']),
             models.Index(fields=['reminder_type']),
         ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['booking', 'service_session', 'recipient', 'lead_minutes'],
+                condition=models.Q(is_sent=False, lead_minutes__isnull=False),
+                nulls_distinct=False,
+                name='unique_pending_booking_reminder'
+            ),
+        ]
 
     def __str__(self):
         return f"{self.reminder_type.title()} reminder for {self.booking}"
@@ -809,11 +865,18 @@ class BookingReminder(BaseModel):
         self.save(update_fields=['is_sent', 'sent_at'])
     
     def mark_failed(self, error_message):
-        """Mark reminder send attempt as failed."""
-        self.send_attempts += 1
-        self.last_attempt_at = timezone.now()
+        """
+        Mark reminder send attempt as failed.
+
+        Queued reminders count the attempt when claimed, so for them this only
+        records the error and releases the claim for the next dispatch.
+        """
+        if self.claimed_at is None:
+            self.send_attempts += 1
+            self.last_attempt_at = timezone.now()
+        self.claimed_at = None
         self.error_message = error_message
-        self.save(update_fields=['send_attempts', 'last_attempt_at', 'error_message'])
+        self.save(update_fields=['send_attempts', 'last_attempt_at', 'error_message', 'claimed_at'])
 
 
 class BookingNote(BaseModel):
@@ -0,0 +1,182 @@
+"""
+Booking reminder queue.
+
+Reminders are rows in `BookingReminder` rather than something rediscovered by
+scanning bookings:
+
+- When a booking is confirmed, or its session moves, `schedule_booking_reminders`
+  writes one row per (recipient, lead time) with `scheduled_time` set to when it
+  is due. Course bookings also get client rows for each upcoming course session.
+- `claim_due_reminders` takes due rows with SELECT ... FOR UPDATE SKIP LOCKED
+  and stamps them `claimed_at`, so concurrent dispatchers never hand out the
+  same reminder twice. The dispatch task fans the claimed ids out to workers
+  in batches, so each tick costs time proportional to the due reminders.
+- A claim is a lease: rows whose worker died are claimable again after
+  CLAIM_LEASE. Each claim counts as an attempt and rows stop being claimed
+  after MAX_ATTEMPTS.
+- Reminders for bookings that are no longer confirmed, or whose session has
+  started, are dropped when they come due.
+"""
+import logging
+from datetime import timedelta
+from typing import Dict, List
+
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from bookings.models import Booking, BookingReminder
+
+logger = logging.getLogger(__name__)
+
+# Lead time in minutes -> hours_before passed to the notification services
+REMINDER_LEADS = {
+    24 * 60: 24,
+    30: 0.5,
+}
+CLAIM_LEASE = timedelta(minutes=10)
+MAX_ATTEMPTS = 3
+
+
+# ── Scheduling ───────────────────────────────────────────────────────────────
+
+def schedule_booking_reminders(booking: Booking) -> int:
+    """
+    Replace the booking's pending reminders with ones for its current times.
+
+    Returns the number of reminders queued.
+    """
+    from services.models import ServiceSession
+
+    BookingReminder.objects.filter(booking=booking, is_sent=False, lead_minutes__isnull=False).delete()
+    if booking.status != 'confirmed':
+        return 0
+
+    now = timezone.now()
+    reminders = []
+
+    def queue(start_time, recipients, service_session=None):
+        for lead_minutes in REMINDER_LEADS:
+            due = start_time - timedelta(minutes=lead_minutes)
+            if due <= now:
+                continue
+            for recipient in recipients:
+                reminders.append(BookingReminder(
+                    booking=booking,
+                    reminder_type='email',
+                    recipient=recipient,
+                    lead_minutes=lead_minutes,
+                    service_session=service_session,
+                    scheduled_time=due,
+                ))
+
+    start_time = booking.get_start_time()
+    if start_time:
+        queue(start_time, ('client', 'practitioner'))
+
+    if booking.service_id and booking.service.service_type and booking.service.service_type.code == 'course':
+        sessions = ServiceSession.objects.filter(
+            service_id=booking.service_id,
+            start_time__gt=now
+        ).exclude(pk=booking.service_session_id)
+        for session in sessions:
+            queue(session.start_time, ('client',), service_session=session)
+
+    BookingReminder.objects.bulk_create(reminders, ignore_conflicts=True)
+    return len(reminders)
+
+
+def schedule_session_reminders(session) -> int:
+    """Re-queue reminders for every confirmed booking affected by a session time change."""
+    bookings = Booking.objects.filter(status='confirmed').filter(
+        Q(service_session=session) |
+        Q(service_id=session.service_id, service__service_type__code='course')
+    ).select_related('service__service_type', 'service_session').distinct()
+
+    return sum(schedule_booking_reminders(booking) for booking in bookings)
+
+
+def cancel_booking_reminders(booking: Booking) -> int:
+    """Drop the booking's pending reminders."""
+    deleted, _ = BookingReminder.objects.filter(
+        booking=booking, is_sent=False, lead_minutes__isnull=False
+    ).delete()
+    return deleted
+
+
+# ── Dispatching ──────────────────────────────────────────────────────────────
+
+def _claimable(now):
+    return BookingReminder.objects.filter(
+        is_sent=False,
+        lead_minutes__isnull=False,
+        scheduled_time__lte=now,
+        send_attempts__lt=MAX_ATTEMPTS,
+    ).filter(
+        Q(claimed_at__isnull=True) | Q(claimed_at__lt=now - CLAIM_LEASE)
+    )
+
+
+def claim_due_reminders(limit: int = 500) -> List[int]:
+    """Claim up to `limit` due reminders and return their ids. Safe to run concurrently."""
+    now = timezone.now()
+    with transaction.atomic():
+        ids = list(
+            _claimable(now).select_for_update(skip_locked=True)
+            .order_by('scheduled_time', 'pk').values_list('pk', flat=True)[:limit]
+        )
+        if ids:
+            BookingReminder.objects.filter(pk__in=ids).update(
+                claimed_at=now,
+                last_attempt_at=now,
+                send_attempts=F('send_attempts') + 1
+            )
+    return ids
+
+
+def deliver_reminder(reminder: BookingReminder) -> str:
+    """
+    Send one claimed reminder. Returns 'sent' or 'skipped'; raises on failure.
+    """
+    from bookings.tasks.reminders import send_booking_reminder_immediate
+    from notifications.services.registry import get_client_notification_service
+
+    booking = reminder.booking
+    session = reminder.service_session or booking.service_session
+    hours_before = REMINDER_LEADS[reminder.lead_minutes]
+
+    if booking.status != 'confirmed' or not session or session.start_time <= timezone.now():
+        reminder.delete()
+        return 'skipped'
+
+    if reminder.service_session_id:
+        get_client_notification_service().send_course_session_reminder(
+            booking, reminder.service_session, int(hours_before)
+        )
+    else:
+        send_booking_reminder_immediate(booking=booking, user_type=reminder.recipient, hours_before=hours_before)
+
+    reminder.mark_sent()
+    return 'sent'
+
+
+def deliver_reminders(reminder_ids: List[int]) -> Dict[str, int]:
+    """Send a batch of claimed reminders."""
+    counts = {'sent': 0, 'skipped': 0, 'failed': 0}
+    reminders = BookingReminder.objects.filter(pk__in=reminder_ids, is_sent=False).select_related(
+        'booking__user',
+        'booking__practitioner',
+        'booking__service__service_type',
+        'booking__service__primary_practitioner__user',
+        'booking__service_session',
+        'service_session',
+    )
+
+    for reminder in reminders:
+        try:
+            counts[deliver_reminder(reminder)] += 1
+        except Exception as e:
+            logger.error(f"[ReminderQueue] Reminder {reminder.pk} for booking {reminder.booking_id} failed: {e}")
+            reminder.mark_failed(str(e))
+            counts['failed'] += 1
+    return counts
@@ -137,13 +137,42 @@ class FastBookingService:
         """
         Create a workshop booking.
         Uses select_for_update() to prevent race conditions on capacity.
+        If checkout already took the seat (payment_data['seat_reserved']), the
+        booking is attached to it without re-checking capacity.
         """
-        # Lock the ServiceSession row to prevent race conditions
-        service_session = ServiceSession.objects.select_for_update().get(
-            id=booking_data['service_session_id']
+        seat_reserved = payment_data.get('seat_reserved', False)
+        if seat_reserved:
+            service_session = ServiceSession.objects.get(id=booking_data['service_session_id'])
+        else:
+            # Lock the ServiceSession row to prevent race conditions
+            service_session = ServiceSession.objects.select_for_update().get(
+                id=booking_data['service_session_id']
+            )
+            self._validate_workshop_session(service_session)
+
+        # Create the booking
+        booking = Booking.objects.create(
+            user=user,
+            service=service,
+            practitioner=service.primary_practitioner,
+            service_session=service_session,
+            order=payment_data.get('order'),
+            credits_allocated=payment_data.get('amount_charged_cents', 0),
+            status='confirmed',
+            payment_status='paid',
+            client_notes=booking_data.get('special_requests', ''),
+            confirmed_at=timezone.now()
         )
 
-        # Validate session status
+        # Atomically increment participant count
+        if not seat_reserved:
+            service_session.current_participants = F('current_participants') + 1
+            service_session.save(update_fields=['current_participants'])
+
+        return booking
+
+    def _validate_workshop_session(self, service_session: ServiceSession) -> None:
+        """Raise ValidationError unless the workshop session can take another participant."""
         if service_session.status != 'scheduled':
             raise ValidationError(
                 f"Cannot book a workshop session with status '{service_session.status}'. "
@@ -160,25 +189,27 @@ class FastBookingService:
                 f"This workshop session is full ({service_session.max_participants}/{service_session.max_participants} seats taken)."
             )
 
-        # Create the booking
-        booking = Booking.objects.create(
-            user=user,
-            service=service,
-            practitioner=service.primary_practitioner,
-            service_session=service_session,
-            order=payment_data.get('order'),
-            credits_allocated=payment_data.get('amount_charged_cents', 0),
-            status='confirmed',
-            payment_status='paid',
-            client_notes=booking_data.get('special_requests', ''),
-            confirmed_at=timezone.now()
-        )
+    @transaction.atomic
+    def reserve_workshop_seat(self, service_session_id: int) -> ServiceSession:
+        """
+        Validate capacity and take a seat on a workshop session before payment.
 
-        # Atomically increment participant count
-        service_session.current_participants = F('current_participants') + 1
-        service_session.save(update_fields=['current_participants'])
+        The row lock is only held for this short transaction. Pass
+        seat_reserved=True in payment_data when creating the booking, or give
+        the seat back with release_workshop_seat().
+        """
+        service_session = ServiceSession.objects.select_for_update().get(id=service_session_id)
+        self._validate_workshop_session(service_session)
+        ServiceSession.objects.filter(id=service_session.id).update(
+            current_participants=F('current_participants') + 1
+        )
+        return service_session
 
-        return booking
+    def release_workshop_seat(self, service_session_id: int) -> None:
+        """Give back a seat taken by reserve_workshop_seat()."""
+        ServiceSession.objects.filter(id=service_session_id, current_participants__gt=0).update(
+            current_participants=F('current_participants') - 1
+        )
 
     def _create_course_booking(
         self,
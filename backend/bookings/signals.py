@@ -3,7 +3,63 @@ Booking signals for handling automatic actions on booking events.
 """
 import logging
 
+from django.db.models.signals import post_save, pre_save
+from django.dispatch import receiver
+
+from bookings.models import Booking
+from services.models import ServiceSession
+
 logger = logging.getLogger(__name__)
 
 # Note: Room creation for bookings is handled in rooms/signals.py
-# This keeps all room-related logic in one place
\ No newline at end of file
+# This keeps all room-related logic in one place
+
+REMINDER_FIELDS = {'status', 'service_session', 'service_session_id'}
+
+
+@receiver(pre_save, sender=Booking)
+def capture_booking_schedule(sender, instance, update_fields=None, **kwargs):
+    """Remember the status and session before this save so reminders follow changes."""
+    instance._schedule_before = None
+    if not instance.pk or (update_fields is not None and not REMINDER_FIELDS & set(update_fields)):
+        return
+    instance._schedule_before = Booking.objects.filter(pk=instance.pk).values_list(
+        'status', 'service_session_id'
+    ).first()
+
+
+@receiver(post_save, sender=Booking)
+def queue_booking_reminders(sender, instance, created, update_fields=None, **kwargs):
+    """Queue reminders when a booking is confirmed or moved; drop them when it leaves 'confirmed'."""
+    from bookings.reminder_queue import schedule_booking_reminders
+
+    before = getattr(instance, '_schedule_before', None)
+    if created:
+        if instance.status != 'confirmed':
+            return
+    elif before is None or before == (instance.status, instance.service_session_id):
+        return
+
+    schedule_booking_reminders(instance)
+
+
+@receiver(pre_save, sender=ServiceSession)
+def capture_session_start(sender, instance, **kwargs):
+    instance._start_before = None
+    if instance.pk:
+        instance._start_before = ServiceSession.objects.filter(pk=instance.pk).values_list(
+            'start_time', flat=True
+        ).first()
+
+
+@receiver(post_save, sender=ServiceSession)
+def requeue_reminders_for_moved_session(sender, instance, created, **kwargs):
+    """Rescheduling a session moves the reminders of every booking on it."""
+    from bookings.reminder_queue import schedule_session_reminders
+
+    before = getattr(instance, '_start_before', None)
+    if created or before is None or before == instance.start_time:
+        return
+
+    count = schedule_session_reminders(instance)
+    logger.info(f"[ReminderQueue] Re-queued {count} reminders for rescheduled session {instance.pk}")
@@ -19,106 +19,57 @@ logger = logging.getLogger(__name__)
 
 
 @shared_task(name='process-booking-reminders')
-def process_booking_reminders():
+def process_booking_reminders(batch_size=50, limit=2000):
     """
-    Process all booking reminders that are due to be sent.
-    This task runs every 5 minutes via Celery Beat.
+    Dispatch booking reminders that are due.
+    This task runs every minute via Celery Beat.
     
-    Checks for:
-    - 24-hour reminders
-    - 30-minute reminders
-    - Both client and practitioner notifications
+    Due rows are claimed from the BookingReminder queue (see
+    bookings.reminder_queue) and sent by send-booking-reminders workers in
+    batches of `batch_size`. Covers 24-hour and 30-minute reminders for
+    clients and practitioners, and course session reminders.
     """
-    from datetime import timedelta
+    from bookings.reminder_queue import claim_due_reminders
     
     now = timezone.now()
+    reminder_ids = claim_due_reminders(limit=limit)
     
-    # Define reminder windows (with some buffer for the periodic task)
-    reminder_configs = [
-        {
-            'hours_before': 24,
-            'min_time': now + timedelta(hours=23, minutes=50),
-            'max_time': now + timedelta(hours=24, minutes=10),
-            'key_suffix': '24h'
-        },
-        {
-            'hours_before': 0.5,
-            'min_time': now + timedelta(minutes=25),
-            'max_time': now + timedelta(minutes=35),
-            'key_suffix': '0.5h'
-        }
-    ]
+    for start in range(0, len(reminder_ids), batch_size):
+        send_booking_reminders.delay(reminder_ids[start:start + batch_size])
     
-    # Get all confirmed bookings with future start times
-    # start_time now lives on ServiceSession, not Booking
-    bookings = Booking.objects.filter(
-        status='confirmed',
-        service_session__start_time__gte=now
-    ).select_related(
-        'user',
-        'service__service_type',
-        'service__primary_practitioner__user',
-        'service_session',
-        'practitioner'
-    )
-
-    reminders_sent = 0
-    errors = 0
+    if reminder_ids:
+        logger.info(f"[ReminderQueue] Dispatched {len(reminder_ids)} due reminders")
+    
+    return {
+        'reminders_dispatched': len(reminder_ids),
+        'checked_at': now.isoformat()
+    }
 
-    for booking in bookings:
-        for config in reminder_configs:
-            try:
-                # Get start time using helper method (handles both new and legacy)
-                start_time = booking.get_start_time()
-                if not start_time:
-                    continue  # Skip bookings without a start time
 
-                # Check if booking time falls within this reminder window
-                if config['min_time'] <= start_time <= config['max_time']:
-                    # Send client reminder if not already sent
-                    client_key = f"client_{config['key_suffix']}_reminder_sent"
-                    if not booking.metadata.get(client_key):
-                        send_booking_reminder_immediate(
-                            booking=booking,
-                            user_type='client',
-                            hours_before=config['hours_before']
-                        )
-                        reminders_sent += 1
-                    
-                    # Send practitioner reminder if not already sent
-                    practitioner_key = f"practitioner_{config['key_suffix']}_reminder_sent"
-                    if not booking.metadata.get(practitioner_key):
-                        send_booking_reminder_immediate(
-                            booking=booking,
-                            user_type='practitioner',
-                            hours_before=config['hours_before']
-                        )
-                        reminders_sent += 1
-                        
-            except Exception as e:
-                logger.error(f"Error processing reminders for booking {booking.id}: {e}")
-                errors += 1
+@shared_task(name='send-booking-reminders')
+def send_booking_reminders(reminder_ids):
+    """
+    Send a batch of claimed booking reminders.
     
-    # Also process course session reminders
-    course_reminders = process_course_session_reminders(now, reminder_configs)
-    reminders_sent += course_reminders['sent']
-    errors += course_reminders['errors']
+    Args:
+        reminder_ids: BookingReminder IDs claimed by process_booking_reminders
+    """
+    from bookings.reminder_queue import deliver_reminders
     
+    counts = deliver_reminders(reminder_ids)
     logger.info(
-        f"Booking reminders task completed. "
-        f"Sent {reminders_sent} reminders, {errors} errors"
+        f"Booking reminders batch completed. "
+        f"Sent {counts['sent']}, skipped {counts['skipped']}, {counts['failed']} errors"
     )
-    
-    return {
-        'reminders_sent': reminders_sent,
-        'errors': errors,
-        'checked_at': now.isoformat()
-    }
+    return counts
 
 
 def send_booking_reminder_immediate(booking, user_type: str, hours_before: float):
     """
-    Send a booking reminder immediately (used by periodic task).
+    Send a booking reminder immediately (used by the reminder queue workers).
+    
+    The queued BookingReminder row is what prevents duplicates; the metadata
+    flag written here records when the reminder went out.
     
     Args:
         booking: Booking instance
@@ -126,10 +77,7 @@ def send_booking_reminder_immediate(booking, user_type: str, hours_before: float
         hours_before: Hours before the appointment (24 or 0.5)
     """
     try:
-        # Check if reminder already sent
         reminder_key = f"{user_type}_{hours_before}h_reminder_sent"
-        if booking.metadata.get(reminder_key):
-            return  # Already sent
         
         # For practitioners with workshops/courses, check if we should aggregate
         if (user_type == 'practitioner' and 
@@ -180,58 +128,6 @@ def send_booking_reminder_immediate(booking, user_type: str, hours_before: float
         raise
 
 
-def process_course_session_reminders(now, reminder_configs):
-    """
-    Process reminders for course sessions.
-    
-    Args:
-        now: Current time
-        reminder_configs: List of reminder configurations
-        
-    Returns:
-        Dict with sent count and errors
-    """
-    sent = 0
-    errors = 0
-    
-    # Get all course bookings
-    course_bookings = Booking.objects.filter(
-        status='confirmed',
-        service__service_type__code='course'
-    ).select_related('service', 'user')
-    
-    for course_booking in course_bookings:
-        # Get upcoming sessions for this course
-        sessions = ServiceSession.objects.filter(
-            service=course_booking.service,
-            start_time__gte=now
-        ).order_by('start_time')
-        
-        for session in sessions:
-            for config in reminder_configs:
-                try:
-                    # Check if session time falls within this reminder window
-                    if config['min_time'] <= session.start_time <= config['max_time']:
-                        # Send client reminder for this session
-                        session_client_key = f"client_session_{session.id}_{config['key_suffix']}_reminder_sent"
-                        if not course_booking.metadata.get(session_client_key):
-                            service = get_client_notification_service()
-                            service.send_course_session_reminder(
-                                course_booking, 
-                                session, 
-                                int(config['hours_before'])
-                            )
-                            course_booking.metadata[session_client_key] = timezone.now().isoformat()
-                            course_booking.save(update_fields=['metadata'])
-                            sent += 1
-                            
-                except Exception as e:
-                    logger.error(f"Error processing course session reminder: {e}")
-                    errors += 1
-    
-    return {'sent': sent, 'errors': errors}
-
-
 def send_practitioner_aggregated_reminder_immediate(practitioner_id: int, session_id: int, hours_before: float):
     """
     Send aggregated reminder to practitioner immediately.
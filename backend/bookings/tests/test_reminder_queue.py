@@ -0,0 +1,114 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+
+from bookings.models import Booking, BookingReminder
+from bookings.reminder_queue import CLAIM_LEASE, claim_due_reminders, deliver_reminders
+from practitioners.models import Practitioner
+from services.models import Service, ServiceSession, ServiceType
+from users.models import User
+
+
+class ReminderQueueTestCase(TestCase):
+    """Reminders are queued on confirmation and claimed by due time."""
+
+    def setUp(self):
+        practitioner_user = User.objects.create_user(email='reminder-practitioner@example.com', password='testpass123')
+        self.practitioner = Practitioner.objects.create(user=practitioner_user, display_name='Reminder Studio')
+        service_type, _ = ServiceType.objects.get_or_create(code='session', defaults={'name': 'Session'})
+        self.service = Service.objects.create(
+            name='Acupuncture', price_cents=9000, duration_minutes=60, service_type=service_type,
+            primary_practitioner=self.practitioner, location_type='in_person'
+        )
+        self.client_user = User.objects.create_user(email='reminder-client@example.com', password='testpass123')
+
+    def book(self, starts_in, status='confirmed'):
+        start = timezone.now() + starts_in
+        session = ServiceSession.objects.create(service=self.service, start_time=start, end_time=start + timedelta(hours=1))
+        return Booking.objects.create(
+            user=self.client_user, practitioner=self.practitioner, service=self.service,
+            service_session=session, status=status
+        )
+
+    def pending(self, booking):
+        return BookingReminder.objects.filter(booking=booking, is_sent=False)
+
+    def test_confirmation_queues_and_cancellation_drops_reminders(self):
+        booking = self.book(timedelta(days=3), status='pending')
+        self.assertFalse(self.pending(booking).exists())
+
+        booking.status = 'confirmed'
+        booking.save()
+        start = booking.service_session.start_time
+        self.assertEqual(
+            sorted(self.pending(booking).values_list('recipient', 'scheduled_time')),
+            sorted([(recipient, start - timedelta(minutes=lead))
+                    for recipient in ('client', 'practitioner') for lead in (1440, 30)])
+        )
+
+        booking.metadata['note'] = 'unrelated change'
+        booking.save(update_fields=['metadata'])
+        self.assertEqual(self.pending(booking).count(), 4)
+
+        booking.status = 'canceled'
+        booking.save()
+        self.assertFalse(self.pending(booking).exists())
+
+    def test_rescheduled_session_moves_reminders(self):
+        booking = self.book(timedelta(hours=10))
+        self.assertEqual(self.pending(booking).count(), 2)  # 24h reminders already passed
+
+        session = booking.service_session
+        session.start_time += timedelta(days=2)
+        session.end_time += timedelta(days=2)
+        session.save()
+
+        self.assertEqual(self.pending(booking).count(), 4)
+        self.assertEqual(
+            self.pending(booking).order_by('scheduled_time').first().scheduled_time,
+            session.start_time - timedelta(days=1)
+        )
+
+    def test_due_reminders_are_claimed_once_until_the_lease_expires(self):
+        due = self.book(timedelta(minutes=40))
+        self.book(timedelta(days=5))
+        self.pending(due).update(scheduled_time=timezone.now() - timedelta(minutes=1))
+
+        claimed = claim_due_reminders()
+        self.assertEqual(set(claimed), set(self.pending(due).filter(lead_minutes=30).values_list('pk', flat=True)))
+        self.assertEqual(claim_due_reminders(), [])
+
+        BookingReminder.objects.filter(pk__in=claimed).update(claimed_at=timezone.now() - CLAIM_LEASE * 2)
+        self.assertEqual(sorted(claim_due_reminders()), sorted(claimed))
+        self.assertEqual(set(BookingReminder.objects.filter(pk__in=claimed).values_list('send_attempts', flat=True)), {2})
+
+    @mock.patch('bookings.tasks.reminders.send_booking_reminder_immediate')
+    def test_worker_sends_live_reminders_and_drops_stale_ones(self, send):
+        live = self.book(timedelta(minutes=40))
+        canceled = self.book(timedelta(minutes=40))
+        reminders = BookingReminder.objects.filter(lead_minutes=30)
+        reminders.update(scheduled_time=timezone.now())
+        Booking.objects.filter(pk=canceled.pk).update(status='canceled')
+
+        counts = deliver_reminders(claim_due_reminders())
+
+        self.assertEqual(counts, {'sent': 2, 'skipped': 2, 'failed': 0})
+        self.assertEqual(
+            sorted(call.kwargs['user_type'] for call in send.call_args_list), ['client', 'practitioner']
+        )
+        self.assertEqual(BookingReminder.objects.filter(booking=live, is_sent=True).count(), 2)
+        self.assertFalse(BookingReminder.objects.filter(booking=canceled).exists())
+
+    @mock.patch('bookings.tasks.reminders.send_booking_reminder_immediate', side_effect=RuntimeError('smtp down'))
+    def test_failed_send_is_released_for_retry(self, send):
+        booking = self.book(timedelta(minutes=40))
+        self.pending(booking).filter(lead_minutes=30).update(scheduled_time=timezone.now())
+
+        self.assertEqual(deliver_reminders(claim_due_reminders())['failed'], 2)
+
+        reminder = self.pending(booking).filter(lead_minutes=30).first()
+        self.assertIsNone(reminder.claimed_at)
+        self.assertEqual((reminder.send_attempts, reminder.error_message), (1, 'smtp down'))
+        self.assertEqual(len(claim_due_reminders()), 2)
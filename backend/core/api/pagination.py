@@ -1,7 +1,7 @@
 """
 Pagination classes for DRF
 """
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.pagination import CursorPagination, PageNumberPagination
 from rest_framework.response import Response
 
 
@@ -65,4 +65,39 @@ class SmallResultsSetPagination(PageNumberPagination):
     """
     page_size = 10
     page_size_query_param = 'page_size'
-    max_page_size = 50
\ No newline at end of file
+    max_page_size = 50
+
+
+class FeedCursorPagination(CursorPagination):
+    """
+    Cursor pagination for feeds read newest first
+
+    Each page is a keyset read ("older than the cursor") instead of an
+    OFFSET, so deep pages cost the same as the first and posts published
+    while scrolling do not shift items between pages.
+
+    Query parameters:
+    - cursor: Opaque cursor from the previous response's next/previous link
+    - page_size: Items per page (default 20, max 100)
+
+    Same envelope as StandardResultsSetPagination, without the counts.
+    """
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = ('-published_at', '-id')
+
+    def get_ordering(self, request, queryset, view):
+        """Always use this paginator's ordering; views pick it per feed."""
+        return tuple(self.ordering)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'status': 'success',
+            'data': {
+                'results': data,
+                'next': self.get_next_link(),
+                'previous': self.get_previous_link(),
+                'page_size': self.page_size,
+            }
+        })
@@ -0,0 +1,215 @@
+"""
+Batched Email Sending
+Sends rendered emails through the Resend batch API.
+
+`EmailService.send_email` makes one blocking request per recipient. For
+fan-out (weekly summaries, announcements to every subscriber) queue the
+rendered messages on a `BatchEmailDispatcher` instead and `flush()` it:
+
+- messages are posted to /emails/batch in chunks of up to BATCH_LIMIT
+- chunks are sent by at most EMAIL_BATCH_CONCURRENCY threads over one
+  pooled HTTP client per process
+- 429s, 5xx responses and connection errors are retried with exponential
+  backoff (honouring Retry-After); each chunk carries an Idempotency-Key so
+  a retry after a lost response does not send twice
+- every queued message gets a `SendResult`, so callers can record delivery
+  per message
+"""
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+import httpx
+from django.conf import settings
+
+from .constants import DEFAULT_FROM_EMAIL
+
+logger = logging.getLogger(__name__)
+
+BATCH_LIMIT = 100  # Resend accepts at most 100 emails per batch request
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+_http_client = None
+_http_client_lock = threading.Lock()
+
+
+def get_http_client() -> httpx.Client:
+    """Return the process-wide pooled HTTP client, creating it on first use."""
+    global _http_client
+    if _http_client is None:
+        with _http_client_lock:
+            if _http_client is None:
+                concurrency = getattr(settings, 'EMAIL_BATCH_CONCURRENCY', 4)
+                _http_client = httpx.Client(
+                    timeout=httpx.Timeout(getattr(settings, 'EMAIL_BATCH_TIMEOUT', 30.0)),
+                    limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency),
+                )
+    return _http_client
+
+
+@dataclass
+class OutgoingEmail:
+    """A rendered email waiting to be sent. `key` identifies it to the caller (e.g. a Notification id)."""
+
+    to: str
+    subject: str
+    html: str
+    key: Any = None
+    from_email: Optional[str] = None
+    reply_to: Optional[str] = None
+    tags: List[Dict[str, str]] = field(default_factory=list)
+
+    def as_params(self) -> Dict[str, Any]:
+        params = {
+            "from": self.from_email or DEFAULT_FROM_EMAIL,
+            "to": [self.to],
+            "subject": self.subject,
+            "html": self.html,
+        }
+        if self.reply_to:
+            params["reply_to"] = self.reply_to
+        if self.tags:
+            params["tags"] = self.tags
+        return params
+
+
+@dataclass
+class SendResult:
+    """Outcome for one queued email."""
+
+    key: Any
+    email_id: Optional[str] = None
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.email_id is not None
+
+
+class BatchSendError(Exception):
+    """A batch request failed and will not be retried."""
+
+
+class ResendBatchClient:
+    """Posts chunks of emails to the Resend batch endpoint with retry and backoff."""
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        http_client: Optional[httpx.Client] = None,
+        max_retries: Optional[int] = None,
+        backoff: Optional[float] = None,
+    ):
+        self.api_key = api_key if api_key is not None else settings.RESEND_API
+        self.base_url = (base_url or getattr(settings, 'RESEND_API_BASE', 'https://api.resend.com')).rstrip('/')
+        self.http_client = http_client or get_http_client()
+        self.max_retries = max_retries if max_retries is not None else getattr(settings, 'EMAIL_BATCH_MAX_RETRIES', 3)
+        self.backoff = backoff if backoff is not None else getattr(settings, 'EMAIL_BATCH_BACKOFF', 1.0)
+
+    def send_batch(self, emails: List[OutgoingEmail]) -> List[SendResult]:
+        """
+        Send up to BATCH_LIMIT emails in one request.
+
+        Never raises: a failed request marks every email in it as failed.
+        """
+        if len(emails) > BATCH_LIMIT:
+            raise ValueError(f"At most {BATCH_LIMIT} emails per batch, got {len(emails)}")
+
+        try:
+            data = self._post([email.as_params() for email in emails])
+            ids = [item.get('id') for item in data.get('data', [])]
+            if len(ids) != len(emails):
+                raise BatchSendError(f"Expected {len(emails)} ids in batch response, got {len(ids)}")
+        except Exception as e:
+            logger.error(f"[EmailBatch] Batch of {len(emails)} emails failed: {e}")
+            return [SendResult(key=email.key, error=str(e)) for email in emails]
+
+        return [SendResult(key=email.key, email_id=email_id) for email, email_id in zip(emails, ids)]
+
+    def _post(self, payload: List[Dict[str, Any]]) -> Dict[str, Any]:
+        headers = {
+            'Authorization': f'Bearer {self.api_key}',
+            'Idempotency-Key': str(uuid.uuid4()),
+        }
+        url = f'{self.base_url}/emails/batch'
+
+        attempt = 0
+        while True:
+            retry_after = None
+            try:
+                response = self.http_client.post(url, json=payload, headers=headers)
+            except httpx.TransportError as e:
+                error = f"{type(e).__name__}: {e}"
+            else:
+                if response.status_code < 400:
+                    return response.json()
+                error = f"HTTP {response.status_code}: {response.text[:500]}"
+                if response.status_code not in RETRY_STATUSES:
+                    raise BatchSendError(error)
+                retry_after = self._retry_after(response)
+
+            if attempt >= self.max_retries:
+                raise BatchSendError(error)
+            delay = retry_after if retry_after is not None else self.backoff * (2 ** attempt)
+            attempt += 1
+            logger.warning(f"[EmailBatch] {error}; retry {attempt}/{self.max_retries} in {delay:.1f}s")
+            time.sleep(delay)
+
+    @staticmethod
+    def _retry_after(response: httpx.Response) -> Optional[float]:
+        try:
+            return max(0.0, float(response.headers['Retry-After']))
+        except (KeyError, ValueError):
+            return None
+
+
+class BatchEmailDispatcher:
+    """
+    Collects rendered emails and sends them in concurrent batches.
+
+    Usage:
+        dispatcher = BatchEmailDispatcher()
+        for notification in notifications:
+            dispatcher.queue(OutgoingEmail(to=..., subject=..., html=..., key=notification.id))
+        results = dispatcher.flush()
+    """
+
+    def __init__(
+        self,
+        client: Optional[ResendBatchClient] = None,
+        batch_size: int = BATCH_LIMIT,
+        concurrency: Optional[int] = None,
+    ):
+        self.client = client or ResendBatchClient()
+        self.batch_size = min(batch_size, BATCH_LIMIT)
+        self.concurrency = concurrency or getattr(settings, 'EMAIL_BATCH_CONCURRENCY', 4)
+        self._queue: List[OutgoingEmail] = []
+
+    def __len__(self):
+        return len(self._queue)
+
+    def queue(self, email: OutgoingEmail):
+        self._queue.append(email)
+
+    def flush(self) -> List[SendResult]:
+        """Send everything queued. Results are in queue order."""
+        emails, self._queue = self._queue, []
+        if not emails:
+            return []
+
+        chunks = [emails[i:i + self.batch_size] for i in range(0, len(emails), self.batch_size)]
+        if len(chunks) == 1 or self.concurrency <= 1:
+            batches = [self.client.send_batch(chunk) for chunk in chunks]
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.concurrency, len(chunks))) as pool:
+                batches = list(pool.map(self.client.send_batch, chunks))
+
+        results = [result for batch in batches for result in batch]
+        sent = sum(1 for result in results if result.ok)
+        logger.info(f"[EmailBatch] Sent {sent}/{len(results)} emails in {len(chunks)} batches")
+        return results
@@ -0,0 +1,83 @@
+"""
+Benchmark email rendering throughput in one worker process.
+
+Renders the same template for distinct recipients two ways:
+- per-send compile: Django renders the MJML, then MJML compiles it (the old
+  EmailRenderer.render_email path)
+- pre-compiled: CompiledTemplateCache HTML rendered with the recipient context
+
+Usage:
+    python manage.py benchmark_email_rendering
+    python manage.py benchmark_email_rendering --template clients/welcome.mjml --emails 200
+"""
+import time as time_module
+from types import SimpleNamespace
+
+from django.core.management.base import BaseCommand
+
+from emails.utils import CompiledTemplateCache, EmailRenderer, MJMLCompiler
+
+
+class Command(BaseCommand):
+    help = 'Compare per-send MJML compilation with pre-compiled email templates'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--template', default='clients/reminder.mjml', help='Template under templates/emails/')
+        parser.add_argument('--emails', type=int, default=100, help='Emails rendered per mode')
+
+    def handle(self, *args, **options):
+        template_path, count = options['template'], options['emails']
+        contexts = [self._context(i) for i in range(count)]
+
+        def per_send_compile(context):
+            return MJMLCompiler.compile(EmailRenderer.render_mjml(template_path, context))
+
+        CompiledTemplateCache.clear()
+        started = time_module.perf_counter()
+        if CompiledTemplateCache.get(template_path) is None:
+            self.stderr.write(f'{template_path} cannot be pre-compiled')
+            return
+        compile_ms = (time_module.perf_counter() - started) * 1000
+
+        self.stdout.write(self.style.SUCCESS(
+            f'\n=== EMAIL RENDERING BENCHMARK ({template_path}, {count} emails) ===\n'
+        ))
+        self.stdout.write(f'One-off compile: {compile_ms:.0f} ms')
+        self.stdout.write(f'{"mode":<20} {"emails/s":>10} {"ms/email":>10}')
+
+        rates = {}
+        for mode, render in (('per-send compile', per_send_compile),
+                             ('pre-compiled', lambda context: EmailRenderer.render_email(template_path, context))):
+            started = time_module.perf_counter()
+            for context in contexts:
+                render(context)
+            elapsed = time_module.perf_counter() - started
+            rates[mode] = count / elapsed
+            self.stdout.write(f'{mode:<20} {rates[mode]:>10.1f} {elapsed * 1000 / count:>10.2f}')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'\nPre-compiled throughput: {rates["pre-compiled"] / rates["per-send compile"]:.1f}x'
+        ))
+
+    def _context(self, i):
+        """A plausible context covering the variables the booking templates use."""
+        from emails.constants import URL_PATHS, build_url
+        from django.conf import settings
+
+        return {
+            'WEBSITE_URL': settings.WEBSITE_URL,
+            'SUPPORT_EMAIL': settings.SUPPORT_EMAIL,
+            'LOGO_URL': settings.EMAIL_LOGO_URL,
+            'YEAR': 2026,
+            'build_url': build_url,
+            'URL_PATHS': URL_PATHS,
+            'first_name': f'Client {i}',
+            'user': SimpleNamespace(first_name=f'Client {i}', email=f'client{i}@example.com'),
+            'practitioner': SimpleNamespace(display_name=f'Practitioner {i % 7}'),
+            'service': SimpleNamespace(name='Sound Bath', location_type='virtual' if i % 2 else 'in_person',
+                                       location='12 Harbour St'),
+            'booking': SimpleNamespace(public_uuid=f'00000000-0000-0000-0000-{i:012d}'),
+            'is_24h': bool(i % 2),
+            'is_30m': not i % 2,
+            'hours_until': 24 if i % 2 else 0.5,
+        }
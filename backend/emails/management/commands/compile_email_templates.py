@@ -0,0 +1,46 @@
+"""
+Pre-compile the MJML email templates into the shared template cache.
+
+Workers then render emails from compiled HTML without running MJML. Run it on
+deploy; templates that change later are recompiled on first use.
+
+Usage:
+    python manage.py compile_email_templates
+    python manage.py compile_email_templates clients/reminder.mjml
+"""
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+
+from emails.utils import CompiledTemplateCache
+
+TEMPLATE_ROOT = Path(__file__).resolve().parents[2] / 'templates' / 'emails'
+
+
+def email_templates():
+    """Sendable templates, relative to templates/emails/ (layouts and components excluded)."""
+    return sorted(
+        str(path.relative_to(TEMPLATE_ROOT))
+        for path in TEMPLATE_ROOT.rglob('*.mjml')
+        if path.parent != TEMPLATE_ROOT and path.parent.name != 'components'
+    )
+
+
+class Command(BaseCommand):
+    help = 'Compile MJML email templates to HTML and store them in the shared cache'
+
+    def add_arguments(self, parser):
+        parser.add_argument('templates', nargs='*', help='Templates to compile (default: all)')
+
+    def handle(self, *args, **options):
+        CompiledTemplateCache.clear()
+        compiled, skipped = 0, []
+        for template_path in options['templates'] or email_templates():
+            if CompiledTemplateCache.get(template_path) is None:
+                skipped.append(template_path)
+            else:
+                compiled += 1
+
+        self.stdout.write(self.style.SUCCESS(f'Compiled {compiled} email templates'))
+        for template_path in skipped:
+            self.stdout.write(self.style.WARNING(f'  {template_path}: not pre-compiled, rendered per send'))
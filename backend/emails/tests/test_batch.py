@@ -0,0 +1,124 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+from django.test import SimpleTestCase
+
+from emails.batch import BatchEmailDispatcher, OutgoingEmail, ResendBatchClient
+
+
+class StandInResend:
+    """
+    Local stand-in for the Resend batch endpoint.
+
+    `responses` is a list of (status, headers) to return before answering
+    normally; every request body is kept in `requests`.
+    """
+
+    def __init__(self):
+        self.requests = []
+        self.responses = []
+        self.lock = threading.Lock()
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                with stand_in.lock:
+                    stand_in.requests.append({'body': body, 'headers': dict(self.headers)})
+                    status, headers = stand_in.responses.pop(0) if stand_in.responses else (200, {})
+                if status == 200:
+                    payload = {'data': [{'id': f"email-{item['to'][0]}"} for item in body]}
+                else:
+                    payload = {'message': 'stand-in error'}
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}'
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class BatchEmailDispatcherTestCase(SimpleTestCase):
+    """Queued emails are sent through the batch endpoint with retries."""
+
+    def setUp(self):
+        self.resend = StandInResend()
+        self.addCleanup(self.resend.close)
+        self.http_client = httpx.Client()
+        self.addCleanup(self.http_client.close)
+
+    def dispatcher(self, batch_size=100, concurrency=4, max_retries=3):
+        client = ResendBatchClient(
+            api_key='re_test',
+            base_url=self.resend.url,
+            http_client=self.http_client,
+            max_retries=max_retries,
+            backoff=0,
+        )
+        return BatchEmailDispatcher(client=client, batch_size=batch_size, concurrency=concurrency)
+
+    def queue(self, dispatcher, count):
+        for i in range(count):
+            dispatcher.queue(OutgoingEmail(to=f'user{i}@example.com', subject='Hi', html='<p>Hi</p>', key=i))
+
+    def test_chunks_queue_and_keeps_result_order(self):
+        dispatcher = self.dispatcher(batch_size=10)
+        self.queue(dispatcher, 25)
+
+        results = dispatcher.flush()
+
+        self.assertEqual(sorted(len(r['body']) for r in self.resend.requests), [5, 10, 10])
+        self.assertEqual([r.key for r in results], list(range(25)))
+        self.assertTrue(all(r.ok for r in results))
+        self.assertEqual(results[7].email_id, 'email-user7@example.com')
+        self.assertEqual(len(dispatcher), 0)
+        self.assertEqual(self.resend.requests[0]['headers']['Authorization'], 'Bearer re_test')
+
+    def test_retries_rate_limits_with_the_same_idempotency_key(self):
+        self.resend.responses = [(429, {'Retry-After': '0'}), (503, {})]
+        dispatcher = self.dispatcher()
+        self.queue(dispatcher, 3)
+
+        results = dispatcher.flush()
+
+        self.assertTrue(all(r.ok for r in results))
+        self.assertEqual(len(self.resend.requests), 3)
+        keys = {r['headers']['Idempotency-Key'] for r in self.resend.requests}
+        self.assertEqual(len(keys), 1)
+
+    def test_gives_up_after_max_retries(self):
+        self.resend.responses = [(500, {})] * 3
+        dispatcher = self.dispatcher(max_retries=2)
+        self.queue(dispatcher, 2)
+
+        results = dispatcher.flush()
+
+        self.assertEqual(len(self.resend.requests), 3)
+        self.assertFalse(any(r.ok for r in results))
+        self.assertIn('HTTP 500', results[0].error)
+
+    def test_client_errors_are_not_retried(self):
+        self.resend.responses = [(422, {})]
+        dispatcher = self.dispatcher(batch_size=2, concurrency=1)
+        self.queue(dispatcher, 4)
+
+        results = dispatcher.flush()
+
+        # Only the chunk that got the 422 fails
+        self.assertEqual(len(self.resend.requests), 2)
+        self.assertEqual([r.ok for r in results], [False, False, True, True])
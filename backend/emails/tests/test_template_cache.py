@@ -0,0 +1,80 @@
+import html
+import os
+import re
+from types import SimpleNamespace
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+
+from emails.utils import CompiledTemplateCache, EmailRenderer, MJMLCompiler
+
+
+def visible_text(markup):
+    markup = re.sub(r'<style.*?</style>|<!--.*?-->', '', markup, flags=re.S)
+    return ' '.join(html.unescape(re.sub(r'<[^>]+>', ' ', markup)).split())
+
+
+class CompiledTemplateCacheTestCase(SimpleTestCase):
+    """Emails render from HTML compiled once per template."""
+
+    template = 'clients/reminder.mjml'
+
+    def setUp(self):
+        cache.clear()
+        CompiledTemplateCache.clear()
+        self.addCleanup(CompiledTemplateCache.clear)
+
+    def context(self, **overrides):
+        return {
+            'practitioner': SimpleNamespace(display_name='Dr. Reyes'),
+            'service': SimpleNamespace(name='Sound Bath', location_type='virtual', location='12 Harbour St'),
+            'booking': SimpleNamespace(public_uuid='3f0c9a'),
+            'is_24h': True,
+            **overrides,
+        }
+
+    def uncompiled(self, context):
+        with mock.patch.object(CompiledTemplateCache, 'get', return_value=None):
+            return EmailRenderer.render_email(self.template, context)
+
+    def test_compiled_render_matches_per_send_compile(self):
+        for context in (self.context(), self.context(is_24h=False, is_30m=True),
+                        self.context(service=SimpleNamespace(name='Reiki', location_type='in_person', location='Loft 2'))):
+            self.assertEqual(
+                visible_text(EmailRenderer.render_email(self.template, context)),
+                visible_text(self.uncompiled(context))
+            )
+
+    def test_mjml_runs_once_per_template(self):
+        with mock.patch.object(MJMLCompiler, 'compile', wraps=MJMLCompiler.compile) as compile_mjml:
+            for name in ('Ana', 'Ben', 'Cleo'):
+                rendered = EmailRenderer.render_email(self.template, self.context(
+                    practitioner=SimpleNamespace(display_name=name)
+                ))
+                self.assertIn(name, rendered)
+
+        self.assertEqual(compile_mjml.call_count, 1)
+
+    def test_changed_include_is_recompiled(self):
+        compiled = CompiledTemplateCache.get(self.template)
+        _, files, _, _ = CompiledTemplateCache._compiled[self.template]
+        component = next(path for path in files if path.endswith('booking_card.mjml'))
+        stat = os.stat(component)
+        self.addCleanup(os.utime, component, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+        self.assertIs(CompiledTemplateCache.get(self.template), compiled)
+        os.utime(component, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        self.assertIsNot(CompiledTemplateCache.get(self.template), compiled)
+
+    def test_structural_tags_are_carried_in_mj_raw(self):
+        prepared, tags = CompiledTemplateCache._prepare(
+            '<mj-body>{% if show %}<mj-section><mj-column>'
+            '<mj-text color="{{ color }}">Hi {{ name }}{% if vip %}!{% endif %}</mj-text>'
+            '</mj-column></mj-section>{% endif %}</mj-body>'
+        )
+
+        self.assertEqual(tags, ['{% if show %}', '{{ color }}', '{{ name }}', '{% if vip %}', '{% endif %}', '{% endif %}'])
+        self.assertIn('<mj-body><mj-raw>djtag0x</mj-raw><mj-section>', prepared)
+        self.assertIn('<mj-text color="djtag1x">Hi djtag2xdjtag3x!djtag4x</mj-text>', prepared)
+        self.assertIn('</mj-section><mj-raw>djtag5x</mj-raw></mj-body>', prepared)
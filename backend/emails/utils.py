@@ -2,9 +2,14 @@
 Email Utilities
 Handles MJML compilation, template rendering, and email sending via Resend.
 """
+import hashlib
 import os
-from typing import Dict, Any, Optional
-from django.template import Context, Template
+import re
+import threading
+import time
+from typing import Dict, Any, List, Optional, Tuple
+from django.core.cache import cache
+from django.template import Context, Template, TemplateDoesNotExist, engines
 from django.template.loader import render_to_string
 from django.conf import settings
 import logging
@@ -54,6 +59,176 @@ class MJMLCompiler:
             raise
 
 
+class UnsupportedTemplate(Exception):
+    """Template uses a construct CompiledTemplateCache cannot pre-compile."""
+
+
+class CompiledTemplateCache:
+    """
+    MJML templates compiled to HTML once, leaving the Django tags in place.
+
+    A template is flattened ({% extends %} blocks and {% include %}s inlined),
+    its Django tags are swapped for placeholders - wrapped in <mj-raw> where
+    they sit between MJML elements, e.g. an {% if %} around a section - and the
+    result is compiled with MJML. The placeholders are then put back, giving a
+    Django template of plain HTML, so sending an email only renders the
+    per-recipient context.
+
+    Compiled templates are kept per process, keyed by template path and the
+    mtimes of every file they were built from, and shared between workers via
+    the Django cache keyed by a hash of the flattened source.
+    `manage.py compile_email_templates` fills the shared cache ahead of time.
+
+    Templates that cannot be flattened or compiled this way are rendered the
+    old way (Django, then MJML) by EmailRenderer; compile failures are retried
+    after RETRY_FAILED_AFTER seconds.
+    """
+
+    CACHE_PREFIX = 'email-template:'
+    RETRY_FAILED_AFTER = 300
+
+    _TAG = re.compile(r'{%.*?%}|{{.*?}}|{#.*?#}', re.S)
+    _EXTENDS = re.compile(r'^\s*{%\s*extends\s+["\']([^"\']+)["\']\s*%}')
+    _BLOCK = re.compile(r'{%\s*block\s+(\w+)\s*%}(.*?){%\s*endblock(?:\s+\w+)?\s*%}', re.S)
+    _INCLUDE = re.compile(r'{%\s*include\s+(.*?)\s*%}')
+    _INCLUDE_ARGS = re.compile(r'^["\']([^"\']+)["\'](?:\s+with\s+(.+))?$')
+    _TOKEN = re.compile(r'<(/?)(mj-[\w-]+)\b[^>]*?(/?)>|{%.*?%}|{{.*?}}|{#.*?#}', re.S)
+    _PLACEHOLDER = re.compile(r'djtag(\d+)x')
+    _LITERAL_OPENERS = re.compile(r'{[{%#]')
+    _TEMPLATETAGS = {'{{': 'openvariable', '{%': 'openblock', '{#': 'opencomment'}
+    # MJML elements whose content is passed through as HTML
+    _ENDING_TAGS = {
+        'mj-text', 'mj-button', 'mj-raw', 'mj-table', 'mj-style', 'mj-title', 'mj-preview',
+        'mj-navbar-link', 'mj-accordion-title', 'mj-accordion-text', 'mj-social-element',
+    }
+
+    # template_path -> (mtime signature, files, compiled template or None, retry at)
+    _compiled: Dict[str, Tuple[Tuple[int, ...], List[str], Any, float]] = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def get(cls, template_path: str):
+        """
+        Return the compiled Django template for `template_path` (relative to
+        templates/emails/), or None if it has to be rendered uncompiled.
+        """
+        entry = cls._compiled.get(template_path)
+        if entry is not None:
+            signature, files, template, retry_at = entry
+            try:
+                if cls._signature(files) == signature and (template is not None or time.monotonic() < retry_at):
+                    return template
+            except OSError:
+                pass
+
+        with cls._lock:
+            return cls._build(template_path)
+
+    @classmethod
+    def clear(cls):
+        """Drop every compiled template held by this process."""
+        cls._compiled.clear()
+
+    @classmethod
+    def _build(cls, template_path: str):
+        template, files = None, [cls._template_file(f"emails/{template_path}")]
+        try:
+            source, files = cls._flatten(f"emails/{template_path}")
+            prepared, tags = cls._prepare(source)
+            cache_key = cls.CACHE_PREFIX + hashlib.sha256(prepared.encode()).hexdigest()
+
+            html = cache.get(cache_key)
+            if html is None:
+                html = cls._restore(MJMLCompiler.compile(prepared), tags)
+                cache.set(cache_key, html, None)
+            template = engines['django'].from_string(html)
+        except UnsupportedTemplate as e:
+            logger.info(f"[EmailTemplates] {template_path} will be compiled per send: {e}")
+        except Exception as e:
+            logger.warning(f"[EmailTemplates] Could not pre-compile {template_path}: {e}")
+
+        cls._compiled[template_path] = (
+            cls._signature(files), files, template, time.monotonic() + cls.RETRY_FAILED_AFTER
+        )
+        return template
+
+    @staticmethod
+    def _signature(files: List[str]) -> Tuple[int, ...]:
+        return tuple(os.stat(path).st_mtime_ns for path in files)
+
+    @staticmethod
+    def _template_file(template_name: str) -> str:
+        """Path of a template's source file, found without parsing it."""
+        for loader in engines['django'].engine.template_loaders:
+            for origin in loader.get_template_sources(template_name):
+                if os.path.exists(origin.name):
+                    return origin.name
+        raise TemplateDoesNotExist(template_name)
+
+    @classmethod
+    def _flatten(cls, template_name: str) -> Tuple[str, List[str]]:
+        """Inline {% extends %} and {% include %}. Returns (source, files read)."""
+        path = cls._template_file(template_name)
+        with open(path, encoding='utf-8') as f:
+            source = f.read()
+        files = [path]
+
+        extends = cls._EXTENDS.match(source)
+        if extends:
+            parent, parent_files = cls._flatten(extends.group(1))
+            files += parent_files
+            blocks = {}
+            for block in cls._BLOCK.finditer(source):
+                if '{% block' in block.group(2) or 'block.super' in block.group(2):
+                    raise UnsupportedTemplate("nested blocks")
+                blocks[block.group(1)] = block.group(2)
+            source = cls._BLOCK.sub(lambda block: blocks.get(block.group(1), block.group(2)), parent)
+
+        def include(match):
+            args = cls._INCLUDE_ARGS.match(match.group(1))
+            if not args or (args.group(2) and re.search(r'\bonly\s*$', args.group(2))):
+                raise UnsupportedTemplate(f"include {match.group(1)}")
+            body, body_files = cls._flatten(args.group(1))
+            files.extend(body_files)
+            return f"{{% with {args.group(2)} %}}{body}{{% endwith %}}" if args.group(2) else body
+
+        return cls._INCLUDE.sub(include, source), files
+
+    @classmethod
+    def _prepare(cls, source: str) -> Tuple[str, List[str]]:
+        """Swap Django tags for placeholders MJML will carry through to the HTML."""
+        tags, output, position, depth = [], [], 0, 0
+
+        def placeholder(tag):
+            tags.append(tag)
+            return f"djtag{len(tags) - 1}x"
+
+        for match in cls._TOKEN.finditer(source):
+            output.append(source[position:match.start()])
+            position = match.end()
+            token = match.group(0)
+
+            if match.group(2):
+                # An MJML tag: keep it, but protect Django tags in its attributes
+                if match.group(2) in cls._ENDING_TAGS and not match.group(3):
+                    depth += -1 if match.group(1) else 1
+                output.append(cls._TAG.sub(lambda tag: placeholder(tag.group(0)), token))
+            elif depth or token.startswith('{{'):
+                output.append(placeholder(token))
+            else:
+                output.append(f"<mj-raw>{placeholder(token)}</mj-raw>")
+
+        output.append(source[position:])
+        return ''.join(output), tags
+
+    @classmethod
+    def _restore(cls, html: str, tags: List[str]) -> str:
+        html = cls._LITERAL_OPENERS.sub(
+            lambda match: f"{{% templatetag {cls._TEMPLATETAGS[match.group(0)]} %}}", html
+        )
+        return cls._PLACEHOLDER.sub(lambda match: tags[int(match.group(1))], html)
+
+
 class EmailRenderer:
     """Renders email templates with context"""
 
@@ -106,6 +281,11 @@ class EmailRenderer:
         # Merge with provided context
         full_context = {**default_context, **context}
 
+        # Pre-compiled HTML: only the per-recipient context is rendered here
+        compiled = CompiledTemplateCache.get(template_path)
+        if compiled is not None:
+            return compiled.render(full_context)
+
         # Render MJML template
         mjml_content = EmailRenderer.render_mjml(template_path, full_context)
 
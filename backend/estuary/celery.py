@@ -28,12 +28,21 @@ app.conf.beat_schedule = {
         }
     },
     
-    # Process booking reminders every 5 minutes
+    # Send due scheduled notifications (emails go out in batches) every minute
+    'process-scheduled-notifications': {
+        'task': 'notifications.tasks.scheduled.process_scheduled_notifications',
+        'schedule': crontab(),  # Every minute
+        'options': {
+            'expires': 50.0,  # Task expires after 50 seconds if not executed
+        }
+    },
+
+    # Dispatch due booking reminders from the reminder queue every minute
     'process-booking-reminders': {
         'task': 'process-booking-reminders',
-        'schedule': crontab(minute='*/5'),  # Every 5 minutes
+        'schedule': crontab(),  # Every minute
         'options': {
-            'expires': 240.0,  # Task expires after 4 minutes if not executed
+            'expires': 50.0,  # Task expires after 50 seconds if not executed
         }
     },
 
@@ -73,6 +82,63 @@ app.conf.beat_schedule = {
         }
     },
     
+    # Keep materialized practitioner busy bitmaps filled for the booking window
+    'warm-practitioner-busy-days': {
+        'task': 'practitioners.tasks.availability.warm_practitioner_busy_days',
+        'schedule': crontab(minute=15),  # Hourly
+        'options': {
+            'expires': 3000.0,
+        }
+    },
+
+    # Recompute next_available_date for practitioners whose calendars changed
+    'update-next-available-dates': {
+        'task': 'practitioners.tasks.availability.update_next_available_dates',
+        'schedule': crontab(minute='*/5'),  # Every 5 minutes
+        'options': {
+            'expires': 240.0,
+        }
+    },
+
+    # Write buffered stream post / media view counters to the database
+    'flush-stream-view-counters': {
+        'task': 'streams.tasks.flush_stream_view_counters',
+        'schedule': crontab(),  # Every minute
+        'options': {
+            'expires': 50.0,
+        }
+    },
+    'flush-page-view-counters': {
+        'task': 'analytics.tasks.flush_page_view_counters',
+        'schedule': crontab(),  # Every minute
+        'options': {
+            'expires': 50.0,
+        }
+    },
+    'flush-search-logs': {
+        'task': 'analytics.tasks.flush_search_logs',
+        'schedule': crontab(),  # Every minute
+        'options': {
+            'expires': 50.0,
+        }
+    },
+    'flush-media-counters': {
+        'task': 'media.tasks.flush_media_counters',
+        'schedule': crontab(),  # Every minute
+        'options': {
+            'expires': 50.0,
+        }
+    },
+
+    # Roll up the previous day into the analytics fact tables (one day per run)
+    'rollup-analytics': {
+        'task': 'analytics.tasks.rollup_analytics',
+        'schedule': crontab(minute=5),  # Hourly
+        'options': {
+            'expires': 3000.0,
+        }
+    },
+
     # NOTE: Temporal workflows are disabled. All scheduling handled by Celery Beat.
     # Temporal workflow code exists in backend/workflows/ but is not active.
     # To re-enable, uncomment the check-temporal-workflows task below.
@@ -129,6 +195,24 @@ app.conf.beat_schedule = {
         }
     },
     
+    # Drain the Stripe webhook inbox (retries and anything the on-receipt kick missed)
+    'process-stripe-webhook-events': {
+        'task': 'process-stripe-webhook-events',
+        'schedule': crontab(minute='*'),  # Every minute
+        'options': {
+            'expires': 55.0,
+        }
+    },
+    
+    # Release credits/seats held by checkouts that never finished
+    'release-stale-checkout-reservations': {
+        'task': 'release-stale-checkout-reservations',
+        'schedule': crontab(minute='*/15'),  # Every 15 minutes
+        'options': {
+            'expires': 600.0,
+        }
+    },
+    
     # Update available earnings
     'update-available-earnings': {
         'task': 'payments.tasks.update_available_earnings',
@@ -138,14 +222,23 @@ app.conf.beat_schedule = {
         }
     },
     
-    # Calculate pending earnings daily
-    'calculate-pending-earnings': {
-        'task': 'payments.tasks.calculate_pending_earnings',
+    # Verify practitioner earnings totals against the ledger daily
+    'reconcile-practitioner-earnings': {
+        'task': 'reconcile-practitioner-earnings',
         'schedule': crontab(hour=1, minute=0),  # Daily at 1 AM
         'options': {
             'expires': 3600.0,
         }
     },
+    
+    # Verify credit balances against recent ledger entries and advance snapshots
+    'snapshot-credit-balances': {
+        'task': 'snapshot-credit-balances',
+        'schedule': crontab(hour=1, minute=30),  # Daily at 1:30 AM
+        'options': {
+            'expires': 3600.0,
+        }
+    },
 }
 
 # Celery Configuration
@@ -50,6 +50,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     
     # Third party apps
     "channels",
@@ -586,6 +587,32 @@ TEMPORAL_TASK_QUEUE = os.getenv('TEMPORAL_TASK_QUEUE', 'estuary-main')
 TEMPORAL_MAX_CONCURRENT_ACTIVITIES = int(os.getenv('TEMPORAL_MAX_CONCURRENT_ACTIVITIES', '100'))
 TEMPORAL_MAX_CACHED_WORKFLOWS = int(os.getenv('TEMPORAL_MAX_CACHED_WORKFLOWS', '500'))
 
+# ============================================================================
+# Cache Configuration
+# ============================================================================
+
+# Shared Redis cache when REDIS_URL is set so invalidations are visible to every
+# worker; per-process memory cache otherwise (local development, tests).
+# Write-behind counters (utils.counters) use the same Redis.
+REDIS_URL = os.environ.get('REDIS_URL', '')
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+            'KEY_PREFIX': 'estuary',
+            'TIMEOUT': 300,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'estuary-default',
+        }
+    }
+
 # ============================================================================
 # Django Channels Configuration
 # ============================================================================
@@ -702,6 +729,7 @@ CELERY_RESULT_COMPRESSION = 'gzip'
 CELERY_TASK_ROUTES = {
     'notifications.tasks.*': {'queue': 'notifications'},
     'notifications.cron.*': {'queue': 'notifications'},  # Add cron tasks to notifications queue
+    'streams.tasks.*': {'queue': 'notifications'},  # New post fan-out
     'payments.tasks.*': {'queue': 'payments'},
     'bookings.tasks.*': {'queue': 'default'},
 }
@@ -758,5 +786,8 @@ APP_NAME = 'Estuary'
 # ============================================================================
 
 RESEND_API = os.environ.get('RESEND_API', '')
+RESEND_API_BASE = os.environ.get('RESEND_API_BASE', 'https://api.resend.com')
+EMAIL_BATCH_CONCURRENCY = int(os.environ.get('EMAIL_BATCH_CONCURRENCY', 4))  # Concurrent batch requests per flush
+EMAIL_BATCH_MAX_RETRIES = int(os.environ.get('EMAIL_BATCH_MAX_RETRIES', 3))
 EMAIL_LOGO_URL = os.environ.get('EMAIL_LOGO_URL', 'https://estuary.com/logo.png')
 WEBSITE_URL = os.environ.get('WEBSITE_URL', FRONTEND_URL)  # Use FRONTEND_URL as default
\ No newline at end of file
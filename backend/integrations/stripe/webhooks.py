@@ -25,9 +25,12 @@ def stripe_webhook_handler(request):
     """
     Handle Stripe webhook events.
     
-    This endpoint receives webhook events from Stripe and processes them
-    based on the event type.
+    Verifies the event and writes it to the webhook inbox; the handlers below
+    are run from a worker by `payments.webhook_inbox` via `dispatch_event`.
+    Stripe retries of an already recorded event are acknowledged and ignored.
     """
+    from payments.webhook_inbox import record_event
+
     payload = request.body
     sig_header = request.META.get('HTTP_STRIPE_SIGNATURE')
     
@@ -40,31 +43,7 @@ def stripe_webhook_handler(request):
         # Log the event for debugging
         logger.info(f"Received Stripe webhook event: {event['type']}")
         
-        # Process the event based on its type
-        if event['type'] == 'payment_intent.succeeded':
-            handle_payment_intent_succeeded(event['data']['object'])
-        elif event['type'] == 'payment_intent.payment_failed':
-            handle_payment_intent_failed(event['data']['object'])
-        elif event['type'] == 'checkout.session.completed':
-            handle_checkout_session_completed(event['data']['object'])
-        elif event['type'] == 'charge.refunded':
-            handle_charge_refunded(event['data']['object'])
-        
-        # Subscription events
-        elif event['type'] == 'customer.subscription.created':
-            handle_subscription_created(event['data']['object'])
-        elif event['type'] == 'customer.subscription.updated':
-            handle_subscription_updated(event['data']['object'])
-        elif event['type'] == 'customer.subscription.deleted':
-            handle_subscription_deleted(event['data']['object'])
-        elif event['type'] == 'invoice.payment_succeeded':
-            handle_invoice_payment_succeeded(event['data']['object'])
-        elif event['type'] == 'invoice.payment_failed':
-            handle_invoice_payment_failed(event['data']['object'])
-        
-        else:
-            logger.info(f"Unhandled event type: {event['type']}")
-        
+        record_event(event, handler='integrations')
         return HttpResponse(status=200)
         
     except ValueError as e:
@@ -77,9 +56,24 @@ def stripe_webhook_handler(request):
         return HttpResponse(status=400)
     except Exception as e:
         # Other exceptions
-        logger.exception(f"Error processing webhook: {str(e)}")
+        logger.exception(f"Error recording webhook: {str(e)}")
         return HttpResponse(status=500)
 
+
+def dispatch_event(event_type, data_object):
+    """
+    Run the handler for a Stripe event.
+    
+    Returns:
+        False if the event type is not handled
+    """
+    handler = EVENT_HANDLERS.get(event_type)
+    if not handler:
+        logger.info(f"Unhandled event type: {event_type}")
+        return False
+    handler(data_object)
+    return True
+
 def handle_payment_intent_succeeded(payment_intent):
     """
     Handle a successful payment intent.
@@ -1291,3 +1285,16 @@ async def trigger_subscription_workflow(practitioner_id: str, event_type: str, m
     except Exception as e:
         logger.error(f"Error triggering subscription workflow: {e}")
         # Don't raise - we don't want webhook to fail
+
+
+EVENT_HANDLERS = {
+    'payment_intent.succeeded': handle_payment_intent_succeeded,
+    'payment_intent.payment_failed': handle_payment_intent_failed,
+    'checkout.session.completed': handle_checkout_session_completed,
+    'charge.refunded': handle_charge_refunded,
+    'customer.subscription.created': handle_subscription_created,
+    'customer.subscription.updated': handle_subscription_updated,
+    'customer.subscription.deleted': handle_subscription_deleted,
+    'invoice.payment_succeeded': handle_invoice_payment_succeeded,
+    'invoice.payment_failed': handle_invoice_payment_failed,
+}
@@ -2,18 +2,17 @@ from rest_framework import viewsets, status, filters
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
-from django.db.models import Q, F, Value, DecimalField
-from django.db.models.functions import Power, Sqrt, Sin, Cos, ATan2, Radians
+from django.db.models import Q
 from django.db import models
 from django_filters import rest_framework as django_filters
 from locations.models import Country, State, City, ZipCode, PractitionerLocation
+from locations.utils import filter_within_radius
 from .serializers import (
     CountrySerializer, StateSerializer, CitySerializer, ZipCodeSerializer,
     PractitionerLocationSerializer, LocationSearchSerializer, NearbyLocationSerializer
 )
 from utils.permissions import IsPractitioner
 from .permissions import IsLocationOwnerOrReadOnly, CanManageLocation
-import math
 import logging
 
 logger = logging.getLogger(__name__)
@@ -215,32 +214,8 @@ class PractitionerLocationViewSet(viewsets.ModelViewSet):
             lng = float(params['longitude'])
             radius = float(params.get('radius', 25.0))
             
-            # Haversine formula for distance calculation
-            # Convert to radians
-            lat_rad = math.radians(lat)
-            lng_rad = math.radians(lng)
-            
-            # Annotate with distance using database functions
-            queryset = queryset.annotate(
-                distance_miles=Value(3959.0, output_field=DecimalField()) * 
-                ATan2(
-                    Sqrt(
-                        Power(Sin((Radians(F('latitude')) - lat_rad) / 2), 2) +
-                        Cos(lat_rad) * Cos(Radians(F('latitude'))) *
-                        Power(Sin((Radians(F('longitude')) - lng_rad) / 2), 2)
-                    ),
-                    Sqrt(
-                        1 - (
-                            Power(Sin((Radians(F('latitude')) - lat_rad) / 2), 2) +
-                            Cos(lat_rad) * Cos(Radians(F('latitude'))) *
-                            Power(Sin((Radians(F('longitude')) - lng_rad) / 2), 2)
-                        )
-                    )
-                ) * 2
-            )
-            
-            # Filter by radius
-            queryset = queryset.filter(distance_miles__lte=radius)
+            # Bounding-box prefilter on the lat/lng index, then exact distance
+            queryset = filter_within_radius(queryset, lat, lng, radius)
             
             # Order by distance
             queryset = queryset.order_by('distance_miles')
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.3 on 2026-10-16 20:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('locations', '0002_initial'),
+        ('practitioners', '0015_practitioner_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='practitionerlocation',
+            index=models.Index(fields=['latitude', 'longitude'], name='locations_p_latitud_6c5e45_idx'),
+        ),
+    ]
@@ -175,6 +175,7 @@ class PractitionerLocation(BaseModel):
         indexes = [
             models.Index(fields=['practitioner', 'is_primary']),
             models.Index(fields=['city', 'is_in_person']),
+            models.Index(fields=['latitude', 'longitude']),
         ]
     
     def __str__(self):
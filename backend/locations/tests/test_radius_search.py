@@ -0,0 +1,95 @@
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from locations.models import City, Country, PractitionerLocation, State
+from locations.utils import (
+    annotate_practitioner_distance, bounding_box_q, calculate_distance,
+    nearby_practitioner_locations
+)
+from practitioners.models import Practitioner
+from users.models import User
+
+# (name, latitude, longitude) — distances from Union Square, San Francisco
+UNION_SQUARE = (37.7880, -122.4075)
+PLACES = [
+    ('Mission', '37.7599', '-122.4148'),       # ~2 mi
+    ('Oakland', '37.8044', '-122.2712'),       # ~7.5 mi
+    ('San Jose', '37.3382', '-121.8863'),      # ~42 mi
+    ('Los Angeles', '34.0522', '-118.2437'),   # ~347 mi
+]
+
+
+class RadiusSearchTestCase(TestCase):
+    """Database radius search with a bounding-box prefilter."""
+
+    def setUp(self):
+        country = Country.objects.create(name='United States', code='US', code_3='USA', numeric_code='840')
+        state = State.objects.create(country=country, name='California', code='CA')
+        city = City.objects.create(state=state, name='San Francisco')
+
+        self.practitioners = {}
+        for i, (name, lat, lng) in enumerate(PLACES):
+            user = User.objects.create_user(email=f'radius-{i}@example.com', password='testpass123')
+            practitioner = Practitioner.objects.create(
+                user=user, display_name=name, is_verified=True, practitioner_status='active'
+            )
+            PractitionerLocation.objects.create(
+                practitioner=practitioner, address_line1='1 Main St', city=city, state=state,
+                country=country, postal_code='94100', latitude=Decimal(lat), longitude=Decimal(lng)
+            )
+            self.practitioners[name] = practitioner
+
+        # A second, farther location must not hide the closer one
+        PractitionerLocation.objects.create(
+            practitioner=self.practitioners['Mission'], address_line1='2 Main St', city=city,
+            state=state, country=country, postal_code='94100',
+            latitude=Decimal('37.3382'), longitude=Decimal('-121.8863')
+        )
+
+    def test_distances_match_haversine(self):
+        locations = nearby_practitioner_locations(*UNION_SQUARE, radius_miles=50)
+        for location in locations:
+            expected = calculate_distance(*UNION_SQUARE, float(location.latitude), float(location.longitude))
+            self.assertAlmostEqual(location.distance_miles, expected, places=3)
+
+    def test_radius_and_ordering(self):
+        queryset = annotate_practitioner_distance(
+            Practitioner.objects.all(), *UNION_SQUARE, radius_miles=10
+        ).order_by('distance_miles')
+        self.assertEqual([p.display_name for p in queryset], ['Mission', 'Oakland'])
+        self.assertLess(queryset[0].distance_miles, 3)
+
+    def test_nearest_location_is_reported(self):
+        practitioner = annotate_practitioner_distance(
+            Practitioner.objects.filter(pk=self.practitioners['Mission'].pk), *UNION_SQUARE, radius_miles=100
+        ).get()
+        nearest = PractitionerLocation.objects.get(pk=practitioner.nearest_location_id)
+        self.assertEqual(nearest.address_line1, '1 Main St')
+
+    def test_bounding_box_is_in_sql(self):
+        with CaptureQueriesContext(connection) as ctx:
+            list(nearby_practitioner_locations(*UNION_SQUARE, radius_miles=10))
+        sql = ctx.captured_queries[0]['sql']
+        self.assertIn('"latitude" >=', sql)
+        self.assertIn('"longitude" <=', sql)
+
+    def test_bounding_box_wraps_antimeridian_and_poles(self):
+        crossing = bounding_box_q(0, 179.9, 50)
+        self.assertEqual(crossing.children[-1].connector, 'OR')
+        polar = bounding_box_q(89.9, 0, 50)
+        self.assertNotIn('longitude', str(polar))
+
+    def test_practitioner_search_endpoint_sorts_by_distance(self):
+        client = APIClient()
+        client.force_authenticate(self.practitioners['Mission'].user)
+        response = client.get('/api/v1/practitioners/search/', {
+            'latitude': UNION_SQUARE[0], 'longitude': UNION_SQUARE[1],
+            'radius_km': 20, 'sort_by': 'distance'
+        }, HTTP_HOST='localhost')
+        self.assertEqual(response.status_code, 200)
+        names = [row['display_name'] for row in response.json()['data']['results']]
+        self.assertEqual(names, ['Mission', 'Oakland'])
@@ -4,12 +4,15 @@ Utility functions for location operations
 import math
 from typing import Tuple, Optional, List
 from decimal import Decimal
-from django.db.models import Q, F, Value, DecimalField
-from django.db.models.functions import Power, Sqrt, Sin, Cos, ATan2, Radians
+from django.db.models import Q, Value, FloatField, ExpressionWrapper, OuterRef, QuerySet, Subquery
+from django.db.models.functions import ASin, Cast, Cos, Least, Power, Radians, Sin, Sqrt
 from locations.models import City, PractitionerLocation
 import pytz
 from datetime import datetime
 
+EARTH_RADIUS_MILES = 3959
+MILES_PER_KM = 0.621371
+
 
 def calculate_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
     """
@@ -26,10 +29,7 @@ def calculate_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> fl
     a = math.sin(dlat/2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon/2)**2
     c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
     
-    # Radius of earth in miles
-    r = 3959
-    
-    return r * c
+    return EARTH_RADIUS_MILES * c
 
 
 def get_bounding_box(lat: float, lon: float, distance_miles: float) -> Tuple[float, float, float, float]:
@@ -37,8 +37,7 @@ def get_bounding_box(lat: float, lon: float, distance_miles: float) -> Tuple[flo
     Get bounding box coordinates for a given center point and radius.
     Returns (min_lat, max_lat, min_lon, max_lon)
     """
-    # Earth's radius in miles
-    R = 3959
+    R = EARTH_RADIUS_MILES
     
     # Convert to radians
     lat_rad = math.radians(lat)
@@ -59,6 +58,118 @@ def get_bounding_box(lat: float, lon: float, distance_miles: float) -> Tuple[flo
     return min_lat, max_lat, min_lon, max_lon
 
 
+def bounding_box_q(
+    latitude: float,
+    longitude: float,
+    radius_miles: float,
+    lat_field: str = 'latitude',
+    lng_field: str = 'longitude'
+) -> Q:
+    """
+    Range predicate on indexed latitude/longitude columns that encloses the
+    search radius. Use it as a cheap prefilter before exact distance.
+    Handles searches that reach a pole or cross the antimeridian.
+    """
+    angular_distance = radius_miles / EARTH_RADIUS_MILES
+    min_lat = latitude - math.degrees(angular_distance)
+    max_lat = latitude + math.degrees(angular_distance)
+    
+    # Radius reaches a pole: every longitude is in range
+    if min_lat <= -90 or max_lat >= 90:
+        return Q(**{f'{lat_field}__gte': max(min_lat, -90), f'{lat_field}__lte': min(max_lat, 90)})
+    
+    min_lat, max_lat, min_lon, max_lon = get_bounding_box(latitude, longitude, radius_miles)
+    q = Q(**{f'{lat_field}__gte': min_lat, f'{lat_field}__lte': max_lat})
+    
+    if min_lon < -180:
+        return q & (Q(**{f'{lng_field}__gte': min_lon + 360}) | Q(**{f'{lng_field}__lte': max_lon}))
+    if max_lon > 180:
+        return q & (Q(**{f'{lng_field}__gte': min_lon}) | Q(**{f'{lng_field}__lte': max_lon - 360}))
+    return q & Q(**{f'{lng_field}__gte': min_lon, f'{lng_field}__lte': max_lon})
+
+
+def distance_miles_expression(
+    latitude: float,
+    longitude: float,
+    lat_field: str = 'latitude',
+    lng_field: str = 'longitude'
+) -> ExpressionWrapper:
+    """Haversine distance in miles from a point to each row, computed in the database."""
+    lat_rad = math.radians(latitude)
+    lng_rad = math.radians(longitude)
+    row_lat = Radians(Cast(lat_field, FloatField()))
+    row_lng = Radians(Cast(lng_field, FloatField()))
+    
+    a = (
+        Power(Sin((row_lat - lat_rad) / 2), 2) +
+        math.cos(lat_rad) * Cos(row_lat) * Power(Sin((row_lng - lng_rad) / 2), 2)
+    )
+    return ExpressionWrapper(
+        2 * EARTH_RADIUS_MILES * ASin(Sqrt(Least(a, Value(1.0)))),
+        output_field=FloatField()
+    )
+
+
+def filter_within_radius(
+    queryset: QuerySet,
+    latitude: float,
+    longitude: float,
+    radius_miles: float,
+    lat_field: str = 'latitude',
+    lng_field: str = 'longitude'
+) -> QuerySet:
+    """
+    Restrict `queryset` to rows within `radius_miles` and annotate `distance_miles`.
+    
+    The bounding box narrows rows through the (latitude, longitude) index;
+    exact distance is only evaluated for the rows inside it.
+    """
+    return queryset.filter(
+        bounding_box_q(latitude, longitude, radius_miles, lat_field, lng_field)
+    ).annotate(
+        distance_miles=distance_miles_expression(latitude, longitude, lat_field, lng_field)
+    ).filter(distance_miles__lte=radius_miles)
+
+
+def nearby_practitioner_locations(
+    latitude: float,
+    longitude: float,
+    radius_miles: float,
+    in_person_only: bool = False
+) -> QuerySet:
+    """PractitionerLocation rows within the radius, annotated with distance_miles."""
+    queryset = PractitionerLocation.objects.all()
+    if in_person_only:
+        queryset = queryset.filter(is_in_person=True)
+    return filter_within_radius(queryset, latitude, longitude, radius_miles)
+
+
+def annotate_practitioner_distance(
+    queryset: QuerySet,
+    latitude: float,
+    longitude: float,
+    radius_miles: float,
+    in_person_only: bool = False
+) -> QuerySet:
+    """
+    Restrict a Practitioner queryset to practitioners with a location inside
+    the radius and annotate `distance_miles` (closest location) and
+    `nearest_location_id`.
+    
+    Uses a semi-join and correlated subqueries rather than joining locations,
+    so practitioners with several matching locations are not duplicated.
+    """
+    locations = nearby_practitioner_locations(latitude, longitude, radius_miles, in_person_only)
+    nearest = locations.filter(practitioner_id=OuterRef('pk')).order_by('distance_miles')
+    
+    return queryset.filter(
+        id__in=locations.values('practitioner_id')
+    ).annotate(
+        distance_miles=Subquery(nearest.values('distance_miles')[:1], output_field=FloatField()),
+        nearest_location_id=Subquery(nearest.values('id')[:1])
+    )
+
+
 def find_nearby_locations(
     latitude: float,
     longitude: float,
@@ -69,15 +180,7 @@ def find_nearby_locations(
     """
     Find practitioner locations within a given radius.
     """
-    # Get bounding box for initial filtering
-    min_lat, max_lat, min_lon, max_lon = get_bounding_box(latitude, longitude, radius_miles)
-    
-    # Start with locations in bounding box
-    queryset = PractitionerLocation.objects.filter(
-        latitude__gte=min_lat,
-        latitude__lte=max_lat,
-        longitude__gte=min_lon,
-        longitude__lte=max_lon,
+    queryset = nearby_practitioner_locations(latitude, longitude, radius_miles).filter(
         practitioner__practitioner_status='active'
     )
     
@@ -87,34 +190,7 @@ def find_nearby_locations(
     elif location_type == 'virtual':
         queryset = queryset.filter(is_virtual=True)
     
-    # Calculate distance using database functions
-    lat_rad = math.radians(latitude)
-    lng_rad = math.radians(longitude)
-    
-    queryset = queryset.annotate(
-        distance_miles=Value(3959.0, output_field=DecimalField()) * 
-        ATan2(
-            Sqrt(
-                Power(Sin((Radians(F('latitude')) - lat_rad) / 2), 2) +
-                Cos(lat_rad) * Cos(Radians(F('latitude'))) *
-                Power(Sin((Radians(F('longitude')) - lng_rad) / 2), 2)
-            ),
-            Sqrt(
-                1 - (
-                    Power(Sin((Radians(F('latitude')) - lat_rad) / 2), 2) +
-                    Cos(lat_rad) * Cos(Radians(F('latitude'))) *
-                    Power(Sin((Radians(F('longitude')) - lng_rad) / 2), 2)
-                )
-            )
-        ) * 2
-    )
-    
-    # Filter by actual distance and order
-    queryset = queryset.filter(distance_miles__lte=radius_miles)
-    queryset = queryset.order_by('distance_miles')
-    
-    # Select related for efficiency
-    queryset = queryset.select_related(
+    queryset = queryset.order_by('distance_miles').select_related(
         'practitioner', 'city', 'state', 'country'
     )
     
@@ -13,6 +13,7 @@ import uuid
 import os
 
 from media.models import Media, MediaType, MediaStatus, MediaProcessingJob
+from media.counters import media_downloads, media_views
 from integrations.cloudflare_r2.storage import R2MediaStorage
 from .serializers import (
     MediaSerializer,
@@ -465,11 +466,12 @@ class MediaViewSet(viewsets.ModelViewSet):
         Increment view count for a media item.
         """
         media = self.get_object()
-        media.view_count += 1
-        media.save(update_fields=['view_count'])
-        
+        pending = media_views.incr(media.pk)
+        if not pending:
+            media.refresh_from_db(fields=['view_count'])  # written through
+
         return Response({
-            'view_count': media.view_count
+            'view_count': media.view_count + pending
         }, status=status.HTTP_200_OK)
     
     @action(detail=True, methods=['post'])
@@ -478,11 +480,12 @@ class MediaViewSet(viewsets.ModelViewSet):
         Increment download count for a media item.
         """
         media = self.get_object()
-        media.download_count += 1
-        media.save(update_fields=['download_count'])
-        
+        pending = media_downloads.incr(media.pk)
+        if not pending:
+            media.refresh_from_db(fields=['download_count'])  # written through
+
         return Response({
-            'download_count': media.download_count
+            'download_count': media.download_count + pending
         }, status=status.HTTP_200_OK)
     
     def _trigger_processing(self, media, operations):
@@ -0,0 +1,8 @@
+"""
+Media view and download counters (write-behind, see utils.counters).
+"""
+from media.models import Media
+from utils.counters import BufferedCounter
+
+media_views = BufferedCounter(Media, 'view_count')
+media_downloads = BufferedCounter(Media, 'download_count')
@@ -0,0 +1,21 @@
+"""
+Media periodic tasks.
+"""
+import logging
+from celery import shared_task
+
+from media.counters import media_downloads, media_views
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def flush_media_counters():
+    """Write buffered media view and download counts to the database."""
+    result = {
+        'views': media_views.flush(),
+        'downloads': media_downloads.flush(),
+    }
+    if any(result.values()):
+        logger.info(f"Flushed media counters: {result}")
+    return result
@@ -7,7 +7,7 @@ from django.utils import timezone
 from django.db.models import Q, Count
 
 from messaging.models import (
-    Conversation, Message, MessageReceipt, ConversationParticipant,
+    Conversation, Message, ConversationParticipant,
     BlockedUser, MessageNotificationPreference, TypingIndicator
 )
 from users.models import User
@@ -62,27 +62,16 @@ class AttachmentSerializer(serializers.Serializer):
     height = serializers.IntegerField(required=False, allow_null=True)
 
 
-class MessageStatusSerializer(serializers.ModelSerializer):
-    """Serializer for message delivery and read status."""
-    message_id = serializers.IntegerField(source='message.id')
-    user_id = serializers.IntegerField(source='user.id')
-    
-    class Meta:
-        model = MessageReceipt
-        fields = ['message_id', 'user_id', 'delivered_at', 'is_read', 'read_at']
-
-
 class MessageSerializer(serializers.ModelSerializer):
     """Serializer for messages."""
     sender = UserSummarySerializer(read_only=True)
     attachments = AttachmentSerializer(many=True, read_only=True)
-    receipts = MessageStatusSerializer(many=True, read_only=True)
     
     class Meta:
         model = Message
         fields = ['id', 'conversation', 'sender', 'content', 'message_type',
                   'attachments', 'created_at', 'updated_at', 'edited_at',
-                  'is_edited', 'is_deleted', 'deleted_at', 'receipts']
+                  'is_edited', 'is_deleted', 'deleted_at']
         read_only_fields = ['id', 'conversation', 'sender', 'created_at', 
                             'updated_at', 'edited_at', 'is_edited', 
                             'is_deleted', 'deleted_at']
@@ -143,33 +132,24 @@ class ConversationListSerializer(serializers.ModelSerializer):
     def get_other_user(self, obj):
         """Get the other user in the conversation."""
         request_user = self.context.get('request').user
-        # For direct conversations, get the other participant
+        # For direct conversations, get the other participant (prefetched in the view)
         if obj.conversation_type == 'direct':
-            other_user = obj.participants.exclude(id=request_user.id).first()
-            if other_user:
-                return UserSummarySerializer(other_user).data
+            for other_user in obj.participants.all():
+                if other_user.id != request_user.id:
+                    return UserSummarySerializer(other_user).data
         return None
     
     def get_last_message(self, obj):
         """Get the last message in the conversation."""
-        # This is prefetched in the view
-        messages = list(obj.messages.all())
-        if messages:
-            last_message = messages[0]
-            # Check if message is read by current user
-            user = self.context['request'].user
-            is_read = MessageReceipt.objects.filter(
-                message=last_message,
-                user=user,
-                is_read=True
-            ).exists()
-            
+        last_message = obj.last_message
+        if last_message:
             return {
                 'id': last_message.id,
                 'content': last_message.content[:100] + '...' if len(last_message.content) > 100 else last_message.content,
                 'sender_id': last_message.sender_id,
                 'created_at': last_message.created_at,
-                'is_read': is_read
+                # Nothing unread means the latest message has been seen
+                'is_read': self.get_unread_count(obj) == 0
             }
         return None
     
@@ -198,23 +178,20 @@ class ConversationSerializer(serializers.ModelSerializer):
     
     def get_last_message(self, obj):
         """Get the last message in the conversation."""
-        last_message = obj.messages.filter(is_deleted=False).order_by('-created_at').first()
-        if last_message:
-            return MessageSerializer(last_message).data
+        if obj.last_message:
+            return MessageSerializer(obj.last_message).data
         return None
     
     def get_unread_count(self, obj):
         """Get unread message count for current user."""
+        if hasattr(obj, 'unread_count'):
+            return obj.unread_count
+        
         user = self.context.get('request').user if self.context.get('request') else None
         if not user:
             return 0
         
-        return MessageReceipt.objects.filter(
-            message__conversation=obj,
-            user=user,
-            is_read=False,
-            message__is_deleted=False
-        ).count()
+        return obj.get_unread_count(user)
 
 
 class ConversationDetailSerializer(ConversationSerializer):
@@ -6,13 +6,13 @@ import logging
 from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from django.db.models import Q, Max, Count, Prefetch
+from django.db.models import Count, F, Value
+from django.db.models.functions import Coalesce
 from django.shortcuts import get_object_or_404
-from django.utils import timezone
 from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiParameter
 from drf_spectacular.types import OpenApiTypes
 
-from messaging.models import Conversation, Message, MessageReceipt
+from messaging.models import Conversation, Message
 from messaging.api.v1.serializers import (
     ConversationListSerializer,
     ConversationDetailSerializer,
@@ -86,24 +86,19 @@ class ConversationViewSet(viewsets.ModelViewSet):
         """Get conversations for the authenticated user"""
         user = self.request.user
         
-        # Base queryset with optimizations
+        # Inbox state comes from the user's own participant row
         queryset = Conversation.objects.filter(
-            participants=user,
+            conversation_participants__user=user,
             is_active=True
+        ).annotate(
+            unread_count=F('conversation_participants__unread_count'),
+            inbox_last_message_at=F('conversation_participants__last_message_at'),
+        ).select_related(
+            'last_message'
         ).prefetch_related(
             'participants',
             'participants__practitioner_profile',
-            Prefetch(
-                'messages',
-                queryset=Message.objects.select_related('sender').order_by('-created_at')
-            )
-        ).annotate(
-            last_message_time=Max('messages__created_at'),
-            unread_count=Count(
-                'messages__receipts',
-                filter=Q(messages__receipts__user=user, messages__receipts__is_read=False)
-            )
-        ).order_by('-last_message_time')
+        ).order_by(F('inbox_last_message_at').desc(nulls_last=True), '-created_at')
         
         # Filter by unread if requested
         if self.request.query_params.get('unread_only') == 'true':
@@ -317,12 +312,7 @@ class ConversationViewSet(viewsets.ModelViewSet):
         """Mark all messages in conversation as read"""
         conversation = self.get_object()
         
-        # Update message receipts for current user
-        MessageReceipt.objects.filter(
-            message__conversation=conversation,
-            user=request.user,
-            is_read=False
-        ).update(is_read=True, read_at=timezone.now())
+        conversation.mark_as_read(request.user)
         
         return Response({"status": "Messages marked as read"})
     
@@ -384,11 +374,12 @@ class MessageViewSet(viewsets.GenericViewSet):
     @action(detail=False, methods=['get'])
     def unread_count(self, request):
         """Get total unread message count"""
-        count = MessageReceipt.objects.filter(
-            user=request.user,
-            is_read=False,
-            message__conversation__participants=request.user
-        ).count()
+        # Visible messages from others after each of the user's read watermarks
+        count = Message.objects.filter(
+            conversation__conversation_participants__user=request.user,
+            is_deleted=False,
+            id__gt=Coalesce(F('conversation__conversation_participants__last_read_message_id'), Value(0))
+        ).exclude(sender=request.user).count()
         
         return Response({"unread_count": count})
 
@@ -6,7 +6,7 @@ from channels.db import database_sync_to_async
 from django.utils import timezone
 from django.core.exceptions import ObjectDoesNotExist
 from django.contrib.auth import get_user_model
-from messaging.models import Conversation, Message, MessageReceipt, TypingIndicator
+from messaging.models import Conversation, Message, TypingIndicator
 
 User = get_user_model()
 logger = logging.getLogger(__name__)
@@ -310,18 +310,11 @@ class ChatConsumer(AsyncWebsocketConsumer):
     @database_sync_to_async
     def mark_message_as_read(self, message_id):
         try:
-            message = Message.objects.get(id=message_id, conversation_id=self.conversation_id)
-            receipt, created = MessageReceipt.objects.get_or_create(
-                message=message,
-                user=self.user,
-                defaults={"is_read": True, "read_at": timezone.now()}
+            message = Message.objects.select_related('conversation').get(
+                id=message_id,
+                conversation_id=self.conversation_id
             )
-            
-            if not created and not receipt.is_read:
-                receipt.is_read = True
-                receipt.read_at = timezone.now()
-                receipt.save(update_fields=['is_read', 'read_at'])
-            
+            message.conversation.mark_as_read(self.user, message)
             return True
         except ObjectDoesNotExist:
             return False
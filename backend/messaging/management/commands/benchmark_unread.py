@@ -0,0 +1,115 @@
+"""
+Benchmark unread tracking in group conversations: per-message receipts vs read watermarks.
+
+For each group size a synthetic conversation gets --messages messages from
+rotating senders, then every member reads it and asks for their unread count.
+Two modes are compared:
+- receipts: one MessageReceipt row per message per recipient, flipped on read
+  and counted for unread (how it worked before)
+- watermarks: ConversationParticipant.last_read_message moved forward on read,
+  unread counted as a range of message ids (as shipped)
+
+Everything runs in a transaction that is rolled back at the end.
+
+Usage:
+    python manage.py benchmark_unread
+    python manage.py benchmark_unread --group-sizes 10 50 200 --messages 300
+"""
+import time as time_module
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Compare receipt rows and read watermarks for unread counts in group conversations'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--group-sizes', type=int, nargs='+', default=[5, 25, 100], help='Members per conversation')
+        parser.add_argument('--messages', type=int, default=200, help='Messages per conversation')
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.SUCCESS(
+            f"\n=== UNREAD TRACKING BENCHMARK ({options['messages']} messages per conversation) ===\n"
+        ))
+        self.stdout.write(
+            f'{"mode":<11} {"members":>7} {"rows":>8} {"send ms":>9} {"read ms":>9} {"count ms":>9}'
+        )
+        try:
+            with transaction.atomic():
+                stamp = int(time_module.time())
+                for size in options['group_sizes']:
+                    members = self._create_members(stamp, size)
+                    results = {}
+                    for mode in ('receipts', 'watermarks'):
+                        results[mode] = self._run(mode, members, options['messages'])
+                    if results['watermarks']:
+                        self.stdout.write(self.style.SUCCESS(
+                            f'  {size} members: send {results["receipts"] / results["watermarks"]:.1f}x faster'
+                        ))
+                raise _Rollback
+        except _Rollback:
+            self.stdout.write('Synthetic data rolled back.')
+
+    def _create_members(self, stamp, size):
+        from users.models import User
+
+        return [
+            User.objects.create_user(email=f'bench-unread-{stamp}-{size}-{i}@example.com', password=None)
+            for i in range(size)
+        ]
+
+    def _run(self, mode, members, message_count):
+        from messaging.models import Conversation, Message, MessageReceipt
+
+        conversation = Conversation.objects.create(conversation_type='group', title=f'Benchmark {mode}')
+        conversation.participants.add(*members)
+
+        started = time_module.perf_counter()
+        messages = []
+        for i in range(message_count):
+            sender = members[i % len(members)]
+            message = Message.objects.create(conversation=conversation, sender=sender, content=f'Message {i}')
+            if mode == 'receipts':
+                MessageReceipt.objects.bulk_create([
+                    MessageReceipt(message=message, user=member, is_read=False)
+                    for member in members if member.id != sender.id
+                ])
+            messages.append(message)
+        send_ms = (time_module.perf_counter() - started) * 1000
+
+        started = time_module.perf_counter()
+        for member in members:
+            if mode == 'receipts':
+                MessageReceipt.objects.filter(
+                    message__conversation=conversation, user=member, is_read=False
+                ).update(is_read=True, read_at=timezone.now())
+            else:
+                conversation.mark_as_read(member)
+        read_ms = (time_module.perf_counter() - started) * 1000
+
+        # One more message so there is something unread to count
+        Message.objects.create(conversation=conversation, sender=members[0], content='Unread')
+        started = time_module.perf_counter()
+        for member in members:
+            if mode == 'receipts':
+                MessageReceipt.objects.filter(
+                    message__conversation=conversation, user=member, is_read=False, message__is_deleted=False
+                ).count()
+            else:
+                conversation.get_unread_count(member)
+        count_ms = (time_module.perf_counter() - started) * 1000
+
+        rows = (
+            MessageReceipt.objects.filter(message__conversation=conversation).count()
+            if mode == 'receipts' else len(members)
+        )
+        self.stdout.write(
+            f'{mode:<11} {len(members):>7} {rows:>8} {send_ms:>9.0f} {read_ms:>9.0f} {count_ms:>9.0f}'
+        )
+        return send_ms
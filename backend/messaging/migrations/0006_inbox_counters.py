@@ -0,0 +1,72 @@
+# Generated by Django 5.1.3 on 2026-10-16 23:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_inbox_counters(apps, schema_editor):
+    """Set last messages from the message table and unread counts from receipts."""
+    Conversation = apps.get_model('messaging', 'Conversation')
+    ConversationParticipant = apps.get_model('messaging', 'ConversationParticipant')
+    Message = apps.get_model('messaging', 'Message')
+    MessageReceipt = apps.get_model('messaging', 'MessageReceipt')
+
+    latest = Message.objects.filter(
+        conversation=OuterRef('pk'),
+        is_deleted=False
+    ).order_by('-created_at')
+    Conversation.objects.update(
+        last_message=Subquery(latest.values('id')[:1]),
+        last_message_at=Subquery(latest.values('created_at')[:1]),
+    )
+
+    ConversationParticipant.objects.update(
+        last_message_at=Subquery(
+            Conversation.objects.filter(pk=OuterRef('conversation_id')).values('last_message_at')[:1]
+        ),
+        unread_count=Coalesce(Subquery(
+            MessageReceipt.objects.filter(
+                user_id=OuterRef('user_id'),
+                message__conversation_id=OuterRef('conversation_id'),
+                is_read=False,
+                message__is_deleted=False
+            ).order_by().values('user_id').annotate(n=Count('id')).values('n')[:1]
+        ), Value(0)),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('messaging', '0005_performance_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='conversation',
+            name='last_message',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='messaging.message'),
+        ),
+        migrations.AddField(
+            model_name='conversation',
+            name='last_message_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='conversationparticipant',
+            name='last_message_at',
+            field=models.DateTimeField(blank=True, help_text="Copy of the conversation's last_message_at, for ordering the inbox", null=True),
+        ),
+        migrations.AddField(
+            model_name='conversationparticipant',
+            name='unread_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='conversationparticipant',
+            index=models.Index(fields=['user', '-last_message_at'], name='msg_participant_inbox_idx'),
+        ),
+        migrations.RunPython(backfill_inbox_counters, migrations.RunPython.noop),
+    ]
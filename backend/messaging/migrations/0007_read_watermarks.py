@@ -0,0 +1,77 @@
+# Generated by Django 5.1.3 on 2026-10-16 23:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Exists, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def receipts_to_watermarks(apps, schema_editor):
+    """
+    Fold MessageReceipt rows into each participant's read and email watermarks.
+
+    A participant with no unread receipts has read the whole conversation.
+    Otherwise the watermark stops just before their oldest unread message, so
+    nothing unread becomes read (messages read out of order after that point
+    count as unread again).
+    """
+    ConversationParticipant = apps.get_model('messaging', 'ConversationParticipant')
+    Message = apps.get_model('messaging', 'Message')
+    MessageReceipt = apps.get_model('messaging', 'MessageReceipt')
+
+    receipts = MessageReceipt.objects.filter(
+        user_id=OuterRef('user_id'),
+        message__conversation_id=OuterRef('conversation_id')
+    )
+    unread = receipts.filter(is_read=False, message__is_deleted=False)
+
+    ConversationParticipant.objects.filter(~Exists(unread)).update(
+        last_read_message=Subquery(
+            Message.objects.filter(conversation_id=OuterRef('conversation_id')).order_by('-id').values('id')[:1]
+        )
+    )
+
+    with_unread = ConversationParticipant.objects.filter(Exists(unread)).annotate(
+        first_unread=Subquery(unread.order_by('message_id').values('message_id')[:1])
+    ).values_list('id', 'conversation_id', 'first_unread')
+    for participant_id, conversation_id, first_unread in with_unread.iterator():
+        watermark = Message.objects.filter(
+            conversation_id=conversation_id,
+            id__lt=first_unread
+        ).order_by('-id').values_list('id', flat=True).first()
+        ConversationParticipant.objects.filter(id=participant_id).update(last_read_message_id=watermark)
+
+    ConversationParticipant.objects.update(
+        email_notified_message=Subquery(
+            receipts.filter(email_notified_at__isnull=False).order_by('-message_id').values('message_id')[:1]
+        ),
+        unread_count=Coalesce(Subquery(
+            Message.objects.filter(
+                conversation_id=OuterRef('conversation_id'),
+                is_deleted=False,
+                id__gt=Coalesce(OuterRef('last_read_message_id'), Value(0))
+            ).exclude(
+                sender_id=OuterRef('user_id')
+            ).order_by().values('conversation_id').annotate(n=Count('id')).values('n')[:1]
+        ), Value(0)),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('messaging', '0006_inbox_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='conversationparticipant',
+            name='email_notified_message',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='messaging.message'),
+        ),
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(condition=Q(is_deleted=False), fields=['conversation', 'id'], name='msg_conv_visible_id_idx'),
+        ),
+        migrations.RunPython(receipts_to_watermarks, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,6 @@
 from django.db import models
+from django.db.models import Case, Count, F, IntegerField, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Coalesce, Greatest
 from django.utils import timezone
 from django.contrib.postgres.fields import ArrayField
 from utils.models import BaseModel
@@ -44,6 +46,16 @@ class Conversation(BaseModel):
         related_name='conversations'
     )
     
+    # Latest visible message, kept current as messages are sent and deleted
+    last_message = models.ForeignKey(
+        'Message',
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+        related_name='+'
+    )
+    last_message_at = models.DateTimeField(blank=True, null=True)
+    
     class Meta:
         indexes = [
             models.Index(fields=['is_active', 'updated_at']),
@@ -70,64 +82,81 @@ class Conversation(BaseModel):
         self.updated_at = timezone.now()
         self.save(update_fields=['updated_at'])
         
-        # Update participant's last read time
-        ConversationParticipant.objects.filter(
-            conversation=self,
-            user=sender
-        ).update(
-            last_read_at=timezone.now(),
-            last_read_message=message
-        )
+        # The sender has read everything up to their own message
+        self.mark_as_read(sender, message)
         
         return message
     
-    def mark_as_read(self, user):
+    def mark_as_read(self, user, message=None):
         """
-        Mark all unread messages in the conversation as read for a specific user
+        Mark messages as read for a specific user, up to and including `message`
+        (default: the latest message).
+
+        Read state is the participant's last_read_message watermark; it only
+        moves forward. unread_count is recomputed from the watermark in the
+        same statement.
         """
-        MessageReceipt.objects.filter(
-            message__conversation=self,
-            user=user,
-            is_read=False
-        ).update(
-            is_read=True,
-            read_at=timezone.now()
-        )
+        if message is None:
+            message = self.messages.filter(is_deleted=False).order_by('-id').first()
+            if message is None:
+                return False
         
-        # Update participant's last read
-        last_message = self.messages.filter(is_deleted=False).last()
-        if last_message:
-            ConversationParticipant.objects.filter(
-                conversation=self,
-                user=user
-            ).update(
-                last_read_at=timezone.now(),
-                last_read_message=last_message
-            )
+        return bool(ConversationParticipant.objects.filter(
+            conversation=self,
+            user=user
+        ).filter(
+            Q(last_read_message__isnull=True) | Q(last_read_message_id__lt=message.id)
+        ).update(
+            last_read_at=timezone.now(),
+            last_read_message=message,
+            unread_count=Coalesce(Subquery(
+                Message.objects.filter(
+                    conversation_id=OuterRef('conversation_id'),
+                    is_deleted=False,
+                    id__gt=message.id
+                ).exclude(
+                    sender_id=OuterRef('user_id')
+                ).order_by().values('conversation_id').annotate(n=Count('id')).values('n')[:1]
+            ), Value(0))
+        ))
+    
+    def unread_messages(self, user, last_read_message_id=None):
+        """
+        Messages from others after a read watermark (an index range scan on
+        conversation + id).
+        """
+        return self.messages.filter(
+            is_deleted=False,
+            id__gt=last_read_message_id or 0
+        ).exclude(sender=user)
     
     def get_unread_count(self, user):
         """
         Get unread message count for a specific user
         """
-        return MessageReceipt.objects.filter(
-            message__conversation=self,
-            user=user,
-            is_read=False,
-            message__is_deleted=False
-        ).count()
+        last_read_message_id = ConversationParticipant.objects.filter(
+            conversation=self,
+            user=user
+        ).values_list('last_read_message_id', flat=True).first()
+        return self.unread_messages(user, last_read_message_id).count()
     
     def add_participant(self, user, role='member'):
         """
         Add a participant to the conversation
         """
+        # History from before joining is not unread
+        latest = self.messages.order_by('-id').first()
         participant, created = ConversationParticipant.objects.get_or_create(
             conversation=self,
             user=user,
-            defaults={'role': role}
+            defaults={'role': role, 'last_message_at': self.last_message_at, 'last_read_message': latest}
         )
         if not created and not participant.is_active:
             participant.is_active = True
             participant.left_at = None
+            participant.last_message_at = self.last_message_at
+            participant.last_read_message = latest
+            participant.unread_count = 0
             participant.save()
         return participant
     
@@ -192,6 +221,8 @@ class Message(BaseModel):
         indexes = [
             models.Index(fields=['conversation', 'created_at']),
             models.Index(fields=['conversation', 'is_deleted', '-created_at']),
+            # Unread counts: visible messages after a participant's read watermark
+            models.Index(fields=['conversation', 'id'], condition=Q(is_deleted=False), name='msg_conv_visible_id_idx'),
             models.Index(fields=['sender', 'created_at']),
             models.Index(fields=['is_deleted']),
             models.Index(fields=['message_type']),
@@ -204,18 +235,27 @@ class Message(BaseModel):
         is_new = self.pk is None
         super().save(*args, **kwargs)
         
-        # Create message receipts for all active participants except sender
         if is_new:
-            active_participants = ConversationParticipant.objects.filter(
-                conversation=self.conversation,
-                is_active=True
-            ).exclude(user=self.sender).values_list('user', flat=True)
-            
-            receipts = [
-                MessageReceipt(message=self, user_id=user_id, is_read=False)
-                for user_id in active_participants
-            ]
-            MessageReceipt.objects.bulk_create(receipts)
+            self._record_sent()
+    
+    def _record_sent(self):
+        """Move the conversation's last message and the recipients' unread counts forward."""
+        Conversation.objects.filter(pk=self.conversation_id).update(
+            last_message=self,
+            last_message_at=self.created_at,
+            updated_at=self.created_at
+        )
+        ConversationParticipant.objects.filter(
+            conversation_id=self.conversation_id,
+            is_active=True
+        ).update(
+            last_message_at=self.created_at,
+            unread_count=F('unread_count') + Case(
+                When(user_id=self.sender_id, then=Value(0)),
+                default=Value(1),
+                output_field=IntegerField()
+            )
+        )
     
     def edit(self, new_content):
         """
@@ -233,11 +273,36 @@ class Message(BaseModel):
         self.is_deleted = True
         self.deleted_at = timezone.now()
         self.save(update_fields=['is_deleted', 'deleted_at'])
+        
+        # No longer counted as unread by anyone who had not read past it
+        ConversationParticipant.objects.filter(
+            conversation_id=self.conversation_id
+        ).exclude(
+            user_id=self.sender_id
+        ).filter(
+            Q(last_read_message__isnull=True) | Q(last_read_message_id__lt=self.id)
+        ).update(unread_count=Greatest(F('unread_count') - 1, Value(0)))
+        
+        # Fall back to the previous message in the inbox
+        conversation = Conversation.objects.filter(pk=self.conversation_id, last_message=self)
+        if conversation.exists():
+            previous = Message.objects.filter(
+                conversation_id=self.conversation_id,
+                is_deleted=False
+            ).order_by('-created_at').first()
+            conversation.update(
+                last_message=previous,
+                last_message_at=previous.created_at if previous else None
+            )
 
 
 class MessageReceipt(BaseModel):
     """
     Model representing message read receipts.
+
+    No longer written: read state is ConversationParticipant.last_read_message.
+    Existing rows were folded into those watermarks and are kept only until
+    the table is dropped.
     """
     message = models.ForeignKey(Message, on_delete=models.CASCADE, related_name='receipts')
     user = models.ForeignKey('users.User', on_delete=models.CASCADE, related_name='message_receipts')
@@ -318,7 +383,7 @@ class ConversationParticipant(BaseModel):
     is_archived = models.BooleanField(default=False)
     archived_at = models.DateTimeField(blank=True, null=True)
     
-    # Last read tracking
+    # Last read tracking: everything up to last_read_message has been read
     last_read_at = models.DateTimeField(blank=True, null=True)
     last_read_message = models.ForeignKey(
         'Message',
@@ -327,6 +392,22 @@ class ConversationParticipant(BaseModel):
         null=True,
         related_name='+'
     )
+    # Latest message covered by an unread-messages email
+    email_notified_message = models.ForeignKey(
+        'Message',
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+        related_name='+'
+    )
+    
+    # Inbox state, kept current as messages are sent and read
+    last_message_at = models.DateTimeField(
+        blank=True,
+        null=True,
+        help_text="Copy of the conversation's last_message_at, for ordering the inbox"
+    )
+    unread_count = models.PositiveIntegerField(default=0)
     
     # Join/leave tracking
     joined_at = models.DateTimeField(auto_now_add=True)
@@ -339,6 +420,7 @@ class ConversationParticipant(BaseModel):
             models.Index(fields=['user', 'is_active']),
             models.Index(fields=['conversation', 'is_active']),
             models.Index(fields=['user', 'is_archived']),
+            models.Index(fields=['user', '-last_message_at'], name='msg_participant_inbox_idx'),
         ]
     
     def __str__(self):
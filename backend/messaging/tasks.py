@@ -6,13 +6,12 @@ import logging
 from datetime import timedelta
 from celery import shared_task
 from django.utils import timezone
-from django.db.models import Count, Max
+from django.db.models import Exists, OuterRef, Value
+from django.db.models.functions import Coalesce, Greatest
 from django.conf import settings
 
 from messaging.models import (
-    MessageReceipt,
     Message,
-    Conversation,
     ConversationParticipant,
     MessageNotificationPreference
 )
@@ -31,11 +30,11 @@ def process_unread_message_notifications():
     Runs every 5 minutes via Celery Beat.
 
     Logic:
-    - Find MessageReceipts where:
-      - is_read = False
-      - email_notified_at IS NULL (not yet notified)
-      - delivered_at < now - 15 minutes (message is old enough)
-    - Group by user + conversation
+    - Find active participants with unread messages where some message:
+      - is after both their read watermark (last_read_message) and the last
+        message already emailed about (email_notified_message)
+      - is from someone else, not deleted
+      - is at least 15 minutes old
     - Check user preferences (email_notifications enabled)
     - Check conversation settings (not muted)
     - Check quiet hours if enabled
@@ -47,43 +46,36 @@ def process_unread_message_notifications():
     notification_threshold = now - timedelta(minutes=15)
 
     try:
-        # Find unread message receipts that need email notifications
-        unread_receipts = MessageReceipt.objects.filter(
-            is_read=False,
-            email_notified_at__isnull=True,
-            delivered_at__lt=notification_threshold,
-            message__is_deleted=False
-        ).select_related(
-            'message',
-            'message__conversation',
-            'message__sender',
-            'user'
-        ).prefetch_related(
-            'message__conversation__conversation_participants'
-        )
-
-        logger.info(f"Found {unread_receipts.count()} unread message receipts to process")
-
-        # Group by user and conversation
-        user_conversation_groups = {}
-        for receipt in unread_receipts:
-            key = (receipt.user.id, receipt.message.conversation.id)
-            if key not in user_conversation_groups:
-                user_conversation_groups[key] = []
-            user_conversation_groups[key].append(receipt)
-
-        logger.info(f"Grouped into {len(user_conversation_groups)} user-conversation pairs")
+        pending_messages = Message.objects.filter(
+            conversation_id=OuterRef('conversation_id'),
+            is_deleted=False,
+            id__gt=OuterRef('notify_after'),
+            created_at__lt=notification_threshold
+        ).exclude(sender_id=OuterRef('user_id'))
+
+        participants = ConversationParticipant.objects.filter(
+            is_active=True,
+            unread_count__gt=0
+        ).annotate(
+            notify_after=Greatest(
+                Coalesce('last_read_message_id', Value(0)),
+                Coalesce('email_notified_message_id', Value(0))
+            )
+        ).filter(
+            Exists(pending_messages)
+        ).select_related('user', 'conversation')
+
+        logger.info(f"Found {len(participants)} user-conversation pairs to process")
 
         sent_count = 0
         skipped_count = 0
         error_count = 0
 
-        for (user_id, conversation_id), receipts in user_conversation_groups.items():
+        for participant in participants:
+            user_id, conversation_id = participant.user_id, participant.conversation_id
             try:
-                # Get the first receipt to access user and conversation
-                first_receipt = receipts[0]
-                user = first_receipt.user
-                conversation = first_receipt.message.conversation
+                user = participant.user
+                conversation = participant.conversation
 
                 # Check if user has email notifications enabled
                 prefs, _ = MessageNotificationPreference.objects.get_or_create(
@@ -97,12 +89,7 @@ def process_unread_message_notifications():
                     continue
 
                 # Check if conversation is muted
-                participant = ConversationParticipant.objects.filter(
-                    conversation=conversation,
-                    user=user
-                ).first()
-
-                if participant and participant.is_muted:
+                if participant.is_muted:
                     # Check if mute is permanent or temporary
                     if not participant.muted_until or participant.muted_until > now:
                         logger.debug(f"Skipping conversation {conversation.id} for user {user.email} - muted")
@@ -126,10 +113,15 @@ def process_unread_message_notifications():
                         skipped_count += 1
                         continue
 
-                # Get the most recent unread message for preview
-                most_recent_message = Message.objects.filter(
-                    id__in=[r.message.id for r in receipts]
-                ).order_by('-created_at').first()
+                # Unread messages not yet emailed about, newest first
+                pending = Message.objects.filter(
+                    conversation_id=conversation.id,
+                    is_deleted=False,
+                    id__gt=participant.notify_after,
+                    created_at__lt=notification_threshold
+                ).exclude(sender_id=user.id)
+                unread_count = pending.count()
+                most_recent_message = pending.select_related('sender').order_by('-id').first()
 
                 if not most_recent_message:
                     logger.warning(f"No recent message found for conversation {conversation.id}")
@@ -137,7 +129,6 @@ def process_unread_message_notifications():
                     continue
 
                 # Send notification email
-                unread_count = len(receipts)
                 sender = most_recent_message.sender
 
                 # Truncate message preview
@@ -174,10 +165,9 @@ def process_unread_message_notifications():
                     ]
                 )
 
-                # Mark all receipts as notified
-                receipt_ids = [r.id for r in receipts]
-                MessageReceipt.objects.filter(id__in=receipt_ids).update(
-                    email_notified_at=now
+                # Later runs only email about messages after this one
+                ConversationParticipant.objects.filter(pk=participant.pk).update(
+                    email_notified_message=most_recent_message
                 )
 
                 logger.info(
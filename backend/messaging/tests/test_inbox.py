@@ -0,0 +1,74 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from messaging.models import Conversation, ConversationParticipant, Message
+from users.models import User
+
+
+class InboxCountersTestCase(TestCase):
+    """Last message and unread counts are stored, and the inbox does not scale with history."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='inbox-reader@example.com', password='testpass123')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def conversation_with(self, other):
+        conversation = Conversation.objects.create(conversation_type='direct')
+        conversation.participants.add(self.user, other)
+        return conversation
+
+    def participant(self, conversation, user):
+        return ConversationParticipant.objects.get(conversation=conversation, user=user)
+
+    def test_counters_follow_send_delete_and_read(self):
+        other = User.objects.create_user(email='inbox-friend@example.com', password='testpass123')
+        conversation = self.conversation_with(other)
+
+        Message.objects.create(conversation=conversation, sender=other, content='Hi')
+        Message.objects.create(conversation=conversation, sender=other, content='Still there?')
+        Message.objects.create(conversation=conversation, sender=self.user, content='Yes')
+        reply_from_other = Message.objects.create(conversation=conversation, sender=other, content='Great')
+
+        conversation.refresh_from_db()
+        self.assertEqual(conversation.last_message_id, reply_from_other.id)
+        self.assertEqual(self.participant(conversation, self.user).unread_count, 3)
+        self.assertEqual(self.participant(conversation, other).unread_count, 1)
+        self.assertEqual(self.participant(conversation, self.user).last_message_at, reply_from_other.created_at)
+
+        reply_from_other.soft_delete()
+        conversation.refresh_from_db()
+        self.assertEqual(conversation.last_message_at, Message.objects.get(content='Yes').created_at)
+        self.assertEqual(conversation.get_unread_count(self.user), 2)
+
+        conversation.mark_as_read(self.user)
+        self.assertEqual(conversation.get_unread_count(self.user), 0)
+        self.assertEqual(self.participant(conversation, self.user).last_read_message_id, conversation.last_message_id)
+
+    def test_inbox_list_is_one_query_regardless_of_history(self):
+        conversations = []
+        for i in range(3):
+            other = User.objects.create_user(email=f'inbox-friend{i}@example.com', password='testpass123')
+            conversation = self.conversation_with(other)
+            for n in range(5 * (i + 1)):
+                Message.objects.create(conversation=conversation, sender=other, content=f'Message {n}')
+            conversations.append(conversation)
+        conversations[0].mark_as_read(self.user)
+        Message.objects.create(conversation=conversations[0], sender=self.user, content='Latest')
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/v1/conversations/')
+        self.assertEqual(response.status_code, 200)
+
+        results = response.data['data']['results']
+        self.assertEqual([c['id'] for c in results], [conversations[0].id, conversations[2].id, conversations[1].id])
+        self.assertEqual([c['unread_count'] for c in results], [0, 15, 10])
+        self.assertEqual(results[0]['last_message']['content'], 'Latest')
+        self.assertEqual(results[1]['other_user']['email'], 'inbox-friend2@example.com')
+        # Without the counters this grew with every conversation and message
+        self.assertLessEqual(len(queries), 6)
+
+        response = self.client.get('/api/v1/messages/unread_count/')
+        self.assertEqual(response.data['unread_count'], 25)
@@ -0,0 +1,81 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+
+from messaging.models import Conversation, ConversationParticipant, Message, MessageReceipt
+from messaging.tasks import process_unread_message_notifications
+from users.models import User
+
+
+class ReadWatermarkTestCase(TestCase):
+    """Read state is one watermark per participant; no per-message receipt rows."""
+
+    def setUp(self):
+        self.members = [
+            User.objects.create_user(email=f'group-member{i}@example.com', password='testpass123')
+            for i in range(4)
+        ]
+        self.conversation = Conversation.objects.create(conversation_type='group', title='Circle')
+        self.conversation.participants.add(*self.members)
+
+    def send(self, sender, content):
+        return Message.objects.create(conversation=self.conversation, sender=sender, content=content)
+
+    def participant(self, user):
+        return ConversationParticipant.objects.get(conversation=self.conversation, user=user)
+
+    def test_group_messages_write_no_receipts(self):
+        for i in range(5):
+            self.send(self.members[i % 2], f'Message {i}')
+
+        self.assertFalse(MessageReceipt.objects.exists())
+        self.assertEqual(self.conversation.get_unread_count(self.members[0]), 2)
+        self.assertEqual(self.conversation.get_unread_count(self.members[3]), 5)
+
+    def test_watermark_only_moves_forward(self):
+        sender, reader = self.members[0], self.members[1]
+        messages = [self.send(sender, f'Message {i}') for i in range(4)]
+
+        self.assertTrue(self.conversation.mark_as_read(reader, messages[2]))
+        self.assertEqual(self.participant(reader).unread_count, 1)
+        self.assertEqual(self.conversation.get_unread_count(reader), 1)
+
+        # An older read receipt (e.g. a late WebSocket event) changes nothing
+        self.assertFalse(self.conversation.mark_as_read(reader, messages[0]))
+        self.assertEqual(self.participant(reader).last_read_message_id, messages[2].id)
+
+        self.conversation.mark_as_read(reader)
+        self.assertEqual(self.conversation.get_unread_count(reader), 0)
+        self.assertEqual(self.participant(reader).unread_count, 0)
+
+    def test_new_participant_starts_with_history_read(self):
+        self.send(self.members[0], 'Before you joined')
+        newcomer = User.objects.create_user(email='group-newcomer@example.com', password='testpass123')
+        self.conversation.add_participant(newcomer)
+        self.assertEqual(self.conversation.get_unread_count(newcomer), 0)
+
+        self.send(self.members[0], 'Welcome')
+        self.assertEqual(self.conversation.get_unread_count(newcomer), 1)
+        self.assertEqual(self.participant(newcomer).unread_count, 1)
+
+    @mock.patch('messaging.tasks.EmailService.send_template_email')
+    def test_unread_email_sent_once_per_batch(self, send_email):
+        sender, reader = self.members[0], self.members[1]
+        for user in self.members[2:]:
+            ConversationParticipant.objects.filter(conversation=self.conversation, user=user).update(is_active=False)
+        messages = [self.send(sender, f'Message {i}') for i in range(3)]
+        Message.objects.filter(id__in=[m.id for m in messages]).update(
+            created_at=timezone.now() - timedelta(minutes=30)
+        )
+
+        result = process_unread_message_notifications()
+        self.assertEqual(result['sent_count'], 1)
+        self.assertEqual(send_email.call_args.kwargs['to'], reader.email)
+        self.assertEqual(send_email.call_args.kwargs['context']['unread_count'], 3)
+        self.assertEqual(self.participant(reader).email_notified_message_id, messages[-1].id)
+
+        send_email.reset_mock()
+        self.assertEqual(process_unread_message_notifications()['sent_count'], 0)
+        send_email.assert_not_called()
@@ -90,7 +90,7 @@ DEFAULT_NOTIFICATION_PREFERENCES = {
 # Celery Beat Schedule for periodic notifications
 CELERY_BEAT_SCHEDULE = {
     'process-scheduled-notifications': {
-        'task': 'notifications.tasks.process_scheduled_notifications',
+        'task': 'notifications.tasks.scheduled.process_scheduled_notifications',
         'schedule': 60.0,  # Every minute
     },
     'cleanup-old-notifications': {
@@ -12,12 +12,8 @@ from django.db import models
 from django.conf import settings
 
 from bookings.models import Booking
-from services.models import ServiceSession
 from notifications.models import Notification
-from notifications.services.registry import (
-    get_client_notification_service,
-    get_practitioner_notification_service
-)
+from notifications.services.registry import get_client_notification_service
 
 logger = logging.getLogger(__name__)
 
@@ -53,343 +49,17 @@ def process_all_notifications():
 
 def process_booking_reminders():
     """
-    Process all booking reminder notifications (24h and 30min).
-    Returns stats about processed reminders.
-    """
-    logger.info("Processing booking reminders")
-    
-    stats = {
-        'session_24h_reminders': 0,
-        'session_30m_reminders': 0,
-        'booking_24h_reminders': 0,
-        'booking_30m_reminders': 0
-    }
-    
-    # 1. Process session-based reminders (workshops, courses)
-    stats['session_24h_reminders'] = process_session_reminders(hours_before=24)
-    stats['session_30m_reminders'] = process_session_reminders(hours_before=0.5)
-    
-    # 2. Process booking-based reminders (individual sessions, packages)
-    stats['booking_24h_reminders'] = process_booking_based_reminders(hours_before=24)
-    stats['booking_30m_reminders'] = process_booking_based_reminders(hours_before=0.5)
-    
-    total_reminders = sum(stats.values())
-    logger.info(f"Processed {total_reminders} reminder notifications: {stats}")
-    
-    return stats
-
-
-def process_session_reminders(hours_before):
-    """
-    Process reminders for ServiceSession-based bookings (workshops, courses).
-    """
-    now = timezone.now()
-    
-    # Calculate time window for reminders
-    if hours_before == 24:
-        start_time = now + timedelta(hours=23, minutes=45)  # 23:45 to 24:15 hours from now
-        end_time = now + timedelta(hours=24, minutes=15)
-    else:  # 30 minutes
-        start_time = now + timedelta(minutes=15)  # 15 to 45 minutes from now
-        end_time = now + timedelta(minutes=45)
-    
-    # Find sessions in the time window
-    sessions = ServiceSession.objects.filter(
-        start_time__gte=start_time,
-        start_time__lt=end_time,
-        service__is_active=True
-    ).select_related('service__primary_practitioner__user')
-    
-    logger.info(f"Found {sessions.count()} sessions needing {hours_before}h reminders")
-    
-    reminder_count = 0
-    
-    for session in sessions:
-        # Find confirmed bookings for this session
-        bookings = Booking.objects.filter(
-            service_session=session,
-            status='confirmed'
-        ).select_related('user', 'service__primary_practitioner__user')
-        
-        # Process client reminders
-        for booking in bookings:
-            if send_session_reminder_to_client(booking, session, hours_before):
-                reminder_count += 1
-        
-        # Process practitioner reminder (aggregated for workshops/courses)
-        if bookings.exists():
-            send_session_reminder_to_practitioner(session, bookings, hours_before)
-            reminder_count += 1
-    
-    return reminder_count
-
-
-def process_booking_based_reminders(hours_before):
-    """
-    Process reminders for direct booking-based services (sessions, packages).
-    """
-    now = timezone.now()
-    
-    # Calculate time window for reminders
-    if hours_before == 24:
-        start_time = now + timedelta(hours=23, minutes=45)
-        end_time = now + timedelta(hours=24, minutes=15)
-    else:  # 30 minutes
-        start_time = now + timedelta(minutes=15)
-        end_time = now + timedelta(minutes=45)
-    
-    # Find bookings without service_session (direct bookings)
-    bookings = Booking.objects.filter(
-        start_time__gte=start_time,
-        start_time__lt=end_time,
-        status='confirmed',
-        service_session__isnull=True  # Direct bookings only
-    ).select_related('user', 'service__primary_practitioner__user')
-    
-    logger.info(f"Found {bookings.count()} direct bookings needing {hours_before}h reminders")
-    
-    reminder_count = 0
-    
-    for booking in bookings:
-        # Send client reminder
-        if send_booking_reminder_to_client(booking, hours_before):
-            reminder_count += 1
-            
-        # Send practitioner reminder
-        if send_booking_reminder_to_practitioner(booking, hours_before):
-            reminder_count += 1
-    
-    return reminder_count
-
-
-def send_session_reminder_to_client(booking, session, hours_before):
-    """
-    Send session-based reminder to client with deduplication.
-    """
-    # Create unique notification key
-    notification_key = f"booking_{booking.id}_session_{session.id}_{hours_before}h_client_reminder"
-    
-    # Check if already sent
-    if notification_already_sent(booking.user, notification_key):
-        return False
-    
-    try:
-        client_service = get_client_notification_service()
-        
-        # Determine template and content
-        template_key = 'reminder_24h' if hours_before == 24 else 'reminder_30m'
-        template_id = client_service.get_template_id(template_key)
-        
-        if not template_id:
-            logger.warning(f"No {template_key} template configured")
-            return False
-        
-        # Prepare notification data
-        service = booking.service
-        practitioner = service.primary_practitioner
-        
-        data = {
-            'booking_id': str(booking.id),
-            'service_name': service.name,
-            'session_title': session.title or f"Session {session.sequence_number}" if session.sequence_number else service.name,
-            'session_number': session.sequence_number,
-            'practitioner_name': practitioner.user.get_full_name(),
-            'session_date': session.start_time.strftime('%A, %B %d, %Y'),
-            'session_time': session.start_time.strftime('%I:%M %p'),
-            'duration_minutes': session.duration or service.duration_minutes,
-            'location': booking.location.name if booking.location else ('Virtual' if booking.meeting_url else 'TBD'),
-            'hours_until': int(hours_before),
-            'booking_url': f"{settings.FRONTEND_URL}/dashboard/user/bookings/{booking.id}",
-            'session_url': f"{settings.FRONTEND_URL}/dashboard/user/sessions/{session.id}",
-            'is_course_session': service.service_type.code == 'course'
-        }
-        
-        # Create notification record
-        notification = Notification.objects.create(
-            user=booking.user,
-            title=f"Reminder: {service.name} in {int(hours_before)} {'hours' if hours_before > 1 else 'hour'}",
-            message=f"Your session starts at {data['session_time']}",
-            notification_type='reminder',
-            delivery_channel='email',
-            related_object_type='booking',
-            related_object_id=str(booking.id),
-            notification_key=notification_key,
-            metadata={
-                'booking_id': booking.id,
-                'session_id': session.id,
-                'hours_before': hours_before,
-                'reminder_type': 'session_based'
-            }
-        )
-        
-        # Send via notification service
-        result = client_service.send_email_notification(
-            user=booking.user,
-            template_id=template_id,
-            data=data,
-            notification=notification,
-            idempotency_key=f"session-reminder-{booking.id}-{session.id}-{hours_before}h"
-        )
-        
-        if result and 'error' not in result:
-            notification.status = 'sent'
-            notification.sent_at = timezone.now()
-            notification.save(update_fields=['status', 'sent_at'])
-            logger.info(f"Sent {hours_before}h session reminder to {booking.user.email} for session {session.id}")
-            return True
-        else:
-            notification.status = 'failed'
-            notification.metadata['error'] = result.get('error', 'Unknown error')
-            notification.save(update_fields=['status', 'metadata'])
-            logger.error(f"Failed to send session reminder: {result}")
-            return False
-            
-    except Exception as e:
-        logger.exception(f"Error sending session reminder: {str(e)}")
-        return False
-
-
-def send_booking_reminder_to_client(booking, hours_before):
-    """
-    Send booking-based reminder to client with deduplication.
-    """
-    # Create unique notification key
-    notification_key = f"booking_{booking.id}_{hours_before}h_client_reminder"
-    
-    # Check if already sent
-    if notification_already_sent(booking.user, notification_key):
-        return False
+    Dispatch due booking reminders (24h and 30min).
     
-    try:
-        client_service = get_client_notification_service()
-        
-        # Use existing send_booking_reminder method
-        result = client_service.send_booking_reminder(booking, int(hours_before))
-        
-        # Create notification record for tracking
-        Notification.objects.create(
-            user=booking.user,
-            title=f"Reminder: {booking.service.name} in {int(hours_before)} {'hours' if hours_before > 1 else 'hour'}",
-            message=f"Your booking starts at {booking.start_time.strftime('%I:%M %p')}",
-            notification_type='reminder',
-            delivery_channel='email',
-            related_object_type='booking',
-            related_object_id=str(booking.id),
-            notification_key=notification_key,
-            status='sent' if result else 'failed',
-            sent_at=timezone.now() if result else None,
-            metadata={
-                'booking_id': booking.id,
-                'hours_before': hours_before,
-                'reminder_type': 'booking_based'
-            }
-        )
-        
-        logger.info(f"Sent {hours_before}h booking reminder to {booking.user.email} for booking {booking.id}")
-        return True
-        
-    except Exception as e:
-        logger.exception(f"Error sending booking reminder: {str(e)}")
-        return False
-
-
-def send_session_reminder_to_practitioner(session, bookings, hours_before):
+    Reminders are queued as BookingReminder rows when bookings are confirmed
+    or rescheduled (see bookings.reminder_queue); this claims whatever is due,
+    so it is safe to run alongside the process-booking-reminders task.
+    Returns stats about dispatched reminders.
     """
-    Send aggregated session reminder to practitioner.
-    """
-    practitioner = session.service.primary_practitioner
-    if not practitioner:
-        return False
+    from bookings.tasks.reminders import process_booking_reminders as dispatch_booking_reminders
     
-    # Create unique notification key
-    notification_key = f"session_{session.id}_{hours_before}h_practitioner_reminder"
-    
-    # Check if already sent
-    if notification_already_sent(practitioner.user, notification_key):
-        return False
-    
-    try:
-        # Use existing aggregated reminder task
-        from bookings.tasks import send_practitioner_aggregated_reminder
-        
-        result = send_practitioner_aggregated_reminder(
-            practitioner_id=practitioner.id,
-            session_id=session.id,
-            hours_before=hours_before
-        )
-        
-        # Create notification record
-        Notification.objects.create(
-            user=practitioner.user,
-            title=f"Reminder: {session.service.name} in {int(hours_before)} {'hours' if hours_before > 1 else 'hour'} ({bookings.count()} participants)",
-            message=f"You have {bookings.count()} participants for this session",
-            notification_type='reminder',
-            delivery_channel='email',
-            related_object_type='service_session',
-            related_object_id=str(session.id),
-            notification_key=notification_key,
-            status='sent',
-            sent_at=timezone.now(),
-            metadata={
-                'session_id': session.id,
-                'participant_count': bookings.count(),
-                'hours_before': hours_before,
-                'reminder_type': 'aggregated_practitioner'
-            }
-        )
-        
-        logger.info(f"Sent aggregated {hours_before}h reminder to {practitioner.user.email} for session {session.id}")
-        return True
-        
-    except Exception as e:
-        logger.exception(f"Error sending practitioner session reminder: {str(e)}")
-        return False
-
-
-def send_booking_reminder_to_practitioner(booking, hours_before):
-    """
-    Send individual booking reminder to practitioner.
-    """
-    practitioner = booking.service.primary_practitioner
-    if not practitioner:
-        return False
-    
-    # Create unique notification key
-    notification_key = f"booking_{booking.id}_{hours_before}h_practitioner_reminder"
-    
-    # Check if already sent
-    if notification_already_sent(practitioner.user, notification_key):
-        return False
-    
-    try:
-        practitioner_service = get_practitioner_notification_service()
-        result = practitioner_service.send_booking_reminder(booking, int(hours_before))
-        
-        # Create notification record
-        Notification.objects.create(
-            user=practitioner.user,
-            title=f"Reminder: {booking.service.name} with {booking.user.get_full_name()} in {int(hours_before)} {'hours' if hours_before > 1 else 'hour'}",
-            message=f"Your session with {booking.user.get_full_name()} starts at {booking.start_time.strftime('%I:%M %p')}",
-            notification_type='reminder',
-            delivery_channel='email',
-            related_object_type='booking',
-            related_object_id=str(booking.id),
-            notification_key=notification_key,
-            status='sent' if result else 'failed',
-            sent_at=timezone.now() if result else None,
-            metadata={
-                'booking_id': booking.id,
-                'hours_before': hours_before,
-                'reminder_type': 'individual_practitioner'
-            }
-        )
-        
-        logger.info(f"Sent {hours_before}h booking reminder to {practitioner.user.email} for booking {booking.id}")
-        return True
-        
-    except Exception as e:
-        logger.exception(f"Error sending practitioner booking reminder: {str(e)}")
-        return False
+    result = dispatch_booking_reminders()
+    return {'reminders_dispatched': result['reminders_dispatched']}
 
 
 def process_session_reschedules():
@@ -0,0 +1,28 @@
+# Generated by Django 5.1.3 on 2026-10-16 21:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0003_performance_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='notification',
+            name='notification_type',
+            field=models.CharField(choices=[('booking', 'Booking'), ('payment', 'Payment'), ('session', 'Session'), ('review', 'Review'), ('system', 'System'), ('message', 'Message'), ('reminder', 'Reminder'), ('stream', 'Stream')], max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='notificationsetting',
+            name='notification_type',
+            field=models.CharField(choices=[('booking', 'Booking'), ('payment', 'Payment'), ('session', 'Session'), ('review', 'Review'), ('system', 'System'), ('message', 'Message'), ('reminder', 'Reminder'), ('stream', 'Stream')], max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='notificationtemplate',
+            name='notification_type',
+            field=models.CharField(choices=[('booking', 'Booking'), ('payment', 'Payment'), ('session', 'Session'), ('review', 'Review'), ('system', 'System'), ('message', 'Message'), ('reminder', 'Reminder'), ('stream', 'Stream')], max_length=20),
+        ),
+    ]
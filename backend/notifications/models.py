@@ -14,6 +14,7 @@ class Notification(BaseModel):
         ('system', 'System'),
         ('message', 'Message'),
         ('reminder', 'Reminder'),
+        ('stream', 'Stream'),
     )
     
     DELIVERY_CHANNELS = (
@@ -25,6 +26,7 @@ class Notification(BaseModel):
     
     STATUS_CHOICES = (
         ('pending', 'Pending'),
+        ('processing', 'Processing'),
         ('sent', 'Sent'),
         ('failed', 'Failed'),
         ('cancelled', 'Cancelled'),
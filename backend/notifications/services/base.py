@@ -5,12 +5,15 @@ import logging
 from typing import Dict, Optional, Any, List
 from datetime import datetime, timedelta
 from django.conf import settings
+from django.db import transaction
 from django.utils import timezone
 from celery import shared_task
 
 from notifications.models import Notification, NotificationSetting
 # Updated to use Resend email service
 from emails.services import EmailService
+from emails.batch import BatchEmailDispatcher, OutgoingEmail
+from emails.utils import EmailRenderer
 
 logger = logging.getLogger(__name__)
 
@@ -131,6 +134,80 @@ class BaseNotificationService:
                 notification.save()
             return {"error": str(e)}
     
+    def send_email_notifications(
+        self,
+        notifications: List[Notification],
+        dispatcher: Optional[BatchEmailDispatcher] = None
+    ) -> Dict[str, int]:
+        """
+        Send pending email notifications through the Resend batch API.
+
+        Each notification is rendered from the template_path, subject and
+        template_data in its metadata, the whole set is sent in batches, and
+        the outcome is written back to every row in one bulk update.
+        """
+        dispatcher = dispatcher or BatchEmailDispatcher()
+        now = timezone.now()
+        by_id = {}
+        failed = []
+
+        for notification in notifications:
+            user = notification.user
+            template_path = notification.metadata.get('template_path')
+            if not user.email or not template_path:
+                notification.status = 'failed'
+                notification.metadata['error'] = 'No email address' if not user.email else 'No template_path'
+                failed.append(notification)
+                continue
+
+            data = dict(notification.metadata.get('template_data', {}))
+            data.update({
+                'user': user,
+                'user_name': user.get_full_name() or user.email,
+                'user_email': user.email,
+            })
+
+            try:
+                html_content = EmailRenderer.render_email(template_path, data)
+            except Exception as e:
+                logger.error(f"Error rendering email for notification {notification.id}: {str(e)}")
+                notification.status = 'failed'
+                notification.metadata['error'] = str(e)
+                failed.append(notification)
+                continue
+
+            dispatcher.queue(OutgoingEmail(
+                to=user.email,
+                subject=notification.metadata.get('subject') or notification.title,
+                html=html_content,
+                key=notification.id,
+                tags=notification.metadata.get('tags', []),
+            ))
+            by_id[notification.id] = notification
+
+        sent = 0
+        for result in dispatcher.flush():
+            notification = by_id[result.key]
+            if result.ok:
+                notification.status = 'sent'
+                notification.sent_at = now
+                notification.metadata['resend_email_id'] = result.email_id
+                notification.metadata.pop('error', None)
+                sent += 1
+            else:
+                notification.status = 'failed'
+                notification.metadata['error'] = result.error
+                failed.append(notification)
+
+        # Failed renders were never queued, so they are not in by_id
+        updated = list(by_id.values()) + [n for n in failed if n.id not in by_id]
+        for notification in updated:
+            notification.updated_at = now  # auto_now is not applied by bulk_update
+        if updated:
+            Notification.objects.bulk_update(updated, ['status', 'sent_at', 'metadata', 'updated_at'])
+
+        return {'sent': sent, 'failed': len(failed)}
+
     def schedule_notification(
         self,
         user,
@@ -174,16 +251,34 @@ class BaseNotificationService:
         return notification
 
 
+def claim_notification(notification_id: int) -> Optional[Notification]:
+    """
+    Move a pending notification to 'processing' so only one worker sends it.
+
+    Returns None if the notification is not pending or another worker (e.g.
+    send_email_notification_batch) holds it.
+    """
+    with transaction.atomic():
+        notification = Notification.objects.select_for_update(skip_locked=True).filter(
+            id=notification_id, status='pending'
+        ).first()
+        if notification is None:
+            return None
+        notification.status = 'processing'
+        notification.save(update_fields=['status', 'updated_at'])
+    return notification
+
+
 @shared_task
 def send_scheduled_notification(notification_id: int):
     """
     Celery task to send scheduled notifications.
     """
     try:
-        notification = Notification.objects.get(id=notification_id)
-        
-        # Check if already sent or cancelled
-        if notification.status in ['sent', 'cancelled']:
+        notification = claim_notification(notification_id)
+
+        # Already sent, cancelled or claimed by another worker
+        if notification is None:
             return
         
         # Get service class based on notification type
@@ -223,7 +318,5 @@ def send_scheduled_notification(notification_id: int):
         
         # Add other delivery channels as needed (SMS, push, etc.)
         
-    except Notification.DoesNotExist:
-        logger.error(f"Notification {notification_id} not found")
     except Exception as e:
         logger.exception(f"Error sending scheduled notification {notification_id}: {str(e)}")
\ No newline at end of file
@@ -82,6 +82,10 @@ class ClientNotificationService(BaseNotificationService):
             'path': 'shared/message_notification_standalone.mjml',
             'subject': 'New Message from {sender_name}'
         },
+        'new_stream_post': {
+            'path': 'clients/new_stream_post_standalone.mjml',
+            'subject': 'New post from {practitioner_name}'
+        },
     }
 
     def get_template(self, template_key: str) -> Dict[str, str]:
@@ -2,10 +2,14 @@
 Scheduled notification processing tasks.
 """
 import logging
+from datetime import timedelta
+
 from celery import shared_task
+from django.db import transaction
 from django.utils import timezone
 
-from notifications.models import Notification
+from notifications.models import Notification, NotificationSetting
+from notifications.services.base import claim_notification
 from notifications.services.registry import (
     get_client_notification_service,
     get_practitioner_notification_service
@@ -13,6 +17,12 @@ from notifications.services.registry import (
 
 logger = logging.getLogger(__name__)
 
+# Due email notifications handed to each send_email_notification_batch task
+EMAIL_BATCH_TASK_SIZE = 500
+
+# Claimed emails whose worker died are released for another attempt after this long
+EMAIL_CLAIM_LEASE = timedelta(minutes=15)
+
 
 @shared_task
 def process_scheduled_notifications():
@@ -21,18 +31,89 @@ def process_scheduled_notifications():
     Run this every minute via Celery Beat.
     """
     now = timezone.now()
+
+    # Release email batches whose worker died mid-send
+    released = Notification.objects.filter(
+        status='processing',
+        updated_at__lt=now - EMAIL_CLAIM_LEASE
+    ).update(status='pending', updated_at=now)
+    if released:
+        logger.warning(f"Released {released} stale email notification claims")
     
     # Get all pending notifications scheduled for now or earlier
     notifications = Notification.objects.filter(
         status='pending',
         scheduled_for__lte=now
-    ).select_related('user')
-    
-    for notification in notifications:
+    )
+
+    # Emails go out through the batch API; other channels one at a time
+    email_ids = list(
+        notifications.filter(delivery_channel='email').values_list('id', flat=True)
+    )
+    for start in range(0, len(email_ids), EMAIL_BATCH_TASK_SIZE):
+        send_email_notification_batch.delay(email_ids[start:start + EMAIL_BATCH_TASK_SIZE])
+
+    for notification_id in notifications.exclude(delivery_channel='email').values_list('id', flat=True):
         try:
-            send_scheduled_notification.delay(notification.id)
+            send_scheduled_notification.delay(notification_id)
         except Exception as e:
-            logger.error(f"Error queuing notification {notification.id}: {str(e)}")
+            logger.error(f"Error queuing notification {notification_id}: {str(e)}")
+
+
+@shared_task
+def send_email_notification_batch(notification_ids):
+    """
+    Send a batch of pending email notifications through the Resend batch API.
+    Delivery status is recorded on the Notification rows in bulk.
+
+    The rows are first claimed (moved to 'processing' under SELECT ... FOR
+    UPDATE SKIP LOCKED), so overlapping runs and retries never email the
+    same notification twice.
+    """
+    with transaction.atomic():
+        claimed_ids = list(
+            Notification.objects.select_for_update(skip_locked=True).filter(
+                id__in=notification_ids,
+                status='pending',
+                delivery_channel='email'
+            ).values_list('id', flat=True)
+        )
+        if claimed_ids:
+            Notification.objects.filter(id__in=claimed_ids).update(
+                status='processing', updated_at=timezone.now()
+            )
+
+    notifications = list(
+        Notification.objects.filter(id__in=claimed_ids).select_related('user')
+    )
+    if not notifications:
+        return {'sent': 0, 'failed': 0, 'cancelled': 0}
+
+    # One query for the opt-outs instead of one per notification
+    opted_out = set(
+        NotificationSetting.objects.filter(
+            user_id__in={n.user_id for n in notifications},
+            notification_type__in={n.notification_type for n in notifications},
+            email_enabled=False
+        ).values_list('user_id', 'notification_type')
+    )
+    cancelled = [n for n in notifications if (n.user_id, n.notification_type) in opted_out]
+    for notification in cancelled:
+        notification.status = 'cancelled'
+        notification.metadata['reason'] = 'User preference'
+        notification.updated_at = timezone.now()
+    if cancelled:
+        Notification.objects.bulk_update(cancelled, ['status', 'metadata', 'updated_at'])
+
+    to_send = [n for n in notifications if (n.user_id, n.notification_type) not in opted_out]
+    result = get_client_notification_service().send_email_notifications(to_send)
+    result['cancelled'] = len(cancelled)
+
+    logger.info(
+        f"Email batch: {result['sent']} sent, {result['failed']} failed, "
+        f"{result['cancelled']} cancelled"
+    )
+    return result
 
 
 @shared_task
@@ -41,10 +122,10 @@ def send_scheduled_notification(notification_id: int):
     Send a single scheduled notification.
     """
     try:
-        notification = Notification.objects.get(id=notification_id)
-        
-        # Check if already sent or cancelled
-        if notification.status in ['sent', 'cancelled']:
+        notification = claim_notification(notification_id)
+
+        # Already sent, cancelled or claimed by another worker
+        if notification is None:
             return
         
         # Determine service based on user type
@@ -96,8 +177,6 @@ def send_scheduled_notification(notification_id: int):
         
         notification.save()
         
-    except Notification.DoesNotExist:
-        logger.error(f"Notification {notification_id} not found")
     except Exception as e:
         logger.exception(f"Error sending notification {notification_id}: {str(e)}")
         try:
@@ -1,8 +1,14 @@
+from unittest import mock
+
+import httpx
 from django.test import TestCase
 from django.contrib.auth import get_user_model
 from rest_framework.test import APIClient
 from rest_framework import status
+from emails.batch import BatchEmailDispatcher, ResendBatchClient
+from emails.tests.test_batch import StandInResend
 from .models import Notification, NotificationSetting, NotificationTemplate
+from .tasks.scheduled import send_email_notification_batch
 
 User = get_user_model()
 
@@ -165,4 +171,93 @@ class NotificationAPITestCase(TestCase):
         
         # All notifications should belong to the authenticated user
         for notif in response.data['results']:
-            self.assertEqual(notif['user'], self.user.id)
\ No newline at end of file
+            self.assertEqual(notif['user'], self.user.id)
+
+
+class EmailNotificationBatchTestCase(TestCase):
+    """Due email notifications are sent in one batch and their rows updated in bulk."""
+
+    def setUp(self):
+        self.resend = StandInResend()
+        self.addCleanup(self.resend.close)
+        http_client = httpx.Client()
+        self.addCleanup(http_client.close)
+        client = ResendBatchClient(api_key='re_test', base_url=self.resend.url, http_client=http_client, backoff=0)
+        patcher = mock.patch(
+            'notifications.services.base.BatchEmailDispatcher',
+            lambda: BatchEmailDispatcher(client=client)
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        renderer = mock.patch('notifications.services.base.EmailRenderer.render_email', return_value='<p>Hi</p>')
+        renderer.start()
+        self.addCleanup(renderer.stop)
+
+        self.notifications = []
+        for i in range(3):
+            user = User.objects.create_user(
+                username=f'batchuser{i}',
+                email=f'batch{i}@example.com',
+                password='testpass123'
+            )
+            self.notifications.append(Notification.objects.create(
+                user=user,
+                title='Reminder',
+                message='Your session starts soon',
+                notification_type='reminder',
+                delivery_channel='email',
+                metadata={'template_path': 'clients/reminder.mjml', 'subject': 'Reminder'}
+            ))
+
+    def test_sends_batch_and_records_status(self):
+        NotificationSetting.objects.create(
+            user=self.notifications[2].user,
+            notification_type='reminder',
+            email_enabled=False
+        )
+
+        result = send_email_notification_batch([n.id for n in self.notifications])
+
+        self.assertEqual(result, {'sent': 2, 'failed': 0, 'cancelled': 1})
+        self.assertEqual(len(self.resend.requests), 1)
+        self.assertEqual(len(self.resend.requests[0]['body']), 2)
+
+        sent = Notification.objects.get(id=self.notifications[0].id)
+        self.assertEqual(sent.status, 'sent')
+        self.assertIsNotNone(sent.sent_at)
+        self.assertEqual(sent.metadata['resend_email_id'], 'email-batch0@example.com')
+        self.assertEqual(Notification.objects.get(id=self.notifications[2].id).status, 'cancelled')
+
+    def test_failed_batch_marks_rows_failed(self):
+        self.resend.responses = [(422, {})]
+
+        result = send_email_notification_batch([n.id for n in self.notifications])
+
+        self.assertEqual(result['failed'], 3)
+        for notification in Notification.objects.filter(id__in=[n.id for n in self.notifications]):
+            self.assertEqual(notification.status, 'failed')
+            self.assertIn('HTTP 422', notification.metadata['error'])
+
+    def test_claimed_rows_are_not_sent_again(self):
+        # Another worker holds the first notification
+        Notification.objects.filter(id=self.notifications[0].id).update(status='processing')
+        ids = [n.id for n in self.notifications]
+
+        result = send_email_notification_batch(ids)
+        self.assertEqual(result['sent'], 2)
+
+        # A retry of the same batch finds nothing left to claim
+        self.assertEqual(send_email_notification_batch(ids), {'sent': 0, 'failed': 0, 'cancelled': 0})
+        self.assertEqual(len(self.resend.requests), 1)
+        self.assertEqual(Notification.objects.get(id=self.notifications[0].id).status, 'processing')
+
+    def test_eta_task_skips_rows_claimed_by_the_batch(self):
+        from notifications.services.base import send_scheduled_notification
+
+        # The batch task is mid-send
+        Notification.objects.filter(id=self.notifications[0].id).update(status='processing')
+
+        with mock.patch('notifications.services.base.EmailService.send_template_email') as send:
+            send_scheduled_notification(self.notifications[0].id)
+        send.assert_not_called()
+        self.assertEqual(Notification.objects.get(id=self.notifications[0].id).status, 'processing')
@@ -16,7 +16,8 @@ from .models import (
     ServiceTypeCommission,
     TierCommissionAdjustment,
     ExternalServiceFee,
-    PackageCompletionRecord
+    PackageCompletionRecord,
+    StripeWebhookEvent
 )
 
 
@@ -77,6 +78,13 @@ class UserCreditTransactionAdmin(BaseModelAdmin):
     readonly_fields = ('id', 'created_at', 'updated_at', 'is_credit', 'is_debit')
     date_hierarchy = 'created_at'
     
+    def get_readonly_fields(self, request, obj=None):
+        # The ledger is append-only once written
+        readonly = super().get_readonly_fields(request, obj)
+        if obj:
+            readonly = tuple(readonly) + ('user', 'amount_cents')
+        return readonly
+    
     def transaction_short(self, obj):
         return str(obj.id)[:8] + '...'
     transaction_short.short_description = 'Transaction ID'
@@ -371,3 +379,21 @@ class PackageCompletionRecordAdmin(admin.ModelAdmin):
                 processed += 1
         self.message_user(request, f"Processed payouts for {processed} completed packages.")
     process_payouts.short_description = "Process payouts for completed packages"
+
+
+@admin.register(StripeWebhookEvent)
+class StripeWebhookEventAdmin(admin.ModelAdmin):
+    list_display = ('event_id', 'event_type', 'handler', 'object_id', 'status', 'attempts',
+                    'created_at', 'processed_at')
+    list_filter = ('status', 'handler', 'event_type')
+    search_fields = ('event_id', 'object_id')
+    readonly_fields = ('event_id', 'handler', 'event_type', 'object_id', 'stripe_created', 'payload',
+                       'attempts', 'last_error', 'processed_at', 'created_at', 'updated_at')
+    date_hierarchy = 'created_at'
+    actions = ['requeue_events']
+    
+    def requeue_events(self, request, queryset):
+        from payments.webhook_inbox import requeue_failed
+        count = requeue_failed(list(queryset.values_list('event_id', flat=True)))
+        self.message_user(request, f"Requeued {count} failed events.")
+    requeue_events.short_description = "Requeue failed events"
@@ -44,7 +44,7 @@ from .serializers import (
     SubscriptionCreateSerializer, SubscriptionTiersResponseSerializer,
     # Others
     CommissionRateSerializer, CommissionCalculationSerializer,
-    RefundSerializer, WebhookEventSerializer
+    RefundSerializer
 )
 from .permissions import (
     IsOwnerOrReadOnly, IsPractitionerOwner, IsStaffOrReadOnly
@@ -1074,7 +1074,10 @@ class SubscriptionViewSet(viewsets.ModelViewSet):
 
 class WebhookView(APIView):
     """
-    Handle Stripe webhooks
+    Receive Stripe webhooks.
+
+    Verified events are written to the webhook inbox and acknowledged
+    immediately; `WebhookService.handle_event` runs them from a worker.
     """
     permission_classes = [AllowAny]
     
@@ -1106,215 +1109,11 @@ class WebhookView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Process the event
-        serializer = WebhookEventSerializer(data={
-            'type': event['type'],
-            'data': event['data']
-        })
-        
-        if not serializer.is_valid():
-            logger.warning(f"Unsupported webhook event: {event['type']}")
-            return Response({'received': True})
-        
-        # Use WebhookService to handle events
-        from payments.services import WebhookService
-        webhook_service = WebhookService()
-        
-        # Handle specific event types
-        event_type = event['type']
-        event_data = event['data']['object']
-        
-        try:
-            if event_type == 'payment_intent.succeeded':
-                webhook_service.handle_payment_success(event_data)
-            elif event_type == 'payment_intent.payment_failed':
-                webhook_service.handle_payment_failure(event_data)
-            elif event_type == 'customer.subscription.created':
-                webhook_service.handle_subscription_created(event_data)
-            elif event_type == 'customer.subscription.updated':
-                webhook_service.handle_subscription_updated(event_data)
-            elif event_type == 'customer.subscription.deleted':
-                webhook_service.handle_subscription_deleted(event_data)
-            elif event_type == 'charge.refunded':
-                webhook_service.handle_refund_created(event_data)
-            elif event_type == 'account.updated':
-                webhook_service.handle_connect_account_update(event_data)
-            elif event_type == 'payout.paid':
-                self._handle_payout_paid(event_data)  # Keep for now - not in service
-            elif event_type == 'payout.failed':
-                self._handle_payout_failed(event_data)  # Keep for now - not in service
-            elif event_type == 'invoice.payment_succeeded':
-                self._handle_invoice_payment_succeeded(event_data)  # Keep for now - not in service
-            elif event_type == 'invoice.payment_failed':
-                self._handle_invoice_payment_failed(event_data)  # Keep for now - not in service
-        except Exception as e:
-            logger.error(f"Error processing webhook {event_type}: {e}")
-            return Response(
-                {'error': 'Processing failed'},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
+        # Record the event; payments.webhook_inbox processes it asynchronously
+        from payments.webhook_inbox import record_event
+        record_event(event, handler='payments')
         
         return Response({'received': True})
-    
-    def _handle_payout_paid(self, payout):
-        """Handle successful payout"""
-        # Find related payout record
-        payout_record = PractitionerPayout.objects.filter(
-            stripe_transfer_id=payout['id']
-        ).first()
-        
-        if payout_record:
-            payout_record.status = 'completed'
-            payout_record.payout_date = timezone.now()
-            payout_record.save()
-    
-    def _handle_payout_failed(self, payout):
-        """Handle failed payout"""
-        payout_record = PractitionerPayout.objects.filter(
-            stripe_transfer_id=payout['id']
-        ).first()
-        
-        if payout_record:
-            payout_record.status = 'failed'
-            payout_record.error_message = payout.get('failure_message', 'Unknown error')
-            payout_record.save()
-    
-    def _handle_invoice_payment_succeeded(self, invoice):
-        """Handle successful invoice payment (subscription renewals)"""
-        subscription_id = invoice.get('subscription')
-        if not subscription_id:
-            return
-        
-        # Check subscription metadata to determine type
-        try:
-            import stripe
-            subscription = stripe.Subscription.retrieve(subscription_id)
-            metadata = subscription.get('metadata', {})
-            subscription_type = metadata.get('type')
-            
-            if subscription_type == 'stream':
-                # Handle stream subscription renewal
-                from streams.models import StreamSubscription
-                
-                stream_sub = StreamSubscription.objects.filter(
-                    stripe_subscription_id=subscription_id
-                ).first()
-                
-                if stream_sub:
-                    # Update subscription period dates
-                    stream_sub.current_period_start = timezone.datetime.fromtimestamp(
-                        subscription['current_period_start'], 
-                        tz=timezone.utc
-                    )
-                    stream_sub.current_period_end = timezone.datetime.fromtimestamp(
-                        subscription['current_period_end'], 
-                        tz=timezone.utc
-                    )
-                    stream_sub.status = 'active'
-                    stream_sub.save()
-                    
-                    # Create earnings transaction for practitioner
-                    stream = stream_sub.stream
-                    practitioner = stream.practitioner
-                    
-                    # Calculate commission (platform takes 15%)
-                    gross_amount_cents = invoice['amount_paid']
-                    commission_rate = 15.0  # Platform commission for streams
-                    commission_amount_cents = int(gross_amount_cents * commission_rate / 100)
-                    net_amount_cents = gross_amount_cents - commission_amount_cents
-                    
-                    # Create earnings transaction
-                    EarningsTransaction.objects.create(
-                        practitioner=practitioner,
-                        gross_amount_cents=gross_amount_cents,
-                        commission_rate=commission_rate,
-                        commission_amount_cents=commission_amount_cents,
-                        net_amount_cents=net_amount_cents,
-                        status='pending',
-                        available_after=timezone.now() + timezone.timedelta(hours=48),
-                        description=f"Stream subscription renewal - {stream_sub.user.get_full_name() or stream_sub.user.email} ({stream_sub.tier} tier)",
-                        metadata={
-                            'type': 'stream_subscription',
-                            'stream_id': str(stream.id),
-                            'subscription_id': str(stream_sub.id),
-                            'user_id': str(stream_sub.user.id),
-                            'tier': stream_sub.tier,
-                            'invoice_id': invoice['id']
-                        }
-                    )
-                    
-            else:
-                # Handle practitioner platform subscription renewal
-                sub = PractitionerSubscription.objects.filter(
-                    stripe_subscription_id=subscription_id
-                ).first()
-                
-                if sub:
-                    # Ensure subscription is marked as active
-                    sub.status = 'active'
-                    sub.save()
-                    
-        except Exception as e:
-            logger.error(f"Error handling invoice.payment_succeeded: {e}")
-    
-    def _handle_invoice_payment_failed(self, invoice):
-        """Handle failed invoice payment (subscription payment failures)"""
-        subscription_id = invoice.get('subscription')
-        if not subscription_id:
-            return
-        
-        # Check subscription metadata to determine type
-        try:
-            import stripe
-            subscription = stripe.Subscription.retrieve(subscription_id)
-            metadata = subscription.get('metadata', {})
-            subscription_type = metadata.get('type')
-            
-            if subscription_type == 'stream':
-                # Handle stream subscription payment failure
-                from streams.models import StreamSubscription
-                
-                stream_sub = StreamSubscription.objects.filter(
-                    stripe_subscription_id=subscription_id
-                ).first()
-                
-                if stream_sub:
-                    # Mark subscription as past due
-                    stream_sub.status = 'past_due'
-                    stream_sub.save()
-                    
-                    # Update stream subscriber counts
-                    stream = stream_sub.stream
-                    stream.subscriber_count = stream.subscriptions.filter(
-                        status='active'
-                    ).count()
-                    stream.paid_subscriber_count = stream.subscriptions.filter(
-                        status='active',
-                        tier__in=['entry', 'premium']
-                    ).count()
-                    stream.save()
-                    
-                    # TODO: Send notification to user about payment failure
-                    
-            else:
-                # Handle practitioner platform subscription payment failure
-                sub = PractitionerSubscription.objects.filter(
-                    stripe_subscription_id=subscription_id
-                ).first()
-                
-                if sub:
-                    # Mark subscription as past due
-                    sub.status = 'past_due'
-                    sub.save()
-                    
-                    # Clear practitioner's current subscription if this was it
-                    practitioner = sub.practitioner
-                    if practitioner.current_subscription == sub:
-                        practitioner.current_subscription = None
-                        practitioner.save(update_fields=['current_subscription'])
-                        
-        except Exception as e:
-            logger.error(f"Error handling invoice.payment_failed: {e}")
 
 
 @extend_schema_view(
@@ -0,0 +1,214 @@
+"""
+Benchmark concurrent checkout throughput against a local Stripe stand-in.
+
+A small HTTP server on 127.0.0.1 answers the Stripe endpoints checkout uses
+(PaymentIntents, refunds, customers) after a configurable delay, and the
+stripe library is pointed at it. Concurrent clients then book seats on the
+same workshop session, which is the contended case: every checkout locks the
+same ServiceSession row.
+
+Two modes are compared:
+- two-phase: FastCheckoutOrchestrator as shipped (no locks held during the
+  Stripe call)
+- single-transaction: the same checkout wrapped in one transaction, which is
+  how it ran before (locks held for the whole Stripe round-trip)
+
+Synthetic data is committed (worker threads use their own connections) and
+deleted at the end.
+
+Usage:
+    python manage.py benchmark_checkout
+    python manage.py benchmark_checkout --checkouts 100 --concurrency 20 --stripe-latency-ms 300
+"""
+import json
+import statistics
+import threading
+import time as time_module
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import stripe
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+
+class _StripeStandIn(BaseHTTPRequestHandler):
+    """Answers the Stripe API calls made during checkout."""
+
+    latency = 0.2
+    counter = 0
+    lock = threading.Lock()
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        time_module.sleep(self.latency)
+        with self.lock:
+            _StripeStandIn.counter += 1
+            n = _StripeStandIn.counter
+
+        if self.path.startswith('/v1/payment_intents'):
+            body = {'id': f'pi_bench_{n}', 'object': 'payment_intent', 'status': 'succeeded',
+                    'client_secret': f'pi_bench_{n}_secret'}
+        elif self.path.startswith('/v1/refunds'):
+            body = {'id': f're_bench_{n}', 'object': 'refund', 'amount': 0, 'status': 'succeeded'}
+        elif self.path.startswith('/v1/customers'):
+            body = {'id': f'cus_bench_{n}', 'object': 'customer'}
+        else:
+            self.send_error(404)
+            return
+
+        payload = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class Command(BaseCommand):
+    help = 'Compare two-phase and single-transaction checkout throughput against a Stripe stand-in'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--checkouts', type=int, default=40, help='Checkouts per mode')
+        parser.add_argument('--concurrency', type=int, default=10, help='Concurrent clients')
+        parser.add_argument('--stripe-latency-ms', type=int, default=200,
+                            help='Delay added by the Stripe stand-in to every call')
+
+    def handle(self, *args, **options):
+        from payments.services.checkout_orchestrator_fast import FastCheckoutOrchestrator
+
+        _StripeStandIn.latency = options['stripe_latency_ms'] / 1000
+        server = ThreadingHTTPServer(('127.0.0.1', 0), _StripeStandIn)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+        orchestrator = FastCheckoutOrchestrator()
+        original_api_base = stripe.api_base
+        stripe.api_base = f'http://127.0.0.1:{server.server_address[1]}'
+
+        checkouts = options['checkouts']
+        data = self._create_synthetic_data(checkouts * 2)
+        try:
+            self.stdout.write(self.style.SUCCESS(
+                f"\n=== CHECKOUT BENCHMARK ({checkouts} checkouts, {options['concurrency']} clients, "
+                f"{options['stripe_latency_ms']} ms Stripe latency) ===\n"
+            ))
+            self.stdout.write(f'{"mode":<20} {"ok":>4} {"err":>4} {"wall s":>8} {"per s":>7} {"p50 ms":>8} {"p95 ms":>8}')
+
+            results = {}
+            for mode, users in (('single-transaction', data['users'][:checkouts]),
+                                ('two-phase', data['users'][checkouts:])):
+                results[mode] = self._run(orchestrator, mode, users, data, options['concurrency'])
+
+            single, two_phase = results['single-transaction'], results['two-phase']
+            if single and two_phase:
+                self.stdout.write(self.style.SUCCESS(f'\nTwo-phase throughput: {two_phase / single:.1f}x'))
+        finally:
+            stripe.api_base = original_api_base
+            server.shutdown()
+            self._delete_synthetic_data(data)
+
+    def _run(self, orchestrator, mode, users, data, concurrency):
+        def checkout(user_and_method):
+            user, payment_method = user_and_method
+            started = time_module.perf_counter()
+            try:
+                kwargs = dict(
+                    user=user,
+                    service_id=data['service'].id,
+                    payment_method_id=payment_method.id,
+                    booking_data={'service_session_id': data['session'].id, 'apply_credits': True},
+                )
+                if mode == 'single-transaction':
+                    with transaction.atomic():
+                        result = orchestrator.process_booking_payment_fast(**kwargs)
+                else:
+                    result = orchestrator.process_booking_payment_fast(**kwargs)
+                ok = result.success
+            except Exception as e:
+                self.stderr.write(f'{mode}: {e}')
+                ok = False
+            finally:
+                connection.close()
+            return ok, (time_module.perf_counter() - started) * 1000
+
+        started = time_module.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            outcomes = list(pool.map(checkout, users))
+        wall = time_module.perf_counter() - started
+
+        latencies = sorted(ms for _, ms in outcomes)
+        ok = sum(1 for success, _ in outcomes if success)
+        throughput = ok / wall if wall else 0
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] if latencies else 0
+        self.stdout.write(
+            f'{mode:<20} {ok:>4} {len(outcomes) - ok:>4} {wall:>8.2f} {throughput:>7.1f} '
+            f'{statistics.median(latencies) if latencies else 0:>8.0f} {p95:>8.0f}'
+        )
+        return throughput
+
+    def _create_synthetic_data(self, user_count):
+        from payments.models import PaymentMethod
+        from practitioners.models import Practitioner
+        from services.models import Service, ServiceSession, ServiceType
+        from users.models import User, UserPaymentProfile
+
+        stamp = int(time_module.time())
+        practitioner_user = User.objects.create_user(email=f'bench-checkout-{stamp}@example.com', password=None)
+        practitioner = Practitioner.objects.create(user=practitioner_user, display_name='Benchmark Practitioner')
+        service_type, _ = ServiceType.objects.get_or_create(code='workshop', defaults={'name': 'Workshop'})
+        service = Service.objects.create(
+            name='Benchmark Workshop',
+            slug=f'benchmark-workshop-{stamp}',
+            price_cents=5000,
+            duration_minutes=60,
+            max_participants=user_count,
+            service_type=service_type,
+            primary_practitioner=practitioner,
+            location_type='in_person'
+        )
+        start = timezone.now() + timedelta(days=7)
+        session = ServiceSession.objects.create(
+            service=service,
+            session_type='workshop',
+            start_time=start,
+            end_time=start + timedelta(hours=1),
+            max_participants=user_count,
+            status='scheduled',
+        )
+
+        users = []
+        for i in range(user_count):
+            user = User.objects.create_user(email=f'bench-checkout-{stamp}-{i}@example.com', password=None)
+            UserPaymentProfile.objects.update_or_create(
+                user=user, defaults={'stripe_customer_id': f'cus_bench_{stamp}_{i}'}
+            )
+            payment_method = PaymentMethod.objects.create(
+                user=user,
+                stripe_payment_method_id=f'pm_bench_{stamp}_{i}',
+                brand='visa',
+                last4='4242',
+                exp_month=12,
+                exp_year=timezone.now().year + 2,
+            )
+            users.append((user, payment_method))
+
+        return {'practitioner_user': practitioner_user, 'service': service, 'session': session, 'users': users}
+
+    def _delete_synthetic_data(self, data):
+        from bookings.models import Booking
+        from payments.models import Order
+
+        user_ids = [user.id for user, _ in data['users']]
+        Booking.objects.filter(user_id__in=user_ids).delete()
+        Order.objects.filter(user_id__in=user_ids).delete()
+        data['session'].delete()
+        data['service'].delete()
+        data['practitioner_user'].delete()
+        for user, _ in data['users']:
+            user.delete()
+        self.stdout.write('Synthetic data deleted.')
@@ -0,0 +1,27 @@
+"""
+Verify practitioner earnings balances against the earnings ledger.
+
+Balances are maintained incrementally; this recomputes them from
+EarningsTransaction and reports (and by default repairs) any drift.
+
+Usage:
+    python manage.py reconcile_earnings
+    python manage.py reconcile_earnings --dry-run
+"""
+from django.core.management.base import BaseCommand
+
+from payments.services import EarningsService
+
+
+class Command(BaseCommand):
+    help = 'Check PractitionerEarnings running totals against EarningsTransaction and fix drift'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Report drift without fixing it')
+
+    def handle(self, *args, **options):
+        result = EarningsService().reconcile_balances(fix=not options['dry_run'])
+        style = self.style.WARNING if result['mismatched'] else self.style.SUCCESS
+        self.stdout.write(style(
+            f"Checked {result['checked']} balances: {result['mismatched']} drifted, {result['fixed']} fixed"
+        ))
@@ -0,0 +1,36 @@
+"""
+Inspect and drain the Stripe webhook inbox.
+
+Usage:
+    python manage.py stripe_webhook_inbox                 # print metrics
+    python manage.py stripe_webhook_inbox --drain         # process due events now
+    python manage.py stripe_webhook_inbox --requeue-failed [--event-id evt_...]
+"""
+from django.core.management.base import BaseCommand
+
+from payments.webhook_inbox import inbox_metrics, process_pending_events, requeue_failed
+
+
+class Command(BaseCommand):
+    help = 'Show Stripe webhook inbox metrics, drain it or requeue failed events'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--drain', action='store_true', help='Process due events in this process')
+        parser.add_argument('--limit', type=int, default=1000, help='Maximum events to drain')
+        parser.add_argument('--requeue-failed', action='store_true', help='Retry events that gave up')
+        parser.add_argument('--event-id', action='append', dest='event_ids',
+                            help='Restrict --requeue-failed to these event IDs')
+
+    def handle(self, *args, **options):
+        if options['requeue_failed']:
+            count = requeue_failed(options['event_ids'])
+            self.stdout.write(self.style.SUCCESS(f'Requeued {count} failed events'))
+
+        if options['drain']:
+            counts = process_pending_events(limit=options['limit'])
+            self.stdout.write(self.style.SUCCESS(
+                ', '.join(f'{key}={value}' for key, value in counts.items())
+            ))
+
+        for key, value in inbox_metrics().items():
+            self.stdout.write(f'{key}: {value}')
@@ -0,0 +1,37 @@
+# Generated by Django 5.1.3 on 2026-10-16 20:23
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0014_add_credit_applied_transaction_type'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StripeWebhookEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('event_id', models.CharField(help_text='Stripe event ID (evt_...)', max_length=255)),
+                ('handler', models.CharField(choices=[('payments', 'Payments webhook service'), ('integrations', 'Stripe integration handlers')], max_length=20)),
+                ('event_type', models.CharField(max_length=100)),
+                ('object_id', models.CharField(blank=True, help_text='ID of data.object; events for one object are processed in order', max_length=255)),
+                ('stripe_created', models.DateTimeField(help_text='When Stripe created the event')),
+                ('payload', models.JSONField()),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('processed', 'Processed'), ('ignored', 'Ignored'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('last_error', models.TextField(blank=True)),
+                ('processed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'indexes': [models.Index(condition=models.Q(('status', 'pending')), fields=['next_attempt_at', 'stripe_created'], name='webhook_event_pending_idx'), models.Index(condition=models.Q(('status', 'pending')), fields=['object_id', 'handler', 'stripe_created'], name='webhook_event_object_idx'), models.Index(fields=['status', 'processed_at'], name='payments_st_status_0548b2_idx')],
+                'constraints': [models.UniqueConstraint(fields=('event_id', 'handler'), name='payments_webhook_event_unique')],
+            },
+        ),
+    ]
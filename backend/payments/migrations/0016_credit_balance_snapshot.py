@@ -0,0 +1,28 @@
+# Generated by Django 5.1.3 on 2026-10-16 20:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0015_stripe_webhook_event'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='usercreditbalance',
+            name='snapshot_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='usercreditbalance',
+            name='snapshot_balance_cents',
+            field=models.IntegerField(default=0, help_text='Verified balance covering ledger entries up to snapshot_through_id'),
+        ),
+        migrations.AddField(
+            model_name='usercreditbalance',
+            name='snapshot_through_id',
+            field=models.BigIntegerField(default=0, help_text='Highest UserCreditTransaction id included in the snapshot'),
+        ),
+    ]
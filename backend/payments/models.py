@@ -1,4 +1,5 @@
 from django.db import models, transaction
+from django.db.models import F
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.core.exceptions import ValidationError
 from django.utils import timezone
@@ -276,9 +277,71 @@ class UserCreditTransaction(BaseModel):
         ]
 
     def save(self, *args, **kwargs):
-        super().save(*args, **kwargs)
-        # Update user's credit balance
-        UserCreditBalance.update_balance(self.user)
+        if not self._state.adding:
+            # The ledger is append-only: only descriptive fields and links may change
+            previous = UserCreditTransaction.objects.filter(pk=self.pk).values('user_id', 'amount_cents').first()
+            if previous and (previous['user_id'], previous['amount_cents']) != (self.user_id, self.amount_cents):
+                raise ValidationError("Credit transactions are append-only; record an adjustment instead")
+            super().save(*args, **kwargs)
+            return
+        
+        with transaction.atomic():
+            # Lock the balance first so ledger inserts for a user are serialized
+            # and a snapshot never sees a half-applied entry
+            balance = UserCreditBalance.lock_for_user(self.user_id)
+            super().save(*args, **kwargs)
+            # Update user's credit balance
+            UserCreditBalance.objects.filter(pk=balance.pk).update(
+                balance_cents=F('balance_cents') + self.amount_cents,
+                last_transaction=self,
+                updated_at=timezone.now()
+            )
+    
+    @classmethod
+    def bulk_record(cls, transactions):
+        """
+        Insert many ledger entries and apply one balance delta per user.
+        
+        For refund storms (e.g. mass cancellations): each user's balance row is
+        locked once and all balances are moved with a single UPDATE.
+        Returns the created transactions.
+        """
+        from django.db.models import Case, IntegerField, When
+        
+        transactions = list(transactions)
+        totals = {}
+        for credit_transaction in transactions:
+            totals[credit_transaction.user_id] = totals.get(credit_transaction.user_id, 0) + credit_transaction.amount_cents
+        if not totals:
+            return []
+        
+        with transaction.atomic():
+            UserCreditBalance.objects.bulk_create(
+                [UserCreditBalance(user_id=user_id) for user_id in totals], ignore_conflicts=True
+            )
+            list(
+                UserCreditBalance.objects.filter(user_id__in=totals)
+                .select_for_update().order_by('user_id').values_list('pk', flat=True)
+            )
+            created = cls.objects.bulk_create(transactions)
+            
+            last_ids = {}
+            for credit_transaction in created:
+                last_ids[credit_transaction.user_id] = max(last_ids.get(credit_transaction.user_id, 0), credit_transaction.pk)
+            
+            UserCreditBalance.objects.filter(user_id__in=totals).update(
+                balance_cents=F('balance_cents') + Case(
+                    *[When(user_id=user_id, then=delta) for user_id, delta in totals.items()],
+                    default=0, output_field=IntegerField()
+                ),
+                last_transaction_id=Case(
+                    *[When(user_id=user_id, then=last_id) for user_id, last_id in last_ids.items()],
+                    default=F('last_transaction_id'), output_field=models.BigIntegerField()
+                ),
+                updated_at=timezone.now()
+            )
+        
+        return created
 
     @property
     def amount(self):
@@ -411,6 +474,15 @@ class PractitionerEarnings(BaseModel):
         help_text="When last payout was processed"
     )
     
+    # Transaction statuses each running total sums over. Totals are kept
+    # current with deltas; EarningsService.reconcile_balances() checks them
+    # against these sums.
+    BALANCE_STATUSES = {
+        'pending_balance_cents': ('pending',),
+        'available_balance_cents': ('available',),
+        'lifetime_earnings_cents': ('pending', 'available', 'paid'),
+    }
+    
     class Meta:
         indexes = [
             models.Index(fields=['practitioner']),
@@ -420,6 +492,43 @@ class PractitionerEarnings(BaseModel):
     def __str__(self):
         return f"{self.practitioner} - Available: ${self.available_balance}"
     
+    @classmethod
+    def balance_deltas(cls, old_status, new_status, old_amount_cents=0, new_amount_cents=0):
+        """
+        Change to each running total when a transaction moves from
+        (old_status, old_amount_cents) to (new_status, new_amount_cents).
+        Use None for the status of a transaction being created or deleted.
+        """
+        deltas = {}
+        for field, statuses in cls.BALANCE_STATUSES.items():
+            delta = (new_amount_cents if new_status in statuses else 0) - \
+                    (old_amount_cents if old_status in statuses else 0)
+            if delta:
+                deltas[field] = delta
+        return deltas
+    
+    @classmethod
+    def apply_deltas(cls, practitioner_id, deltas, create=True, **values):
+        """
+        Add `deltas` to a practitioner's running totals with F() expressions
+        under a row lock, and set any extra field `values`.
+        
+        With create=False a missing balance row is left alone (used when the
+        practitioner is being deleted).
+        """
+        from utils.stats import locked_update
+        
+        updates = {field: F(field) + delta for field, delta in deltas.items() if delta}
+        updates.update(values)
+        with transaction.atomic():
+            if create:
+                cls.objects.get_or_create(practitioner_id=practitioner_id)
+            if updates:
+                locked_update(
+                    cls.objects.filter(practitioner_id=practitioner_id),
+                    {**updates, 'updated_at': timezone.now()}
+                )
+    
     @property
     def pending_balance(self):
         """Get pending balance in dollars."""
@@ -442,12 +551,16 @@ class PractitionerEarnings(BaseModel):
     
     def move_pending_to_available(self, amount_cents):
         """Move funds from pending to available (amount in cents)."""
-        if amount_cents > self.pending_balance_cents:
-            raise ValueError("Insufficient pending balance")
-        
-        self.pending_balance_cents -= amount_cents
-        self.available_balance_cents += amount_cents
-        self.save(update_fields=['pending_balance_cents', 'available_balance_cents'])
+        with transaction.atomic():
+            locked = PractitionerEarnings.objects.select_for_update().get(pk=self.pk)
+            if amount_cents > locked.pending_balance_cents:
+                raise ValueError("Insufficient pending balance")
+            
+            self.apply_deltas(self.practitioner_id, {
+                'pending_balance_cents': -amount_cents,
+                'available_balance_cents': amount_cents,
+            })
+        self.refresh_from_db(fields=['pending_balance_cents', 'available_balance_cents'])
 
 
 class EarningsTransaction(PublicModel):
@@ -563,38 +676,69 @@ class EarningsTransaction(PublicModel):
         # Set available_after if not set (48 hours after creation)
         if not self.available_after:
             self.available_after = timezone.now() + timezone.timedelta(hours=48)
+        
+        with transaction.atomic():
+            # Lock the row so a concurrent bulk_transition cannot change the
+            # status between reading it and applying the balance delta
+            previous = None
+            if self.pk:
+                previous = EarningsTransaction.objects.select_for_update().filter(pk=self.pk).values(
+                    'practitioner_id', 'status', 'net_amount_cents'
+                ).first()
             
-        super().save(*args, **kwargs)
+            super().save(*args, **kwargs)
+            
+            # Update practitioner's earnings balance
+            self._update_practitioner_balance(previous)
+    
+    def _update_practitioner_balance(self, previous=None):
+        """Apply this save's change to the practitioner's running totals."""
+        if previous and previous['practitioner_id'] != self.practitioner_id:
+            PractitionerEarnings.apply_deltas(
+                previous['practitioner_id'],
+                PractitionerEarnings.balance_deltas(previous['status'], None, previous['net_amount_cents']),
+                create=False
+            )
+            previous = None
         
-        # Update practitioner's earnings balance
-        self._update_practitioner_balance()
-    
-    def _update_practitioner_balance(self):
-        """Update the practitioner's earnings balance."""
-        balance, created = PractitionerEarnings.objects.get_or_create(
-            practitioner=self.practitioner
+        old_status, old_amount_cents = (previous['status'], previous['net_amount_cents']) if previous else (None, 0)
+        PractitionerEarnings.apply_deltas(
+            self.practitioner_id,
+            PractitionerEarnings.balance_deltas(old_status, self.status, old_amount_cents, self.net_amount_cents)
         )
+    
+    @classmethod
+    def bulk_transition(cls, queryset, to_status, **values):
+        """
+        Move every transaction in `queryset` to `to_status` with one UPDATE
+        and adjust each affected practitioner's balance once.
         
-        # Recalculate balances based on all transactions
-        pending_cents = EarningsTransaction.objects.filter(
-            practitioner=self.practitioner,
-            status='pending'
-        ).aggregate(total=models.Sum('net_amount_cents'))['total'] or 0
-        
-        available_cents = EarningsTransaction.objects.filter(
-            practitioner=self.practitioner,
-            status='available'
-        ).aggregate(total=models.Sum('net_amount_cents'))['total'] or 0
+        Extra field `values` (e.g. payout=...) are set on the moved rows.
+        Transactions already in `to_status` are left alone. Returns the
+        number of transactions moved.
+        """
+        from collections import defaultdict
         
-        lifetime_cents = EarningsTransaction.objects.filter(
-            practitioner=self.practitioner,
-            status__in=['pending', 'available', 'paid']
-        ).aggregate(total=models.Sum('net_amount_cents'))['total'] or 0
+        with transaction.atomic():
+            rows = list(
+                queryset.exclude(status=to_status).select_for_update().order_by('pk')
+                .values_list('pk', 'practitioner_id', 'status', 'net_amount_cents')
+            )
+            if not rows:
+                return 0
+            
+            cls.objects.filter(pk__in=[row[0] for row in rows]).update(
+                status=to_status, updated_at=timezone.now(), **values
+            )
+            
+            deltas = defaultdict(lambda: defaultdict(int))
+            for _, practitioner_id, status, amount_cents in rows:
+                for field, delta in PractitionerEarnings.balance_deltas(status, to_status, amount_cents, amount_cents).items():
+                    deltas[practitioner_id][field] += delta
+            for practitioner_id in sorted(deltas):
+                PractitionerEarnings.apply_deltas(practitioner_id, deltas[practitioner_id])
         
-        balance.pending_balance_cents = pending_cents
-        balance.available_balance_cents = available_cents
-        balance.lifetime_earnings_cents = lifetime_cents
-        balance.save()
+        return len(rows)
     
     def mark_available(self):
         """Mark transaction as available for payout."""
@@ -683,61 +827,72 @@ class PractitionerPayout(models.Model):
         self.save(update_fields=['status', 'payout_date', 'stripe_transfer_id'])
         
         # Update all related earnings transactions
-        self.earnings_transactions.update(status='paid')
+        EarningsTransaction.bulk_transition(self.earnings_transactions.all(), 'paid')
         
         return True
     
     @classmethod
-    def create_batch_payout(cls, practitioner, transactions, processed_by=None, notes=None):
+    def create_batch_payout(cls, practitioner, transactions, processed_by=None, notes=None, **payout_fields):
         """
         Create a batch payout for multiple earnings transactions.
         
+        The transactions are locked, summed, moved to 'paid' with a single
+        UPDATE and the practitioner's balance is adjusted once, so the cost is
+        linear in the number of transactions.
+        
         Args:
             practitioner: The practitioner to pay
-            transactions: QuerySet of EarningsTransaction objects with status='available'
+            transactions: QuerySet (or list) of EarningsTransaction objects with status='available'
             processed_by: User who processed this payout
             notes: Optional notes about this payout
+            **payout_fields: Extra PractitionerPayout fields (fees, payment_method, ...)
             
         Returns:
             PractitionerPayout: The created payout object
         """
         from uuid import uuid4
         
-        # Only include available transactions
-        available_transactions = transactions.filter(status='available')
-        
-        # Calculate total earnings
-        total_earnings_cents = available_transactions.aggregate(
-            total=models.Sum('net_amount_cents')
-        )['total'] or 0
-        
-        # Calculate total commission
-        total_commission_cents = available_transactions.aggregate(
-            total=models.Sum('commission_amount_cents')
-        )['total'] or 0
-        
-        # Create the payout
-        batch_id = uuid4()
-        payout = cls.objects.create(
-            practitioner=practitioner,
-            credits_payout_cents=total_earnings_cents,
-            commission_collected_cents=total_commission_cents,
-            batch_id=batch_id,
-            processed_by=processed_by,
-            notes=notes,
-            status='pending'
-        )
+        if not isinstance(transactions, models.QuerySet):
+            transactions = EarningsTransaction.objects.filter(pk__in=[t.pk for t in transactions])
         
-        # Mark transactions as paid and link to payout
-        for transaction in available_transactions:
-            transaction.mark_paid(payout)
-        
-        # Update practitioner's earnings balance
-        balance = practitioner.earnings_balance
-        balance.available_balance_cents -= total_earnings_cents
-        balance.lifetime_payouts_cents += total_earnings_cents
-        balance.last_payout_date = timezone.now()
-        balance.save()
+        with transaction.atomic():
+            # Only include available transactions
+            available_transactions = EarningsTransaction.objects.filter(
+                pk__in=list(
+                    transactions.filter(status='available').select_for_update().values_list('pk', flat=True)
+                )
+            )
+            
+            # Calculate total earnings and commission
+            totals = available_transactions.aggregate(
+                earnings=models.Sum('net_amount_cents'),
+                commission=models.Sum('commission_amount_cents'),
+            )
+            total_earnings_cents = totals['earnings'] or 0
+            
+            # Create the payout
+            batch_id = uuid4()
+            payout = cls.objects.create(
+                practitioner=practitioner,
+                credits_payout_cents=total_earnings_cents,
+                commission_collected_cents=totals['commission'] or 0,
+                batch_id=batch_id,
+                processed_by=processed_by,
+                notes=notes,
+                status='pending',
+                **payout_fields
+            )
+            
+            # Mark transactions as paid and link to payout (moves them out of
+            # the available balance)
+            EarningsTransaction.bulk_transition(available_transactions, 'paid', payout=payout)
+            
+            # Record the payout on the practitioner's balance
+            PractitionerEarnings.apply_deltas(
+                practitioner.id,
+                {'lifetime_payouts_cents': total_earnings_cents},
+                last_payout_date=timezone.now()
+            )
         
         return payout
 
@@ -746,6 +901,11 @@ class UserCreditBalance(BaseModel):
     """
     Model for tracking user credit balances for faster lookups.
     This avoids having to sum all CreditTransaction records for high-volume users.
+    
+    balance_cents is a running total: every new UserCreditTransaction adds its
+    amount under this row's lock. A periodic job (CreditService.snapshot_balances)
+    checks it against the last snapshot plus the ledger entries since, then
+    moves the snapshot forward, so verification never rescans old history.
     """
     user = models.OneToOneField('users.User', on_delete=models.CASCADE, related_name='credit_balance')
     balance_cents = models.IntegerField(
@@ -760,6 +920,15 @@ class UserCreditBalance(BaseModel):
         null=True,
         related_name='+'
     )
+    snapshot_balance_cents = models.IntegerField(
+        default=0,
+        help_text="Verified balance covering ledger entries up to snapshot_through_id"
+    )
+    snapshot_through_id = models.BigIntegerField(
+        default=0,
+        help_text="Highest UserCreditTransaction id included in the snapshot"
+    )
+    snapshot_at = models.DateTimeField(blank=True, null=True)
     
     class Meta:
         indexes = [
@@ -775,30 +944,34 @@ class UserCreditBalance(BaseModel):
         """Get balance in dollars."""
         return Decimal(self.balance_cents) / 100
     
+    @classmethod
+    def lock_for_user(cls, user_id):
+        """Get (creating if needed) and lock a user's balance row. Call inside a transaction."""
+        cls.objects.get_or_create(user_id=user_id)
+        return cls.objects.select_for_update().get(user_id=user_id)
+    
     @classmethod
     def update_balance(cls, user):
         """
-        Update the user's credit balance by recalculating from all transactions.
-        Uses select_for_update() to prevent race conditions.
+        Rebuild the user's credit balance from the full ledger and snapshot it.
+        
+        New transactions apply their delta on save; this is the repair path
+        used when verification finds drift.
         """
-        from django.db.models import Sum
+        from django.db.models import Max, Sum
 
         with transaction.atomic():
-            # Calculate the current balance in cents
-            transactions = UserCreditTransaction.objects.filter(user=user)
-            balance_cents = transactions.aggregate(Sum('amount_cents'))['amount_cents__sum'] or 0
-
-            # Get or create the balance record with row-level locking
-            credit_balance, created = cls.objects.select_for_update().get_or_create(user=user)
-
-            # Update the balance
-            credit_balance.balance_cents = balance_cents
-
-            # Set the last transaction if there are any
-            last_transaction = transactions.order_by('-created_at').first()
-            if last_transaction:
-                credit_balance.last_transaction = last_transaction
-
+            # Lock first so no ledger entry lands between the sum and the write
+            credit_balance = cls.lock_for_user(getattr(user, 'pk', user))
+            totals = UserCreditTransaction.objects.filter(user_id=credit_balance.user_id).aggregate(
+                total=Sum('amount_cents'), last_id=Max('id')
+            )
+
+            credit_balance.balance_cents = totals['total'] or 0
+            credit_balance.last_transaction_id = totals['last_id']
+            credit_balance.snapshot_balance_cents = credit_balance.balance_cents
+            credit_balance.snapshot_through_id = totals['last_id'] or 0
+            credit_balance.snapshot_at = timezone.now()
             credit_balance.save()
             return credit_balance
 
@@ -1206,4 +1379,52 @@ class PackageCompletionRecord(models.Model):
         if self.status == 'completed':
             self.process_final_payout()
         else:
-            self.process_partial_payout()
\ No newline at end of file
+            self.process_partial_payout()
+
+class StripeWebhookEvent(BaseModel):
+    """
+    Inbox row for a verified Stripe webhook event.
+
+    The webhook endpoints only persist the event and return 200; the rows are
+    drained asynchronously by `payments.webhook_inbox`. The unique constraint
+    on (event_id, handler) makes Stripe's redeliveries no-ops.
+    """
+    HANDLER_CHOICES = (
+        ('payments', 'Payments webhook service'),  # /api/v1/webhooks/stripe/
+        ('integrations', 'Stripe integration handlers'),  # /api/v1/payments/webhook
+    )
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),  # Waiting for a worker (or a retry)
+        ('processed', 'Processed'),
+        ('ignored', 'Ignored'),  # No handler for this event type
+        ('failed', 'Failed'),  # Gave up after the maximum number of attempts
+    )
+
+    event_id = models.CharField(max_length=255, help_text="Stripe event ID (evt_...)")
+    handler = models.CharField(max_length=20, choices=HANDLER_CHOICES)
+    event_type = models.CharField(max_length=100)
+    object_id = models.CharField(max_length=255, blank=True,
+                                 help_text="ID of data.object; events for one object are processed in order")
+    stripe_created = models.DateTimeField(help_text="When Stripe created the event")
+    payload = models.JSONField()
+
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    processed_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['event_id', 'handler'], name='payments_webhook_event_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['next_attempt_at', 'stripe_created'], condition=models.Q(status='pending'),
+                         name='webhook_event_pending_idx'),
+            models.Index(fields=['object_id', 'handler', 'stripe_created'], condition=models.Q(status='pending'),
+                         name='webhook_event_object_idx'),
+            models.Index(fields=['status', 'processed_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.event_type} {self.event_id} ({self.status})"
@@ -7,7 +7,7 @@ from dataclasses import dataclass
 from django.db import transaction
 from django.shortcuts import get_object_or_404
 
-from payments.models import PaymentMethod, UserCreditBalance
+from payments.models import Order, PaymentMethod, UserCreditBalance
 from payments.services.payment_service import PaymentService
 from payments.services.credit_service import CreditService
 from payments.services.earnings_service import EarningsService
@@ -40,7 +40,6 @@ class FastCheckoutOrchestrator:
         self.earnings_service = EarningsService()
         self.booking_service = FastBookingService()
     
-    @transaction.atomic
     def process_booking_payment_fast(
         self,
         user: User,
@@ -52,13 +51,18 @@ class FastCheckoutOrchestrator:
         Process a booking payment quickly by deferring non-critical operations.
         UPDATED: Handles Order FK, package/bundle bookings, progressive earnings.
 
-        Critical operations (synchronous):
-        1. Validate and calculate pricing
-        2. Create order record
-        3. Process Stripe payment
-        4. Create booking record
-        5. Apply credit deductions
-        6. Link order to booking
+        The checkout runs in three phases so no row locks are held while Stripe
+        is called:
+
+        1. Reserve (short transaction): lock the user's credit balance, create
+           the order, deduct applied credits and, for workshops, take a seat
+        2. Charge (no transaction): create and confirm the Stripe PaymentIntent
+        3. Finalize (short transaction): create credit ledger entries and the
+           booking, link them to the order, queue earnings
+
+        If the charge fails or needs customer action, the reservation is
+        released. If finalizing fails after a successful charge, the charge is
+        refunded and the reservation released.
 
         Non-critical operations (deferred to background):
         - Room creation
@@ -78,152 +82,281 @@ class FastCheckoutOrchestrator:
         Returns:
             CheckoutResult with booking and payment details
         """
+        # Phase 1: reserve
+        order, service, payment_method = self._reserve_checkout(
+            user, service_id, payment_method_id, booking_data
+        )
+
+        # Phase 2: charge (Stripe round-trip, no transaction open)
         try:
-            # 1. Get service and payment method
-            service = get_object_or_404(Service, id=service_id)
-            payment_method = get_object_or_404(PaymentMethod, id=payment_method_id, user=user)
-            
-            # 2. Calculate pricing
-            service_price_cents = int(service.price * 100)
-            user_credit_balance = self.credit_service.get_user_balance(user)
-            
-            credits_to_apply_cents, amount_to_charge_cents = self.payment_service.calculate_payment_amounts(
-                service_price_cents=service_price_cents,
-                apply_credits=booking_data.get('apply_credits', True),
-                user_credit_balance_cents=user_credit_balance
-            )
-            
-            # 3. Create order
-            order = self.payment_service.create_order(
-                user=user,
-                service=service,
-                payment_method=payment_method,
-                service_price_cents=service_price_cents,
-                credits_to_apply_cents=credits_to_apply_cents,
-                amount_to_charge_cents=amount_to_charge_cents,
-                special_requests=booking_data.get('special_requests')
-            )
-            
-            # 4. Process payment (if needed)
             payment_result = self.payment_service.process_stripe_payment(
                 user=user,
                 payment_method=payment_method,
-                amount_cents=amount_to_charge_cents,
+                amount_cents=order.total_amount_cents,
                 order=order,
                 service=service
             )
-            
-            # Check if payment requires action
-            if payment_result['status'] == 'requires_action':
+        except Exception as e:
+            logger.error(f"Fast checkout payment failed for order {order.id}: {str(e)}")
+            self.release_reservation(order, reason='Payment failed')
+            raise
+
+        # Check if payment requires action
+        if payment_result['status'] == 'requires_action':
+            # Nothing is held while the customer authenticates
+            self.release_reservation(order, reason='Payment requires action')
+            return CheckoutResult(
+                success=False,
+                order=order,
+                payment_intent=payment_result['payment_intent'],
+                requires_action=True,
+                client_secret=payment_result['client_secret']
+            )
+
+        # Phase 3: finalize
+        try:
+            booking = self._finalize_checkout(user, service, order, booking_data, payment_result)
+        except Exception as e:
+            if self._reservation_state(order) == 'confirmed':
+                # The booking committed; only an on-commit hook (task queueing) failed
+                logger.error(f"Post-checkout hook failed for order {order.id}: {str(e)}")
+                booking = Booking.objects.filter(order=order).order_by('created_at').first()
                 return CheckoutResult(
-                    success=False,
+                    success=True,
+                    booking=booking,
                     order=order,
-                    payment_intent=payment_result['payment_intent'],
-                    requires_action=True,
-                    client_secret=payment_result['client_secret']
+                    payment_intent=payment_result.get('payment_intent')
                 )
-            
-            # Payment succeeded or no payment needed
-            # 5. Create credit transactions (critical for balance accuracy)
-            self.credit_service.create_booking_credit_transactions(
-                user=user,
-                service=service,
-                order=order
-            )
-            
-            # 6. Create booking using fast service
-            payment_data = {
-                'price_charged_cents': service_price_cents,
-                'credits_applied_cents': credits_to_apply_cents,
-                'amount_charged_cents': amount_to_charge_cents,
-                'payment_intent_id': payment_result.get('payment_intent', {}).id if payment_result.get('payment_intent') else None,
-                'order': order  # Pass order so factory can link all bookings
-            }
-
-            booking = self.booking_service.create_booking_fast(
-                user=user,
-                service=service,
-                booking_data=booking_data,
-                payment_data=payment_data
-            )
 
-            # 7. Link order to booking (PRIMARY financial relationship)
-            if booking:
-                booking.order = order
-
-                # Link credit usage transaction if credits were applied
-                if credits_to_apply_cents > 0:
-                    usage_transaction = order.user_credit_transactions.filter(
-                        transaction_type='usage'
-                    ).first()
-                    if usage_transaction:
-                        booking.credit_usage_transaction = usage_transaction
-                        usage_transaction.booking = booking
-                        usage_transaction.save()
-
-                booking.save()
-
-                # For package/bundle bookings, ensure ALL session bookings in order are linked
-                # (Factory creates multiple session bookings, all need order FK)
-                service_type_code = service.service_type.code if service.service_type else None
-                if service_type_code in ['package', 'bundle']:
-                    # Get all bookings created for this order
-                    order_bookings = Booking.objects.filter(
-                        order=order,
-                        user=user,
-                        created_at__gte=order.created_at
+            logger.error(f"Fast checkout failed after payment for order {order.id}: {str(e)}")
+            if payment_result['status'] == 'succeeded':
+                try:
+                    self.payment_service.refund_payment(order)
+                except Exception as refund_error:
+                    logger.error(
+                        f"Refund after failed checkout failed for order {order.id}: {str(refund_error)}"
                     )
-                    # Ensure they all have the order FK (should already be set by factory)
-                    count = order_bookings.count()
-                    if count > 1:
-                        logger.info(
-                            f"Package/bundle order {order.id} has {count} session bookings"
-                        )
-
-            # 8. Queue earnings calculation
-            # SKIP for package/bundle bookings - earnings created when sessions are completed
-            # Check the ORDER type, not service type (since booking.service might be the session service)
-            is_package_or_bundle_order = (
-                booking.order and
-                booking.order.order_type in ['package', 'bundle']
-            )
+            self.release_reservation(order, reason='Checkout failed')
+            raise
 
-            should_create_earnings = (
-                service.primary_practitioner and
-                not is_package_or_bundle_order and
-                booking.status not in ['draft']  # Skip draft bookings
-            )
+        logger.info(f"Fast checkout completed for booking {booking.id}")
+
+        return CheckoutResult(
+            success=True,
+            booking=booking,
+            order=order,
+            payment_intent=payment_result.get('payment_intent')
+        )
+
+    @transaction.atomic
+    def _reserve_checkout(
+        self,
+        user: User,
+        service_id: int,
+        payment_method_id: int,
+        booking_data: Dict[str, Any]
+    ):
+        """
+        Phase 1: price the checkout, create the order and hold credits and capacity.
+
+        The order records what was held in metadata['reservation'] so it can be
+        released by release_reservation() or the stale reservation sweep.
+        """
+        # 1. Get service and payment method
+        service = get_object_or_404(Service.objects.select_related('service_type', 'primary_practitioner'), id=service_id)
+        payment_method = get_object_or_404(PaymentMethod, id=payment_method_id, user=user)
+
+        # 2. Calculate pricing against the locked balance so concurrent
+        # checkouts cannot apply the same credits twice
+        user_credit_balance = UserCreditBalance.lock_for_user(user.id).balance_cents
+        service_price_cents = int(service.price * 100)
+
+        credits_to_apply_cents, amount_to_charge_cents = self.payment_service.calculate_payment_amounts(
+            service_price_cents=service_price_cents,
+            apply_credits=booking_data.get('apply_credits', True),
+            user_credit_balance_cents=user_credit_balance
+        )
+
+        # 3. Take a workshop seat (locks the session row until this commits)
+        service_session_id = None
+        if service.service_type and service.service_type.code == 'workshop':
+            service_session_id = self.booking_service.reserve_workshop_seat(
+                booking_data['service_session_id']
+            ).id
+
+        # 4. Create order
+        order = self.payment_service.create_order(
+            user=user,
+            service=service,
+            payment_method=payment_method,
+            service_price_cents=service_price_cents,
+            credits_to_apply_cents=credits_to_apply_cents,
+            amount_to_charge_cents=amount_to_charge_cents,
+            special_requests=booking_data.get('special_requests')
+        )
+        order.metadata['reservation'] = {
+            'state': 'held',
+            'service_session_id': service_session_id,
+            'credits_held_cents': credits_to_apply_cents,
+        }
+        order.save(update_fields=['metadata'])
+
+        # 5. Deduct applied credits
+        self.credit_service.hold_booking_credits(user=user, service=service, order=order)
+
+        return order, service, payment_method
+
+    @transaction.atomic
+    def _finalize_checkout(
+        self,
+        user: User,
+        service: Service,
+        order: Order,
+        booking_data: Dict[str, Any],
+        payment_result: Dict[str, Any]
+    ) -> Booking:
+        """Phase 3: create ledger entries and booking(s) for a paid order."""
+        locked_order = Order.objects.select_for_update().get(pk=order.pk)
+        reservation = locked_order.metadata.get('reservation') or {}
+        if reservation.get('state') != 'held':
+            raise ValueError(f"Checkout reservation for order {order.id} is no longer held")
+
+        service_price_cents = order.subtotal_amount_cents
+        credits_to_apply_cents = order.credits_applied_cents
+
+        # 1. Create credit ledger entries (applied credits were debited in phase 1)
+        self.credit_service.create_booking_credit_transactions(
+            user=user,
+            service=service,
+            order=order,
+            debit_credits=False
+        )
+
+        # 2. Create booking using fast service
+        payment_data = {
+            'price_charged_cents': service_price_cents,
+            'credits_applied_cents': credits_to_apply_cents,
+            'amount_charged_cents': order.total_amount_cents,
+            'payment_intent_id': payment_result.get('payment_intent', {}).id if payment_result.get('payment_intent') else None,
+            'order': order,  # Pass order so factory can link all bookings
+            'seat_reserved': bool(reservation.get('service_session_id')),
+        }
+
+        booking = self.booking_service.create_booking_fast(
+            user=user,
+            service=service,
+            booking_data=booking_data,
+            payment_data=payment_data
+        )
+
+        # 3. Link order to booking (PRIMARY financial relationship)
+        if booking:
+            booking.order = order
 
-            if should_create_earnings:
-                from payments.tasks import create_booking_earnings_async
+            # Link credit usage transaction if credits were applied
+            if credits_to_apply_cents > 0:
+                usage_transaction = order.user_credit_transactions.filter(
+                    transaction_type='usage'
+                ).first()
+                if usage_transaction:
+                    booking.credit_usage_transaction = usage_transaction
+                    usage_transaction.booking = booking
+                    usage_transaction.save()
 
-                def queue_earnings_task():
-                    create_booking_earnings_async.delay(
-                        practitioner_id=service.primary_practitioner.id,
-                        booking_id=booking.id,
-                        service_id=service.id,
-                        gross_amount_cents=service_price_cents
+            booking.save()
+
+            # For package/bundle bookings, ensure ALL session bookings in order are linked
+            # (Factory creates multiple session bookings, all need order FK)
+            service_type_code = service.service_type.code if service.service_type else None
+            if service_type_code in ['package', 'bundle']:
+                # Get all bookings created for this order
+                order_bookings = Booking.objects.filter(
+                    order=order,
+                    user=user,
+                    created_at__gte=order.created_at
+                )
+                # Ensure they all have the order FK (should already be set by factory)
+                count = order_bookings.count()
+                if count > 1:
+                    logger.info(
+                        f"Package/bundle order {order.id} has {count} session bookings"
                     )
 
-                transaction.on_commit(queue_earnings_task)
-            elif is_package_or_bundle_order:
-                logger.info(
-                    f"Skipping earnings for package/bundle booking {booking.id} (order {order.id}). "
-                    f"Earnings will be created when sessions are scheduled and completed."
+        # 4. Queue earnings calculation
+        # SKIP for package/bundle bookings - earnings created when sessions are completed
+        # Check the ORDER type, not service type (since booking.service might be the session service)
+        is_package_or_bundle_order = (
+            booking.order and
+            booking.order.order_type in ['package', 'bundle']
+        )
+
+        should_create_earnings = (
+            service.primary_practitioner and
+            not is_package_or_bundle_order and
+            booking.status not in ['draft']  # Skip draft bookings
+        )
+
+        if should_create_earnings:
+            from payments.tasks import create_booking_earnings_async
+
+            def queue_earnings_task():
+                create_booking_earnings_async.delay(
+                    practitioner_id=service.primary_practitioner.id,
+                    booking_id=booking.id,
+                    service_id=service.id,
+                    gross_amount_cents=service_price_cents
                 )
-            
-            logger.info(f"Fast checkout completed for booking {booking.id}")
-            
-            return CheckoutResult(
-                success=True,
-                booking=booking,
-                order=order,
-                payment_intent=payment_result.get('payment_intent')
+
+            transaction.on_commit(queue_earnings_task)
+        elif is_package_or_bundle_order:
+            logger.info(
+                f"Skipping earnings for package/bundle booking {booking.id} (order {order.id}). "
+                f"Earnings will be created when sessions are scheduled and completed."
             )
-            
-        except Exception as e:
-            logger.error(f"Fast checkout failed: {str(e)}")
-            raise
+
+        # 5. The held credits and seat now belong to the booking
+        reservation['state'] = 'confirmed'
+        locked_order.metadata['reservation'] = reservation
+        locked_order.save(update_fields=['metadata'])
+        order.metadata['reservation'] = reservation
+
+        return booking
+
+    def _reservation_state(self, order: Order) -> Optional[str]:
+        return Order.objects.filter(pk=order.pk).values_list(
+            'metadata__reservation__state', flat=True
+        ).first()
+
+    @transaction.atomic
+    def release_reservation(self, order: Order, reason: str) -> bool:
+        """
+        Give back the credits and workshop seat held for an order's checkout.
+
+        Safe to call more than once; returns False if nothing was held.
+        """
+        locked_order = Order.objects.select_for_update().get(pk=order.pk)
+        reservation = locked_order.metadata.get('reservation') or {}
+        if reservation.get('state') != 'held':
+            return False
+
+        if reservation.get('service_session_id'):
+            self.booking_service.release_workshop_seat(reservation['service_session_id'])
+
+        if reservation.get('credits_held_cents'):
+            self.credit_service.refund_credits(
+                user=locked_order.user,
+                amount_cents=reservation['credits_held_cents'],
+                booking=None,
+                reason=f"Checkout released: {reason}"
+            )
+
+        reservation['state'] = 'released'
+        locked_order.metadata['reservation'] = reservation
+        locked_order.save(update_fields=['metadata'])
+        order.metadata['reservation'] = reservation
+
+        logger.info(f"Released checkout reservation for order {order.id}: {reason}")
+        return True
     
     @transaction.atomic
     def process_credit_purchase(
@@ -37,7 +37,8 @@ class CreditService:
         user: User,
         service: Any,
         order: Any,
-        booking: Any = None
+        booking: Any = None,
+        debit_credits: bool = True
     ) -> None:
         """
         Create credit ledger entries for a service booking.
@@ -53,6 +54,8 @@ class CreditService:
             service: Service being booked
             order: Associated order
             booking: Associated booking (optional)
+            debit_credits: Pass False when the debit was already taken with
+                hold_booking_credits()
         """
         service_price_cents = int(service.price * 100)
 
@@ -81,19 +84,42 @@ class CreditService:
         )
 
         # 3. Credit debit — only when credits were actually applied
+        if debit_credits:
+            self.hold_booking_credits(user=user, service=service, order=order, booking=booking)
+
+    def hold_booking_credits(
+        self,
+        user: User,
+        service: Any,
+        order: Any,
+        booking: Any = None
+    ) -> Optional[UserCreditTransaction]:
+        """
+        Deduct the credits applied to an order from the user's balance.
+
+        Checkout takes this debit before charging the card so concurrent checkouts
+        cannot spend the same credits; it is returned with refund_credits() if the
+        checkout does not complete.
+
+        Returns:
+            The debit transaction, or None if no credits were applied
+        """
         credits_applied_cents = getattr(order, 'credits_applied_cents', 0) or 0
-        if credits_applied_cents > 0:
-            UserCreditTransaction.objects.create(
-                user=user,
-                amount_cents=-credits_applied_cents,
-                transaction_type='credit_applied',
-                service=service,
-                practitioner=service.primary_practitioner,
-                order=order,
-                booking=booking,
-                description=f"Credits applied: {service.name}"
-            )
-            logger.info(f"Deducted {credits_applied_cents} credit cents from user {user.id} for {service.name}")
+        if credits_applied_cents <= 0:
+            return None
+
+        debit = UserCreditTransaction.objects.create(
+            user=user,
+            amount_cents=-credits_applied_cents,
+            transaction_type='credit_applied',
+            service=service,
+            practitioner=service.primary_practitioner,
+            order=order,
+            booking=booking,
+            description=f"Credits applied: {service.name}"
+        )
+        logger.info(f"Deducted {credits_applied_cents} credit cents from user {user.id} for {service.name}")
+        return debit
     
     @transaction.atomic
     def refund_credits(
@@ -128,6 +154,97 @@ class CreditService:
         logger.info(f"Refunded {amount_cents} cents to user {user.id} for {reason}")
         return transaction
     
+    def bulk_refund_credits(self, refunds: list[tuple[Any, int, str]]) -> list[UserCreditTransaction]:
+        """
+        Refund credits for many bookings at once.
+        
+        Used when a whole session or series is cancelled: the ledger entries are
+        inserted together and each user's balance is moved once, instead of one
+        lock and one balance update per booking.
+        
+        Args:
+            refunds: (booking, amount_cents, reason) tuples
+            
+        Returns:
+            Created credit transactions
+        """
+        transactions = [
+            UserCreditTransaction(
+                user_id=booking.user_id,
+                amount_cents=amount_cents,
+                transaction_type='refund',
+                booking=booking,
+                service_id=booking.service_id,
+                practitioner_id=booking.practitioner_id,
+                description=reason
+            )
+            for booking, amount_cents, reason in refunds
+            if amount_cents > 0
+        ]
+        created = UserCreditTransaction.bulk_record(transactions)
+        
+        logger.info(
+            f"Refunded {sum(t.amount_cents for t in created)} cents to "
+            f"{len({t.user_id for t in created})} users in {len(created)} transactions"
+        )
+        return created
+    
+    def snapshot_balances(self, batch_size: int = 500) -> dict:
+        """
+        Verify running balances against the ledger and advance their snapshots.
+        
+        Only ledger entries newer than each balance's snapshot are summed, so the
+        cost follows recent activity rather than total history. A balance that
+        does not match its snapshot plus those entries is rebuilt from the full
+        ledger and logged.
+        
+        Candidates are walked in user_id order, `batch_size` at a time, until
+        none are left, so a daily run keeps up however many balances changed.
+        
+        Returns:
+            Counts of checked, snapshotted and repaired balances
+        """
+        from django.db.models import F, Max, Sum
+        
+        result = {'checked': 0, 'snapshotted': 0, 'repaired': 0}
+        last_user_id = 0
+        while True:
+            candidates = list(
+                UserCreditBalance.objects.filter(
+                    last_transaction_id__gt=F('snapshot_through_id'), user_id__gt=last_user_id
+                ).order_by('user_id').values_list('user_id', flat=True)[:batch_size]
+            )
+            if not candidates:
+                break
+            last_user_id = candidates[-1]
+            
+            for user_id in candidates:
+                with transaction.atomic():
+                    balance = UserCreditBalance.lock_for_user(user_id)
+                    result['checked'] += 1
+                    recent = UserCreditTransaction.objects.filter(
+                        user_id=user_id, id__gt=balance.snapshot_through_id
+                    ).aggregate(total=Sum('amount_cents'), last_id=Max('id'))
+                    expected = balance.snapshot_balance_cents + (recent['total'] or 0)
+                    
+                    if expected != balance.balance_cents:
+                        logger.warning(
+                            f"[CreditLedger] Balance drift for user {user_id}: "
+                            f"stored {balance.balance_cents}, ledger {expected}. Rebuilding."
+                        )
+                        UserCreditBalance.update_balance(user_id)
+                        result['repaired'] += 1
+                        continue
+                    
+                    UserCreditBalance.objects.filter(pk=balance.pk).update(
+                        snapshot_balance_cents=expected,
+                        snapshot_through_id=recent['last_id'] or balance.snapshot_through_id,
+                        snapshot_at=timezone.now()
+                    )
+                    result['snapshotted'] += 1
+        
+        return result
+    
     @transaction.atomic
     def transfer_credits(
         self,
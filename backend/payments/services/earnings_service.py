@@ -238,20 +238,86 @@ class EarningsService:
         pending_earnings = EarningsTransaction.objects.filter(
             status='pending',
             available_after__lte=now
-        ).select_related('practitioner')
+        )
         
         updated_count = 0
         error_count = 0
         
-        for earning in pending_earnings:
-            try:
-                self.mark_earnings_available(earning)
-                updated_count += 1
-            except Exception as e:
-                logger.error(f"Error processing earning {earning.id}: {e}")
-                error_count += 1
+        try:
+            updated_count = EarningsTransaction.bulk_transition(pending_earnings, 'available')
+        except Exception as e:
+            logger.error(f"Error making pending earnings available: {e}")
+            error_count += 1
         
         return {
             'updated_count': updated_count,
             'error_count': error_count
-        }
\ No newline at end of file
+        }
+    
+    def reconcile_balances(self, fix: bool = True) -> Dict[str, int]:
+        """
+        Verify every practitioner's running totals against the earnings ledger.
+        
+        One grouped aggregate finds the practitioners whose stored totals
+        differ from the sums of their transactions. Each of those is then
+        recomputed under its balance row lock (so in-flight deltas are not
+        lost) and, when `fix` is set, corrected.
+        
+        Returns:
+            Dict with counts of checked, mismatched and fixed balances
+        """
+        fields = list(PractitionerEarnings.BALANCE_STATUSES)
+        ledger = {
+            row.pop('practitioner_id'): row
+            for row in EarningsTransaction.objects.values('practitioner_id').annotate(**self._ledger_totals())
+        }
+        stored = {
+            row.pop('practitioner_id'): row
+            for row in PractitionerEarnings.objects.values('practitioner_id', *fields)
+        }
+        
+        empty = dict.fromkeys(fields, 0)
+        suspects = [
+            practitioner_id
+            for practitioner_id in sorted(set(ledger) | set(stored))
+            if ledger.get(practitioner_id, empty) != stored.get(practitioner_id)
+        ]
+        
+        mismatched = fixed = 0
+        for practitioner_id in suspects:
+            with transaction.atomic():
+                PractitionerEarnings.objects.get_or_create(practitioner_id=practitioner_id)
+                balance = PractitionerEarnings.objects.select_for_update().get(practitioner_id=practitioner_id)
+                expected = EarningsTransaction.objects.filter(
+                    practitioner_id=practitioner_id
+                ).aggregate(**self._ledger_totals())
+                actual = {field: getattr(balance, field) for field in fields}
+                if expected == actual:
+                    continue
+                
+                mismatched += 1
+                logger.warning(
+                    f"[EarningsLedger] Practitioner {practitioner_id} balance drifted: "
+                    f"stored={actual} ledger={expected}"
+                )
+                if fix:
+                    PractitionerEarnings.objects.filter(pk=balance.pk).update(
+                        **expected, updated_at=timezone.now()
+                    )
+                    fixed += 1
+        
+        return {
+            'checked': len(set(ledger) | set(stored)),
+            'mismatched': mismatched,
+            'fixed': fixed
+        }
+    
+    def _ledger_totals(self) -> Dict[str, Any]:
+        """Aggregate expressions for each running total, keyed by balance field."""
+        from django.db.models import Q, Sum
+        from django.db.models.functions import Coalesce
+        
+        return {
+            field: Coalesce(Sum('net_amount_cents', filter=Q(status__in=statuses)), 0)
+            for field, statuses in PractitionerEarnings.BALANCE_STATUSES.items()
+        }
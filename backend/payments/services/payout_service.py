@@ -357,7 +357,11 @@ class PayoutService:
             payout.save()
             
             # Revert earnings transactions to available
-            payout.earnings_transactions.update(status='available')
+            EarningsTransaction.bulk_transition(payout.earnings_transactions.all(), 'available')
+            PractitionerEarnings.apply_deltas(
+                payout.practitioner_id,
+                {'lifetime_payouts_cents': -(payout.credits_payout_cents or 0)}
+            )
             
             logger.info(f"Cancelled payout {payout.id}: {reason}")
             
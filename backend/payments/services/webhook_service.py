@@ -9,7 +9,7 @@ from django.utils import timezone
 
 from payments.models import (
     Order, UserCreditTransaction, PractitionerSubscription,
-    SubscriptionTier
+    SubscriptionTier, PractitionerPayout, EarningsTransaction
 )
 from payments.services.credit_service import CreditService
 from payments.services.earnings_service import EarningsService
@@ -23,10 +23,35 @@ logger = logging.getLogger(__name__)
 class WebhookService:
     """Service for processing Stripe webhooks."""
     
+    EVENT_HANDLERS = {
+        'payment_intent.succeeded': 'handle_payment_success',
+        'payment_intent.payment_failed': 'handle_payment_failure',
+        'customer.subscription.created': 'handle_subscription_created',
+        'customer.subscription.updated': 'handle_subscription_updated',
+        'customer.subscription.deleted': 'handle_subscription_deleted',
+        'charge.refunded': 'handle_refund_created',
+        'account.updated': 'handle_connect_account_update',
+        'payout.paid': 'handle_payout_paid',
+        'payout.failed': 'handle_payout_failed',
+    }
+    
     def __init__(self):
         self.credit_service = CreditService()
         self.earnings_service = EarningsService()
     
+    def handle_event(self, event_type: str, data_object: Dict[str, Any]) -> bool:
+        """
+        Dispatch a webhook event to its handler.
+        
+        Returns:
+            False if there is no handler for the event type
+        """
+        handler = self.EVENT_HANDLERS.get(event_type)
+        if not handler:
+            return False
+        getattr(self, handler)(data_object)
+        return True
+    
     @transaction.atomic
     def handle_payment_success(self, payment_intent: Dict[str, Any]) -> None:
         """
@@ -356,4 +381,160 @@ class WebhookService:
             logger.info(f"Updated Stripe Connect status for practitioner {practitioner.id}")
             
         except Practitioner.DoesNotExist:
-            logger.error(f"Practitioner not found for Stripe account {account_id}")
\ No newline at end of file
+            logger.error(f"Practitioner not found for Stripe account {account_id}")
+    
+    def handle_payout_paid(self, payout: Dict[str, Any]) -> None:
+        """Handle successful payout"""
+        # Find related payout record
+        payout_record = PractitionerPayout.objects.filter(
+            stripe_transfer_id=payout['id']
+        ).first()
+        
+        if payout_record:
+            payout_record.status = 'completed'
+            payout_record.payout_date = timezone.now()
+            payout_record.save()
+    
+    def handle_payout_failed(self, payout: Dict[str, Any]) -> None:
+        """Handle failed payout"""
+        payout_record = PractitionerPayout.objects.filter(
+            stripe_transfer_id=payout['id']
+        ).first()
+        
+        if payout_record:
+            payout_record.status = 'failed'
+            payout_record.error_message = payout.get('failure_message', 'Unknown error')
+            payout_record.save()
+    
+    # The invoice handlers are not in EVENT_HANDLERS: this endpoint has never
+    # processed invoice events, and dispatching them would start recording
+    # stream renewal earnings.
+    
+    def handle_invoice_payment_succeeded(self, invoice: Dict[str, Any]) -> None:
+        """Handle successful invoice payment (subscription renewals)"""
+        subscription_id = invoice.get('subscription')
+        if not subscription_id:
+            return
+        
+        # Check subscription metadata to determine type
+        import stripe
+        subscription = stripe.Subscription.retrieve(subscription_id)
+        metadata = subscription.get('metadata', {})
+        subscription_type = metadata.get('type')
+        
+        if subscription_type == 'stream':
+            # Handle stream subscription renewal
+            from streams.models import StreamSubscription
+            
+            stream_sub = StreamSubscription.objects.filter(
+                stripe_subscription_id=subscription_id
+            ).first()
+            
+            if stream_sub:
+                # Update subscription period dates
+                stream_sub.current_period_start = timezone.datetime.fromtimestamp(
+                    subscription['current_period_start'], 
+                    tz=timezone.utc
+                )
+                stream_sub.current_period_end = timezone.datetime.fromtimestamp(
+                    subscription['current_period_end'], 
+                    tz=timezone.utc
+                )
+                stream_sub.status = 'active'
+                stream_sub.save()
+                
+                # Create earnings transaction for practitioner
+                stream = stream_sub.stream
+                practitioner = stream.practitioner
+                
+                # Calculate commission (platform takes 15%)
+                gross_amount_cents = invoice['amount_paid']
+                commission_rate = 15.0  # Platform commission for streams
+                commission_amount_cents = int(gross_amount_cents * commission_rate / 100)
+                net_amount_cents = gross_amount_cents - commission_amount_cents
+                
+                # Create earnings transaction
+                EarningsTransaction.objects.create(
+                    practitioner=practitioner,
+                    gross_amount_cents=gross_amount_cents,
+                    commission_rate=commission_rate,
+                    commission_amount_cents=commission_amount_cents,
+                    net_amount_cents=net_amount_cents,
+                    status='pending',
+                    available_after=timezone.now() + timezone.timedelta(hours=48),
+                    description=f"Stream subscription renewal - {stream_sub.user.get_full_name() or stream_sub.user.email} ({stream_sub.tier} tier)",
+                    metadata={
+                        'type': 'stream_subscription',
+                        'stream_id': str(stream.id),
+                        'subscription_id': str(stream_sub.id),
+                        'user_id': str(stream_sub.user.id),
+                        'tier': stream_sub.tier,
+                        'invoice_id': invoice['id']
+                    }
+                )
+                
+        else:
+            # Handle practitioner platform subscription renewal
+            sub = PractitionerSubscription.objects.filter(
+                stripe_subscription_id=subscription_id
+            ).first()
+            
+            if sub:
+                # Ensure subscription is marked as active
+                sub.status = 'active'
+                sub.save()
+    
+    def handle_invoice_payment_failed(self, invoice: Dict[str, Any]) -> None:
+        """Handle failed invoice payment (subscription payment failures)"""
+        subscription_id = invoice.get('subscription')
+        if not subscription_id:
+            return
+        
+        # Check subscription metadata to determine type
+        import stripe
+        subscription = stripe.Subscription.retrieve(subscription_id)
+        metadata = subscription.get('metadata', {})
+        subscription_type = metadata.get('type')
+        
+        if subscription_type == 'stream':
+            # Handle stream subscription payment failure
+            from streams.models import StreamSubscription
+            
+            stream_sub = StreamSubscription.objects.filter(
+                stripe_subscription_id=subscription_id
+            ).first()
+            
+            if stream_sub:
+                # Mark subscription as past due
+                stream_sub.status = 'past_due'
+                stream_sub.save()
+                
+                # Update stream subscriber counts
+                stream = stream_sub.stream
+                stream.subscriber_count = stream.subscriptions.filter(
+                    status='active'
+                ).count()
+                stream.paid_subscriber_count = stream.subscriptions.filter(
+                    status='active',
+                    tier__in=['entry', 'premium']
+                ).count()
+                stream.save()
+                
+                # TODO: Send notification to user about payment failure
+                
+        else:
+            # Handle practitioner platform subscription payment failure
+            sub = PractitionerSubscription.objects.filter(
+                stripe_subscription_id=subscription_id
+            ).first()
+            
+            if sub:
+                # Mark subscription as past due
+                sub.status = 'past_due'
+                sub.save()
+                
+                # Clear practitioner's current subscription if this was it
+                practitioner = sub.practitioner
+                if practitioner.current_subscription == sub:
+                    practitioner.current_subscription = None
+                    practitioner.save(update_fields=['current_subscription'])
@@ -4,14 +4,18 @@ Payment-related signal handlers.
 NOTE: Most payment logic has been moved to service classes for explicit control.
 Only package completion tracking remains here as it needs to track status changes.
 """
-from django.db.models.signals import post_save, pre_save
+from django.db.models import Case, F, When
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 from django.utils import timezone
 
 from bookings.models import Booking
 from payments.models import (
     EarningsTransaction, 
-    PackageCompletionRecord
+    PackageCompletionRecord,
+    PractitionerEarnings,
+    UserCreditBalance,
+    UserCreditTransaction
 )
 from payments.commission_services import (
     CommissionCalculator,
@@ -73,3 +77,30 @@ def handle_package_completion(sender, instance, created, **kwargs):
     if instance.status == 'completed' and not instance.payout_processed:
         # Process the payout
         instance.process_payout()
+
+
+@receiver(post_delete, sender=EarningsTransaction)
+def remove_deleted_earnings_from_balance(sender, instance, **kwargs):
+    """
+    Take a deleted earnings transaction out of the practitioner's running totals.
+    """
+    PractitionerEarnings.apply_deltas(
+        instance.practitioner_id,
+        PractitionerEarnings.balance_deltas(instance.status, None, instance.net_amount_cents),
+        create=False
+    )
+
+
+@receiver(post_delete, sender=UserCreditTransaction)
+def remove_deleted_credit_from_balance(sender, instance, **kwargs):
+    """
+    Take a deleted credit transaction out of the user's running balance (and
+    out of the verified snapshot if it was already covered by it).
+    """
+    UserCreditBalance.objects.filter(user_id=instance.user_id).update(
+        balance_cents=F('balance_cents') - instance.amount_cents,
+        snapshot_balance_cents=Case(
+            When(snapshot_through_id__gte=instance.pk, then=F('snapshot_balance_cents') - instance.amount_cents),
+            default=F('snapshot_balance_cents')
+        )
+    )
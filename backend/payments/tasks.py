@@ -1,12 +1,10 @@
 import stripe
 from celery import shared_task
 from django.utils import timezone
-from django.db import models
-from django.db.models import Q, F, Sum
 from datetime import timedelta
 import logging
 
-from .models import EarningsTransaction, PractitionerEarnings
+from .models import EarningsTransaction
 
 logger = logging.getLogger(__name__)
 
@@ -59,7 +57,7 @@ def process_refund_credits(self, booking_uuid, refund_amount_cents, reason='Book
         )
         
         logger.info(
-            f"Created refund transaction {refund_transaction.id} for booking {booking_id}. "
+            f"Created refund transaction {refund_transaction.id} for booking {booking.id}. "
             f"Amount: ${refund_amount_cents / 100:.2f}"
         )
         
@@ -68,7 +66,7 @@ def process_refund_credits(self, booking_uuid, refund_amount_cents, reason='Book
         reversal = earnings_service.reverse_earnings(booking)
         
         if reversal:
-            logger.info(f"Created earnings reversal {reversal.id} for booking {booking_id}")
+            logger.info(f"Created earnings reversal {reversal.id} for booking {booking.id}")
         
         return {
             'success': True,
@@ -78,7 +76,7 @@ def process_refund_credits(self, booking_uuid, refund_amount_cents, reason='Book
         
     except Exception as e:
         logger.error(
-            f"Error processing refund for booking {booking_id}: {str(e)}",
+            f"Error processing refund for booking {booking_uuid}: {str(e)}",
             exc_info=True
         )
         return {
@@ -87,6 +85,66 @@ def process_refund_credits(self, booking_uuid, refund_amount_cents, reason='Book
         }
 
 
+@shared_task(bind=True, name='process-bulk-refund-credits', max_retries=3)
+def process_bulk_refund_credits(self, refunds, reason='Booking canceled'):
+    """
+    Process credit refunds for many canceled bookings in one ledger write.
+
+    Args:
+        refunds: List of (booking_uuid, refund_amount_cents) pairs
+        reason: Reason for the refunds
+    """
+    try:
+        from bookings.models import Booking
+        from payments.services import CreditService, EarningsService
+
+        amounts = {str(booking_uuid): amount for booking_uuid, amount in refunds}
+        bookings = Booking.objects.filter(public_uuid__in=amounts).select_related('service', 'practitioner')
+
+        created = CreditService().bulk_refund_credits([
+            (booking, amounts[str(booking.public_uuid)], f"Refund: {reason}") for booking in bookings
+        ])
+
+        earnings_service = EarningsService()
+        for booking in bookings:
+            earnings_service.reverse_earnings(booking)
+
+        logger.info(
+            f"Created {len(created)} refund transactions for {len(bookings)} canceled bookings. "
+            f"Amount: ${sum(t.amount_cents for t in created) / 100:.2f}"
+        )
+
+        return {
+            'success': True,
+            'refund_count': len(created),
+            'refund_amount': sum(t.amount_cents for t in created) / 100
+        }
+
+    except Exception as e:
+        logger.error(f"Error processing bulk refund: {str(e)}", exc_info=True)
+        return {
+            'success': False,
+            'error': str(e)
+        }
+
+
+@shared_task(name='snapshot-credit-balances')
+def snapshot_credit_balances():
+    """
+    Verify user credit balances against the ledger entries since their last
+    snapshot, advance the snapshots and rebuild any balance that drifted.
+    Runs daily via Celery Beat.
+    """
+    from payments.services import CreditService
+
+    result = CreditService().snapshot_balances()
+    logger.info(
+        f"[CreditLedger] Checked {result['checked']} balances: "
+        f"{result['snapshotted']} snapshotted, {result['repaired']} repaired"
+    )
+    return result
+
+
 @shared_task(bind=True, name='process-stripe-refund', max_retries=3)
 def process_stripe_refund(self, order_id, refund_amount_cents):
     """
@@ -144,26 +202,16 @@ def transition_projected_to_pending():
     projected_earnings = EarningsTransaction.objects.filter(
         status='projected',
         available_after__lte=now + timedelta(hours=48)  # booking_end_time <= now
-    ).select_related('practitioner', 'booking')
+    )
 
     updated_count = 0
     error_count = 0
 
-    for earning in projected_earnings:
-        try:
-            # Verify the booking is actually completed or the session time has passed
-            booking_end_time = earning.available_after - timedelta(hours=48)
-            if booking_end_time <= now:
-                earning.status = 'pending'
-                earning.save(update_fields=['status', 'updated_at'])
-                updated_count += 1
-                logger.info(
-                    f"Transitioned earning {earning.id} from projected to pending "
-                    f"for practitioner {earning.practitioner_id}"
-                )
-        except Exception as e:
-            logger.error(f"Error transitioning earning {earning.id}: {e}")
-            error_count += 1
+    try:
+        updated_count = EarningsTransaction.bulk_transition(projected_earnings, 'pending')
+    except Exception as e:
+        logger.error(f"Error transitioning projected earnings: {e}")
+        error_count += 1
 
     logger.info(
         f"Projected-to-pending transition finished. "
@@ -177,58 +225,34 @@ def transition_projected_to_pending():
     }
 
 
-@shared_task(name='calculate-pending-earnings')
-def calculate_pending_earnings():
+@shared_task(name='reconcile-practitioner-earnings')
+def reconcile_practitioner_earnings(fix=True):
     """
-    Calculate and update pending earnings for practitioners.
-    This ensures the pending_balance_cents is accurate.
+    Verify practitioners' running earnings totals against the transaction
+    ledger and repair any drift (see EarningsService.reconcile_balances).
     Runs daily via Celery Beat.
     """
-    practitioners_updated = 0
-    errors = 0
-    
-    # Get all practitioners with earnings
-    practitioners = PractitionerEarnings.objects.all()
+    from payments.services import EarningsService
     
-    for practitioner_earnings in practitioners:
-        try:
-            # Calculate pending earnings from transactions
-            pending_total = EarningsTransaction.objects.filter(
-                practitioner=practitioner_earnings.practitioner,
-                status='pending'
-            ).aggregate(
-                total=models.Sum('net_amount_cents')
-            )['total'] or 0
-            
-            # Update if different
-            if practitioner_earnings.pending_balance_cents != pending_total:
-                practitioner_earnings.pending_balance_cents = pending_total
-                practitioner_earnings.save(update_fields=['pending_balance_cents'])
-                practitioners_updated += 1
-                
-                logger.info(
-                    f"Updated pending balance for {practitioner_earnings.practitioner.display_name}: "
-                    f"${pending_total / 100:.2f}"
-                )
-                
-        except Exception as e:
-            logger.error(
-                f"Error calculating pending earnings for practitioner {practitioner_earnings.practitioner_id}: {str(e)}",
-                exc_info=True
-            )
-            errors += 1
+    result = EarningsService().reconcile_balances(fix=fix)
     
-    logger.info(
-        f"Pending earnings calculation finished. "
-        f"Updated {practitioners_updated} practitioners. "
-        f"Errors: {errors}"
+    log = logger.warning if result['mismatched'] else logger.info
+    log(
+        f"[EarningsLedger] Reconciliation finished. Checked {result['checked']} balances, "
+        f"{result['mismatched']} drifted, {result['fixed']} fixed"
     )
     
-    return {
-        'practitioners_updated': practitioners_updated,
-        'errors': errors,
-        'completed_at': timezone.now().isoformat()
-    }
+    result['completed_at'] = timezone.now().isoformat()
+    return result
+
+
+@shared_task(name='calculate-pending-earnings')
+def calculate_pending_earnings():
+    """
+    Superseded by reconcile_practitioner_earnings, which checks every running
+    total; kept so already-queued messages still run.
+    """
+    return reconcile_practitioner_earnings()
 
 
 @shared_task(name='complete-booking-post-payment', bind=True, max_retries=3)
@@ -345,4 +369,63 @@ def create_booking_earnings_async(practitioner_id: int, booking_id: int, service
             'success': False,
             'error': str(e),
             'booking_id': booking_id
-        }
\ No newline at end of file
+        }
+
+@shared_task(name='process-stripe-webhook-events')
+def process_stripe_webhook_events(limit=200):
+    """
+    Drain the Stripe webhook inbox (see payments.webhook_inbox).
+    
+    Queued when an event is recorded and run every minute by Celery Beat to
+    pick up retries. Several workers can run this at once.
+    """
+    from payments.webhook_inbox import inbox_metrics, process_pending_events
+    
+    counts = process_pending_events(limit=limit)
+    metrics = inbox_metrics()
+    
+    if any(counts.values()) or metrics['pending'] or metrics['failed']:
+        logger.info(
+            f"[WebhookInbox] processed={counts['processed']} ignored={counts['ignored']} "
+            f"retrying={counts['retrying']} failed={counts['failed']} | "
+            f"pending={metrics['pending']} oldest_pending={metrics['oldest_pending_seconds']:.0f}s "
+            f"avg_lag={metrics['avg_lag_seconds_last_hour']:.1f}s total_failed={metrics['failed']}"
+        )
+    
+    return {**counts, 'metrics': metrics}
+
+
+@shared_task(name='release-stale-checkout-reservations')
+def release_stale_checkout_reservations(older_than_minutes=30):
+    """
+    Release credits and workshop seats held by checkouts that never finished.
+    
+    Checkout holds them before calling Stripe and releases them itself on
+    failure; this catches checkouts whose worker died in between. Only orders
+    that were never charged are released. Runs every 15 minutes via Celery Beat.
+    """
+    from payments.models import Order
+    from payments.services.checkout_orchestrator_fast import FastCheckoutOrchestrator
+    
+    cutoff = timezone.now() - timedelta(minutes=older_than_minutes)
+    stale = Order.objects.filter(
+        metadata__reservation__state='held',
+        created_at__lt=cutoff,
+    )
+    
+    orchestrator = FastCheckoutOrchestrator()
+    released = 0
+    for order in stale.filter(status__in=['pending', 'failed'], stripe_payment_intent_id=''):
+        if orchestrator.release_reservation(order, reason='Checkout abandoned'):
+            released += 1
+    
+    charged = stale.exclude(status__in=['pending', 'failed']).count()
+    if charged:
+        logger.error(
+            f"[Checkout] {charged} charged orders still hold a checkout reservation without a booking; "
+            f"review them manually"
+        )
+    
+    if released:
+        logger.info(f"[Checkout] Released {released} stale checkout reservations")
+    return {'released': released, 'needs_review': charged}
@@ -0,0 +1,127 @@
+from datetime import timedelta
+from unittest import mock
+
+import stripe
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+
+from bookings.models import Booking
+from payments.models import Order, PaymentMethod, UserCreditBalance, UserCreditTransaction
+from payments.services.checkout_orchestrator_fast import FastCheckoutOrchestrator
+from payments.tasks import release_stale_checkout_reservations
+from practitioners.models import Practitioner
+from services.models import Service, ServiceSession, ServiceType
+from users.models import User, UserPaymentProfile
+
+
+class TwoPhaseCheckoutTestCase(TestCase):
+    """Checkout holds no locks during the Stripe call and undoes its reservation on failure."""
+
+    def setUp(self):
+        practitioner_user = User.objects.create_user(email='checkout-practitioner@example.com', password='testpass123')
+        practitioner = Practitioner.objects.create(user=practitioner_user, display_name='Checkout Studio')
+        service_type, _ = ServiceType.objects.get_or_create(code='workshop', defaults={'name': 'Workshop'})
+        self.service = Service.objects.create(
+            name='Sound Bath',
+            price_cents=5000,
+            duration_minutes=60,
+            max_participants=1,
+            service_type=service_type,
+            primary_practitioner=practitioner,
+            location_type='in_person'
+        )
+        start = timezone.now() + timedelta(days=3)
+        self.session = ServiceSession.objects.create(
+            service=self.service, session_type='workshop', start_time=start,
+            end_time=start + timedelta(hours=1), max_participants=1, status='scheduled'
+        )
+
+        self.user = User.objects.create_user(email='checkout-client@example.com', password='testpass123')
+        UserPaymentProfile.objects.update_or_create(user=self.user, defaults={'stripe_customer_id': 'cus_test'})
+        self.payment_method = PaymentMethod.objects.create(
+            user=self.user, stripe_payment_method_id='pm_test', brand='visa', last4='4242',
+            exp_month=12, exp_year=timezone.now().year + 2
+        )
+        UserCreditTransaction.objects.create(user=self.user, amount_cents=2000, transaction_type='bonus')
+
+        self.orchestrator = FastCheckoutOrchestrator()
+
+    def checkout(self):
+        return self.orchestrator.process_booking_payment_fast(
+            user=self.user,
+            service_id=self.service.id,
+            payment_method_id=self.payment_method.id,
+            booking_data={'service_session_id': self.session.id}
+        )
+
+    def balance(self):
+        return UserCreditBalance.objects.get(user=self.user).balance_cents
+
+    def seats_taken(self):
+        self.session.refresh_from_db()
+        return self.session.current_participants
+
+    def intent(self, status='succeeded'):
+        return stripe.PaymentIntent.construct_from(
+            {'id': 'pi_test', 'object': 'payment_intent', 'status': status, 'client_secret': 'secret'}, 'sk_test'
+        )
+
+    def test_stripe_is_called_outside_the_checkout_transaction(self):
+        depth = len(connection.atomic_blocks)
+
+        def create_intent(**kwargs):
+            self.assertEqual(len(connection.atomic_blocks), depth)
+            self.assertEqual(kwargs['amount'], 3000)
+            return self.intent()
+
+        with mock.patch('stripe.PaymentIntent.create', side_effect=create_intent):
+            result = self.checkout()
+
+        self.assertTrue(result.success)
+        self.assertEqual(result.booking.service_session_id, self.session.id)
+        self.assertEqual(self.seats_taken(), 1)
+        self.assertEqual(self.balance(), 0)
+        self.assertEqual(result.order.metadata['reservation']['state'], 'confirmed')
+        self.assertEqual(
+            set(result.order.user_credit_transactions.values_list('transaction_type', flat=True)),
+            {'purchase', 'usage', 'credit_applied'}
+        )
+
+    def test_card_failure_releases_seat_and_credits(self):
+        error = stripe.error.CardError('Your card was declined.', None, 'card_declined')
+        with mock.patch('stripe.PaymentIntent.create', side_effect=error):
+            with self.assertRaises(stripe.error.CardError):
+                self.checkout()
+
+        order = Order.objects.get(user=self.user)
+        self.assertEqual(order.status, 'failed')
+        self.assertEqual(order.metadata['reservation']['state'], 'released')
+        self.assertEqual(self.seats_taken(), 0)
+        self.assertEqual(self.balance(), 2000)
+        self.assertFalse(Booking.objects.filter(user=self.user).exists())
+
+    def test_failure_after_charge_refunds_and_releases(self):
+        with mock.patch('stripe.PaymentIntent.create', return_value=self.intent()), \
+                mock.patch('stripe.Refund.create', return_value=mock.Mock(id='re_test', amount=3000)) as refund, \
+                mock.patch.object(self.orchestrator.booking_service, 'create_booking_fast',
+                                  side_effect=RuntimeError('booking failed')):
+            with self.assertRaises(RuntimeError):
+                self.checkout()
+
+        refund.assert_called_once()
+        order = Order.objects.get(user=self.user)
+        self.assertEqual(order.status, 'refunded')
+        self.assertEqual(self.seats_taken(), 0)
+        self.assertEqual(self.balance(), 2000)
+
+    def test_abandoned_reservations_are_swept(self):
+        order, _, _ = self.orchestrator._reserve_checkout(
+            self.user, self.service.id, self.payment_method.id, {'service_session_id': self.session.id}
+        )
+        self.assertEqual(self.seats_taken(), 1)
+        Order.objects.filter(pk=order.pk).update(created_at=timezone.now() - timedelta(hours=1))
+
+        self.assertEqual(release_stale_checkout_reservations()['released'], 1)
+        self.assertEqual(self.seats_taken(), 0)
+        self.assertEqual(self.balance(), 2000)
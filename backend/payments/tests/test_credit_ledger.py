@@ -0,0 +1,124 @@
+from datetime import timedelta
+
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from bookings.models import Booking
+from payments.models import UserCreditBalance, UserCreditTransaction
+from payments.services import CreditService
+from practitioners.models import Practitioner
+from services.models import Service, ServiceSession, ServiceType
+from users.models import User
+
+
+class CreditLedgerTestCase(TestCase):
+    """Credit balances move by deltas and are verified against snapshots."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='credit-ledger@example.com', password='testpass123')
+
+    def credit(self, amount_cents, user=None, transaction_type='bonus'):
+        return UserCreditTransaction.objects.create(
+            user=user or self.user, amount_cents=amount_cents, transaction_type=transaction_type
+        )
+
+    def balance(self, user=None):
+        return UserCreditBalance.objects.get(user=user or self.user)
+
+    def test_save_cost_does_not_grow_with_history(self):
+        def save_queries():
+            with CaptureQueriesContext(connection) as ctx:
+                self.credit(100)
+            return len(ctx.captured_queries)
+
+        self.credit(100)  # creates the balance row
+        first = save_queries()
+        for _ in range(20):
+            self.credit(100)
+        self.assertEqual(save_queries(), first)
+
+        balance = self.balance()
+        self.assertEqual(balance.balance_cents, 2300)
+        self.assertEqual(balance.last_transaction, UserCreditTransaction.objects.latest('id'))
+
+    def test_ledger_is_append_only(self):
+        entry = self.credit(500)
+
+        entry.description = 'Welcome bonus'
+        entry.save()
+
+        entry.amount_cents = 5000
+        with self.assertRaises(ValidationError):
+            entry.save()
+        self.assertEqual(self.balance().balance_cents, 500)
+
+    def test_deleted_entry_leaves_the_balance_and_snapshot(self):
+        self.credit(700)
+        mistake = self.credit(300)
+        mistake_id = mistake.id
+        CreditService().snapshot_balances()
+
+        mistake.delete()
+
+        balance = self.balance()
+        self.assertEqual((balance.balance_cents, balance.snapshot_balance_cents), (700, 700))
+        self.assertEqual(balance.snapshot_through_id, mistake_id)
+        self.assertEqual(CreditService().snapshot_balances()['repaired'], 0)
+
+    def test_snapshot_advances_and_repairs_drift(self):
+        self.credit(1000)
+        self.credit(-250, transaction_type='usage')
+
+        result = CreditService().snapshot_balances()
+        self.assertEqual((result['snapshotted'], result['repaired']), (1, 0))
+        balance = self.balance()
+        self.assertEqual((balance.snapshot_balance_cents, balance.snapshot_through_id),
+                         (750, balance.last_transaction_id))
+
+        # Nothing new since the snapshot: nothing to check
+        self.assertEqual(CreditService().snapshot_balances()['checked'], 0)
+
+        self.credit(50)
+        UserCreditBalance.objects.filter(user=self.user).update(balance_cents=9999)
+        self.assertEqual(CreditService().snapshot_balances()['repaired'], 1)
+        self.assertEqual(self.balance().balance_cents, 800)
+        self.assertEqual(self.balance().snapshot_balance_cents, 800)
+
+    def test_snapshot_drains_every_batch(self):
+        for i in range(5):
+            user = User.objects.create_user(email=f'credit-batch{i}@example.com', password='testpass123')
+            self.credit(100 * (i + 1), user=user)
+
+        result = CreditService().snapshot_balances(batch_size=2)
+        self.assertEqual((result['checked'], result['snapshotted']), (5, 5))
+        self.assertEqual(CreditService().snapshot_balances(batch_size=2)['checked'], 0)
+
+    def test_bulk_refund_moves_each_balance_once(self):
+        practitioner_user = User.objects.create_user(email='credit-practitioner@example.com', password='testpass123')
+        practitioner = Practitioner.objects.create(user=practitioner_user, display_name='Credit Studio')
+        service_type, _ = ServiceType.objects.get_or_create(code='workshop', defaults={'name': 'Workshop'})
+        service = Service.objects.create(
+            name='Breathwork', price_cents=3000, duration_minutes=60, service_type=service_type,
+            primary_practitioner=practitioner, location_type='virtual'
+        )
+        start = timezone.now() + timedelta(days=2)
+        session = ServiceSession.objects.create(service=service, start_time=start, end_time=start + timedelta(hours=1))
+        other = User.objects.create_user(email='credit-other@example.com', password='testpass123')
+        self.credit(100)
+
+        bookings = [
+            Booking.objects.create(user=user, practitioner=practitioner, service=service, service_session=session)
+            for user in (self.user, self.user, other)
+        ]
+        created = CreditService().bulk_refund_credits(
+            [(booking, 3000, 'Session canceled') for booking in bookings]
+        )
+
+        self.assertEqual(len(created), 3)
+        self.assertEqual(self.balance().balance_cents, 6100)
+        self.assertEqual(self.balance(other).balance_cents, 3000)
+        self.assertEqual(self.balance(other).last_transaction_id, created[2].id)
+        self.assertEqual(CreditService().snapshot_balances()['repaired'], 0)
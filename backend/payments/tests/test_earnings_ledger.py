@@ -0,0 +1,110 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from bookings.models import Booking
+from payments.models import EarningsTransaction, PractitionerEarnings, PractitionerPayout
+from payments.services import EarningsService, PayoutService
+from practitioners.models import Practitioner
+from services.models import Service, ServiceSession, ServiceType
+from users.models import User
+
+
+class EarningsLedgerTestCase(TestCase):
+    """Practitioner balances follow earnings transactions incrementally."""
+
+    def setUp(self):
+        user = User.objects.create_user(email='ledger-practitioner@example.com', password='testpass123')
+        self.practitioner = Practitioner.objects.create(user=user, display_name='Ledger Studio')
+        client = User.objects.create_user(email='ledger-client@example.com', password='testpass123')
+        service_type, _ = ServiceType.objects.get_or_create(code='session', defaults={'name': 'Session'})
+        service = Service.objects.create(
+            name='Reiki', price_cents=10000, duration_minutes=60, service_type=service_type,
+            primary_practitioner=self.practitioner, location_type='virtual'
+        )
+        start = timezone.now() - timedelta(days=3)
+        session = ServiceSession.objects.create(service=service, start_time=start, end_time=start + timedelta(hours=1))
+        self.booking = Booking.objects.create(
+            user=client, practitioner=self.practitioner, service=service,
+            service_session=session, status='completed'
+        )
+
+    def earn(self, net_cents, status='available'):
+        return EarningsTransaction.objects.create(
+            practitioner=self.practitioner,
+            booking=self.booking,
+            gross_amount_cents=net_cents,
+            commission_rate=Decimal('0'),
+            commission_amount_cents=0,
+            net_amount_cents=net_cents,
+            status=status,
+            available_after=timezone.now() - timedelta(hours=1),
+        )
+
+    def balance(self):
+        return PractitionerEarnings.objects.get(practitioner=self.practitioner)
+
+    def totals(self):
+        balance = self.balance()
+        return (balance.pending_balance_cents, balance.available_balance_cents,
+                balance.lifetime_earnings_cents, balance.lifetime_payouts_cents)
+
+    def test_status_changes_apply_deltas(self):
+        projected = self.earn(1000, status='projected')
+        self.assertEqual(self.totals(), (0, 0, 0, 0))
+
+        projected.status = 'pending'
+        projected.save(update_fields=['status'])
+        self.assertEqual(self.totals(), (1000, 0, 1000, 0))
+
+        self.assertEqual(EarningsService().process_available_earnings()['updated_count'], 1)
+        self.assertEqual(self.totals(), (0, 1000, 1000, 0))
+
+        projected.refresh_from_db()
+        projected.status = 'reversed'
+        projected.save()
+        self.assertEqual(self.totals(), (0, 0, 0, 0))
+
+        self.earn(500).delete()
+        self.assertEqual(self.totals(), (0, 0, 0, 0))
+
+    def test_batch_payout_is_linear(self):
+        def payout_queries(count):
+            for _ in range(count):
+                self.earn(100)
+            transactions = EarningsTransaction.objects.filter(practitioner=self.practitioner, status='available')
+            with CaptureQueriesContext(connection) as ctx:
+                PractitionerPayout.create_batch_payout(self.practitioner, transactions)
+            return len(ctx.captured_queries)
+
+        self.assertEqual(payout_queries(3), payout_queries(30))
+        self.assertEqual(self.totals(), (0, 0, 3300, 3300))
+        self.assertEqual(EarningsTransaction.objects.filter(status='paid', payout__isnull=False).count(), 33)
+
+    def test_cancelled_payout_returns_funds(self):
+        self.earn(4000)
+        self.earn(2500)
+        payout = PractitionerPayout.create_batch_payout(
+            self.practitioner, EarningsTransaction.objects.filter(practitioner=self.practitioner)
+        )
+        self.assertEqual(self.totals(), (0, 0, 6500, 6500))
+
+        PayoutService().cancel_payout(payout, reason='Bank details changed')
+        self.assertEqual(self.totals(), (0, 6500, 6500, 0))
+
+    def test_reconciliation_repairs_drift(self):
+        self.earn(700)
+        self.earn(300, status='pending')
+        PractitionerEarnings.objects.filter(practitioner=self.practitioner).update(
+            available_balance_cents=0, lifetime_earnings_cents=42
+        )
+
+        self.assertEqual(EarningsService().reconcile_balances(fix=False)['mismatched'], 1)
+        result = EarningsService().reconcile_balances()
+        self.assertEqual((result['mismatched'], result['fixed']), (1, 1))
+        self.assertEqual(self.totals(), (300, 700, 1000, 0))
+        self.assertEqual(EarningsService().reconcile_balances()['mismatched'], 0)
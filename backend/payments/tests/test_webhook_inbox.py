@@ -0,0 +1,112 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from payments import webhook_inbox
+from payments.models import StripeWebhookEvent
+from payments.webhook_inbox import inbox_metrics, process_pending_events, record_event, requeue_failed
+
+
+def stripe_event(event_id, event_type='payment_intent.succeeded', object_id='pi_1', created=1700000000):
+    return {
+        'id': event_id,
+        'object': 'event',
+        'type': event_type,
+        'created': created,
+        'data': {'object': {'id': object_id, 'object': 'payment_intent'}},
+    }
+
+
+class WebhookInboxTestCase(TestCase):
+    """Webhooks are recorded once and processed in per-object order."""
+
+    def setUp(self):
+        self.calls = []
+        self.fail_for = set()
+        patcher = mock.patch.dict(webhook_inbox.DISPATCHERS, {'payments': self.dispatch})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def dispatch(self, event_type, data_object):
+        self.calls.append((event_type, data_object['id']))
+        if data_object['id'] in self.fail_for:
+            raise RuntimeError('handler exploded')
+        return event_type != 'customer.created'
+
+    def test_redelivery_is_recorded_once(self):
+        self.assertTrue(record_event(stripe_event('evt_1'), handler='payments'))
+        self.assertFalse(record_event(stripe_event('evt_1'), handler='payments'))
+        self.assertTrue(record_event(stripe_event('evt_1'), handler='integrations'))
+
+        self.assertEqual(StripeWebhookEvent.objects.filter(event_id='evt_1').count(), 2)
+
+    def test_events_for_an_object_run_in_stripe_order(self):
+        record_event(stripe_event('evt_late', 'charge.refunded', created=1700000100), handler='payments')
+        record_event(stripe_event('evt_early', 'payment_intent.succeeded', created=1700000000), handler='payments')
+        record_event(stripe_event('evt_other', 'customer.created', object_id='cus_1'), handler='payments')
+
+        counts = process_pending_events()
+
+        self.assertEqual(self.calls, [
+            ('payment_intent.succeeded', 'pi_1'),
+            ('customer.created', 'cus_1'),
+            ('charge.refunded', 'pi_1'),
+        ])
+        self.assertEqual(counts, {'processed': 2, 'ignored': 1, 'retrying': 0, 'failed': 0})
+        self.assertEqual(
+            StripeWebhookEvent.objects.get(event_id='evt_other').status, 'ignored'
+        )
+
+    def test_failure_backs_off_and_blocks_later_events_for_the_object(self):
+        self.fail_for = {'pi_1'}
+        record_event(stripe_event('evt_1', created=1700000000), handler='payments')
+        record_event(stripe_event('evt_2', 'charge.refunded', created=1700000100), handler='payments')
+        record_event(stripe_event('evt_3', object_id='pi_2'), handler='payments')
+
+        counts = process_pending_events()
+
+        self.assertEqual(counts['retrying'], 1)
+        self.assertEqual(counts['processed'], 1)
+        failed = StripeWebhookEvent.objects.get(event_id='evt_1')
+        self.assertEqual((failed.status, failed.attempts), ('pending', 1))
+        self.assertGreater(failed.next_attempt_at, timezone.now())
+        self.assertIn('handler exploded', failed.last_error)
+        self.assertEqual(StripeWebhookEvent.objects.get(event_id='evt_2').attempts, 0)
+
+    def test_event_is_parked_after_max_attempts_and_can_be_requeued(self):
+        self.fail_for = {'pi_1'}
+        record_event(stripe_event('evt_1'), handler='payments')
+        StripeWebhookEvent.objects.update(attempts=webhook_inbox.MAX_ATTEMPTS - 1)
+
+        self.assertEqual(process_pending_events()['failed'], 1)
+        self.assertEqual(inbox_metrics()['failed'], 1)
+
+        self.fail_for = set()
+        self.assertEqual(requeue_failed(), 1)
+        process_pending_events()
+        self.assertEqual(StripeWebhookEvent.objects.get(event_id='evt_1').status, 'processed')
+
+    def test_metrics_report_backlog(self):
+        record_event(stripe_event('evt_1'), handler='payments')
+        StripeWebhookEvent.objects.update(created_at=timezone.now() - timedelta(minutes=5))
+
+        metrics = inbox_metrics()
+
+        self.assertEqual(metrics['pending'], 1)
+        self.assertGreaterEqual(metrics['oldest_pending_seconds'], 300)
+
+    @mock.patch('stripe.Webhook.construct_event')
+    def test_endpoint_acknowledges_without_running_handlers(self, construct_event):
+        construct_event.return_value = stripe_event('evt_http')
+
+        response = APIClient().post(
+            '/api/v1/webhooks/stripe/', data='{}', content_type='application/json',
+            HTTP_STRIPE_SIGNATURE='t=1,v1=sig'
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(StripeWebhookEvent.objects.get(event_id='evt_http').status, 'pending')
+        self.assertEqual(self.calls, [])
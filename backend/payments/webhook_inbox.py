@@ -0,0 +1,185 @@
+"""
+Stripe webhook inbox.
+
+The webhook endpoints verify the signature, write the event to
+`StripeWebhookEvent` and return 200 straight away. Workers drain the inbox:
+
+- Redeliveries are deduplicated by the unique (event_id, handler) constraint.
+- Events that share a Stripe object (data.object.id) run in the order Stripe
+  created them: an event is only claimed once every earlier event for the
+  same object has been processed or has exhausted its retries.
+- Each event is claimed with SELECT ... FOR UPDATE SKIP LOCKED and handled in
+  the same transaction, so any number of workers can drain concurrently and a
+  crashed worker leaves the event pending.
+- Failures are retried with exponential backoff, then parked as 'failed'.
+
+`inbox_metrics` reports backlog size, lag and failure counts; the drain task
+logs them and `manage.py stripe_webhook_inbox` prints them.
+"""
+import logging
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import Any, Dict, Optional
+
+import stripe
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Avg, Count, Exists, F, Min, OuterRef, Q
+from django.utils import timezone
+
+from payments.models import StripeWebhookEvent
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 8
+RETRY_BASE_SECONDS = 30
+RETRY_MAX_SECONDS = 60 * 60
+
+
+def _dispatch_payments(event_type: str, data_object) -> bool:
+    from payments.services import WebhookService
+    return WebhookService().handle_event(event_type, data_object)
+
+
+def _dispatch_integrations(event_type: str, data_object) -> bool:
+    from integrations.stripe.webhooks import dispatch_event
+    return dispatch_event(event_type, data_object)
+
+
+DISPATCHERS = {
+    'payments': _dispatch_payments,
+    'integrations': _dispatch_integrations,
+}
+
+
+# ── Receiving ────────────────────────────────────────────────────────────────
+
+def record_event(event, handler: str) -> bool:
+    """
+    Persist a verified Stripe event for `handler`.
+
+    Returns False if the event was already recorded (a Stripe retry).
+    """
+    payload = event.to_dict_recursive() if hasattr(event, 'to_dict_recursive') else dict(event)
+    data_object = payload.get('data', {}).get('object') or {}
+
+    try:
+        with transaction.atomic():
+            StripeWebhookEvent.objects.create(
+                event_id=payload['id'],
+                handler=handler,
+                event_type=payload['type'],
+                object_id=data_object.get('id') or '',
+                stripe_created=datetime.fromtimestamp(payload['created'], tz=dt_timezone.utc),
+                payload=payload,
+            )
+    except IntegrityError:
+        logger.info(f"[WebhookInbox] Duplicate delivery of {payload['id']} ignored")
+        return False
+
+    transaction.on_commit(_kick_worker)
+    return True
+
+
+def _kick_worker():
+    from payments.tasks import process_stripe_webhook_events
+    try:
+        process_stripe_webhook_events.delay()
+    except Exception as e:
+        # The periodic drain picks the event up anyway
+        logger.warning(f"[WebhookInbox] Could not queue inbox drain: {e}")
+
+
+# ── Processing ───────────────────────────────────────────────────────────────
+
+def _claimable():
+    """Pending events that are due and have no earlier pending event for their object."""
+    earlier = StripeWebhookEvent.objects.filter(
+        status='pending',
+        handler=OuterRef('handler'),
+        object_id=OuterRef('object_id'),
+    ).filter(
+        Q(stripe_created__lt=OuterRef('stripe_created'))
+        | Q(stripe_created=OuterRef('stripe_created'), pk__lt=OuterRef('pk'))
+    )
+    return StripeWebhookEvent.objects.filter(
+        status='pending', next_attempt_at__lte=timezone.now()
+    ).filter(Q(object_id='') | ~Exists(earlier))
+
+
+def _retry_delay(attempts: int) -> timedelta:
+    return timedelta(seconds=min(RETRY_BASE_SECONDS * 2 ** (attempts - 1), RETRY_MAX_SECONDS))
+
+
+def process_event(record: StripeWebhookEvent) -> str:
+    """Run the handler for a claimed event and record the outcome. Returns the new status."""
+    event = stripe.Event.construct_from(record.payload, settings.STRIPE_SECRET_KEY)
+    record.attempts += 1
+    try:
+        with transaction.atomic():
+            handled = DISPATCHERS[record.handler](record.event_type, event['data']['object'])
+    except Exception as e:
+        record.last_error = f"{type(e).__name__}: {e}"
+        if record.attempts >= MAX_ATTEMPTS:
+            record.status = 'failed'
+            logger.error(f"[WebhookInbox] {record.event_type} {record.event_id} failed permanently: {e}")
+        else:
+            record.next_attempt_at = timezone.now() + _retry_delay(record.attempts)
+            logger.warning(
+                f"[WebhookInbox] {record.event_type} {record.event_id} failed "
+                f"(attempt {record.attempts}/{MAX_ATTEMPTS}): {e}"
+            )
+    else:
+        record.status = 'processed' if handled else 'ignored'
+        record.processed_at = timezone.now()
+        record.last_error = ''
+
+    record.save(update_fields=['status', 'attempts', 'next_attempt_at', 'last_error', 'processed_at', 'updated_at'])
+    return record.status
+
+
+def process_pending_events(limit: int = 100) -> Dict[str, int]:
+    """Drain up to `limit` events, one transaction per event. Safe to run concurrently."""
+    counts = {'processed': 0, 'ignored': 0, 'retrying': 0, 'failed': 0}
+    for _ in range(limit):
+        with transaction.atomic():
+            record = _claimable().select_for_update(skip_locked=True).order_by('stripe_created', 'pk').first()
+            if record is None:
+                break
+            status = process_event(record)
+        counts['retrying' if status == 'pending' else status] += 1
+    return counts
+
+
+def requeue_failed(event_ids: Optional[list] = None) -> int:
+    """Give failed events a fresh set of attempts."""
+    queryset = StripeWebhookEvent.objects.filter(status='failed')
+    if event_ids:
+        queryset = queryset.filter(event_id__in=event_ids)
+    return queryset.update(status='pending', attempts=0, next_attempt_at=timezone.now())
+
+
+# ── Metrics ──────────────────────────────────────────────────────────────────
+
+def inbox_metrics() -> Dict[str, Any]:
+    """Backlog, lag and failure counts for monitoring."""
+    now = timezone.now()
+    hour_ago = now - timedelta(hours=1)
+
+    backlog = StripeWebhookEvent.objects.filter(status='pending').aggregate(
+        pending=Count('pk'),
+        retrying=Count('pk', filter=Q(attempts__gt=0)),
+        oldest=Min('created_at'),
+    )
+    recent = StripeWebhookEvent.objects.filter(processed_at__gte=hour_ago).aggregate(
+        processed=Count('pk'),
+        avg_lag=Avg(F('processed_at') - F('created_at')),
+    )
+
+    return {
+        'pending': backlog['pending'],
+        'retrying': backlog['retrying'],
+        'failed': StripeWebhookEvent.objects.filter(status='failed').count(),
+        'oldest_pending_seconds': (now - backlog['oldest']).total_seconds() if backlog['oldest'] else 0,
+        'processed_last_hour': recent['processed'],
+        'avg_lag_seconds_last_hour': recent['avg_lag'].total_seconds() if recent['avg_lag'] else 0,
+    }
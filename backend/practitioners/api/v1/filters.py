@@ -5,6 +5,7 @@ import django_filters
 from django.db.models import Q
 from practitioners.models import Practitioner
 from services.models import ServiceCategory, ServiceType
+from utils.search import apply_text_search
 
 
 class PractitionerFilter(django_filters.FilterSet):
@@ -88,6 +89,13 @@ class PractitionerFilter(django_filters.FilterSet):
         label='Maximum Price'
     )
     
+    # Rating (denormalized, indexed)
+    min_rating = django_filters.NumberFilter(
+        field_name='rating_avg',
+        lookup_expr='gte',
+        label='Minimum Average Rating'
+    )
+    
     # Status filters
     is_verified = django_filters.BooleanFilter(
         field_name='is_verified',
@@ -137,7 +145,7 @@ class PractitionerFilter(django_filters.FilterSet):
         fields = [
             'city', 'state', 'country', 'service_type', 'service_category',
             'specialization', 'style', 'topic', 'modality', 'modality_id', 'modality_category',
-            'min_experience', 'max_experience', 'min_price', 'max_price',
+            'min_experience', 'max_experience', 'min_price', 'max_price', 'min_rating',
             'is_verified', 'featured', 'practitioner_status',
             'available_now', 'location_type', 'language', 'search'
         ]
@@ -157,11 +165,14 @@ class PractitionerFilter(django_filters.FilterSet):
         ).distinct()
     
     def filter_available_now(self, queryset, name, value):
-        """Filter practitioners available now"""
+        """Filter practitioners with a bookable slot in the next 24 hours"""
         if value:
+            from datetime import timedelta
             from django.utils import timezone
+            # next_available_date holds the first *future* bookable slot
+            # (see practitioners.utils.next_available), so "now" means soon.
             return queryset.filter(
-                next_available_date__lte=timezone.now()
+                next_available_date__lte=timezone.now() + timedelta(hours=24)
             )
         return queryset
     
@@ -181,16 +192,7 @@ class PractitionerFilter(django_filters.FilterSet):
     
     def filter_search(self, queryset, name, value):
         """Full text search across multiple fields including modality names"""
-        return queryset.filter(
-            Q(display_name__icontains=value) |
-            Q(professional_title__icontains=value) |
-            Q(bio__icontains=value) |
-            Q(user__first_name__icontains=value) |
-            Q(user__last_name__icontains=value) |
-            Q(specializations__content__icontains=value) |
-            Q(primary_services__name__icontains=value) |
-            Q(modalities__name__icontains=value)
-        ).distinct()
+        return apply_text_search(queryset, value, 'display_name')
 
     def filter_modality(self, queryset, name, value):
         """Filter by modality slug(s) - supports comma-separated values"""
@@ -3,7 +3,6 @@ DRF Serializers for Practitioners API
 """
 from rest_framework import serializers
 from django.db import transaction
-from django.db.models import Avg, Count, Min, Max, Q
 from django.utils import timezone
 from decimal import Decimal
 
@@ -15,7 +14,6 @@ from practitioners.models import (
 )
 from locations.models import PractitionerLocation
 from services.models import Service, ServiceType
-from reviews.models import Review
 from payments.models import PractitionerSubscription
 from users.models import User
 from common.models import Modality, ModalityCategory
@@ -174,45 +172,19 @@ class PractitionerListSerializer(serializers.ModelSerializer):
         read_only_fields = fields
     
     def get_average_rating(self, obj):
-        """Calculate average rating from reviews (uses annotation if available)"""
-        if hasattr(obj, '_average_rating'):
-            return round(obj._average_rating or 0, 2)
-        # Fallback for non-annotated querysets
-        result = Review.objects.filter(
-            practitioner=obj,
-            is_published=True
-        ).aggregate(avg_rating=Avg('rating'))
-        return round(result['avg_rating'] or 0, 2)
+        return obj.average_rating
 
     def get_total_reviews(self, obj):
-        """Count total published reviews (uses annotation if available)"""
-        if hasattr(obj, '_total_reviews'):
-            return obj._total_reviews or 0
-        return Review.objects.filter(
-            practitioner=obj,
-            is_published=True
-        ).count()
+        return obj.total_reviews
 
     def get_total_services(self, obj):
-        """Count total active services (uses annotation if available)"""
-        if hasattr(obj, '_total_services'):
-            return obj._total_services or 0
-        return obj.primary_services.filter(is_active=True).count()
+        return obj.total_services
 
     def get_price_range(self, obj):
-        """Get min and max price from active services (uses annotation if available)"""
-        if hasattr(obj, '_min_price'):
-            return {
-                'min': Decimal(obj._min_price) / 100 if obj._min_price else None,
-                'max': Decimal(obj._max_price) / 100 if obj._max_price else None,
-            }
-        result = obj.primary_services.filter(is_active=True).aggregate(
-            min_price=Min('price_cents'),
-            max_price=Max('price_cents')
-        )
+        """Active service price range in dollars"""
         return {
-            'min': Decimal(result['min_price']) / 100 if result['min_price'] else None,
-            'max': Decimal(result['max_price']) / 100 if result['max_price'] else None
+            'min': Decimal(obj.min_price_cents) / 100 if obj.min_price_cents else None,
+            'max': Decimal(obj.max_price_cents) / 100 if obj.max_price_cents else None,
         }
 
 
@@ -547,6 +519,8 @@ class AvailabilityQuerySerializer(serializers.Serializer):
 
 class PractitionerSearchSerializer(serializers.Serializer):
     """Serializer for practitioner search/filter parameters"""
+    q = serializers.CharField(required=False, allow_blank=True, help_text="Search query")
+    
     # Location filters
     city = serializers.CharField(required=False, allow_blank=True)
     state = serializers.CharField(required=False, allow_blank=True)
@@ -610,7 +584,8 @@ class PractitionerSearchSerializer(serializers.Serializer):
         child=serializers.CharField(),
         required=False
     )
-    is_verified = serializers.BooleanField(required=False)
+    # allow_null: an omitted query param must not become is_verified=False
+    is_verified = serializers.BooleanField(required=False, allow_null=True)
     featured_only = serializers.BooleanField(default=False)
     
     # Sorting
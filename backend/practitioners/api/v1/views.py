@@ -1,17 +1,18 @@
 """
 DRF ViewSets for Practitioners API
 """
-from rest_framework import viewsets, status, filters
+from rest_framework import viewsets, status, filters, serializers
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Q, Avg, Count, Min, Max, Prefetch, F, Sum, OuterRef, Subquery
+from django.db.models import Q, Count, Max, Prefetch, F, Sum, OuterRef, Subquery
 from django.db import transaction
 from django.utils import timezone
 from django.shortcuts import get_object_or_404
+from django.http import StreamingHttpResponse
 from datetime import datetime, timedelta
-from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiParameter
+from drf_spectacular.utils import extend_schema, extend_schema_view, inline_serializer, OpenApiParameter
 
 from practitioners.models import (
     Practitioner, Schedule, ScheduleTimeSlot, SchedulePreference,
@@ -38,7 +39,13 @@ from .serializers import (
 )
 from .permissions import IsPractitionerOwner, IsPractitionerOrReadOnly
 from .filters import PractitionerFilter
+from practitioners.utils.dashboard_stats import get_dashboard_stats, measure_queries
+from practitioners.utils.transactions import stream_transactions_csv, transaction_bookings, transaction_rows
+from core.api.pagination import FeedCursorPagination
+from locations.utils import MILES_PER_KM, annotate_practitioner_distance
+from utils.search import RelevanceOrderingFilter, apply_text_search
 from emails.services import PractitionerEmailService
+from analytics.page_views import page_view_totals, record_practitioner_view, viewer_id
 
 
 @extend_schema_view(
@@ -62,6 +69,7 @@ from emails.services import PractitionerEmailService
     client_note_detail=extend_schema(tags=['Practitioners']),
     earnings=extend_schema(tags=['Practitioners']),
     transactions=extend_schema(tags=['Practitioners']),
+    transactions_export=extend_schema(tags=['Practitioners']),
     balance=extend_schema(tags=['Practitioners']),
     payouts=extend_schema(tags=['Practitioners']),
     request_payout=extend_schema(tags=['Practitioners']),
@@ -85,10 +93,10 @@ class PractitionerViewSet(viewsets.ModelViewSet):
     - Application process for new practitioners
     - Verification status tracking
     """
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    # ?search= is handled by PractitionerFilter against the full-text index
+    filter_backends = [DjangoFilterBackend, RelevanceOrderingFilter]
     filterset_class = PractitionerFilter
-    search_fields = ['display_name', 'bio', 'professional_title']
-    ordering_fields = ['created_at', 'years_of_experience', 'featured']
+    ordering_fields = ['created_at', 'years_of_experience', 'featured', 'rating_avg', 'rating_count']
     ordering = ['-featured', '-created_at']
     
     def get_queryset(self):
@@ -103,15 +111,6 @@ class PractitionerViewSet(viewsets.ModelViewSet):
                 queryset=Service.objects.filter(is_active=True)
             )
         )
-        
-        # Add annotations so the serializer doesn't need to query per-practitioner
-        queryset = queryset.annotate(
-            _average_rating=Avg('reviews__rating', filter=Q(reviews__is_published=True)),
-            _total_reviews=Count('reviews', filter=Q(reviews__is_published=True)),
-            _total_services=Count('primary_services', filter=Q(primary_services__is_active=True)),
-            _min_price=Min('primary_services__price_cents', filter=Q(primary_services__is_active=True)),
-            _max_price=Max('primary_services__price_cents', filter=Q(primary_services__is_active=True)),
-        )
 
         # For public views, only show active and verified practitioners
         if self.action in ['list', 'retrieve']:
@@ -241,6 +240,10 @@ class PractitionerViewSet(viewsets.ModelViewSet):
         # Start with base queryset
         queryset = self.get_queryset()
         
+        # Text search against the full-text index
+        if filters.get('q'):
+            queryset = apply_text_search(queryset, filters['q'], 'display_name')
+        
         # Apply location filters
         if filters.get('city'):
             queryset = queryset.filter(primary_location__city__icontains=filters['city'])
@@ -249,10 +252,15 @@ class PractitionerViewSet(viewsets.ModelViewSet):
         if filters.get('country'):
             queryset = queryset.filter(primary_location__country__icontains=filters['country'])
         
-        # Location-based radius search
-        if filters.get('latitude') and filters.get('longitude'):
-            # TODO: Implement geographic distance calculation
-            pass
+        # Location-based radius search (bounding-box prefilter + exact distance in SQL)
+        has_coordinates = filters.get('latitude') is not None and filters.get('longitude') is not None
+        if has_coordinates:
+            queryset = annotate_practitioner_distance(
+                queryset,
+                filters['latitude'],
+                filters['longitude'],
+                (filters.get('radius_km') or 10) * MILES_PER_KM
+            )
         
         # Service type and category filters
         if filters.get('service_type_ids'):
@@ -306,9 +314,7 @@ class PractitionerViewSet(viewsets.ModelViewSet):
         
         # Rating filter
         if filters.get('min_rating'):
-            queryset = queryset.annotate(
-                avg_rating=Avg('reviews__rating', filter=Q(reviews__is_published=True))
-            ).filter(avg_rating__gte=filters['min_rating'])
+            queryset = queryset.filter(rating_avg__gte=filters['min_rating'])
         
         # Language filter
         if filters.get('languages'):
@@ -327,21 +333,19 @@ class PractitionerViewSet(viewsets.ModelViewSet):
         # Apply sorting
         sort_by = filters.get('sort_by', 'relevance')
         if sort_by == 'rating':
-            queryset = queryset.annotate(
-                avg_rating=Avg('reviews__rating', filter=Q(reviews__is_published=True))
-            ).order_by('-avg_rating', '-featured')
+            queryset = queryset.order_by('-rating_avg', '-rating_count', '-featured')
         elif sort_by == 'price_low':
-            queryset = queryset.annotate(
-                min_price=Min('primary_services__price_cents')
-            ).order_by('min_price')
+            queryset = queryset.order_by(F('min_price_cents').asc(nulls_last=True))
         elif sort_by == 'price_high':
-            queryset = queryset.annotate(
-                max_price=Max('primary_services__price_cents')
-            ).order_by('-max_price')
+            queryset = queryset.order_by(F('max_price_cents').desc(nulls_last=True))
         elif sort_by == 'experience':
             queryset = queryset.order_by('-years_of_experience', '-featured')
         elif sort_by == 'availability':
             queryset = queryset.order_by('next_available_date', '-featured')
+        elif sort_by == 'distance' and has_coordinates:
+            queryset = queryset.order_by('distance_miles', '-featured')
+        elif filters.get('q'):  # relevance with a text query
+            queryset = queryset.order_by('-search_rank', '-featured')
         else:  # relevance or default
             queryset = queryset.order_by('-featured', '-is_verified', '-years_of_experience')
         
@@ -358,7 +362,8 @@ class PractitionerViewSet(viewsets.ModelViewSet):
     def stats(self, request):
         """
         Get dashboard statistics for the practitioner.
-        Returns bookings, revenue, clients, and rating stats.
+        Returns bookings, revenue, clients, and rating stats, plus the query
+        count and latency of producing them under 'meta'.
         """
         try:
             practitioner = request.user.practitioner_profile
@@ -368,101 +373,10 @@ class PractitionerViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_404_NOT_FOUND
             )
         
-        # Calculate date ranges
-        now = timezone.now()
-        current_month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-        last_month_start = (current_month_start - timedelta(days=1)).replace(day=1)
-        
-        # Get current month stats
-        # 'completed' is no longer a valid Booking status (moved to ServiceSession per migration 0020).
-        # Use 'confirmed' for active bookings; exclude canceled for broad queries.
-        current_month_bookings = Booking.objects.filter(
-            practitioner=practitioner,
-            created_at__gte=current_month_start,
-            status='confirmed'
-        )
-        
-        # Get last month stats for comparison
-        last_month_bookings = Booking.objects.filter(
-            practitioner=practitioner,
-            created_at__gte=last_month_start,
-            created_at__lt=current_month_start,
-            status='confirmed'
-        )
-        
-        # Calculate stats
-        total_bookings = current_month_bookings.count()
-        total_bookings_last = last_month_bookings.count()
+        with measure_queries() as timing:
+            stats, cached = get_dashboard_stats(practitioner)
         
-        # Revenue uses ServiceSession.status='completed' since event lifecycle moved there
-        total_revenue = current_month_bookings.filter(
-            service_session__status='completed'
-        ).aggregate(
-            total=Sum('credits_allocated')
-        )['total'] or 0
-
-        total_revenue_last = last_month_bookings.filter(
-            service_session__status='completed'
-        ).aggregate(
-            total=Sum('credits_allocated')
-        )['total'] or 0
-        
-        # Active clients (unique users with bookings in the last 30 days)
-        active_clients = User.objects.filter(
-            bookings__practitioner=practitioner,
-            bookings__created_at__gte=now - timedelta(days=30),
-            bookings__status='confirmed'
-        ).distinct().count()
-
-        active_clients_last = User.objects.filter(
-            bookings__practitioner=practitioner,
-            bookings__created_at__gte=now - timedelta(days=60),
-            bookings__created_at__lt=now - timedelta(days=30),
-            bookings__status='confirmed'
-        ).distinct().count()
-        
-        # Average rating
-        from reviews.models import Review
-        rating_data = Review.objects.filter(
-            practitioner=practitioner,
-            is_published=True
-        ).aggregate(
-            avg_rating=Avg('rating'),
-            total_reviews=Count('id')
-        )
-        
-        # Calculate percentage changes
-        def calculate_change(current, previous):
-            if previous == 0:
-                return 100 if current > 0 else 0
-            return round(((current - previous) / previous) * 100, 1)
-        
-        stats = {
-            'total_bookings': {
-                'value': total_bookings,
-                'change': calculate_change(total_bookings, total_bookings_last),
-                'is_positive': total_bookings >= total_bookings_last
-            },
-            'total_revenue': {
-                'value': total_revenue,
-                'value_display': f"${total_revenue / 100:,.2f}",
-                'change': calculate_change(total_revenue, total_revenue_last),
-                'is_positive': total_revenue >= total_revenue_last
-            },
-            'active_clients': {
-                'value': active_clients,
-                'change': calculate_change(active_clients, active_clients_last),
-                'is_positive': active_clients >= active_clients_last
-            },
-            'average_rating': {
-                'value': round(rating_data['avg_rating'] or 0, 1),
-                'total_reviews': rating_data['total_reviews'],
-                'change': 0,  # Rating changes are calculated differently
-                'is_positive': True
-            }
-        }
-        
-        return Response(stats)
+        return Response({**stats, 'meta': {**timing, 'cached': cached}})
     
     @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
     def clients(self, request):
@@ -835,6 +749,7 @@ class PractitionerViewSet(viewsets.ModelViewSet):
     def transactions(self, request):
         """
         Get practitioner transactions with extensive filtering.
+        Pages by cursor, newest first.
         """
         try:
             practitioner = request.user.practitioner_profile
@@ -844,96 +759,37 @@ class PractitionerViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_404_NOT_FOUND
             )
         
-        # Get all bookings for this practitioner
-        bookings = Booking.objects.filter(
-            practitioner=practitioner
-        ).exclude(
-            status__in=['draft', 'pending_payment']
-        ).select_related(
-            'user', 'service'
-        ).order_by('-created_at')
-        
-        # Apply filters
-        status = request.query_params.get('status')
-        if status:
-            bookings = bookings.filter(status=status)
-        
-        service_type = request.query_params.get('service_type')
-        if service_type:
-            bookings = bookings.filter(service__service_type=service_type)
-        
-        client_id = request.query_params.get('client')
-        if client_id:
-            bookings = bookings.filter(user_id=client_id)
-        
-        start_date = request.query_params.get('start_date')
-        if start_date:
-            bookings = bookings.filter(created_at__gte=start_date)
-        
-        end_date = request.query_params.get('end_date')
-        if end_date:
-            bookings = bookings.filter(created_at__lte=end_date)
+        bookings = transaction_bookings(practitioner, request.query_params)
         
-        # Paginate
-        page = self.paginate_queryset(bookings)
-        
-        # Format transactions
-        from payments.models import EarningsTransaction
-        transactions = []
-        for booking in (page if page is not None else bookings):
-            # Get earnings transaction for commission data
-            earnings_tx = EarningsTransaction.objects.filter(
-                booking=booking,
-                practitioner=practitioner
-            ).first()
-
-            # Get the booking amount from earnings, order, or service price
-            if earnings_tx:
-                amount_cents = earnings_tx.gross_amount_cents
-                commission_cents = earnings_tx.commission_amount_cents
-                net_amount_cents = earnings_tx.net_amount_cents
-            else:
-                # Fallback: get from order or service price
-                order = getattr(booking, 'order', None)
-                if order and order.total_amount_cents:
-                    amount_cents = order.total_amount_cents
-                elif booking.service and booking.service.price_cents:
-                    amount_cents = booking.service.price_cents
-                else:
-                    amount_cents = 0
-                # Default 15% commission calculation
-                commission_cents = int(amount_cents * 0.15)
-                net_amount_cents = amount_cents - commission_cents
-
-            transaction = {
-                'id': f"TXN-{booking.id}",
-                'booking_id': booking.id,
-                'date': booking.created_at,
-                'type': 'booking',
-                'status': booking.status,
-                'client': {
-                    'id': booking.user.id,
-                    'name': booking.user.get_full_name() or booking.user.email,
-                    'email': booking.user.email
-                },
-                'service': {
-                    'id': booking.service.id,
-                    'title': booking.service.name,  # Service model uses 'name' not 'title'
-                    'type': booking.service.service_type.code  # Use 'code' field for the type identifier
-                },
-                'amount': amount_cents,
-                'amount_display': f"${amount_cents / 100:,.2f}" if amount_cents else "$0.00",
-                'commission': commission_cents,
-                'commission_display': f"${commission_cents / 100:,.2f}",
-                'net_amount': net_amount_cents,
-                'net_amount_display': f"${net_amount_cents / 100:,.2f}",
-            }
-            transactions.append(transaction)
-        
-        if page is not None:
-            return self.get_paginated_response(transactions)
+        # Keyset pages over (created_at, id): deep pages cost the same as the first
+        paginator = FeedCursorPagination()
+        paginator.ordering = ('-created_at', '-id')
+        page = paginator.paginate_queryset(bookings, request, view=self)
+        return paginator.get_paginated_response(transaction_rows(practitioner, page))
+    
+    @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated], url_path='transactions/export')
+    def transactions_export(self, request):
+        """
+        Stream the practitioner's transactions as CSV.
+        Takes the same filters as the transactions list.
+        """
+        try:
+            practitioner = request.user.practitioner_profile
+        except Practitioner.DoesNotExist:
+            return Response(
+                {"detail": "You are not registered as a practitioner"},
+                status=status.HTTP_404_NOT_FOUND
+            )
         
-        return Response(transactions)
+        bookings = transaction_bookings(practitioner, request.query_params)
+        response = StreamingHttpResponse(
+            stream_transactions_csv(practitioner, bookings),
+            content_type='text/csv'
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="transactions-{timezone.now():%Y-%m-%d}.csv"'
+        )
+        return response
     
     @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
     def balance(self, request):
@@ -1116,25 +972,15 @@ class PractitionerViewSet(viewsets.ModelViewSet):
                     status=status.HTTP_400_BAD_REQUEST
                 )
             
-            # Create payout record
-            payout = PractitionerPayout.objects.create(
+            # Create payout record, link the earnings transactions to it and
+            # move them out of the available balance
+            payout = PractitionerPayout.create_batch_payout(
                 practitioner=practitioner,
-                credits_payout_cents=earnings.available_balance_cents,
+                transactions=available_transactions,
                 transaction_fee_cents=fee_cents,
-                payment_method=payout_method,
-                status='pending'
-            )
-            
-            # Link earnings transactions to payout
-            available_transactions.update(
-                payout=payout,
-                status='processing'
+                payment_method=payout_method
             )
             
-            # Update earnings balance
-            earnings.available_balance_cents = 0
-            earnings.save()
-            
             # TODO: Trigger Stripe payout via Temporal workflow
             
         return Response({
@@ -1170,12 +1016,23 @@ class PractitionerViewSet(viewsets.ModelViewSet):
         end_date = timezone.now()
         start_date = end_date - timedelta(days=days)
         
-        # Profile views (simulated for now)
-        import random
+        # Profile views from the daily page view counters
+        views = page_view_totals(
+            practitioner.id,
+            start_date.date(),
+            end_date.date(),
+            previous_start=(start_date - timedelta(days=days)).date()
+        )
+        previous_views = views['previous_profile_views']
+        if previous_views:
+            views_trend = round((views['profile_views'] - previous_views) / previous_views * 100, 1)
+        else:
+            views_trend = 100 if views['profile_views'] else 0
         profile_views = {
-            'total': random.randint(100, 500),
-            'trend': random.uniform(-10, 20),
-            'daily_average': random.randint(3, 15)
+            'total': views['profile_views'],
+            'trend': views_trend,
+            'daily_average': round(views['profile_views'] / days, 1) if days > 0 else 0,
+            'service_views': views['service_views']
         }
         
         # Booking analytics
@@ -1195,7 +1052,7 @@ class PractitionerViewSet(viewsets.ModelViewSet):
         
         # Service popularity
         service_popularity = bookings.values(
-            'service__title', 'service__service_type'
+            'service__name', 'service__service_type__code'
         ).annotate(
             count=Count('id'),
             revenue=Sum('order__total_amount_cents')
@@ -1220,14 +1077,15 @@ class PractitionerViewSet(viewsets.ModelViewSet):
         
         # Peak booking times
         from django.db.models.functions import ExtractHour, ExtractWeekDay
-        peak_hours = bookings.annotate(
-            hour=ExtractHour('start_time')
+        scheduled = bookings.filter(service_session__isnull=False)
+        peak_hours = scheduled.annotate(
+            hour=ExtractHour('service_session__start_time')
         ).values('hour').annotate(
             count=Count('id')
         ).order_by('-count')[:5]
         
-        peak_days = bookings.annotate(
-            weekday=ExtractWeekDay('start_time')
+        peak_days = scheduled.annotate(
+            weekday=ExtractWeekDay('service_session__start_time')
         ).values('weekday').annotate(
             count=Count('id')
         ).order_by('-count')
@@ -1247,8 +1105,8 @@ class PractitionerViewSet(viewsets.ModelViewSet):
             },
             'service_popularity': [
                 {
-                    'title': item['service__title'],
-                    'type': item['service__service_type'],
+                    'title': item['service__name'],
+                    'type': item['service__service_type__code'],
                     'bookings': item['count'],
                     'revenue': item['revenue'],
                     'revenue_display': f"${item['revenue'] / 100:,.2f}" if item['revenue'] else "$0.00"
@@ -1494,10 +1352,10 @@ class PublicPractitionerViewSet(viewsets.ReadOnlyModelViewSet):
     """
     serializer_class = PractitionerDetailSerializer
     permission_classes = [AllowAny]  # Public access
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    # ?search= is handled by PractitionerFilter against the full-text index
+    filter_backends = [DjangoFilterBackend, RelevanceOrderingFilter]
     filterset_class = PractitionerFilter
-    search_fields = ['display_name', 'bio', 'professional_title']
-    ordering_fields = ['created_at', 'years_of_experience', 'featured']
+    ordering_fields = ['created_at', 'years_of_experience', 'featured', 'rating_avg', 'rating_count']
     ordering = ['-featured', '-created_at']
     lookup_field = 'public_uuid'
     lookup_url_kwarg = 'public_uuid'
@@ -1536,6 +1394,38 @@ class PublicPractitionerViewSet(viewsets.ReadOnlyModelViewSet):
                 status=status.HTTP_404_NOT_FOUND
             )
 
+    @extend_schema(
+        tags=['Public Practitioners'],
+        request=inline_serializer(
+            name='PublicPractitionerViewRequest',
+            fields={'session_id': serializers.CharField(
+                required=False, max_length=100,
+                help_text='Anonymous id kept by the browser, so a visitor is counted once per day'
+            )}
+        )
+    )
+    @action(detail=True, methods=['post'])
+    def view(self, request, public_uuid=None):
+        """
+        Record a view of the practitioner's public profile, once per viewer per day.
+        Counts are buffered and flushed by flush_page_view_counters.
+        """
+        practitioner = Practitioner.objects.filter(
+            public_uuid=public_uuid, practitioner_status='active'
+        ).values('id', 'user_id').first()
+        if practitioner is None:
+            return Response(
+                {"detail": "Practitioner not found"},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        # Practitioners looking at their own profile are not counted
+        if practitioner['user_id'] == request.user.id:
+            return Response({'viewed': False})
+
+        viewed = record_practitioner_view(practitioner['id'], viewer_id(request))
+        return Response({'viewed': viewed})
+
 
 class ScheduleViewSet(viewsets.ModelViewSet):
     """
@@ -1773,20 +1663,13 @@ class AvailabilityViewSet(viewsets.ViewSet):
                 status=status.HTTP_404_NOT_FOUND
             )
         
-        # Calculate next available date
-        # TODO: Implement AvailabilityCalculator
-        # calculator = AvailabilityCalculator(practitioner)
-        # next_available = calculator.calculate_next_available_date()
-        
-        # For now, set next available to tomorrow
-        next_available = timezone.now() + timedelta(days=1)
-        
-        # Update practitioner
-        practitioner.next_available_date = next_available
-        practitioner.save(update_fields=['next_available_date'])
+        # Recompute immediately rather than waiting for the periodic pipeline
+        from practitioners.utils.next_available import refresh_next_available_dates
+        refresh_next_available_dates([practitioner.id])
+        practitioner.refresh_from_db(fields=['next_available_date'])
         
         return Response({
-            'next_available_date': next_available
+            'next_available_date': practitioner.next_available_date
         })
 
 
@@ -5,3 +5,7 @@ class PractitionersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'practitioners'
     verbose_name = 'Practitioners'
+
+    def ready(self):
+        """Import signals when app is ready."""
+        import practitioners.signals
@@ -0,0 +1,144 @@
+"""
+Benchmark the interval availability engine against the legacy per-day implementation.
+
+By default a synthetic practitioner (weekly template, booking history and a
+365-day booking window) is created inside a transaction that is rolled back at
+the end. Pass --service-id to benchmark against existing data instead.
+
+Usage:
+    python manage.py benchmark_availability
+    python manage.py benchmark_availability --service-id 42 --days 30 90 365 --repeat 5
+"""
+import time as time_module
+from datetime import time, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from practitioners.utils.availability import (
+    get_practitioner_availability, get_practitioner_availability_legacy
+)
+
+
+class _Rollback(Exception):
+    """Raised to discard synthetic benchmark data."""
+
+
+class Command(BaseCommand):
+    help = 'Compare legacy and interval-engine availability (timing, query count, parity)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--service-id', type=int, help='Benchmark an existing service')
+        parser.add_argument('--days', type=int, nargs='+', default=[30, 90, 365],
+                            help='Window sizes in days (default: 30 90 365)')
+        parser.add_argument('--repeat', type=int, default=3, help='Runs per measurement (best is reported)')
+        parser.add_argument('--bookings', type=int, default=400,
+                            help='Synthetic bookings to create (synthetic mode only)')
+
+    def handle(self, *args, **options):
+        if options['service_id']:
+            self._run(options['service_id'], options['days'], options['repeat'])
+            return
+
+        try:
+            with transaction.atomic():
+                service_id = self._create_synthetic_data(options['bookings'])
+                self._run(service_id, options['days'], options['repeat'])
+                raise _Rollback()
+        except _Rollback:
+            self.stdout.write('Synthetic data rolled back.')
+
+    def _run(self, service_id, days_list, repeat):
+        start_date = timezone.now().date()
+        self.stdout.write(self.style.SUCCESS(f'\n=== AVAILABILITY BENCHMARK (service {service_id}) ===\n'))
+        self.stdout.write(f'{"days":>6} {"slots":>7} {"legacy ms":>10} {"q":>5} {"engine ms":>10} {"q":>5} {"speedup":>8}')
+
+        for days in days_list:
+            end_date = start_date + timedelta(days=days)
+            legacy, legacy_ms, legacy_q = self._measure(
+                get_practitioner_availability_legacy, service_id, start_date, end_date, repeat
+            )
+            engine, engine_ms, engine_q = self._measure(
+                get_practitioner_availability, service_id, start_date, end_date, repeat
+            )
+            if legacy != engine:
+                raise CommandError(
+                    f'Result mismatch for {days} days: legacy={len(legacy)} slots, engine={len(engine)} slots'
+                )
+
+            speedup = legacy_ms / engine_ms if engine_ms else float('inf')
+            self.stdout.write(
+                f'{days:>6} {len(engine):>7} {legacy_ms:>10.1f} {legacy_q:>5} '
+                f'{engine_ms:>10.1f} {engine_q:>5} {speedup:>7.1f}x'
+            )
+
+        self.stdout.write(self.style.SUCCESS('\nResults identical for all windows.'))
+
+    def _measure(self, func, service_id, start_date, end_date, repeat):
+        best = None
+        result = None
+        queries = 0
+        for _ in range(max(1, repeat)):
+            with CaptureQueriesContext(connection) as ctx:
+                started = time_module.perf_counter()
+                result = func(service_id, start_date, end_date)
+                elapsed = (time_module.perf_counter() - started) * 1000
+            queries = len(ctx.captured_queries)
+            best = elapsed if best is None else min(best, elapsed)
+        return result, best, queries
+
+    def _create_synthetic_data(self, booking_count):
+        from bookings.models import Booking
+        from practitioners.models import (
+            Practitioner, Schedule, SchedulePreference, ScheduleTimeSlot
+        )
+        from services.models import Service, ServiceSession, ServiceType
+        from users.models import User
+
+        stamp = int(time_module.time())
+        user = User.objects.create_user(email=f'bench-practitioner-{stamp}@example.com', password=None)
+        client = User.objects.create_user(email=f'bench-client-{stamp}@example.com', password=None)
+        practitioner = Practitioner.objects.create(
+            user=user, display_name='Benchmark Practitioner', buffer_time=15
+        )
+        SchedulePreference.objects.create(
+            practitioner=practitioner,
+            timezone='America/New_York',
+            advance_booking_min_hours=0,
+            advance_booking_max_days=366
+        )
+        service_type, _ = ServiceType.objects.get_or_create(code='session', defaults={'name': 'Session'})
+        service = Service.objects.create(
+            name='Benchmark Session',
+            slug=f'benchmark-session-{stamp}',
+            price_cents=10000,
+            duration_minutes=60,
+            service_type=service_type,
+            primary_practitioner=practitioner,
+            location_type='in_person'
+        )
+        schedule = Schedule.objects.create(
+            practitioner=practitioner, name='Benchmark Hours', is_default=True, timezone='America/New_York'
+        )
+        ScheduleTimeSlot.objects.bulk_create([
+            ScheduleTimeSlot(schedule=schedule, day=day, start_time=start, end_time=end)
+            for day in range(6)
+            for start, end in ((time(8, 0), time(12, 0)), (time(13, 0), time(19, 0)))
+        ])
+
+        first = timezone.now().replace(hour=13, minute=0, second=0, microsecond=0) + timedelta(days=1)
+        for i in range(booking_count):
+            start = first + timedelta(days=(i * 365) // max(booking_count, 1), hours=i % 6)
+            session = ServiceSession.objects.create(
+                service=service, start_time=start, end_time=start + timedelta(minutes=60)
+            )
+            Booking.objects.create(
+                user=client,
+                practitioner=practitioner,
+                service=service,
+                service_session=session,
+                status='confirmed'
+            )
+        return service.id
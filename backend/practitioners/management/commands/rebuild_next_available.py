@@ -0,0 +1,41 @@
+"""
+Recompute Practitioner.next_available_date.
+
+By default only stale practitioners (and those whose stored slot has passed)
+are recomputed, exactly like the periodic task. Use --all for a full backfill.
+
+Usage:
+    python manage.py rebuild_next_available
+    python manage.py rebuild_next_available --all
+    python manage.py rebuild_next_available --practitioner-id 42
+"""
+import time as time_module
+
+from django.core.management.base import BaseCommand
+
+from practitioners.models import Practitioner
+from practitioners.utils.next_available import refresh_next_available_dates, stale_practitioner_ids
+
+
+class Command(BaseCommand):
+    help = 'Recompute next_available_date for stale (or all) practitioners'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='Recompute every practitioner')
+        parser.add_argument('--practitioner-id', type=int, nargs='+', help='Recompute specific practitioners')
+
+    def handle(self, *args, **options):
+        if options['practitioner_id']:
+            practitioner_ids = options['practitioner_id']
+        elif options['all']:
+            practitioner_ids = list(Practitioner.objects.order_by('id').values_list('id', flat=True))
+        else:
+            practitioner_ids = stale_practitioner_ids()
+
+        started = time_module.perf_counter()
+        updated = refresh_next_available_dates(practitioner_ids)
+        elapsed = time_module.perf_counter() - started
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Checked {len(practitioner_ids)} practitioners, updated {updated} in {elapsed:.2f}s'
+        ))
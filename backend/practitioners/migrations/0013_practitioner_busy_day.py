@@ -0,0 +1,29 @@
+# Generated by Django 5.1.3 on 2026-10-16 19:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('practitioners', '0012_add_user_and_feedback_type_to_feature_request'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PractitionerBusyDay',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('date', models.DateField(help_text='UTC date this bitmap covers')),
+                ('busy_bitmap', models.BinaryField(help_text='1440-bit minute bitmap of booked time')),
+                ('busy_minutes', models.PositiveIntegerField(default=0, help_text='Number of booked minutes')),
+                ('practitioner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='busy_days', to='practitioners.practitioner')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('practitioner', 'date'), name='unique_busy_day_per_practitioner')],
+            },
+        ),
+    ]
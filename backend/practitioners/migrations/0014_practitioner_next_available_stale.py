@@ -0,0 +1,27 @@
+# Generated by Django 5.1.3 on 2026-10-16 19:43
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0009_seed_modalities_v6'),
+        ('locations', '0002_initial'),
+        ('payments', '0014_add_credit_applied_transaction_type'),
+        ('practitioners', '0013_practitioner_busy_day'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='practitioner',
+            name='next_available_stale',
+            field=models.BooleanField(default=True, help_text='Set when schedules or bookings change; cleared when next_available_date is recomputed'),
+        ),
+        migrations.AddIndex(
+            model_name='practitioner',
+            index=models.Index(condition=models.Q(('next_available_stale', True)), fields=['id'], name='practitioner_avail_stale_idx'),
+        ),
+    ]
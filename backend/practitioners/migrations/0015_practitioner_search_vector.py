@@ -0,0 +1,43 @@
+# Generated by Django 5.1.3 on 2026-10-16 19:50
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.conf import settings
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+def build_search_vectors(apps, schema_editor):
+    from practitioners.utils.search_index import update_practitioner_search_vectors
+
+    update_practitioner_search_vectors(apps=apps)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0009_seed_modalities_v6'),
+        ('locations', '0002_initial'),
+        ('payments', '0014_add_credit_applied_transaction_type'),
+        ('practitioners', '0014_practitioner_next_available_stale'),
+        ('services', '0027_add_session_notes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='practitioner',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(blank=True, editable=False, help_text='Maintained by practitioners.utils.search_index', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='practitioner',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='practitioner_search_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='practitioner',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['display_name'], name='practitioner_name_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.RunPython(build_search_vectors, migrations.RunPython.noop),
+    ]
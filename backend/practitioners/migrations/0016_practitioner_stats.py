@@ -0,0 +1,78 @@
+# Generated by Django 5.1.3 on 2026-10-16 20:13
+
+from django.conf import settings
+from django.db import migrations, models
+
+BACKFILL_STATS = """
+UPDATE practitioners_practitioner p SET
+    rating_avg = COALESCE((
+        SELECT AVG(rating) FROM reviews_review WHERE practitioner_id = p.id AND is_published
+    ), 0),
+    rating_count = (
+        SELECT COUNT(*) FROM reviews_review WHERE practitioner_id = p.id AND is_published
+    ),
+    active_service_count = (
+        SELECT COUNT(*) FROM services_service WHERE primary_practitioner_id = p.id AND is_active
+    ),
+    min_price_cents = (
+        SELECT MIN(price_cents) FROM services_service WHERE primary_practitioner_id = p.id AND is_active
+    ),
+    max_price_cents = (
+        SELECT MAX(price_cents) FROM services_service WHERE primary_practitioner_id = p.id AND is_active
+    ),
+    completed_session_count = (
+        SELECT COUNT(*) FROM bookings_booking WHERE practitioner_id = p.id AND status = 'completed'
+    )
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0009_seed_modalities_v6'),
+        ('locations', '0003_practitionerlocation_lat_lng_index'),
+        ('payments', '0014_add_credit_applied_transaction_type'),
+        ('practitioners', '0015_practitioner_search_vector'),
+        ('bookings', '0023_performance_indexes'),
+        ('reviews', '0004_add_response_fields'),
+        ('services', '0028_service_search_vector'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='practitioner',
+            name='active_service_count',
+            field=models.PositiveIntegerField(default=0, help_text='Number of active primary services'),
+        ),
+        migrations.AddField(
+            model_name='practitioner',
+            name='completed_session_count',
+            field=models.PositiveIntegerField(default=0, help_text='Number of completed bookings'),
+        ),
+        migrations.AddField(
+            model_name='practitioner',
+            name='max_price_cents',
+            field=models.PositiveIntegerField(blank=True, help_text='Highest price among active services', null=True),
+        ),
+        migrations.AddField(
+            model_name='practitioner',
+            name='min_price_cents',
+            field=models.PositiveIntegerField(blank=True, help_text='Lowest price among active services', null=True),
+        ),
+        migrations.AddField(
+            model_name='practitioner',
+            name='rating_avg',
+            field=models.DecimalField(decimal_places=2, default=0, help_text='Average rating of published reviews', max_digits=3),
+        ),
+        migrations.AddField(
+            model_name='practitioner',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0, help_text='Number of published reviews'),
+        ),
+        migrations.AddIndex(
+            model_name='practitioner',
+            index=models.Index(fields=['-rating_avg', '-rating_count'], name='practitioner_rating_idx'),
+        ),
+        migrations.RunSQL(BACKFILL_STATS, migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.3 on 2026-10-16 21:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('practitioners', '0016_practitioner_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='practitioner',
+            name='next_available_computed_at',
+            field=models.DateTimeField(blank=True, help_text='When next_available_date was last recomputed', null=True),
+        ),
+    ]
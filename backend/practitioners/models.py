@@ -1,6 +1,8 @@
 from django.db import models
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.core.exceptions import ValidationError
-from django.db.models import Q, F, Avg, Count, Min, Max
+from django.db.models import Q, F
 from django.utils import timezone
 from users.models import User
 from utils.models import BaseModel, PublicModel
@@ -64,6 +66,26 @@ class Practitioner(PublicModel):
                                             help_text="Buffer time between sessions in minutes")
     next_available_date = models.DateTimeField(blank=True, null=True,
                                              help_text="Next available booking date")
+    next_available_stale = models.BooleanField(default=True,
+                                             help_text="Set when schedules or bookings change; "
+                                                       "cleared when next_available_date is recomputed")
+    next_available_computed_at = models.DateTimeField(blank=True, null=True,
+                                                      help_text="When next_available_date was last recomputed")
+    
+    # Search
+    search_vector = SearchVectorField(blank=True, null=True, editable=False,
+                                      help_text="Maintained by practitioners.utils.search_index")
+    
+    # Denormalized stats (maintained by practitioners.utils.stats)
+    rating_avg = models.DecimalField(max_digits=3, decimal_places=2, default=0,
+                                   help_text="Average rating of published reviews")
+    rating_count = models.PositiveIntegerField(default=0, help_text="Number of published reviews")
+    active_service_count = models.PositiveIntegerField(default=0, help_text="Number of active primary services")
+    min_price_cents = models.PositiveIntegerField(blank=True, null=True,
+                                                help_text="Lowest price among active services")
+    max_price_cents = models.PositiveIntegerField(blank=True, null=True,
+                                                help_text="Highest price among active services")
+    completed_session_count = models.PositiveIntegerField(default=0, help_text="Number of completed bookings")
     
     # Onboarding
     is_onboarded = models.BooleanField(default=False)
@@ -98,6 +120,12 @@ class Practitioner(PublicModel):
             models.Index(fields=['practitioner_status']),
             models.Index(fields=['user']),
             models.Index(fields=['next_available_date']),
+            models.Index(fields=['-rating_avg', '-rating_count'], name='practitioner_rating_idx'),
+            models.Index(fields=['id'], condition=Q(next_available_stale=True),
+                         name='practitioner_avail_stale_idx'),
+            GinIndex(fields=['search_vector'], name='practitioner_search_idx'),
+            GinIndex(fields=['display_name'], opclasses=['gin_trgm_ops'],
+                     name='practitioner_name_trgm_idx'),
         ]
     
     def __str__(self):
@@ -119,44 +147,31 @@ class Practitioner(PublicModel):
     
     @property
     def average_rating(self):
-        """Calculate average rating from reviews."""
-        from reviews.models import Review
-        result = Review.objects.filter(
-            practitioner=self,
-            is_published=True
-        ).aggregate(avg_rating=Avg('rating'))
-        return round(result['avg_rating'] or 0, 2)
+        """Average rating of published reviews."""
+        return self.rating_avg
     
     @property 
     def total_reviews(self):
         """Count total published reviews."""
-        from reviews.models import Review
-        return Review.objects.filter(
-            practitioner=self,
-            is_published=True
-        ).count()
+        return self.rating_count
     
     @property
     def total_services(self):
         """Count total active services."""
-        return self.primary_services.filter(is_active=True).count()
+        return self.active_service_count
     
     @property
     def price_range(self):
         """Get min and max price from active services."""
-        result = self.primary_services.filter(is_active=True).aggregate(
-            min_price=Min('price_cents'),
-            max_price=Max('price_cents')
-        )
         return {
-            'min': result['min_price'],
-            'max': result['max_price']
+            'min': self.min_price_cents,
+            'max': self.max_price_cents
         }
     
     @property
     def completed_sessions_count(self):
         """Count completed bookings."""
-        return self.bookings.filter(status='completed').count()
+        return self.completed_session_count
     
     @property
     def cancellation_rate(self):
@@ -450,6 +465,30 @@ class OutOfOffice(BaseModel):
         return f"{self.practitioner} - {self.title} ({self.from_date} to {self.to_date})"
 
 
+class PractitionerBusyDay(BaseModel):
+    """
+    Materialized busy time for one practitioner on one UTC day.
+
+    `busy_bitmap` holds one bit per minute of the day (bit 0 = 00:00 UTC) set
+    for every minute covered by a pending/confirmed booking, without the
+    practitioner buffer (applied at read time). Rows are deleted by signals
+    when bookings or sessions touching the day change and are rebuilt lazily
+    by `practitioners.utils.free_busy` or the refresh task.
+    """
+    practitioner = models.ForeignKey(Practitioner, on_delete=models.CASCADE, related_name='busy_days')
+    date = models.DateField(help_text="UTC date this bitmap covers")
+    busy_bitmap = models.BinaryField(help_text="1440-bit minute bitmap of booked time")
+    busy_minutes = models.PositiveIntegerField(default=0, help_text="Number of booked minutes")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['practitioner', 'date'], name='unique_busy_day_per_practitioner'),
+        ]
+
+    def __str__(self):
+        return f"{self.practitioner} busy {self.busy_minutes}min on {self.date}"
+
+
 class Question(BaseModel):
     """
     Model representing a FAQ question and answer for a practitioner's profile.
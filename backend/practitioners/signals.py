@@ -0,0 +1,226 @@
+"""
+Practitioner signal handlers.
+
+Keeps the materialized free/busy data in `practitioners.utils.free_busy` in step
+with bookings, sessions and schedule settings. Only the UTC days a booking
+touched are invalidated; schedule-level changes bump the practitioner's
+template version.
+
+Also keeps `Practitioner.search_vector` current (see
+`practitioners.utils.search_index`) and the service and completed-session
+stats in `practitioners.utils.stats` (ratings are handled in `reviews.signals`),
+and drops the cached dashboard stats in `practitioners.utils.dashboard_stats`.
+"""
+import logging
+from datetime import timedelta
+
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from bookings.models import Booking
+from payments.models import EarningsTransaction
+from practitioners.models import (
+    OutOfOffice, Practitioner, Schedule, ScheduleAvailability, SchedulePreference,
+    ScheduleTimeSlot, ServiceSchedule
+)
+from practitioners.utils.dashboard_stats import invalidate_dashboard_stats
+from practitioners.utils.free_busy import invalidate_busy_days, invalidate_template, utc_days
+from practitioners.utils.search_index import update_practitioner_search_vectors
+from practitioners.utils.stats import update_practitioner_stats
+from reviews.models import Review
+from services.models import Service, ServiceSession
+from users.models import User
+
+logger = logging.getLogger(__name__)
+
+
+def _session_days(start, end, duration_minutes=None):
+    if not start:
+        return []
+    if not end:
+        end = start + timedelta(minutes=duration_minutes or 60)
+    return utc_days(start, end)
+
+
+def _booking_footprint(booking):
+    """(practitioner_id, days) for the busy time a booking occupies."""
+    service = booking.service if booking.service_id else None
+    session = booking.service_session if booking.service_session_id else None
+    if not service or not session:
+        return None, []
+    return service.primary_practitioner_id, _session_days(
+        session.start_time, session.end_time, service.duration_minutes
+    )
+
+
+# ── Bookings ─────────────────────────────────────────────────────────────────
+
+@receiver(pre_save, sender=Booking)
+def capture_booking_busy_footprint(sender, instance, **kwargs):
+    """Remember where the booking sat before this save so old days get invalidated."""
+    instance._busy_footprint_before = (None, [])
+    instance._status_before = (None, None)
+    if not instance.pk:
+        return
+    old = Booking.objects.filter(pk=instance.pk).values_list(
+        'service__primary_practitioner_id',
+        'service_session__start_time',
+        'service_session__end_time',
+        'service__duration_minutes',
+        'practitioner_id',
+        'status',
+    ).first()
+    if old:
+        practitioner_id, start, end, duration, booking_practitioner_id, status = old
+        instance._busy_footprint_before = (practitioner_id, _session_days(start, end, duration))
+        instance._status_before = (booking_practitioner_id, status)
+
+
+@receiver(post_save, sender=Booking)
+def invalidate_busy_days_for_booking(sender, instance, **kwargs):
+    old_practitioner_id, old_days = getattr(instance, '_busy_footprint_before', (None, []))
+    practitioner_id, days = _booking_footprint(instance)
+
+    if old_practitioner_id and old_practitioner_id != practitioner_id:
+        invalidate_busy_days(old_practitioner_id, old_days)
+        old_days = []
+    invalidate_busy_days(practitioner_id, set(days) | set(old_days))
+
+
+@receiver(post_delete, sender=Booking)
+def invalidate_busy_days_for_deleted_booking(sender, instance, **kwargs):
+    practitioner_id, days = _booking_footprint(instance)
+    invalidate_busy_days(practitioner_id, days)
+
+
+@receiver(post_save, sender=Booking)
+def update_session_stats_for_booking(sender, instance, **kwargs):
+    """Only moves into or out of 'completed' change completed_session_count."""
+    old_practitioner_id, old_status = getattr(instance, '_status_before', (None, None))
+    was_completed, is_completed = old_status == 'completed', instance.status == 'completed'
+    if not (was_completed or is_completed):
+        return
+    if was_completed and is_completed and old_practitioner_id == instance.practitioner_id:
+        return
+    update_practitioner_stats([instance.practitioner_id, old_practitioner_id], groups=['sessions'])
+
+
+@receiver(post_delete, sender=Booking)
+def update_session_stats_for_deleted_booking(sender, instance, **kwargs):
+    if instance.status == 'completed':
+        update_practitioner_stats([instance.practitioner_id], groups=['sessions'])
+
+
+# ── Sessions ─────────────────────────────────────────────────────────────────
+
+@receiver(pre_save, sender=ServiceSession)
+def capture_session_times(sender, instance, **kwargs):
+    instance._times_before = None
+    if instance.pk:
+        instance._times_before = ServiceSession.objects.filter(pk=instance.pk).values_list(
+            'start_time', 'end_time'
+        ).first()
+
+
+@receiver(post_save, sender=ServiceSession)
+def invalidate_busy_days_for_session(sender, instance, created, **kwargs):
+    """Rescheduling a session moves every booking on it."""
+    before = getattr(instance, '_times_before', None)
+    if created or not before or before == (instance.start_time, instance.end_time):
+        return
+
+    duration = instance.service.duration_minutes if instance.service_id else None
+    days = set(_session_days(before[0], before[1], duration))
+    days |= set(_session_days(instance.start_time, instance.end_time, duration))
+    invalidate_busy_days(instance.service.primary_practitioner_id, days)
+
+
+@receiver(post_delete, sender=ServiceSession)
+def invalidate_busy_days_for_deleted_session(sender, instance, **kwargs):
+    try:
+        service = instance.service
+    except Service.DoesNotExist:
+        return
+    invalidate_busy_days(
+        service.primary_practitioner_id,
+        _session_days(instance.start_time, instance.end_time, service.duration_minutes)
+    )
+
+
+# ── Schedule settings ────────────────────────────────────────────────────────
+
+@receiver([post_save, post_delete], sender=Schedule)
+@receiver([post_save, post_delete], sender=OutOfOffice)
+@receiver([post_save, post_delete], sender=SchedulePreference)
+@receiver([post_save, post_delete], sender=ServiceSchedule)
+@receiver([post_save, post_delete], sender=ScheduleAvailability)
+def invalidate_availability_template(sender, instance, **kwargs):
+    invalidate_template(instance.practitioner_id)
+
+
+@receiver([post_save, post_delete], sender=ScheduleTimeSlot)
+def invalidate_availability_template_for_time_slot(sender, instance, **kwargs):
+    practitioner_id = Schedule.objects.filter(
+        pk=instance.schedule_id
+    ).values_list('practitioner_id', flat=True).first()
+    invalidate_template(practitioner_id)
+
+
+@receiver([post_save, post_delete], sender=Service)
+def invalidate_availability_template_for_service(sender, instance, **kwargs):
+    """Linked schedule or duration changes alter the resolved template."""
+    invalidate_template(instance.primary_practitioner_id)
+
+
+# ── Search index ─────────────────────────────────────────────────────────────
+
+SEARCHABLE_USER_FIELDS = {'first_name', 'last_name'}
+
+
+@receiver(post_save, sender=Practitioner)
+def update_search_vector_for_practitioner(sender, instance, **kwargs):
+    update_practitioner_search_vectors([instance.pk])
+
+
+@receiver(post_save, sender=User)
+def update_search_vector_for_user(sender, instance, update_fields=None, **kwargs):
+    """Names are indexed; skip saves like last_login updates that can't change them."""
+    if update_fields and not SEARCHABLE_USER_FIELDS & set(update_fields):
+        return
+    update_practitioner_search_vectors(
+        Practitioner.objects.filter(user_id=instance.pk).values_list('pk', flat=True)
+    )
+
+
+@receiver(m2m_changed, sender=Practitioner.specializations.through)
+@receiver(m2m_changed, sender=Practitioner.modalities.through)
+def update_search_vector_for_practitioner_tags(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        update_practitioner_search_vectors([instance.pk])
+    elif pk_set:
+        update_practitioner_search_vectors(pk_set)
+
+
+@receiver([post_save, post_delete], sender=Service)
+def update_search_vector_for_service_owner(sender, instance, **kwargs):
+    """Active service names are part of the practitioner's vector."""
+    update_practitioner_search_vectors([instance.primary_practitioner_id])
+
+
+# ── Stats ────────────────────────────────────────────────────────────────────
+
+@receiver([post_save, post_delete], sender=Service)
+def update_service_stats_for_owner(sender, instance, **kwargs):
+    """Active service count and price range."""
+    update_practitioner_stats([instance.primary_practitioner_id], groups=['services'])
+
+
+# ── Dashboard stats cache ────────────────────────────────────────────────────
+
+@receiver([post_save, post_delete], sender=Booking)
+@receiver([post_save, post_delete], sender=EarningsTransaction)
+@receiver([post_save, post_delete], sender=Review)
+def invalidate_dashboard_stats_for_change(sender, instance, **kwargs):
+    invalidate_dashboard_stats(instance.practitioner_id)
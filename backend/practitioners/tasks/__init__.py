@@ -5,4 +5,5 @@ Import practitioner-specific tasks.
 
 # Import practitioner tasks
 from .nudges import *
-from .earnings import *
\ No newline at end of file
+from .earnings import *
+from .availability import *
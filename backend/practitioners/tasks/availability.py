@@ -0,0 +1,84 @@
+"""
+Practitioner availability tasks.
+
+Keep the materialized busy bitmaps (`PractitionerBusyDay`) warm so public slot
+endpoints read precomputed rows instead of falling back to the booking tables,
+and keep `Practitioner.next_available_date` accurate for marketplace sorting.
+"""
+import logging
+from datetime import date, timedelta
+from typing import List
+
+from celery import shared_task
+from django.utils import timezone
+
+from practitioners.models import Practitioner, PractitionerBusyDay
+from practitioners.utils.free_busy import refresh_busy_days
+from practitioners.utils.next_available import refresh_next_available_dates, stale_practitioner_ids
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def refresh_practitioner_busy_days(practitioner_id: int, dates: List[str]):
+    """
+    Rebuild busy rows for specific days after an invalidation.
+    Queued on commit by `practitioners.utils.free_busy.invalidate_busy_days`.
+    """
+    days = [date.fromisoformat(d) for d in dates]
+    refresh_busy_days(practitioner_id, days)
+    logger.info(f"[FreeBusy] Refreshed {len(days)} busy days for practitioner {practitioner_id}")
+
+
+@shared_task
+def warm_practitioner_busy_days(days_ahead: int = 30):
+    """
+    Fill missing busy rows for the next `days_ahead` days for every active
+    practitioner with an active schedule. Existing rows are left untouched.
+    Run periodically via Celery Beat.
+    """
+    today = timezone.now().date()
+    window = [today + timedelta(days=i) for i in range(days_ahead + 1)]
+
+    practitioner_ids = Practitioner.objects.filter(
+        practitioner_status='active',
+        schedules__is_active=True
+    ).values_list('id', flat=True).distinct()
+
+    warmed = 0
+    for practitioner_id in practitioner_ids:
+        existing = set(PractitionerBusyDay.objects.filter(
+            practitioner_id=practitioner_id, date__gte=today, date__lte=window[-1]
+        ).values_list('date', flat=True))
+        missing = [day for day in window if day not in existing]
+        if missing:
+            try:
+                refresh_busy_days(practitioner_id, missing)
+                warmed += len(missing)
+            except Exception as e:
+                logger.error(f"[FreeBusy] Error warming practitioner {practitioner_id}: {e}")
+
+    # Past days are never read again
+    PractitionerBusyDay.objects.filter(date__lt=today - timedelta(days=1)).delete()
+
+    logger.info(f"[FreeBusy] Warmed {warmed} busy days")
+    return warmed
+
+
+@shared_task
+def update_next_available_dates(limit: int = 2000):
+    """
+    Recompute next_available_date for practitioners whose schedules or bookings
+    changed since the last run, whose stored slot has passed, or who had no
+    slot in the booking horizon a day ago.
+    Run every few minutes via Celery Beat.
+    """
+    practitioner_ids = stale_practitioner_ids(limit=limit)
+    if not practitioner_ids:
+        return 0
+
+    updated = refresh_next_available_dates(practitioner_ids)
+    logger.info(
+        f"[NextAvailable] Checked {len(practitioner_ids)} practitioners, updated {updated}"
+    )
+    return updated
@@ -0,0 +1,226 @@
+from datetime import datetime, time, timedelta
+
+import pytz
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from bookings.models import Booking
+from practitioners.models import (
+    OutOfOffice, Practitioner, PractitionerBusyDay, Schedule, SchedulePreference,
+    ScheduleTimeSlot
+)
+from practitioners.utils.availability import (
+    get_practitioner_availability, get_practitioner_availability_legacy
+)
+from practitioners.utils.availability_engine import (
+    PractitionerAvailabilityEngine, merge_intervals, subtract_blocked
+)
+from services.models import Service, ServiceSession, ServiceType
+from users.models import User
+
+
+class IntervalHelperTestCase(TestCase):
+    """Pure interval arithmetic used by the availability engine."""
+
+    def setUp(self):
+        self.base = datetime(2030, 1, 7, 9, 0, tzinfo=pytz.UTC)
+
+    def at(self, minutes):
+        return self.base + timedelta(minutes=minutes)
+
+    def test_merge_intervals_merges_overlaps_and_keeps_gaps(self):
+        merged = merge_intervals([
+            (self.at(60), self.at(90)),
+            (self.at(0), self.at(30)),
+            (self.at(15), self.at(45)),
+        ])
+        self.assertEqual(merged, [(self.at(0), self.at(45)), (self.at(60), self.at(90))])
+
+    def test_subtract_blocked_uses_half_open_overlap(self):
+        candidates = [
+            (self.at(m), self.at(m + 30), self.base.date(), None, None)
+            for m in range(0, 120, 15)
+        ]
+        blocked = [(self.at(45), self.at(60))]
+        free = [c[0] for c in subtract_blocked(candidates, blocked)]
+        # 15→45 ends exactly at the block start and 60→90 starts at its end
+        self.assertEqual(free, [self.at(m) for m in (0, 15, 60, 75, 90, 105)])
+
+
+class AvailabilityFixtureMixin:
+    """Practitioner with a split weekday schedule, a holiday and a dozen bookings."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='engine-practitioner@example.com',
+            password='testpass123',
+            is_practitioner=True
+        )
+        self.practitioner = Practitioner.objects.create(
+            user=self.user,
+            display_name='Engine Practitioner',
+            buffer_time=15
+        )
+        SchedulePreference.objects.create(
+            practitioner=self.practitioner,
+            timezone='America/New_York',
+            advance_booking_min_hours=2,
+            advance_booking_max_days=120,
+            holidays=[(timezone.now().date() + timedelta(days=10)).isoformat()]
+        )
+        self.service_type, _ = ServiceType.objects.get_or_create(
+            code='session', defaults={'name': 'Session'}
+        )
+        self.service = Service.objects.create(
+            name='Engine Session',
+            slug='engine-session',
+            price_cents=10000,
+            duration_minutes=60,
+            service_type=self.service_type,
+            primary_practitioner=self.practitioner,
+            location_type='in_person'
+        )
+        self.schedule = Schedule.objects.create(
+            practitioner=self.practitioner,
+            name='Regular Hours',
+            is_default=True,
+            timezone='America/New_York'
+        )
+        for day in range(5):
+            ScheduleTimeSlot.objects.create(
+                schedule=self.schedule, day=day, start_time=time(9, 0), end_time=time(12, 0)
+            )
+            ScheduleTimeSlot.objects.create(
+                schedule=self.schedule, day=day, start_time=time(13, 0), end_time=time(17, 30)
+            )
+
+        client = User.objects.create_user(email='engine-client@example.com', password='testpass123')
+        start = timezone.now().replace(minute=0, second=0, microsecond=0) + timedelta(days=3)
+        for i in range(12):
+            session_start = start + timedelta(days=i * 2, hours=i % 5)
+            session = ServiceSession.objects.create(
+                service=self.service,
+                start_time=session_start,
+                end_time=session_start + timedelta(minutes=60)
+            )
+            Booking.objects.create(
+                user=client,
+                practitioner=self.practitioner,
+                service=self.service,
+                service_session=session,
+                status='confirmed'
+            )
+
+        self.client_user = client
+
+    def book(self, session_start, minutes=60):
+        session = ServiceSession.objects.create(
+            service=self.service,
+            start_time=session_start,
+            end_time=session_start + timedelta(minutes=minutes)
+        )
+        return Booking.objects.create(
+            user=self.client_user,
+            practitioner=self.practitioner,
+            service=self.service,
+            service_session=session,
+            status='confirmed'
+        )
+
+
+class AvailabilityEngineParityTestCase(AvailabilityFixtureMixin, TestCase):
+    """The engine must return exactly what the legacy per-day implementation returns."""
+
+    def assertParity(self, days):
+        start_date = timezone.now().date()
+        end_date = start_date + timedelta(days=days)
+        legacy = get_practitioner_availability_legacy(self.service.id, start_date, end_date)
+        engine = get_practitioner_availability(self.service.id, start_date, end_date)
+        self.assertTrue(legacy)
+        self.assertEqual(engine, legacy)
+
+    def test_matches_legacy_over_30_days(self):
+        self.assertParity(30)
+
+    def test_matches_legacy_over_90_days(self):
+        self.assertParity(90)
+
+    def test_query_count_does_not_grow_with_range(self):
+        start_date = timezone.now().date()
+        counts = []
+        for days in (7, 90):
+            with CaptureQueriesContext(connection) as ctx:
+                get_practitioner_availability(self.service.id, start_date, start_date + timedelta(days=days))
+            counts.append(len(ctx.captured_queries))
+        self.assertEqual(counts[0], counts[1])
+
+    def test_out_of_office_is_opt_in(self):
+        ooo_day = timezone.now().date() + timedelta(days=14)
+        OutOfOffice.objects.create(
+            practitioner=self.practitioner, from_date=ooo_day, to_date=ooo_day, title='Retreat'
+        )
+        engine = PractitionerAvailabilityEngine.for_service(self.service.id)
+        default_dates = {s['date'] for s in engine.get_slots(days_ahead=30)}
+        ooo_dates = {s['date'] for s in engine.get_slots(days_ahead=30, respect_out_of_office=True)}
+
+        if ooo_day.weekday() < 5:
+            self.assertIn(ooo_day, default_dates)
+        self.assertNotIn(ooo_day, ooo_dates)
+
+
+class FreeBusyCacheTestCase(AvailabilityFixtureMixin, TestCase):
+    """Cached availability reads materialized rows and is invalidated by bookings."""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.start_date = timezone.now().date()
+        self.end_date = self.start_date + timedelta(days=30)
+
+    def cached(self):
+        return get_practitioner_availability(
+            self.service.id, self.start_date, self.end_date, use_cache=True
+        )
+
+    def test_cached_matches_uncached(self):
+        uncached = get_practitioner_availability(self.service.id, self.start_date, self.end_date)
+        self.assertEqual(self.cached(), uncached)
+        self.assertTrue(PractitionerBusyDay.objects.filter(practitioner=self.practitioner).exists())
+
+    def test_warm_read_skips_schedule_and_booking_tables(self):
+        self.cached()
+        with CaptureQueriesContext(connection) as ctx:
+            self.cached()
+        tables = ' '.join(q['sql'] for q in ctx.captured_queries)
+        self.assertNotIn('bookings_booking', tables)
+        self.assertNotIn('practitioners_scheduletimeslot', tables)
+
+    def test_new_booking_invalidates_only_its_day(self):
+        slots = self.cached()
+        target = slots[len(slots) // 2]
+        busy_days = PractitionerBusyDay.objects.filter(practitioner=self.practitioner).count()
+
+        self.book(target['start_datetime'])
+
+        self.assertEqual(
+            PractitionerBusyDay.objects.filter(practitioner=self.practitioner).count(),
+            busy_days - 1
+        )
+        starts = {s['start_datetime'] for s in self.cached()}
+        self.assertNotIn(target['start_datetime'], starts)
+        self.assertEqual(
+            self.cached(),
+            get_practitioner_availability(self.service.id, self.start_date, self.end_date)
+        )
+
+    def test_schedule_change_invalidates_template(self):
+        self.cached()
+        ScheduleTimeSlot.objects.filter(schedule=self.schedule, start_time=time(13, 0)).delete()
+        afternoon = [
+            s for s in self.cached()
+            if s['start_datetime'].astimezone(pytz.timezone('America/New_York')).hour >= 13
+        ]
+        self.assertEqual(afternoon, [])
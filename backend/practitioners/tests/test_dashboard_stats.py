@@ -0,0 +1,72 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from bookings.models import Booking
+from practitioners.models import Practitioner
+from services.models import Service, ServiceSession, ServiceType
+from users.models import User
+
+
+class DashboardStatsTestCase(TestCase):
+    """The stats cards come from one query and are cached until the practitioner's data changes."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email='dash-practitioner@example.com', password='testpass123')
+        self.practitioner = Practitioner.objects.create(user=self.user, display_name='Dash Studio')
+        self.client_user = User.objects.create_user(email='dash-client@example.com', password='testpass123')
+        service_type, _ = ServiceType.objects.get_or_create(code='session', defaults={'name': 'Session'})
+        self.service = Service.objects.create(
+            name='Breathwork',
+            price_cents=5000,
+            duration_minutes=60,
+            service_type=service_type,
+            primary_practitioner=self.practitioner,
+            location_type='virtual',
+        )
+        self.api = APIClient()
+        self.api.force_authenticate(user=self.user)
+
+    def book(self, credits=0, session_status='scheduled'):
+        start = timezone.now() - timedelta(hours=2)
+        session = ServiceSession.objects.create(
+            service=self.service, start_time=start, end_time=start + timedelta(hours=1), status=session_status
+        )
+        return Booking.objects.create(
+            user=self.client_user, practitioner=self.practitioner, service=self.service,
+            service_session=session, status='confirmed', credits_allocated=credits
+        )
+
+    def stats(self):
+        response = self.api.get(reverse('practitioner-stats'))
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_single_query_then_cached(self):
+        self.book(credits=2500, session_status='completed')
+
+        data = self.stats()
+        self.assertEqual(data['total_bookings']['value'], 1)
+        self.assertEqual(data['total_revenue']['value_display'], '$25.00')
+        self.assertEqual(data['active_clients']['value'], 1)
+        self.assertEqual((data['meta']['query_count'], data['meta']['cached']), (1, False))
+
+        data = self.stats()
+        self.assertEqual((data['meta']['query_count'], data['meta']['cached']), (0, True))
+        self.assertIn('latency_ms', data['meta'])
+
+    def test_booking_change_invalidates_cache(self):
+        self.book()
+        self.assertEqual(self.stats()['total_bookings']['value'], 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.book()
+
+        data = self.stats()
+        self.assertEqual(data['total_bookings']['value'], 2)
+        self.assertFalse(data['meta']['cached'])
@@ -0,0 +1,73 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+
+from practitioners.models import Practitioner, ScheduleTimeSlot
+from practitioners.tests.test_availability_engine import AvailabilityFixtureMixin
+from practitioners.utils.availability import get_practitioner_availability
+from practitioners.utils.next_available import (
+    refresh_next_available_dates, stale_practitioner_ids
+)
+
+
+class NextAvailableDateTestCase(AvailabilityFixtureMixin, TestCase):
+    """next_available_date is the first real slot and is refreshed incrementally."""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.service.status = 'active'
+        self.service.is_active = True
+        self.service.save()
+        self.practitioner.practitioner_status = 'active'
+        self.practitioner.save()
+
+    def refresh(self):
+        refresh_next_available_dates(stale_practitioner_ids())
+        self.practitioner.refresh_from_db()
+
+    def first_slot(self):
+        today = timezone.now().date()
+        slots = get_practitioner_availability(self.service.id, today, today + timedelta(days=30))
+        return slots[0]['start_datetime']
+
+    def test_matches_first_available_slot(self):
+        self.refresh()
+        self.assertEqual(self.practitioner.next_available_date, self.first_slot())
+        self.assertFalse(self.practitioner.next_available_stale)
+
+    def test_fresh_practitioner_is_not_recomputed(self):
+        self.refresh()
+        self.assertNotIn(self.practitioner.id, stale_practitioner_ids())
+
+    def test_booking_marks_stale_and_moves_date(self):
+        self.refresh()
+        first = self.practitioner.next_available_date
+
+        self.book(first)
+
+        self.assertTrue(Practitioner.objects.get(pk=self.practitioner.pk).next_available_stale)
+        self.refresh()
+        self.assertGreater(self.practitioner.next_available_date, first)
+        self.assertEqual(self.practitioner.next_available_date, self.first_slot())
+
+    def test_cleared_schedule_clears_date(self):
+        self.refresh()
+        ScheduleTimeSlot.objects.filter(schedule=self.schedule).delete()
+        self.refresh()
+        self.assertIsNone(self.practitioner.next_available_date)
+
+    def test_unavailable_practitioner_is_rechecked_daily(self):
+        ScheduleTimeSlot.objects.filter(schedule=self.schedule).delete()
+        self.refresh()
+        self.assertIsNone(self.practitioner.next_available_date)
+        self.assertNotIn(self.practitioner.id, stale_practitioner_ids())
+
+        tomorrow = timezone.now() + timedelta(days=1, minutes=1)
+        self.assertIn(self.practitioner.id, stale_practitioner_ids(now=tomorrow))
+
+    def test_inactive_practitioner_is_not_recomputed(self):
+        Practitioner.objects.filter(pk=self.practitioner.pk).update(practitioner_status='inactive')
+        self.assertNotIn(self.practitioner.id, stale_practitioner_ids())
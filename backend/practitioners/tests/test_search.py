@@ -0,0 +1,101 @@
+from django.test import TestCase
+
+from common.models import Modality
+from practitioners.api.v1.filters import PractitionerFilter
+from practitioners.models import Practitioner, Specialize
+from practitioners.utils.search_index import update_practitioner_search_vectors
+from services.api.v1.filters import ServiceFilter
+from services.models import Service, ServiceType
+from users.models import User
+
+
+class SearchIndexTestCase(TestCase):
+    """Search vectors are kept current by signals and queried by the filters."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='search-practitioner@example.com',
+            password='testpass123',
+            first_name='Marguerite',
+            last_name='Okafor',
+            is_practitioner=True
+        )
+        self.practitioner = Practitioner.objects.create(
+            user=self.user,
+            display_name='Lotus Healing',
+            professional_title='Somatic Therapist',
+            bio='Gentle trauma-informed bodywork.'
+        )
+        other_user = User.objects.create_user(email='other@example.com', password='testpass123')
+        self.other = Practitioner.objects.create(user=other_user, display_name='Acme Coaching')
+
+        service_type, _ = ServiceType.objects.get_or_create(code='session', defaults={'name': 'Session'})
+        self.service = Service.objects.create(
+            name='Restorative Yoga',
+            slug='restorative-yoga',
+            short_description='Slow evening practice',
+            price_cents=5000,
+            duration_minutes=60,
+            service_type=service_type,
+            primary_practitioner=self.practitioner,
+            location_type='virtual',
+            tags=['breathwork']
+        )
+
+    def search_practitioners(self, text):
+        return PractitionerFilter({'search': text}, queryset=Practitioner.objects.all()).qs
+
+    def search_services(self, text):
+        return ServiceFilter({'search': text}, queryset=Service.objects.all()).qs
+
+    def test_practitioner_fields_and_related_text_are_indexed(self):
+        for text in ('lotus', 'somatic', 'trauma', 'okafor', 'restorative yoga'):
+            self.assertEqual(list(self.search_practitioners(text)), [self.practitioner], text)
+
+    def test_prefix_and_fuzzy_matching(self):
+        self.assertIn(self.practitioner, self.search_practitioners('heal'))
+        self.assertIn(self.practitioner, self.search_practitioners('Lotos Healing'))
+
+    def test_m2m_changes_update_vector(self):
+        modality = Modality.objects.create(name='Zephyr Breath Method', slug='zephyr-breath-method')
+        specialization = Specialize.objects.create(content='Grief support')
+        self.practitioner.modalities.add(modality)
+        self.practitioner.specializations.add(specialization)
+
+        self.assertIn(self.practitioner, self.search_practitioners('zephyr'))
+        self.assertIn(self.practitioner, self.search_practitioners('grief'))
+
+    def test_user_name_change_updates_vector(self):
+        self.user.last_name = 'Villeneuve'
+        self.user.save()
+        self.assertIn(self.practitioner, self.search_practitioners('villeneuve'))
+
+    def test_service_fields_are_indexed(self):
+        for text in ('restorative', 'evening', 'breathwork', 'lotus'):
+            self.assertEqual(list(self.search_services(text)), [self.service], text)
+
+    def test_practitioner_rename_updates_services(self):
+        self.practitioner.display_name = 'Cedar Wellness'
+        self.practitioner.save()
+        self.assertIn(self.service, self.search_services('cedar'))
+
+    def test_results_are_ranked(self):
+        Service.objects.create(
+            name='Evening Meditation',
+            slug='evening-meditation',
+            description='Includes a short restorative sequence.',
+            price_cents=3000,
+            duration_minutes=30,
+            service_type=self.service.service_type,
+            primary_practitioner=self.other,
+            location_type='virtual'
+        )
+        ranked = list(self.search_services('restorative').order_by('-search_rank'))
+        self.assertEqual(ranked[0], self.service)
+        self.assertEqual(len(ranked), 2)
+
+    def test_bulk_rebuild(self):
+        Practitioner.objects.update(search_vector=None)
+        self.assertFalse(self.search_practitioners('somatic').exists())
+        self.assertEqual(update_practitioner_search_vectors(), 2)
+        self.assertTrue(self.search_practitioners('somatic').exists())
@@ -0,0 +1,124 @@
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from bookings.models import Booking
+from practitioners.models import Practitioner
+from reviews.models import Review
+from services.models import Service, ServiceSession, ServiceType
+from users.models import User
+
+
+class PractitionerStatsTestCase(TestCase):
+    """Denormalized stats follow reviews, services and bookings."""
+
+    def setUp(self):
+        user = User.objects.create_user(email='stats-practitioner@example.com', password='testpass123')
+        self.practitioner = Practitioner.objects.create(user=user, display_name='Stats Studio')
+        self.client_user = User.objects.create_user(email='stats-client@example.com', password='testpass123')
+
+        self.service_type, _ = ServiceType.objects.get_or_create(code='session', defaults={'name': 'Session'})
+        self.service = self.create_service('Breathwork', 5000)
+
+    def create_service(self, name, price_cents, **kwargs):
+        return Service.objects.create(
+            name=name,
+            price_cents=price_cents,
+            duration_minutes=60,
+            service_type=self.service_type,
+            primary_practitioner=self.practitioner,
+            location_type='virtual',
+            **kwargs
+        )
+
+    def review(self, rating, **kwargs):
+        return Review.objects.create(
+            practitioner=self.practitioner,
+            service=self.service,
+            user=self.client_user,
+            rating=Decimal(rating),
+            **kwargs
+        )
+
+    def refreshed(self):
+        self.practitioner.refresh_from_db()
+        self.service.refresh_from_db()
+        return self.practitioner, self.service
+
+    def test_review_changes_update_rating_stats(self):
+        self.review('5')
+        review = self.review('4')
+        self.review('1', is_published=False)
+
+        practitioner, service = self.refreshed()
+        self.assertEqual((practitioner.rating_avg, practitioner.rating_count), (Decimal('4.50'), 2))
+        self.assertEqual((service.rating_avg, service.rating_count), (Decimal('4.50'), 2))
+
+        review.rating = Decimal('2')
+        review.save()
+        self.assertEqual(self.refreshed()[0].average_rating, Decimal('3.50'))
+
+        review.delete()
+        practitioner, service = self.refreshed()
+        self.assertEqual((practitioner.rating_avg, practitioner.total_reviews), (Decimal('5.00'), 1))
+        self.assertEqual(service.total_reviews, 1)
+
+    def test_service_changes_update_catalogue_stats(self):
+        premium = self.create_service('Retreat', 20000)
+        self.create_service('Archived', 100, is_active=False)
+
+        practitioner, _ = self.refreshed()
+        self.assertEqual(practitioner.total_services, 2)
+        self.assertEqual(practitioner.price_range, {'min': 5000, 'max': 20000})
+
+        premium.is_active = False
+        premium.save()
+        practitioner, _ = self.refreshed()
+        self.assertEqual(practitioner.active_service_count, 1)
+        self.assertEqual(practitioner.max_price_cents, 5000)
+
+    def test_completed_bookings_update_session_count(self):
+        start = timezone.now() - timedelta(days=1)
+        session = ServiceSession.objects.create(
+            service=self.service, start_time=start, end_time=start + timedelta(hours=1)
+        )
+        booking = Booking.objects.create(
+            user=self.client_user, practitioner=self.practitioner, service=self.service,
+            service_session=session, status='confirmed'
+        )
+        self.assertEqual(self.refreshed()[0].completed_sessions_count, 0)
+
+        booking.status = 'completed'
+        booking.save()
+        self.assertEqual(self.refreshed()[0].completed_sessions_count, 1)
+
+        booking.delete()
+        self.assertEqual(self.refreshed()[0].completed_sessions_count, 0)
+
+    def test_rebuild_command_repairs_drift(self):
+        self.review('3')
+        Practitioner.objects.filter(pk=self.practitioner.pk).update(
+            rating_avg=0, rating_count=0, active_service_count=0
+        )
+        Service.objects.filter(pk=self.service.pk).update(rating_count=7)
+
+        call_command('rebuild_stats', stdout=StringIO())
+
+        practitioner, service = self.refreshed()
+        self.assertEqual((practitioner.rating_avg, practitioner.rating_count), (Decimal('3.00'), 1))
+        self.assertEqual(practitioner.active_service_count, 1)
+        self.assertEqual(service.rating_count, 1)
+
+    def test_rating_sort_and_filter_use_stored_columns(self):
+        other_user = User.objects.create_user(email='stats-other@example.com', password='testpass123')
+        other = Practitioner.objects.create(user=other_user, display_name='Other Studio')
+        Review.objects.create(practitioner=other, user=self.client_user, rating=Decimal('3'))
+        self.review('5')
+
+        queryset = Practitioner.objects.filter(rating_avg__gte=3).order_by('-rating_avg', '-rating_count')
+        self.assertEqual(list(queryset), [self.practitioner, other])
+        self.assertNotIn('AVG(', str(queryset.query).upper())
@@ -0,0 +1,104 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from bookings.models import Booking
+from payments.models import EarningsTransaction, Order
+from practitioners.models import Practitioner
+from services.models import Service, ServiceSession, ServiceType
+from users.models import User
+
+
+class TransactionsTestCase(TestCase):
+    """The transactions list loads a page in constant queries, pages by cursor and exports CSV."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='txn-practitioner@example.com', password='testpass123')
+        self.practitioner = Practitioner.objects.create(user=self.user, display_name='Ledger Studio')
+        self.client_user = User.objects.create_user(
+            email='txn-client@example.com', password='testpass123', first_name='Ada', last_name='Lane'
+        )
+        service_type, _ = ServiceType.objects.get_or_create(code='session', defaults={'name': 'Session'})
+        self.service = Service.objects.create(
+            name='Breathwork',
+            price_cents=5000,
+            duration_minutes=60,
+            service_type=service_type,
+            primary_practitioner=self.practitioner,
+            location_type='virtual',
+        )
+        self.api = APIClient()
+        self.api.force_authenticate(user=self.user)
+
+        # Oldest first: earnings, order fallback, service price fallback, then more earnings
+        self.bookings = []
+        for i in range(5):
+            start = timezone.now() + timedelta(days=i + 1)
+            session = ServiceSession.objects.create(
+                service=self.service, start_time=start, end_time=start + timedelta(hours=1)
+            )
+            order = None
+            if i == 1:
+                order = Order.objects.create(
+                    user=self.client_user, service=self.service, practitioner=self.practitioner,
+                    subtotal_amount_cents=4000, total_amount_cents=4000, status='completed'
+                )
+            booking = Booking.objects.create(
+                user=self.client_user, practitioner=self.practitioner, service=self.service,
+                service_session=session, status='confirmed', order=order
+            )
+            Booking.objects.filter(pk=booking.pk).update(created_at=timezone.now() - timedelta(days=10 - i))
+            if i in (0, 3, 4):
+                EarningsTransaction.objects.create(
+                    practitioner=self.practitioner, booking=booking,
+                    gross_amount_cents=6000, commission_rate=Decimal('10'),
+                    commission_amount_cents=600, net_amount_cents=5400,
+                    available_after=timezone.now() + timedelta(days=2),
+                )
+            self.bookings.append(booking)
+
+    def get(self, url, **params):
+        response = self.api.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return response.data['data']
+
+    def test_rows_and_cursor_pages(self):
+        url = reverse('practitioner-transactions')
+        first = self.get(url, page_size=3)
+        self.assertEqual(
+            [row['booking_id'] for row in first['results']],
+            [self.bookings[4].id, self.bookings[3].id, self.bookings[2].id]
+        )
+        self.assertEqual(first['results'][0]['net_amount'], 5400)
+        self.assertEqual(first['results'][2]['amount'], 5000)
+        self.assertEqual(first['results'][0]['client']['name'], 'Ada Lane')
+
+        second = self.api.get(first['next']).data['data']
+        self.assertEqual([row['booking_id'] for row in second['results']], [self.bookings[1].id, self.bookings[0].id])
+        self.assertEqual(second['results'][0]['amount'], 4000)
+        self.assertIsNone(second['next'])
+
+    def test_query_count_does_not_grow_with_page_size(self):
+        url = reverse('practitioner-transactions')
+        with CaptureQueriesContext(connection) as small:
+            self.get(url, page_size=1)
+        with CaptureQueriesContext(connection) as large:
+            self.get(url, page_size=5)
+        self.assertEqual(len(small), len(large))
+
+    def test_csv_export(self):
+        response = self.api.get(reverse('practitioner-transactions-export'), {'status': 'confirmed'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0].split(',')[:3], ['id', 'booking_id', 'date'])
+        self.assertEqual(len(lines), 6)
+        self.assertTrue(lines[1].startswith(f'TXN-{self.bookings[4].id},'))
+        self.assertTrue(lines[1].endswith(',60.00,6.00,54.00'))
@@ -7,6 +7,11 @@ This module handles the core availability logic:
 3. Find the active schedule (service-linked → practitioner default → ServiceSchedule)
 4. Generate time slots at 15-minute intervals
 5. Filter out booked slots and past slots
+
+`get_practitioner_availability` delegates to the interval engine in
+`practitioners.utils.availability_engine`. The original per-day implementation
+is kept as `get_practitioner_availability_legacy` as the reference for parity
+tests and the `benchmark_availability` management command.
 """
 import logging
 import pytz
@@ -21,6 +26,7 @@ from practitioners.models import (
     ServiceSchedule, ScheduleAvailability, SchedulePreference
 )
 from services.models import Service
+from practitioners.utils.availability_engine import PractitionerAvailabilityEngine
 
 logger = logging.getLogger(__name__)
 
@@ -29,11 +35,35 @@ def get_practitioner_availability(
     service_id: int,
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
-    days_ahead: int = 30
+    days_ahead: int = 30,
+    use_cache: bool = False
 ) -> List[Dict[str, Any]]:
     """
     Calculate availability time slots for a practitioner based on a service.
 
+    Returns an empty list if the service, practitioner or schedule data is
+    missing. Output is identical to `get_practitioner_availability_legacy`.
+
+    Public slot endpoints pass `use_cache=True` to read the cached template and
+    materialized busy bitmaps (see `practitioners.utils.free_busy`) instead of
+    the schedule and booking tables.
+    """
+    engine = PractitionerAvailabilityEngine.for_service(service_id, use_cache=use_cache)
+    if engine is None:
+        return []
+    return engine.get_slots(start_date=start_date, end_date=end_date, days_ahead=days_ahead)
+
+
+def get_practitioner_availability_legacy(
+    service_id: int,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    days_ahead: int = 30
+) -> List[Dict[str, Any]]:
+    """
+    Reference implementation: one time-slot query per day and a
+    slots × bookings overlap check. Use `get_practitioner_availability` instead.
+
     Returns an empty list if no availability is found — callers should check
     the logs for diagnostic info if the result is unexpectedly empty.
     """
@@ -0,0 +1,124 @@
+"""
+Stats cards for the practitioner's own dashboard (`PractitionerViewSet.stats`).
+
+Bookings and revenue for this month and last month, and active clients for
+the last 30 days and the 30 days before, come from one conditional-aggregation
+query over the practitioner's confirmed bookings. Ratings come from the
+denormalized columns kept by `practitioners.utils.stats`.
+
+The dashboard polls this on every page load, so the result is cached per
+practitioner for a minute. The signals in `practitioners.signals` drop the
+entry after any booking, earnings transaction or review of theirs changes.
+"""
+import time as time_module
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+DASHBOARD_STATS_KEY = 'practitioners:dashboard-stats:{practitioner_id}'
+DASHBOARD_STATS_TTL = 60
+
+
+def _change(current, previous):
+    if previous == 0:
+        return 100 if current > 0 else 0
+    return round(((current - previous) / previous) * 100, 1)
+
+
+def _card(current, previous):
+    return {
+        'value': current,
+        'change': _change(current, previous),
+        'is_positive': current >= previous,
+    }
+
+
+def compute_dashboard_stats(practitioner, now=None) -> dict:
+    """Build the stats cards with a single query."""
+    from bookings.models import Booking
+
+    now = now or timezone.now()
+    month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    last_month_start = (month_start - timedelta(days=1)).replace(day=1)
+    clients_start = now - timedelta(days=30)
+    last_clients_start = now - timedelta(days=60)
+
+    this_month = Q(created_at__gte=month_start)
+    last_month = Q(created_at__gte=last_month_start, created_at__lt=month_start)
+    # Revenue uses ServiceSession.status='completed' since event lifecycle moved there
+    session_completed = Q(service_session__status='completed')
+
+    totals = Booking.objects.filter(
+        practitioner=practitioner,
+        status='confirmed',
+        created_at__gte=min(last_month_start, last_clients_start)
+    ).aggregate(
+        bookings=Count('id', filter=this_month),
+        bookings_last=Count('id', filter=last_month),
+        revenue=Sum('credits_allocated', filter=this_month & session_completed, default=0),
+        revenue_last=Sum('credits_allocated', filter=last_month & session_completed, default=0),
+        clients=Count('user', distinct=True, filter=Q(created_at__gte=clients_start)),
+        clients_last=Count(
+            'user', distinct=True,
+            filter=Q(created_at__gte=last_clients_start, created_at__lt=clients_start)
+        ),
+    )
+
+    revenue = totals['revenue']
+    return {
+        'total_bookings': _card(totals['bookings'], totals['bookings_last']),
+        'total_revenue': {
+            **_card(revenue, totals['revenue_last']),
+            'value_display': f"${revenue / 100:,.2f}",
+        },
+        'active_clients': _card(totals['clients'], totals['clients_last']),
+        'average_rating': {
+            'value': round(practitioner.rating_avg or 0, 1),
+            'total_reviews': practitioner.rating_count,
+            'change': 0,  # Rating changes are calculated differently
+            'is_positive': True
+        },
+    }
+
+
+def get_dashboard_stats(practitioner):
+    """Return (stats, cached) for the practitioner, computing on a cache miss."""
+    key = DASHBOARD_STATS_KEY.format(practitioner_id=practitioner.pk)
+    stats = cache.get(key)
+    if stats is not None:
+        return stats, True
+    stats = compute_dashboard_stats(practitioner)
+    cache.set(key, stats, DASHBOARD_STATS_TTL)
+    return stats, False
+
+
+def invalidate_dashboard_stats(practitioner_id):
+    """Drop a practitioner's cached stats once the current transaction commits."""
+    if practitioner_id:
+        key = DASHBOARD_STATS_KEY.format(practitioner_id=practitioner_id)
+        transaction.on_commit(lambda: cache.delete(key))
+
+
+@contextmanager
+def measure_queries():
+    """
+    Count the queries run and time the block, for reporting in responses:
+
+        with measure_queries() as timing:
+            ...
+        timing['query_count'], timing['latency_ms']
+    """
+    timing = {'query_count': 0, 'latency_ms': 0.0}
+
+    def count(execute, sql, params, many, context):
+        timing['query_count'] += 1
+        return execute(sql, params, many, context)
+
+    started = time_module.perf_counter()
+    with connection.execute_wrapper(count):
+        yield timing
+    timing['latency_ms'] = round((time_module.perf_counter() - started) * 1000, 2)
@@ -0,0 +1,237 @@
+"""
+Materialized free/busy data for practitioner availability.
+
+Busy time lives in `PractitionerBusyDay` rows (one 1440-bit minute bitmap per
+practitioner per UTC day). Free time — the resolved weekly template,
+preferences, holidays and out-of-office periods — is cached in Django's cache
+under a per-practitioner version key.
+
+Invalidation is event driven (see `practitioners.signals`):
+- Booking / ServiceSession changes delete only the busy rows for the UTC days
+  the booking touched (before and after the change).
+- Schedule, ScheduleTimeSlot, OutOfOffice, SchedulePreference and Service
+  changes bump the practitioner's template version.
+Both also mark the practitioner's stored next_available_date stale.
+
+Reads are read-through: missing busy rows are computed with a single Booking
+query over the missing days and stored, so the public slot endpoints only
+touch the booking tables right after an invalidation.
+"""
+import logging
+import time as time_module
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import pytz
+from django.core.cache import cache
+from django.db import transaction
+
+from practitioners.models import PractitionerBusyDay
+
+logger = logging.getLogger(__name__)
+
+MINUTES_PER_DAY = 24 * 60
+BITMAP_BYTES = MINUTES_PER_DAY // 8
+BUSY_STATUSES = ['confirmed', 'pending']
+
+TEMPLATE_TIMEOUT = 60 * 60
+TEMPLATE_KEY = 'availability:template:{service_id}:{version}'
+TEMPLATE_VERSION_KEY = 'availability:template-version:{practitioner_id}'
+
+
+# ── Bitmap encoding ──────────────────────────────────────────────────────────
+
+def _day_start(day: date) -> datetime:
+    return datetime(day.year, day.month, day.day, tzinfo=pytz.UTC)
+
+
+def utc_days(start: datetime, end: datetime) -> List[date]:
+    """UTC dates covered by the half-open interval [start, end)."""
+    first = start.astimezone(pytz.UTC).date()
+    last = (end.astimezone(pytz.UTC) - timedelta(microseconds=1)).date()
+    return [first + timedelta(days=i) for i in range((last - first).days + 1)]
+
+
+def encode_day(day: date, intervals: Iterable[Tuple[datetime, datetime]]) -> int:
+    """Set one bit per minute of `day` covered by any interval (rounded outward)."""
+    day_start = _day_start(day)
+    mask = 0
+    for start, end in intervals:
+        first = (start - day_start).total_seconds() // 60
+        last = -(-(end - day_start).total_seconds() // 60)  # ceil
+        first, last = max(0, int(first)), min(MINUTES_PER_DAY, int(last))
+        if last > first:
+            mask |= ((1 << (last - first)) - 1) << first
+    return mask
+
+
+def decode_day(day: date, mask: int) -> List[Tuple[datetime, datetime]]:
+    """Turn a minute bitmap back into sorted [start, end) intervals."""
+    day_start = _day_start(day)
+    intervals = []
+    while mask:
+        low = (mask & -mask).bit_length() - 1
+        run = mask >> low
+        length = (~run & (run + 1)).bit_length() - 1
+        intervals.append((
+            day_start + timedelta(minutes=low),
+            day_start + timedelta(minutes=low + length),
+        ))
+        mask &= ~(((1 << length) - 1) << low)
+    return intervals
+
+
+def _to_bytes(mask: int) -> bytes:
+    return mask.to_bytes(BITMAP_BYTES, 'little')
+
+
+def _from_bytes(data) -> int:
+    return int.from_bytes(bytes(data), 'little')
+
+
+# ── Busy rows ────────────────────────────────────────────────────────────────
+
+def compute_busy_days(practitioner_id: int, days: Iterable[date]) -> Dict[date, int]:
+    """Compute bitmaps for `days` with one Booking query covering their span."""
+    from bookings.models import Booking
+
+    days = sorted(set(days))
+    if not days:
+        return {}
+
+    range_start = _day_start(days[0])
+    range_end = _day_start(days[-1]) + timedelta(days=1)
+    rows = Booking.objects.filter(
+        service__primary_practitioner_id=practitioner_id,
+        status__in=BUSY_STATUSES,
+        service_session__start_time__lt=range_end,
+        service_session__start_time__gte=range_start - timedelta(days=1),
+    ).values_list(
+        'service_session__start_time', 'service_session__end_time', 'service__duration_minutes'
+    )
+
+    per_day: Dict[date, List[Tuple[datetime, datetime]]] = {day: [] for day in days}
+    for start, end, duration in rows:
+        if start is None:
+            continue
+        if end is None:
+            end = start + timedelta(minutes=duration or 60)
+        if end <= range_start:
+            continue
+        for day in utc_days(start, end):
+            if day in per_day:
+                per_day[day].append((start, end))
+
+    return {day: encode_day(day, intervals) for day, intervals in per_day.items()}
+
+
+def refresh_busy_days(practitioner_id: int, days: Iterable[date]) -> Dict[date, int]:
+    """Recompute and upsert busy rows for the given days."""
+    masks = compute_busy_days(practitioner_id, days)
+    if not masks:
+        return masks
+
+    with transaction.atomic():
+        PractitionerBusyDay.objects.filter(
+            practitioner_id=practitioner_id, date__in=list(masks)
+        ).delete()
+        PractitionerBusyDay.objects.bulk_create([
+            PractitionerBusyDay(
+                practitioner_id=practitioner_id,
+                date=day,
+                busy_bitmap=_to_bytes(mask),
+                busy_minutes=mask.bit_count(),
+            )
+            for day, mask in masks.items()
+        ], ignore_conflicts=True)
+    return masks
+
+
+def get_busy_intervals(practitioner_id: int, start: datetime, end: datetime
+                       ) -> List[Tuple[datetime, datetime]]:
+    """
+    Return booked intervals overlapping [start, end) from the materialized rows,
+    filling any missing days first. Intervals are minute-aligned and unpadded.
+    """
+    days = utc_days(start, end)
+    stored = {
+        row_date: _from_bytes(bitmap)
+        for row_date, bitmap in PractitionerBusyDay.objects.filter(
+            practitioner_id=practitioner_id, date__gte=days[0], date__lte=days[-1]
+        ).values_list('date', 'busy_bitmap')
+    }
+
+    missing = [day for day in days if day not in stored]
+    if missing:
+        stored.update(refresh_busy_days(practitioner_id, missing))
+
+    intervals = []
+    for day in days:
+        intervals.extend(decode_day(day, stored.get(day, 0)))
+
+    # Join runs split at UTC midnight
+    joined: List[Tuple[datetime, datetime]] = []
+    for interval in intervals:
+        if joined and interval[0] <= joined[-1][1]:
+            joined[-1] = (joined[-1][0], max(joined[-1][1], interval[1]))
+        else:
+            joined.append(interval)
+    return joined
+
+
+def invalidate_busy_days(practitioner_id: Optional[int], days: Iterable[date]):
+    """Drop busy rows for the affected days and queue an asynchronous rebuild."""
+    days: Set[date] = set(days)
+    if not practitioner_id or not days:
+        return
+
+    PractitionerBusyDay.objects.filter(practitioner_id=practitioner_id, date__in=days).delete()
+    _mark_next_available_stale(practitioner_id)
+
+    def _enqueue():
+        from practitioners.tasks.availability import refresh_practitioner_busy_days
+        try:
+            refresh_practitioner_busy_days.delay(practitioner_id, [d.isoformat() for d in sorted(days)])
+        except Exception as e:
+            # Rows are rebuilt on the next read anyway
+            logger.warning(f"[FreeBusy] Could not queue refresh for practitioner {practitioner_id}: {e}")
+
+    transaction.on_commit(_enqueue)
+
+
+# ── Template cache ───────────────────────────────────────────────────────────
+
+def get_template_version(practitioner_id: int) -> int:
+    key = TEMPLATE_VERSION_KEY.format(practitioner_id=practitioner_id)
+    version = cache.get(key)
+    if version is None:
+        version = time_module.time_ns()
+        cache.add(key, version, timeout=None)
+        version = cache.get(key, version)
+    return version
+
+
+def invalidate_template(practitioner_id: Optional[int]):
+    """Invalidate every cached availability template for a practitioner."""
+    if not practitioner_id:
+        return
+    cache.set(TEMPLATE_VERSION_KEY.format(practitioner_id=practitioner_id), time_module.time_ns(), timeout=None)
+    _mark_next_available_stale(practitioner_id)
+
+
+def _mark_next_available_stale(practitioner_id: int):
+    # Imported lazily: next_available depends on the engine, which imports this module
+    from practitioners.utils.next_available import mark_next_available_stale
+    mark_next_available_stale(practitioner_id)
+
+
+def get_cached_template(service_id: int, practitioner_id: int) -> Optional[dict]:
+    return cache.get(TEMPLATE_KEY.format(service_id=service_id, version=get_template_version(practitioner_id)))
+
+
+def set_cached_template(service_id: int, practitioner_id: int, template: dict):
+    cache.set(
+        TEMPLATE_KEY.format(service_id=service_id, version=get_template_version(practitioner_id)),
+        template,
+        TEMPLATE_TIMEOUT
+    )
@@ -0,0 +1,134 @@
+"""
+Next-available-date computation for practitioners.
+
+`Practitioner.next_available_date` drives the marketplace "availability" sort
+and the `available_now` filter, so it is stored and indexed rather than
+computed per request. Changes to schedules or bookings mark the practitioner
+stale (see `mark_next_available_stale`, called from the free/busy
+invalidation hooks) and `refresh_next_available_dates` recomputes only stale
+practitioners plus those whose stored slot has already passed. Practitioners
+with no slot inside the booking horizon are rechecked daily, as new days move
+into the horizon.
+"""
+import logging
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional
+
+from django.db.models import F, Q
+from django.utils import timezone
+
+from practitioners.models import Practitioner
+from practitioners.utils.availability_engine import PractitionerAvailabilityEngine
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 200
+
+# How often practitioners with no slot in the booking horizon are rechecked
+UNAVAILABLE_RECHECK_INTERVAL = timedelta(days=1)
+
+
+def mark_next_available_stale(practitioner_id: Optional[int]):
+    """Flag a practitioner for recomputation on the next pipeline run."""
+    if practitioner_id:
+        Practitioner.objects.filter(id=practitioner_id, next_available_stale=False).update(
+            next_available_stale=True
+        )
+
+
+def compute_next_available(practitioner: Practitioner, now: Optional[datetime] = None) -> Optional[datetime]:
+    """
+    Earliest bookable moment across the practitioner's active services:
+    the first free schedule slot for session services, or the next public
+    session with open seats for workshops and courses.
+    """
+    from services.models import Service, ServiceSession
+
+    now = now or timezone.now()
+    candidates = []
+
+    session_services = Service.objects.filter(
+        primary_practitioner=practitioner,
+        is_active=True,
+        status='active',
+        service_type__code='session'
+    ).select_related('schedule')
+    for service in session_services:
+        engine = PractitionerAvailabilityEngine(service, practitioner, now=now, use_cache=True)
+        slot = engine.next_slot()
+        if slot:
+            candidates.append(slot['start_datetime'])
+
+    next_session = ServiceSession.objects.filter(
+        service__primary_practitioner=practitioner,
+        service__is_active=True,
+        service__status='active',
+        service__service_type__code__in=['workshop', 'course'],
+        visibility='public',
+        status='scheduled',
+        start_time__gt=now,
+    ).filter(
+        Q(max_participants__isnull=True) | Q(current_participants__lt=F('max_participants'))
+    ).order_by('start_time').values_list('start_time', flat=True).first()
+    if next_session:
+        candidates.append(next_session)
+
+    return min(candidates) if candidates else None
+
+
+def stale_practitioner_ids(now: Optional[datetime] = None, limit: Optional[int] = None) -> List[int]:
+    """
+    Active practitioners flagged stale, whose stored next slot is already in
+    the past, or who had no slot when last checked over a day ago.
+    """
+    now = now or timezone.now()
+    unavailable = Q(next_available_date__isnull=True) & (
+        Q(next_available_computed_at__isnull=True)
+        | Q(next_available_computed_at__lte=now - UNAVAILABLE_RECHECK_INTERVAL)
+    )
+    queryset = Practitioner.objects.filter(practitioner_status='active').filter(
+        Q(next_available_stale=True) | Q(next_available_date__lte=now) | unavailable
+    ).values_list('id', flat=True).order_by('id')
+    if limit:
+        queryset = queryset[:limit]
+    return list(queryset)
+
+
+def refresh_next_available_dates(practitioner_ids: Iterable[int], now: Optional[datetime] = None) -> int:
+    """
+    Recompute and bulk-write `next_available_date` for the given practitioners.
+
+    The stale flag is cleared *before* computing, so a booking or schedule
+    change that lands mid-run marks the practitioner stale again and it is
+    picked up on the next run instead of being lost.
+    """
+    now = now or timezone.now()
+    practitioner_ids = list(practitioner_ids)
+    updated = 0
+
+    for offset in range(0, len(practitioner_ids), BATCH_SIZE):
+        batch_ids = practitioner_ids[offset:offset + BATCH_SIZE]
+        Practitioner.objects.filter(id__in=batch_ids).update(
+            next_available_stale=False, next_available_computed_at=now
+        )
+
+        practitioners = list(Practitioner.objects.filter(id__in=batch_ids).only(
+            'id', 'buffer_time', 'display_name', 'next_available_date'
+        ))
+        changed = []
+        for practitioner in practitioners:
+            try:
+                next_available = compute_next_available(practitioner, now=now)
+            except Exception as e:
+                logger.error(f"[NextAvailable] Error computing practitioner {practitioner.id}: {e}", exc_info=True)
+                mark_next_available_stale(practitioner.id)
+                continue
+            if practitioner.next_available_date != next_available:
+                practitioner.next_available_date = next_available
+                changed.append(practitioner)
+
+        if changed:
+            Practitioner.objects.bulk_update(changed, ['next_available_date'])
+        updated += len(changed)
+
+    return updated
@@ -0,0 +1,71 @@
+"""
+Maintain `Practitioner.search_vector`.
+
+The vector covers the same fields the old icontains search ORed together:
+  A  display name, professional title, user first/last name
+  B  specializations, modalities
+  C  active primary service names
+  D  bio
+It is rebuilt with one set-based UPDATE (related text is pulled in through
+correlated subqueries), so the same function serves the signals in
+`practitioners.signals`, the `rebuild_search_index` command and the backfill
+in migration 0015, which passes its historical app registry as `apps`.
+"""
+from typing import Iterable, Optional
+
+from django.apps import apps as global_apps
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import SearchVector
+from django.db.models import OuterRef, Subquery, TextField, Value
+from django.db.models.functions import Concat
+
+from utils.search import SEARCH_CONFIG
+
+
+def _aggregated(queryset, group_field: str, text_field: str) -> Subquery:
+    return Subquery(
+        queryset.values(group_field).annotate(text=StringAgg(text_field, ' ')).values('text')[:1],
+        output_field=TextField()
+    )
+
+
+def practitioner_search_vector(apps=global_apps) -> SearchVector:
+    Modality = apps.get_model('common', 'Modality')
+    Service = apps.get_model('services', 'Service')
+    Specialize = apps.get_model('practitioners', 'Specialize')
+    User = apps.get_model('users', 'User')
+
+    user_name = Subquery(
+        User.objects.filter(pk=OuterRef('user_id')).annotate(
+            full_name=Concat('first_name', Value(' '), 'last_name', output_field=TextField())
+        ).values('full_name')[:1],
+        output_field=TextField()
+    )
+    specializations = _aggregated(
+        Specialize.objects.filter(practitioners=OuterRef('pk')), 'practitioners', 'content'
+    )
+    modalities = _aggregated(
+        Modality.objects.filter(practitioners=OuterRef('pk')), 'practitioners', 'name'
+    )
+    services = _aggregated(
+        Service.objects.filter(primary_practitioner=OuterRef('pk'), is_active=True),
+        'primary_practitioner', 'name'
+    )
+
+    return (
+        SearchVector('display_name', 'professional_title', user_name, weight='A', config=SEARCH_CONFIG)
+        + SearchVector(specializations, modalities, weight='B', config=SEARCH_CONFIG)
+        + SearchVector(services, weight='C', config=SEARCH_CONFIG)
+        + SearchVector('bio', weight='D', config=SEARCH_CONFIG)
+    )
+
+
+def update_practitioner_search_vectors(practitioner_ids: Optional[Iterable[int]] = None, apps=global_apps) -> int:
+    """Rebuild search vectors for the given practitioners (all when None)."""
+    queryset = apps.get_model('practitioners', 'Practitioner').objects.all()
+    if practitioner_ids is not None:
+        practitioner_ids = [pk for pk in practitioner_ids if pk]
+        if not practitioner_ids:
+            return 0
+        queryset = queryset.filter(pk__in=practitioner_ids)
+    return queryset.update(search_vector=practitioner_search_vector(apps))
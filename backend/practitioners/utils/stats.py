@@ -0,0 +1,71 @@
+"""
+Maintain the denormalized stats columns on `Practitioner`.
+
+  ratings   rating_avg, rating_count           published reviews
+  services  active_service_count,              active primary services
+            min_price_cents, max_price_cents
+  sessions  completed_session_count            completed bookings
+
+Signals in `reviews.signals` and `practitioners.signals` refresh only the
+group a change can affect; the `rebuild_stats` command refreshes everything.
+"""
+from typing import Dict, Iterable, Optional
+
+from django.db.models import Count, Expression, IntegerField, Max, Min, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from practitioners.models import Practitioner
+from utils.stats import locked_update, rating_stats
+
+STAT_GROUPS = ('ratings', 'services', 'sessions')
+
+
+def _service_stats() -> Dict[str, Expression]:
+    from services.models import Service
+
+    services = Service.objects.filter(
+        primary_practitioner=OuterRef('pk'), is_active=True
+    ).values('primary_practitioner')
+    return {
+        'active_service_count': Coalesce(
+            Subquery(services.annotate(value=Count('pk')).values('value')[:1]),
+            Value(0),
+            output_field=IntegerField()
+        ),
+        'min_price_cents': Subquery(services.annotate(value=Min('price_cents')).values('value')[:1]),
+        'max_price_cents': Subquery(services.annotate(value=Max('price_cents')).values('value')[:1]),
+    }
+
+
+def _session_stats() -> Dict[str, Expression]:
+    from bookings.models import Booking
+
+    completed = Booking.objects.filter(
+        practitioner=OuterRef('pk'), status='completed'
+    ).values('practitioner').annotate(value=Count('pk')).values('value')[:1]
+    return {
+        'completed_session_count': Coalesce(Subquery(completed), Value(0), output_field=IntegerField()),
+    }
+
+
+def practitioner_stats(groups: Optional[Iterable[str]] = None) -> Dict[str, Expression]:
+    groups = set(groups or STAT_GROUPS)
+    values = {}
+    if 'ratings' in groups:
+        values.update(rating_stats('practitioner'))
+    if 'services' in groups:
+        values.update(_service_stats())
+    if 'sessions' in groups:
+        values.update(_session_stats())
+    return values
+
+
+def update_practitioner_stats(practitioner_ids: Iterable[int],
+                              groups: Optional[Iterable[str]] = None) -> int:
+    """Recompute the given stat groups (all when None) for these practitioners."""
+    practitioner_ids = {pk for pk in practitioner_ids if pk}
+    if not practitioner_ids:
+        return 0
+    return locked_update(
+        Practitioner.objects.filter(pk__in=practitioner_ids), practitioner_stats(groups)
+    )
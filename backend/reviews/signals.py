@@ -0,0 +1,46 @@
+"""
+Review signal handlers.
+
+Keeps the denormalized rating stats on Practitioner and Service (see
+`practitioners.utils.stats` and `services.stats`) in step with reviews. The
+stats are recomputed inside the same transaction as the review write when the
+caller has one open.
+"""
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from practitioners.utils.stats import update_practitioner_stats
+from reviews.models import Review
+from services.stats import update_service_stats
+
+
+def _update_rating_stats(practitioner_ids, service_ids):
+    update_practitioner_stats(practitioner_ids, groups=['ratings'])
+    update_service_stats(service_ids)
+
+
+@receiver(pre_save, sender=Review)
+def capture_review_targets(sender, instance, **kwargs):
+    """Remember the previous targets so a moved review is removed from their stats."""
+    instance._rating_targets_before = (None, None)
+    if instance.pk:
+        instance._rating_targets_before = Review.objects.filter(pk=instance.pk).values_list(
+            'practitioner_id', 'service_id'
+        ).first() or (None, None)
+
+
+@receiver(post_save, sender=Review)
+def update_rating_stats_for_review(sender, instance, update_fields=None, **kwargs):
+    # Vote and report counters don't affect ratings
+    if update_fields and not {'rating', 'is_published', 'practitioner', 'service'} & set(update_fields):
+        return
+    old_practitioner_id, old_service_id = getattr(instance, '_rating_targets_before', (None, None))
+    _update_rating_stats(
+        [instance.practitioner_id, old_practitioner_id],
+        [instance.service_id, old_service_id]
+    )
+
+
+@receiver(post_delete, sender=Review)
+def update_rating_stats_for_deleted_review(sender, instance, **kwargs):
+    _update_rating_stats([instance.practitioner_id], [instance.service_id])
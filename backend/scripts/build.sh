@@ -8,3 +8,4 @@ set -o errexit  # exit on error
 pip install -r requirements.txt
 python manage.py collectstatic --noinput
 python manage.py migrate --noinput
+python manage.py compile_email_templates
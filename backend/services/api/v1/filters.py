@@ -5,6 +5,7 @@ import django_filters
 from django.db.models import Q
 from services.models import Service, ServiceCategory, ServiceType
 from practitioners.models import Practitioner
+from utils.search import apply_text_search
 
 
 class ServiceFilter(django_filters.FilterSet):
@@ -37,6 +38,9 @@ class ServiceFilter(django_filters.FilterSet):
     min_price = django_filters.NumberFilter(method='filter_min_price')
     max_price = django_filters.NumberFilter(method='filter_max_price')
     
+    # Rating (denormalized, indexed)
+    min_rating = django_filters.NumberFilter(field_name='rating_avg', lookup_expr='gte')
+    
     # Duration filters
     min_duration = django_filters.NumberFilter(field_name='duration_minutes', lookup_expr='gte')
     max_duration = django_filters.NumberFilter(field_name='duration_minutes', lookup_expr='lte')
@@ -98,7 +102,7 @@ class ServiceFilter(django_filters.FilterSet):
         model = Service
         fields = [
             'category', 'category_id', 'modality', 'modality_id', 'service_type', 'service_type_id', 'exclude_types',
-            'practitioner', 'practitioner_slug', 'practitioner_category_id', 'uncategorized', 'min_price', 'max_price',
+            'practitioner', 'practitioner_slug', 'practitioner_category_id', 'uncategorized', 'min_price', 'max_price', 'min_rating',
             'min_duration', 'max_duration', 'min_participants', 'max_participants',
             'location_type', 'experience_level', 'age', 'is_featured',
             'is_active', 'is_public', 'status', 'is_bundle', 'is_package',
@@ -213,15 +217,7 @@ class ServiceFilter(django_filters.FilterSet):
 
     def filter_search(self, queryset, name, value):
         """Full text search across multiple fields including modality names"""
-        return queryset.filter(
-            Q(name__icontains=value) |
-            Q(description__icontains=value) |
-            Q(short_description__icontains=value) |
-            Q(tags__icontains=value) |
-            Q(primary_practitioner__display_name__icontains=value) |
-            Q(category__name__icontains=value) |
-            Q(modalities__name__icontains=value)
-        ).distinct()
+        return apply_text_search(queryset, value, 'name')
 
     def filter_uncategorized(self, queryset, name, value):
         """Filter services without a practitioner category"""
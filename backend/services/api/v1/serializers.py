@@ -1159,7 +1159,7 @@ class ServiceSearchSerializer(serializers.Serializer):
     is_featured = serializers.BooleanField(required=False)
     has_availability = serializers.BooleanField(required=False)
     sort_by = serializers.ChoiceField(
-        choices=['created_at', '-created_at', 'price', '-price', 'rating', '-rating', 'popularity'],
+        choices=['created_at', '-created_at', 'price', '-price', 'rating', '-rating', 'popularity', 'relevance'],
         default='-created_at'
     )
     page = serializers.IntegerField(min_value=1, default=1)
@@ -1,16 +1,16 @@
 """
 Services API views for DRF
 """
-from rest_framework import viewsets, permissions, filters, status
+from rest_framework import viewsets, permissions, filters, status, serializers
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.exceptions import PermissionDenied, ValidationError
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
-from django.db.models import Q, Count, Avg, F, Prefetch, Max, Exists, OuterRef
+from django.db.models import Q, Count, F, Prefetch, Max, Exists, OuterRef
 from django.utils import timezone
 from django.db import transaction
 from django_filters.rest_framework import DjangoFilterBackend
-from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiParameter
+from drf_spectacular.utils import extend_schema, extend_schema_view, inline_serializer, OpenApiParameter
 from drf_spectacular.types import OpenApiTypes
 
 from services.models import (
@@ -35,6 +35,8 @@ from .permissions import (
     IsPractitionerCategoryOwner
 )
 from .filters import ServiceFilter
+from utils.search import RelevanceOrderingFilter, apply_text_search
+from analytics.page_views import record_service_view, viewer_id
 
 
 @extend_schema_view(
@@ -176,10 +178,10 @@ class ServiceViewSet(viewsets.ModelViewSet):
     """
     permission_classes = [permissions.IsAuthenticatedOrReadOnly, IsServiceOwner]
     parser_classes = [JSONParser, MultiPartParser, FormParser]  # Accept both JSON and multipart
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    # ?search= is handled by ServiceFilter against the full-text index
+    filter_backends = [DjangoFilterBackend, RelevanceOrderingFilter]
     filterset_class = ServiceFilter
-    search_fields = ['name', 'description', 'tags']
-    ordering_fields = ['created_at', 'price_cents', 'name']
+    ordering_fields = ['created_at', 'price_cents', 'name', 'rating_avg', 'rating_count']
     ordering = ['-created_at']
     
     def get_queryset(self):
@@ -275,9 +277,8 @@ class ServiceViewSet(viewsets.ModelViewSet):
             is_public=True,
             status='active'
         ).annotate(
-            booking_count=Count('bookings'),
-            avg_rating_annotated=Avg('reviews__rating')
-        ).order_by('-booking_count', '-avg_rating')[:20]
+            booking_count=Count('bookings')
+        ).order_by('-booking_count', '-rating_avg')[:20]
         
         serializer = ServiceListSerializer(popular, many=True, context={'request': request})
         return Response(serializer.data)
@@ -293,11 +294,7 @@ class ServiceViewSet(viewsets.ModelViewSet):
         
         # Apply search filters
         if params.get('q'):
-            queryset = queryset.filter(
-                Q(name__icontains=params['q']) |
-                Q(description__icontains=params['q']) |
-                Q(tags__icontains=params['q'])
-            )
+            queryset = apply_text_search(queryset, params['q'], 'name')
         
         if params.get('category'):
             queryset = queryset.filter(category__slug=params['category'])
@@ -332,15 +329,17 @@ class ServiceViewSet(viewsets.ModelViewSet):
         # Apply sorting
         sort_by = params.get('sort_by', '-created_at')
         if sort_by == 'rating':
-            queryset = queryset.annotate(avg_rating_sort=Avg('reviews__rating')).order_by('-avg_rating_sort')
+            queryset = queryset.order_by('-rating_avg', '-rating_count')
         elif sort_by == '-rating':
-            queryset = queryset.annotate(avg_rating_sort=Avg('reviews__rating')).order_by('avg_rating_sort')
+            queryset = queryset.order_by('rating_avg', 'rating_count')
         elif sort_by == 'popularity':
             queryset = queryset.annotate(booking_count=Count('bookings')).order_by('-booking_count')
         elif sort_by == 'price':
             queryset = queryset.order_by('price_cents')
         elif sort_by == '-price':
             queryset = queryset.order_by('-price_cents')
+        elif sort_by == 'relevance':
+            queryset = queryset.order_by('-search_rank', '-created_at') if params.get('q') else queryset.order_by('-created_at')
         else:
             queryset = queryset.order_by(sort_by)
         
@@ -1293,10 +1292,10 @@ class PublicServiceViewSet(viewsets.ReadOnlyModelViewSet):
     """
     serializer_class = ServiceDetailSerializer
     permission_classes = [permissions.AllowAny]  # Public access
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    # ?search= is handled by ServiceFilter against the full-text index
+    filter_backends = [DjangoFilterBackend, RelevanceOrderingFilter]
     filterset_class = ServiceFilter
-    search_fields = ['name', 'description', 'tags']
-    ordering_fields = ['created_at', 'price_cents', 'name']
+    ordering_fields = ['created_at', 'price_cents', 'name', 'rating_avg', 'rating_count']
     ordering = ['-is_featured', '-created_at']
     lookup_field = 'public_uuid'
     lookup_url_kwarg = 'public_uuid'
@@ -1357,4 +1356,36 @@ class PublicServiceViewSet(viewsets.ReadOnlyModelViewSet):
             return Response(
                 {"detail": "Service not found"},
                 status=status.HTTP_404_NOT_FOUND
-            )
\ No newline at end of file
+            )
+
+    @extend_schema(
+        tags=['Public Services'],
+        request=inline_serializer(
+            name='PublicServiceViewRequest',
+            fields={'session_id': serializers.CharField(
+                required=False, max_length=100,
+                help_text='Anonymous id kept by the browser, so a visitor is counted once per day'
+            )}
+        )
+    )
+    @action(detail=True, methods=['post'])
+    def view(self, request, public_uuid=None):
+        """
+        Record a view of the public service page, once per viewer per day.
+        Counts are buffered and flushed by flush_page_view_counters.
+        """
+        service = Service.objects.filter(
+            public_uuid=public_uuid, is_active=True, is_public=True
+        ).values('id', 'primary_practitioner_id', 'primary_practitioner__user_id').first()
+        if service is None:
+            return Response(
+                {"detail": "Service not found"},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        # Practitioners looking at their own service are not counted
+        if service['primary_practitioner__user_id'] == request.user.id:
+            return Response({'viewed': False})
+
+        viewed = record_service_view(service['id'], service['primary_practitioner_id'], viewer_id(request))
+        return Response({'viewed': viewed})
@@ -0,0 +1,39 @@
+# Generated by Django 5.1.3 on 2026-10-16 19:50
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+def build_search_vectors(apps, schema_editor):
+    from services.search import update_service_search_vectors
+
+    update_service_search_vectors(apps=apps)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0009_seed_modalities_v6'),
+        ('locations', '0002_initial'),
+        ('practitioners', '0015_practitioner_search_vector'),
+        ('services', '0027_add_session_notes'),
+        ('utils', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='service',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(blank=True, editable=False, help_text='Maintained by services.search', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='service',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='service_search_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='service',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['name'], name='service_name_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.RunPython(build_search_vectors, migrations.RunPython.noop),
+    ]
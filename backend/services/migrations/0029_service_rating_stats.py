@@ -0,0 +1,44 @@
+# Generated by Django 5.1.3 on 2026-10-16 20:13
+
+from django.db import migrations, models
+
+BACKFILL_STATS = """
+UPDATE services_service s SET
+    rating_avg = r.rating_avg,
+    rating_count = r.rating_count
+FROM (
+    SELECT service_id, AVG(rating) AS rating_avg, COUNT(*) AS rating_count
+    FROM reviews_review WHERE is_published AND service_id IS NOT NULL GROUP BY service_id
+) r
+WHERE s.id = r.service_id
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0009_seed_modalities_v6'),
+        ('locations', '0003_practitionerlocation_lat_lng_index'),
+        ('practitioners', '0016_practitioner_stats'),
+        ('services', '0028_service_search_vector'),
+        ('utils', '0001_initial'),
+        ('reviews', '0004_add_response_fields'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='service',
+            name='rating_avg',
+            field=models.DecimalField(decimal_places=2, default=0, help_text='Average rating of published reviews', max_digits=3),
+        ),
+        migrations.AddField(
+            model_name='service',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0, help_text='Number of published reviews'),
+        ),
+        migrations.AddIndex(
+            model_name='service',
+            index=models.Index(fields=['-rating_avg', '-rating_count'], name='service_rating_idx'),
+        ),
+        migrations.RunSQL(BACKFILL_STATS, migrations.RunSQL.noop),
+    ]
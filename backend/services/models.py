@@ -1,9 +1,10 @@
 import uuid
 from decimal import Decimal
 from django.db import models
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.utils import timezone
 from django.core.validators import MinValueValidator, MaxValueValidator
-from django.db.models import Avg, Count
 from utils.models import BaseModel, PublicModel, Address
 from .enums import ServiceTypeEnum, ServiceStatusEnum
 
@@ -222,6 +223,13 @@ class Service(PublicModel):
     )
     # Note: Videos should be handled through ServiceResource, not directly on Service
     tags = models.JSONField(blank=True, null=True, help_text="Searchable tags")
+    search_vector = SearchVectorField(blank=True, null=True, editable=False,
+                                      help_text="Maintained by services.search")
+    
+    # Denormalized review stats (maintained by services.stats)
+    rating_avg = models.DecimalField(max_digits=3, decimal_places=2, default=0,
+                                   help_text="Average rating of published reviews")
+    rating_count = models.PositiveIntegerField(default=0, help_text="Number of published reviews")
     
     # Multi-language support
     languages = models.ManyToManyField('utils.Language', related_name='services', blank=True)
@@ -299,6 +307,9 @@ class Service(PublicModel):
             models.Index(fields=['is_featured', 'is_active']),
             models.Index(fields=['price_cents']),
             models.Index(fields=['experience_level']),
+            models.Index(fields=['-rating_avg', '-rating_count'], name='service_rating_idx'),
+            GinIndex(fields=['search_vector'], name='service_search_idx'),
+            GinIndex(fields=['name'], opclasses=['gin_trgm_ops'], name='service_name_trgm_idx'),
         ]
 
     def __str__(self):
@@ -344,22 +355,13 @@ class Service(PublicModel):
     
     @property
     def average_rating(self):
-        """Calculate average rating from reviews."""
-        from reviews.models import Review
-        result = Review.objects.filter(
-            service=self,
-            is_published=True
-        ).aggregate(avg_rating=Avg('rating'))
-        return round(result['avg_rating'] or 0, 2)
+        """Average rating of published reviews."""
+        return self.rating_avg
 
     @property
     def total_reviews(self):
         """Count total published reviews."""
-        from reviews.models import Review
-        return Review.objects.filter(
-            service=self,
-            is_published=True
-        ).count()
+        return self.rating_count
 
     @property
     def total_bookings(self):
@@ -0,0 +1,60 @@
+"""
+Maintain `Service.search_vector`.
+
+The vector covers the same fields the old icontains search ORed together:
+  A  name, tags
+  B  short description, category, modalities
+  C  primary practitioner display name
+  D  description
+Rebuilt with one set-based UPDATE by the signals in `services.signals`, the
+`rebuild_search_index` command and the backfill in migration 0028, which
+passes its historical app registry as `apps`.
+"""
+from typing import Iterable, Optional
+
+from django.apps import apps as global_apps
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import SearchVector
+from django.db.models import OuterRef, Subquery, TextField
+from django.db.models.functions import Cast
+
+from utils.search import SEARCH_CONFIG
+
+
+def service_search_vector(apps=global_apps) -> SearchVector:
+    Modality = apps.get_model('common', 'Modality')
+    Practitioner = apps.get_model('practitioners', 'Practitioner')
+    ServiceCategory = apps.get_model('services', 'ServiceCategory')
+
+    category = Subquery(
+        ServiceCategory.objects.filter(pk=OuterRef('category_id')).values('name')[:1],
+        output_field=TextField()
+    )
+    modalities = Subquery(
+        Modality.objects.filter(services=OuterRef('pk')).values('services').annotate(
+            text=StringAgg('name', ' ')
+        ).values('text')[:1],
+        output_field=TextField()
+    )
+    practitioner = Subquery(
+        Practitioner.objects.filter(pk=OuterRef('primary_practitioner_id')).values('display_name')[:1],
+        output_field=TextField()
+    )
+
+    return (
+        SearchVector('name', Cast('tags', TextField()), weight='A', config=SEARCH_CONFIG)
+        + SearchVector('short_description', category, modalities, weight='B', config=SEARCH_CONFIG)
+        + SearchVector(practitioner, weight='C', config=SEARCH_CONFIG)
+        + SearchVector('description', weight='D', config=SEARCH_CONFIG)
+    )
+
+
+def update_service_search_vectors(service_ids: Optional[Iterable[int]] = None, apps=global_apps) -> int:
+    """Rebuild search vectors for the given services (all when None)."""
+    queryset = apps.get_model('services', 'Service').objects.all()
+    if service_ids is not None:
+        service_ids = [pk for pk in service_ids if pk]
+        if not service_ids:
+            return 0
+        queryset = queryset.filter(pk__in=service_ids)
+    return queryset.update(search_vector=service_search_vector(apps))
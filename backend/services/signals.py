@@ -0,0 +1,41 @@
+"""
+Service signal handlers.
+
+Keeps `Service.search_vector` current (see `services.search`) when a service,
+its modalities, its category or its primary practitioner's name changes.
+"""
+from django.db.models.signals import m2m_changed, post_save
+from django.dispatch import receiver
+
+from practitioners.models import Practitioner
+from services.models import Service, ServiceCategory
+from services.search import update_service_search_vectors
+
+
+@receiver(post_save, sender=Service)
+def update_search_vector_for_service(sender, instance, **kwargs):
+    update_service_search_vectors([instance.pk])
+
+
+@receiver(m2m_changed, sender=Service.modalities.through)
+def update_search_vector_for_service_modalities(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        update_service_search_vectors([instance.pk])
+    elif pk_set:
+        update_service_search_vectors(pk_set)
+
+
+@receiver(post_save, sender=ServiceCategory)
+def update_search_vector_for_category(sender, instance, created, **kwargs):
+    if not created:
+        update_service_search_vectors(instance.services.values_list('pk', flat=True))
+
+
+@receiver(post_save, sender=Practitioner)
+def update_search_vector_for_practitioner_services(sender, instance, created, update_fields=None, **kwargs):
+    """The practitioner's display name is indexed on each of their services."""
+    if created or (update_fields and 'display_name' not in update_fields):
+        return
+    update_service_search_vectors(instance.primary_services.values_list('pk', flat=True))
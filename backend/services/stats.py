@@ -0,0 +1,17 @@
+"""
+Maintain `Service.rating_avg` / `Service.rating_count` from published reviews.
+
+Refreshed by `reviews.signals` and the `rebuild_stats` command.
+"""
+from typing import Iterable
+
+from services.models import Service
+from utils.stats import locked_update, rating_stats
+
+
+def update_service_stats(service_ids: Iterable[int]) -> int:
+    """Recompute rating stats for these services."""
+    service_ids = {pk for pk in service_ids if pk}
+    if not service_ids:
+        return 0
+    return locked_update(Service.objects.filter(pk__in=service_ids), rating_stats('service'))
@@ -55,7 +55,7 @@ def update_service_rankings():
     This can be used for featured services, search ranking, etc.
     """
     from services.models import Service
-    from django.db.models import Count, Avg, Q
+    from django.db.models import Count, Q
     from django.utils import timezone
     from datetime import timedelta
     
@@ -70,9 +70,7 @@ def update_service_rankings():
         recent_bookings=Count(
             'bookings',
             filter=Q(bookings__created_at__gte=recent_date)
-        ),
-        avg_rating=Avg('reviews__rating', filter=Q(reviews__is_published=True)),
-        total_reviews=Count('reviews', filter=Q(reviews__is_published=True))
+        )
     )
     
     updated_count = 0
@@ -85,12 +83,12 @@ def update_service_rankings():
         ranking_score += service.recent_bookings * 10
         
         # Average rating weight
-        if service.avg_rating:
-            ranking_score += service.avg_rating * 20
+        if service.rating_avg:
+            ranking_score += service.rating_avg * 20
         
         # Total reviews weight (with diminishing returns)
-        if service.total_reviews:
-            ranking_score += min(service.total_reviews, 50) * 2
+        if service.rating_count:
+            ranking_score += min(service.rating_count, 50) * 2
         
         # Update service metadata (you might want to add a ranking_score field)
         # For now, we'll just log it
@@ -1,9 +1,9 @@
 from rest_framework import serializers
 from django.utils import timezone
-from django.db.models import Q, Count
+from django.db.models import Q, Count, Value
 from streams.models import (
     Stream, StreamPost, StreamPostMedia, StreamSubscription,
-    StreamPostLike, StreamPostComment, StreamTip,
+    StreamPostLike, StreamPostSave, StreamPostComment, StreamTip,
     StreamCategory, StreamAnalytics
 )
 from rooms.models import Room, RoomRecording
@@ -179,6 +179,41 @@ class LinkedServiceSummarySerializer(serializers.Serializer):
     practitioner_name = serializers.CharField(source='practitioner.display_name', default=None)
 
 
+def get_post_engagement(user, post_ids):
+    """
+    Which of these posts the user has liked and saved, in one query.
+
+    Returns (liked_post_ids, saved_post_ids).
+    """
+    liked, saved = set(), set()
+    if not post_ids:
+        return liked, saved
+    rows = StreamPostLike.objects.filter(user=user, post_id__in=post_ids).annotate(
+        kind=Value('like')
+    ).values_list('post_id', 'kind').union(
+        StreamPostSave.objects.filter(user=user, post_id__in=post_ids).annotate(
+            kind=Value('save')
+        ).values_list('post_id', 'kind'),
+        all=True
+    )
+    for post_id, kind in rows:
+        (liked if kind == 'like' else saved).add(post_id)
+    return liked, saved
+
+
+class StreamPostListSerializer(serializers.ListSerializer):
+    """Resolves the user's liked/saved flags for the whole page up front."""
+
+    def to_representation(self, data):
+        posts = list(data.all() if hasattr(data, 'all') else data)
+        request = self.context.get('request')
+        if request and request.user.is_authenticated:
+            liked, saved = get_post_engagement(request.user, [post.id for post in posts])
+            self.context['liked_post_ids'] = liked
+            self.context['saved_post_ids'] = saved
+        return super().to_representation(posts)
+
+
 class StreamPostSerializer(BaseSerializer):
     """Serializer for stream posts."""
     stream_title = serializers.CharField(source='stream.title', read_only=True)
@@ -194,13 +229,14 @@ class StreamPostSerializer(BaseSerializer):
 
     class Meta:
         model = StreamPost
+        list_serializer_class = StreamPostListSerializer
         fields = [
             'id', 'public_uuid', 'stream', 'stream_title',
             'practitioner_name', 'practitioner_id', 'practitioner_slug', 'practitioner_image',
             'title', 'content', 'post_type', 'tier_level',
             'teaser_text', 'blur_preview',
             'is_published', 'published_at', 'is_pinned', 'expires_at',
-            'view_count', 'unique_view_count', 'like_count', 'comment_count', 'share_count',
+            'view_count', 'unique_view_count', 'like_count', 'save_count', 'comment_count', 'share_count',
             'allow_comments', 'allow_tips',
             'poll_options', 'poll_ends_at', 'poll_allows_multiple',
             'tags', 'media', 'can_access', 'is_liked', 'is_saved',
@@ -209,7 +245,7 @@ class StreamPostSerializer(BaseSerializer):
         ]
         read_only_fields = [
             'public_uuid', 'stream_title', 'practitioner_name', 'practitioner_id', 'practitioner_slug', 'practitioner_image',
-            'view_count', 'unique_view_count', 'like_count', 'comment_count', 'share_count',
+            'view_count', 'unique_view_count', 'like_count', 'save_count', 'comment_count', 'share_count',
             'linked_service_detail',
             'created_at', 'updated_at'
         ]
@@ -237,15 +273,18 @@ class StreamPostSerializer(BaseSerializer):
         request = self.context.get('request')
         if not request or not request.user.is_authenticated:
             return False
-        # Use prefetched likes instead of querying
-        return any(like.user_id == request.user.id for like in obj.likes.all())
+        # Lists resolve this for the whole page in StreamPostListSerializer
+        if 'liked_post_ids' in self.context:
+            return obj.id in self.context['liked_post_ids']
+        return StreamPostLike.objects.filter(user=request.user, post=obj).exists()
 
     def get_is_saved(self, obj):
         request = self.context.get('request')
         if not request or not request.user.is_authenticated:
             return False
-        # Use prefetched saves instead of querying
-        return any(save.user_id == request.user.id for save in obj.saves.all())
+        if 'saved_post_ids' in self.context:
+            return obj.id in self.context['saved_post_ids']
+        return StreamPostSave.objects.filter(user=request.user, post=obj).exists()
 
 
 class StreamPostCommentSerializer(BaseSerializer):
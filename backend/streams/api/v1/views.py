@@ -10,7 +10,7 @@ class TipRateThrottle(UserRateThrottle):
     rate = '30/hour'
 from django_filters.rest_framework import DjangoFilterBackend
 from django.utils import timezone
-from django.db.models import Q, F, Count, Sum
+from django.db.models import Q, F, Count, Sum, Exists, OuterRef
 from django.db.models.functions import Greatest
 from django.shortcuts import get_object_or_404
 from django.db import transaction
@@ -19,8 +19,12 @@ from drf_spectacular.types import OpenApiTypes
 
 from streams.models import (
     Stream, StreamPost, StreamSubscription, StreamPostMedia,
-    StreamCategory, StreamAnalytics, StreamPostComment, StreamPostSave
+    StreamCategory, StreamAnalytics, StreamPostComment, StreamPostSave,
+    StreamFeedEntry
 )
+from core.api.pagination import FeedCursorPagination
+from streams.counters import record_post_view
+from streams.tag_index import popular_tags as get_popular_tags
 
 
 from .serializers import (
@@ -879,48 +883,33 @@ class StreamPostViewSet(StreamPostMediaMixin, viewsets.ModelViewSet):
             # If no stream specified, return all posts user can access
             queryset = StreamPost.objects.all()
         
-        # Filter based on permissions and subscriptions
-        if self.request.user.is_authenticated:
-            # Get practitioner's own posts
-            own_posts = queryset.filter(stream__practitioner=self.request.user.practitioner_profile) if hasattr(self.request.user, 'practitioner_profile') else StreamPost.objects.none()
-            
-            # Get posts from subscribed streams
-            subscribed_streams = StreamSubscription.objects.filter(
-                user=self.request.user,
-                status='active'
-            ).values_list('stream_id', 'tier')
-            
-            # Build query for accessible posts
-            accessible_posts = Q(tier_level='free', is_published=True)  # Free posts
-            
-            for stream_id, tier in subscribed_streams:
-                if tier == 'premium':
-                    accessible_posts |= Q(stream_id=stream_id, is_published=True)
-                elif tier == 'entry':
-                    accessible_posts |= Q(stream_id=stream_id, tier_level__in=['free', 'entry'], is_published=True)
-                else:  # free
-                    accessible_posts |= Q(stream_id=stream_id, tier_level='free', is_published=True)
-            
-            # Combine own posts (all) and accessible posts
-            queryset = queryset.filter(Q(id__in=own_posts) | accessible_posts)
+        # Filter based on permissions and subscriptions. Which subscribed posts a
+        # user's tier can see is precomputed in their feed (StreamFeedEntry).
+        if self._subscribed_only():
+            # Home feed: a range read of the user's feed entries
+            queryset = queryset.filter(
+                feed_entries__user=self.request.user
+            ).annotate(feed_published_at=F('feed_entries__published_at'))
+        elif self.request.user.is_authenticated:
+            in_feed = StreamFeedEntry.objects.filter(user=self.request.user, post=OuterRef('pk'))
+            accessible_posts = Q(tier_level='free', is_published=True) | Q(Exists(in_feed))
+
+            # Practitioners see all of their own posts
+            if hasattr(self.request.user, 'practitioner_profile'):
+                accessible_posts |= Q(stream__practitioner=self.request.user.practitioner_profile)
+
+            queryset = queryset.filter(accessible_posts)
         else:
             # Not authenticated, show all published posts (but can_access will be false for premium)
             queryset = queryset.filter(is_published=True)
-        
-        # Filter to only posts from streams the user is subscribed to
-        subscribed_only = self.request.query_params.get('subscribed_only')
-        if subscribed_only == 'true' and self.request.user.is_authenticated:
-            subscribed_stream_ids = StreamSubscription.objects.filter(
-                user=self.request.user,
-                status='active'
-            ).values_list('stream_id', flat=True)
-            queryset = queryset.filter(stream_id__in=subscribed_stream_ids)
 
         # Filter by tags (JSONField containing list of strings)
         tags_param = self.request.query_params.get('tags')
         if tags_param:
-            for tag in tags_param.split(','):
-                queryset = queryset.filter(tags__contains=[tag.strip()])
+            tags = [tag.strip() for tag in tags_param.split(',') if tag.strip()]
+            if tags:
+                # One containment test, served by the tags GIN index
+                queryset = queryset.filter(tags__contains=tags)
 
         # Filter by practitioner modality
         modality_slug = self.request.query_params.get('modality')
@@ -944,13 +933,35 @@ class StreamPostViewSet(StreamPostMediaMixin, viewsets.ModelViewSet):
                 queryset=StreamSubscription.objects.none()
             )
 
+        # is_liked/is_saved come from one query per page (StreamPostListSerializer)
         return queryset.select_related('stream__practitioner').prefetch_related(
             'media',
-            'likes',
-            'saves',
             subscription_prefetch,
         )
 
+    def _subscribed_only(self):
+        return (
+            self.request.query_params.get('subscribed_only') == 'true'
+            and self.request.user.is_authenticated
+        )
+
+    @property
+    def paginator(self):
+        """
+        Newest-first lists page by cursor (FeedCursorPagination); other
+        orderings keep page numbers.
+        """
+        if not hasattr(self, '_paginator'):
+            ordering = self.request.query_params.get('ordering', '-published_at')
+            if self.action == 'list' and ordering == '-published_at':
+                self._paginator = FeedCursorPagination()
+                if self._subscribed_only():
+                    # Matches the (user, -published_at, -post) feed index
+                    self._paginator.ordering = ('-feed_published_at', '-id')
+            else:
+                self._paginator = self.pagination_class() if self.pagination_class else None
+        return self._paginator
+
     def get_permissions(self):
         """Set permissions based on action."""
         if self.action in ['list', 'retrieve', 'popular_tags', 'topics']:
@@ -1079,37 +1090,10 @@ class StreamPostViewSet(StreamPostMediaMixin, viewsets.ModelViewSet):
         post.refresh_from_db()
         serializer = self.get_serializer(post)
 
-        # Notify subscribers of new post (after transaction commits)
+        # Notify subscribers of new post in the background (after transaction commits)
         if post.is_published:
-            from django.db import transaction as db_transaction
-            def _notify_subscribers():
-                try:
-                    from notifications.services import get_client_notification_service
-                    notification_service = get_client_notification_service()
-                    subscribers = stream.subscriptions.filter(
-                        status='active'
-                    ).select_related('user')
-                    # Only notify subscribers who have access to this tier
-                    for sub in subscribers:
-                        if post.is_accessible_to_tier(sub.tier) and sub.notify_new_posts:
-                            try:
-                                notification_service.send_notification(
-                                    user=sub.user,
-                                    notification_type='new_stream_post',
-                                    title=f"New post from {stream.practitioner.display_name}",
-                                    message=post.title or post.content[:100],
-                                    metadata={
-                                        'stream_id': str(stream.public_uuid),
-                                        'post_id': str(post.public_uuid),
-                                        'practitioner_name': stream.practitioner.display_name,
-                                    }
-                                )
-                            except Exception:
-                                pass  # Don't fail post creation if notification fails
-                except Exception:
-                    pass  # Notification service may not be configured
-
-            db_transaction.on_commit(_notify_subscribers)
+            from streams.tasks import fan_out_new_stream_post
+            transaction.on_commit(lambda: fan_out_new_stream_post.delay(post.id))
 
         return Response(serializer.data, status=status.HTTP_201_CREATED)
     
@@ -1146,21 +1130,7 @@ class StreamPostViewSet(StreamPostMediaMixin, viewsets.ModelViewSet):
     @action(detail=False, methods=['get'], permission_classes=[AllowAny])
     def popular_tags(self, request):
         """Get the most popular tags across published posts."""
-        # Get all tags from published posts, flatten, and count
-        posts_with_tags = StreamPost.objects.filter(
-            is_published=True
-        ).exclude(tags=[]).values_list('tags', flat=True)
-
-        # Count tag frequency
-        tag_counts = {}
-        for tags_list in posts_with_tags:
-            if isinstance(tags_list, list):
-                for tag in tags_list:
-                    tag_counts[tag] = tag_counts.get(tag, 0) + 1
-
-        # Sort by frequency, return top 20
-        sorted_tags = sorted(tag_counts.items(), key=lambda x: x[1], reverse=True)[:20]
-        return Response([{'tag': t, 'count': c} for t, c in sorted_tags])
+        return Response(get_popular_tags(limit=20))
 
     @action(detail=False, methods=['get'], permission_classes=[AllowAny])
     def topics(self, request):
@@ -1200,30 +1170,24 @@ class StreamPostViewSet(StreamPostMediaMixin, viewsets.ModelViewSet):
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        # Toggle like
+        # Toggle like; the counter only moves when a row was actually added or removed
         from streams.models import StreamPostLike
         like, created = StreamPostLike.objects.get_or_create(
             user=request.user,
             post=post
         )
-        
-        if not created:
-            like.delete()
-            post.like_count = max(0, post.like_count - 1)
-            post.save(update_fields=['like_count'])
-            return Response({
-                'liked': False, 
-                'like_count': post.like_count,
-                'is_liked': False
-            })
-        else:
-            post.like_count = post.like_count + 1
-            post.save(update_fields=['like_count'])
-            return Response({
-                'liked': True, 
-                'like_count': post.like_count,
-                'is_liked': True
-            })
+
+        if created:
+            StreamPost.objects.filter(pk=post.pk).update(like_count=F('like_count') + 1)
+        elif like.delete()[0]:
+            StreamPost.objects.filter(pk=post.pk).update(like_count=Greatest(F('like_count') - 1, 0))
+        post.refresh_from_db(fields=['like_count'])
+
+        return Response({
+            'liked': created,
+            'like_count': post.like_count,
+            'is_liked': created
+        })
     
     @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated])
     def save(self, request, public_uuid=None):
@@ -1238,17 +1202,18 @@ class StreamPostViewSet(StreamPostMediaMixin, viewsets.ModelViewSet):
             )
         
         # Toggle save
-        from streams.models import StreamPostSave
         save, created = StreamPostSave.objects.get_or_create(
             user=request.user,
             post=post
         )
-        
-        if not created:
-            save.delete()
-            return Response({'saved': False})
-        else:
-            return Response({'saved': True})
+
+        if created:
+            StreamPost.objects.filter(pk=post.pk).update(save_count=F('save_count') + 1)
+        elif save.delete()[0]:
+            StreamPost.objects.filter(pk=post.pk).update(save_count=Greatest(F('save_count') - 1, 0))
+        post.refresh_from_db(fields=['save_count'])
+
+        return Response({'saved': created, 'save_count': post.save_count})
     
     @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated])
     def view(self, request, public_uuid=None):
@@ -1262,23 +1227,9 @@ class StreamPostViewSet(StreamPostMediaMixin, viewsets.ModelViewSet):
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        # Track view
-        from streams.models import StreamPostView
-        view, created = StreamPostView.objects.get_or_create(
-            user=request.user,
-            post=post,
-            defaults={'last_viewed_at': timezone.now()}
-        )
-        
-        if not created:
-            view.last_viewed_at = timezone.now()
-            view.save(update_fields=['last_viewed_at'])
-        else:
-            # Update counts
-            post.view_count = F('view_count') + 1
-            post.unique_view_count = StreamPostView.objects.filter(post=post).count()
-            post.save(update_fields=['view_count', 'unique_view_count'])
-        
+        # Track view; counts are buffered and flushed by flush_stream_view_counters
+        record_post_view(post, request.user)
+
         return Response({'viewed': True})
     
     @action(detail=True, methods=['get', 'post'], permission_classes=[IsAuthenticated])
@@ -0,0 +1,134 @@
+"""
+Stream post view counters (write-behind, see utils.counters).
+
+The view endpoint only calls record_post_view(), which buffers in Redis:
+
+- the post's view_count delta
+- the (post, viewer) pair with the time of the view
+- the stream's views for the day, and the viewer in a per-day HyperLogLog
+
+flush_view_counters() runs from Celery beat and writes all of it in bulk:
+view_count, StreamPostView rows, unique_view_count for the posts touched,
+and StreamAnalytics.total_views / unique_viewers per stream-day.
+
+Without Redis everything is written straight through instead.
+"""
+import logging
+from datetime import date, datetime
+from typing import Dict, Tuple
+
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from streams.models import StreamAnalytics, StreamPost, StreamPostView
+from utils.counters import BufferedCounter, BufferedHash, BufferedUniqueCounter
+
+logger = logging.getLogger(__name__)
+
+post_view_count = BufferedCounter(StreamPost, 'view_count')
+post_viewers = BufferedHash('streams.post_viewers')  # "post_id:user_id" -> ISO view time
+stream_daily_views = BufferedHash('streams.daily_views')  # "stream_id:YYYY-MM-DD" -> views
+stream_daily_viewers = BufferedUniqueCounter('streams.daily_viewers')  # same keys, viewer ids
+
+
+def record_post_view(post: StreamPost, user) -> None:
+    """Count a view of a post by a signed-in user."""
+    now = timezone.now()
+    day_key = f'{post.stream_id}:{now.date().isoformat()}'
+
+    if not post_viewers.put(f'{post.id}:{user.id}', now.isoformat()):
+        # No Redis: write through
+        post_view_count.incr(post.id)
+        _write_post_viewers({(post.id, user.id): now})
+        _write_daily_views({day_key: 1})
+        return
+
+    post_view_count.incr(post.id)
+    stream_daily_views.incr(day_key)
+    stream_daily_viewers.add(day_key, user.id)
+
+
+def pending_post_views(post: StreamPost) -> int:
+    """Views of a post recorded but not yet flushed."""
+    return post_view_count.pending(post.id)
+
+
+def flush_view_counters() -> Dict[str, int]:
+    """Write buffered view counts, viewers and daily analytics to the database."""
+    flushed_posts = post_view_count.flush()
+
+    viewers = {}
+    with post_viewers.flushing() as acquired:
+        if acquired:
+            for member, viewed_at in post_viewers.drain().items():
+                post_id, user_id = member.split(':')
+                viewers[(int(post_id), int(user_id))] = datetime.fromisoformat(viewed_at)
+            _write_post_viewers(viewers)
+            post_viewers.acknowledge()
+
+    daily = {}
+    with stream_daily_views.flushing() as acquired:
+        if acquired:
+            daily = {key: int(views) for key, views in stream_daily_views.drain().items()}
+            _write_daily_views(daily)
+            stream_daily_views.acknowledge()
+
+    return {'posts': flushed_posts, 'viewers': len(viewers), 'stream_days': len(daily)}
+
+
+def _write_post_viewers(viewers: Dict[Tuple[int, int], datetime]):
+    """Create or touch StreamPostView rows and refresh unique_view_count for those posts."""
+    if not viewers:
+        return
+
+    post_ids = {post_id for post_id, _ in viewers}
+    existing = {
+        (post_id, user_id): view_id
+        for view_id, post_id, user_id in StreamPostView.objects.filter(
+            post_id__in=post_ids,
+            user_id__in={user_id for _, user_id in viewers}
+        ).values_list('id', 'post_id', 'user_id')
+        if (post_id, user_id) in viewers
+    }
+
+    StreamPostView.objects.bulk_create(
+        [
+            StreamPostView(post_id=post_id, user_id=user_id)
+            for post_id, user_id in viewers if (post_id, user_id) not in existing
+        ],
+        ignore_conflicts=True
+    )
+    if existing:
+        # updated_at is the time of the latest view
+        StreamPostView.objects.filter(id__in=existing.values()).update(updated_at=timezone.now())
+
+    StreamPost.objects.filter(id__in=post_ids).update(unique_view_count=Coalesce(Subquery(
+        StreamPostView.objects.filter(post=OuterRef('pk'), user__isnull=False).order_by().values('post').annotate(
+            n=Count('id')
+        ).values('n')[:1]
+    ), Value(0)))
+
+
+def _write_daily_views(daily: Dict[str, int]):
+    """Add views to each stream-day's StreamAnalytics row and refresh its unique viewers."""
+    if not daily:
+        return
+
+    keys = {}
+    for key in daily:
+        stream_id, day = key.split(':')
+        keys[key] = (int(stream_id), date.fromisoformat(day))
+
+    StreamAnalytics.objects.bulk_create(
+        [StreamAnalytics(stream_id=stream_id, date=day) for stream_id, day in keys.values()],
+        ignore_conflicts=True
+    )
+    for key, views in daily.items():
+        stream_id, day = keys[key]
+        updates = {'total_views': F('total_views') + views}
+        unique = stream_daily_viewers.count(key)
+        if unique is not None:
+            # The HLL covers the whole day; never go backwards if Redis lost it
+            updates['unique_viewers'] = Greatest(F('unique_viewers'), Value(unique))
+        StreamAnalytics.objects.filter(stream_id=stream_id, date=day).update(**updates)
@@ -0,0 +1,101 @@
+"""
+Home feed maintenance (fan-out-on-write).
+
+Each subscriber has a StreamFeedEntry per published post their tier can view.
+Entries are written when things change rather than worked out on every read:
+
+- a post is created, published, unpublished, re-tiered or re-dated
+  -> sync_post_entries (run in the background, see streams.tasks)
+- a subscription starts, ends or changes tier
+  -> sync_subscription_entries (run inline, it only touches one stream)
+- deleting a post, stream or user cascades to its entries
+
+Reading a feed is then one range scan of (user, published_at).
+"""
+import logging
+
+from streams.models import StreamFeedEntry, StreamPost, StreamSubscription
+
+logger = logging.getLogger(__name__)
+
+# Entries per bulk_create
+FEED_WRITE_BATCH = 1000
+
+
+def sync_post_entries(post: StreamPost) -> int:
+    """
+    Make a post's feed entries match its active subscribers.
+
+    Returns the number of entries added.
+    """
+    entries = StreamFeedEntry.objects.filter(post=post)
+    if not post.is_published:
+        entries.delete()
+        return 0
+
+    eligible = StreamSubscription.objects.filter(
+        stream_id=post.stream_id,
+        status='active',
+        tier__in=post.accessible_tiers()
+    )
+    entries.exclude(user_id__in=eligible.values('user_id')).delete()
+    entries.exclude(published_at=post.published_at).update(published_at=post.published_at)
+
+    user_ids = eligible.exclude(
+        user_id__in=entries.values('user_id')
+    ).values_list('user_id', flat=True).iterator(chunk_size=FEED_WRITE_BATCH)
+    return _write_entries(
+        StreamFeedEntry(user_id=user_id, post_id=post.id, stream_id=post.stream_id, published_at=post.published_at)
+        for user_id in user_ids
+    )
+
+
+def sync_subscription_entries(subscription: StreamSubscription) -> int:
+    """
+    Make a subscriber's feed entries for one stream match their subscription.
+
+    Returns the number of entries added.
+    """
+    entries = StreamFeedEntry.objects.filter(user_id=subscription.user_id, stream_id=subscription.stream_id)
+    if subscription.status != 'active':
+        entries.delete()
+        return 0
+
+    tiers = subscription.accessible_post_tiers()
+    entries.exclude(post__tier_level__in=tiers).delete()
+
+    posts = StreamPost.objects.filter(
+        stream_id=subscription.stream_id,
+        is_published=True,
+        tier_level__in=tiers
+    ).exclude(
+        id__in=entries.values('post_id')
+    ).values_list('id', 'published_at').iterator(chunk_size=FEED_WRITE_BATCH)
+    return _write_entries(
+        StreamFeedEntry(
+            user_id=subscription.user_id, post_id=post_id,
+            stream_id=subscription.stream_id, published_at=published_at
+        )
+        for post_id, published_at in posts
+    )
+
+
+def remove_subscription_entries(user_id: int, stream_id: int):
+    """Drop a subscriber's entries for one stream."""
+    StreamFeedEntry.objects.filter(user_id=user_id, stream_id=stream_id).delete()
+
+
+def _write_entries(entries) -> int:
+    """bulk_create entries in batches; concurrent writers may already have added some."""
+    written = 0
+    batch = []
+    for entry in entries:
+        batch.append(entry)
+        if len(batch) >= FEED_WRITE_BATCH:
+            StreamFeedEntry.objects.bulk_create(batch, ignore_conflicts=True)
+            written += len(batch)
+            batch = []
+    if batch:
+        StreamFeedEntry.objects.bulk_create(batch, ignore_conflicts=True)
+        written += len(batch)
+    return written
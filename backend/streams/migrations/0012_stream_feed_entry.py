@@ -0,0 +1,69 @@
+# Generated by Django 5.1.3 on 2026-10-16 21:45
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+TIER_HIERARCHY = {'free': 0, 'entry': 1, 'premium': 2}
+
+
+def backfill_feed_entries(apps, schema_editor):
+    """Enter every published post each active subscriber's tier can view."""
+    StreamSubscription = apps.get_model('streams', 'StreamSubscription')
+    StreamPost = apps.get_model('streams', 'StreamPost')
+    StreamFeedEntry = apps.get_model('streams', 'StreamFeedEntry')
+
+    posts_by_stream = {}
+    for post_id, stream_id, tier_level, published_at in StreamPost.objects.filter(
+        is_published=True
+    ).values_list('id', 'stream_id', 'tier_level', 'published_at').iterator():
+        posts_by_stream.setdefault(stream_id, []).append((post_id, TIER_HIERARCHY.get(tier_level, 0), published_at))
+
+    batch = []
+    for user_id, stream_id, tier in StreamSubscription.objects.filter(
+        status='active'
+    ).values_list('user_id', 'stream_id', 'tier').iterator():
+        level = TIER_HIERARCHY.get(tier, 0)
+        for post_id, required_level, published_at in posts_by_stream.get(stream_id, []):
+            if level >= required_level:
+                batch.append(StreamFeedEntry(
+                    user_id=user_id, post_id=post_id, stream_id=stream_id, published_at=published_at
+                ))
+        if len(batch) >= 1000:
+            StreamFeedEntry.objects.bulk_create(batch, ignore_conflicts=True)
+            batch = []
+    if batch:
+        StreamFeedEntry.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('streams', '0011_production_readiness_fixes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StreamFeedEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('published_at', models.DateTimeField(help_text="Copy of the post's published_at, for ordering")),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='feed_entries', to='streams.streampost')),
+                ('stream', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='feed_entries', to='streams.stream')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stream_feed_entries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Stream Feed Entry',
+                'verbose_name_plural': 'Stream Feed Entries',
+                'indexes': [
+                    models.Index(fields=['user', '-published_at', '-post'], name='stream_feed_user_recent_idx'),
+                    models.Index(fields=['user', 'stream'], name='stream_feed_user_stream_idx'),
+                ],
+                'unique_together': {('user', 'post')},
+            },
+        ),
+        migrations.RunPython(backfill_feed_entries, migrations.RunPython.noop),
+    ]
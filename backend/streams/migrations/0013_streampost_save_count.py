@@ -0,0 +1,38 @@
+# Generated by Django 5.1.3 on 2026-10-16 22:00
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_engagement_counts(apps, schema_editor):
+    """Set like_count and save_count from the like and save rows."""
+    StreamPost = apps.get_model('streams', 'StreamPost')
+    StreamPostLike = apps.get_model('streams', 'StreamPostLike')
+    StreamPostSave = apps.get_model('streams', 'StreamPostSave')
+
+    def count_of(model):
+        return Coalesce(Subquery(
+            model.objects.filter(post=OuterRef('pk')).order_by().values('post').annotate(n=Count('id')).values('n')[:1]
+        ), Value(0))
+
+    StreamPost.objects.update(
+        like_count=count_of(StreamPostLike),
+        save_count=count_of(StreamPostSave),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('streams', '0012_stream_feed_entry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='streampost',
+            name='save_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_engagement_counts, migrations.RunPython.noop),
+    ]
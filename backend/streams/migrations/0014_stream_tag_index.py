@@ -0,0 +1,53 @@
+# Generated by Django 5.1.3 on 2026-10-16 22:30
+
+import django.contrib.postgres.indexes
+from collections import Counter
+from django.db import migrations, models
+
+MAX_TAG_LENGTH = 100
+
+
+def backfill_tag_counts(apps, schema_editor):
+    """Count the tags on published posts."""
+    StreamPost = apps.get_model('streams', 'StreamPost')
+    StreamTagCount = apps.get_model('streams', 'StreamTagCount')
+
+    counts = Counter()
+    for tags in StreamPost.objects.filter(is_published=True).values_list('tags', flat=True).iterator():
+        if isinstance(tags, list):
+            counts.update({tag for tag in tags if isinstance(tag, str) and tag and len(tag) <= MAX_TAG_LENGTH})
+
+    StreamTagCount.objects.bulk_create(
+        [StreamTagCount(tag=tag, post_count=count) for tag, count in counts.items()],
+        batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('streams', '0013_streampost_save_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StreamTagCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('tag', models.CharField(max_length=100, unique=True)),
+                ('post_count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Stream Tag Count',
+                'verbose_name_plural': 'Stream Tag Counts',
+                'indexes': [models.Index(fields=['-post_count'], name='stream_tag_popular_idx')],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='streampost',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['tags'], name='streampost_tags_gin', opclasses=['jsonb_path_ops']),
+        ),
+        migrations.RunPython(backfill_tag_counts, migrations.RunPython.noop),
+    ]
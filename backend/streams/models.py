@@ -1,4 +1,5 @@
 from django.db import models
+from django.contrib.postgres.indexes import GinIndex
 from django.core.validators import MinValueValidator
 from django.utils import timezone
 from utils.models import BaseModel, PublicModel
@@ -11,6 +12,9 @@ TIER_CHOICES = [
     ('premium', 'Premium'),
 ]
 
+# Tier ordering - a subscriber can see posts at or below their tier
+TIER_HIERARCHY = {'free': 0, 'entry': 1, 'premium': 2}
+
 # Post type choices
 POST_TYPE_CHOICES = [
     ('post', 'Text Post'),
@@ -264,6 +268,7 @@ class StreamPost(PublicModel):
     view_count = models.PositiveIntegerField(default=0)
     unique_view_count = models.PositiveIntegerField(default=0)
     like_count = models.PositiveIntegerField(default=0)
+    save_count = models.PositiveIntegerField(default=0)
     comment_count = models.PositiveIntegerField(default=0)
     share_count = models.PositiveIntegerField(default=0)
     
@@ -302,6 +307,8 @@ class StreamPost(PublicModel):
             models.Index(fields=['tier_level']),
             models.Index(fields=['post_type']),
             models.Index(fields=['published_at']),
+            # Serves tags__contains (jsonb @>) filters
+            GinIndex(fields=['tags'], name='streampost_tags_gin', opclasses=['jsonb_path_ops']),
         ]
     
     def __str__(self):
@@ -309,11 +316,36 @@ class StreamPost(PublicModel):
     
     def is_accessible_to_tier(self, user_tier):
         """Check if post is accessible to a given tier"""
-        tier_hierarchy = {'free': 0, 'entry': 1, 'premium': 2}
-        required_level = tier_hierarchy.get(self.tier_level, 0)
-        user_level = tier_hierarchy.get(user_tier, 0)
+        required_level = TIER_HIERARCHY.get(self.tier_level, 0)
+        user_level = TIER_HIERARCHY.get(user_tier, 0)
         return user_level >= required_level
 
+    def accessible_tiers(self):
+        """Tiers that can view this post, for filtering subscriptions in SQL"""
+        required_level = TIER_HIERARCHY.get(self.tier_level, 0)
+        return [tier for tier, level in TIER_HIERARCHY.items() if level >= required_level]
+
+
+class StreamTagCount(BaseModel):
+    """
+    Number of published posts carrying each tag.
+
+    Kept current by streams.tag_index as posts are created, edited and
+    deleted, so popular tags are a top-N read instead of a scan of every post.
+    """
+    tag = models.CharField(max_length=100, unique=True)
+    post_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = 'Stream Tag Count'
+        verbose_name_plural = 'Stream Tag Counts'
+        indexes = [
+            models.Index(fields=['-post_count'], name='stream_tag_popular_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.tag} ({self.post_count})"
+
 
 class StreamPostMedia(BaseModel):
     """Media attachments for stream posts"""
@@ -473,6 +505,49 @@ class StreamSubscription(BaseModel):
         required_level = tier_hierarchy.get(required_tier, 0)
         return user_level >= required_level
 
+    def accessible_post_tiers(self):
+        """Post tier levels this subscription can view, for filtering posts in SQL"""
+        user_level = TIER_HIERARCHY.get(self.tier, 0)
+        return [tier for tier, level in TIER_HIERARCHY.items() if level <= user_level]
+
+
+class StreamFeedEntry(BaseModel):
+    """
+    A post in a subscriber's home feed (fan-out-on-write).
+
+    Entries are written when a post is published or a subscription starts or
+    changes tier (see streams.feed), and only for posts the subscriber's tier
+    can view, so reading a feed is one range scan over (user, published_at).
+    """
+    user = models.ForeignKey(
+        'users.User',
+        on_delete=models.CASCADE,
+        related_name='stream_feed_entries'
+    )
+    post = models.ForeignKey(
+        StreamPost,
+        on_delete=models.CASCADE,
+        related_name='feed_entries'
+    )
+    stream = models.ForeignKey(
+        Stream,
+        on_delete=models.CASCADE,
+        related_name='feed_entries'
+    )
+    published_at = models.DateTimeField(help_text="Copy of the post's published_at, for ordering")
+
+    class Meta:
+        verbose_name = 'Stream Feed Entry'
+        verbose_name_plural = 'Stream Feed Entries'
+        unique_together = ['user', 'post']
+        indexes = [
+            models.Index(fields=['user', '-published_at', '-post'], name='stream_feed_user_recent_idx'),
+            models.Index(fields=['user', 'stream'], name='stream_feed_user_stream_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user} - post {self.post_id}"
+
 
 class StreamPostLike(BaseModel):
     """Track post likes"""
@@ -1,7 +1,16 @@
+from django.db import transaction
 from django.db.models import Count, Q
-from django.db.models.signals import post_save, post_delete
+from django.db.models.signals import post_save, post_delete, pre_save
 from django.dispatch import receiver
-from .models import StreamSubscription
+from .feed import remove_subscription_entries, sync_subscription_entries
+from .models import StreamPost, StreamSubscription
+from .tag_index import apply_tag_changes, counted_tags
+
+# Fields that decide which posts are in which home feeds
+POST_FEED_FIELDS = {'is_published', 'tier_level', 'published_at', 'stream'}
+SUBSCRIPTION_FEED_FIELDS = {'tier', 'status', 'user', 'stream'}
+# Fields that decide which tags a post counts for
+POST_TAG_FIELDS = {'tags', 'is_published'}
 
 
 def _update_stream_counts(stream):
@@ -18,10 +27,47 @@ def _update_stream_counts(stream):
 
 
 @receiver(post_save, sender=StreamSubscription)
-def update_counts_on_subscription_save(sender, instance, **kwargs):
+def update_counts_on_subscription_save(sender, instance, update_fields=None, **kwargs):
     _update_stream_counts(instance.stream)
+    if not update_fields or SUBSCRIPTION_FEED_FIELDS.intersection(update_fields):
+        sync_subscription_entries(instance)
 
 
 @receiver(post_delete, sender=StreamSubscription)
 def update_counts_on_subscription_delete(sender, instance, **kwargs):
     _update_stream_counts(instance.stream)
+    remove_subscription_entries(instance.user_id, instance.stream_id)
+
+
+@receiver(post_save, sender=StreamPost)
+def sync_feeds_on_post_save(sender, instance, created, update_fields=None, **kwargs):
+    """Rewrite the post's feed entries in the background when its visibility may have changed."""
+    if update_fields and not POST_FEED_FIELDS.intersection(update_fields):
+        return  # counter updates (likes, views, comments)
+    from .tasks import sync_post_feed
+    post_id = instance.id
+    transaction.on_commit(lambda: sync_post_feed.delay(post_id))
+
+
+@receiver(pre_save, sender=StreamPost)
+def remember_post_tags(sender, instance, update_fields=None, **kwargs):
+    """Keep the tags the stored post counts for, so post_save can apply just the difference."""
+    if update_fields and not POST_TAG_FIELDS.intersection(update_fields):
+        return
+    previous = None
+    if instance.pk:
+        previous = StreamPost.objects.filter(pk=instance.pk).values('is_published', 'tags').first()
+    instance._counted_tags = counted_tags(previous['is_published'], previous['tags']) if previous else set()
+
+
+@receiver(post_save, sender=StreamPost)
+def update_tag_counts_on_post_save(sender, instance, **kwargs):
+    before = instance.__dict__.pop('_counted_tags', None)
+    if before is None:
+        return  # tags and publication untouched
+    apply_tag_changes(before, counted_tags(instance.is_published, instance.tags))
+
+
+@receiver(post_delete, sender=StreamPost)
+def update_tag_counts_on_post_delete(sender, instance, **kwargs):
+    apply_tag_changes(counted_tags(instance.is_published, instance.tags), set())
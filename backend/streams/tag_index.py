@@ -0,0 +1,72 @@
+"""
+Tag counts for stream posts.
+
+StreamTagCount holds how many published posts carry each tag. The
+StreamPost signals call apply_tag_changes() with the tags a post counted
+for before and after a save or delete, and only the difference is written.
+popular_tags() reads the top of the table through a short cache.
+"""
+from collections import Counter
+from typing import Iterable, List
+
+from django.core.cache import cache
+from django.db.models import Case, F, IntegerField, Value, When
+from django.db.models.functions import Greatest
+
+from streams.models import StreamTagCount
+
+POPULAR_TAGS_CACHE_KEY = 'streams:popular_tags:{limit}'
+POPULAR_TAGS_CACHE_TTL = 300
+POPULAR_TAGS_LIMITS = (20,)
+MAX_TAG_LENGTH = StreamTagCount._meta.get_field('tag').max_length
+
+
+def counted_tags(is_published: bool, tags) -> set:
+    """The tags a post contributes to the counts."""
+    if not is_published or not isinstance(tags, list):
+        return set()
+    return {tag for tag in tags if isinstance(tag, str) and tag and len(tag) <= MAX_TAG_LENGTH}
+
+
+def apply_tag_changes(before: Iterable[str], after: Iterable[str]):
+    """Move the counts from a post's old tag set to its new one."""
+    delta = Counter()
+    for tag in set(after) - set(before):
+        delta[tag] += 1
+    for tag in set(before) - set(after):
+        delta[tag] -= 1
+    if not delta:
+        return
+
+    StreamTagCount.objects.bulk_create(
+        [StreamTagCount(tag=tag) for tag, change in delta.items() if change > 0],
+        ignore_conflicts=True
+    )
+    StreamTagCount.objects.filter(tag__in=delta).update(post_count=Greatest(
+        F('post_count') + Case(
+            *[When(tag=tag, then=Value(change)) for tag, change in delta.items()],
+            default=Value(0),
+            output_field=IntegerField(),
+        ),
+        Value(0)
+    ))
+    invalidate_popular_tags()
+
+
+def popular_tags(limit: int = 20) -> List[dict]:
+    """Most used tags on published posts, most used first."""
+    key = POPULAR_TAGS_CACHE_KEY.format(limit=limit)
+    result = cache.get(key)
+    if result is None:
+        result = [
+            {'tag': tag, 'count': count}
+            for tag, count in StreamTagCount.objects.filter(
+                post_count__gt=0
+            ).order_by('-post_count', 'tag').values_list('tag', 'post_count')[:limit]
+        ]
+        cache.set(key, result, POPULAR_TAGS_CACHE_TTL)
+    return result
+
+
+def invalidate_popular_tags():
+    cache.delete_many([POPULAR_TAGS_CACHE_KEY.format(limit=limit) for limit in POPULAR_TAGS_LIMITS])
@@ -0,0 +1,202 @@
+"""
+Stream background tasks.
+Fans new posts out to subscribers' notifications and home feeds.
+"""
+import logging
+from celery import shared_task
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from notifications.models import Notification, NotificationSetting
+from notifications.services.client_notifications import ClientNotificationService
+from notifications.tasks.scheduled import EMAIL_BATCH_TASK_SIZE, send_email_notification_batch
+from streams.counters import flush_view_counters
+from streams.feed import sync_post_entries
+from streams.models import StreamPost, StreamSubscription
+
+logger = logging.getLogger(__name__)
+
+# Subscriptions handled per bulk_create and WebSocket push
+FANOUT_CHUNK_SIZE = 1000
+
+
+@shared_task(bind=True)
+def fan_out_new_stream_post(self, post_id: int):
+    """
+    Notify every eligible subscriber of a newly published post.
+
+    Subscribers are filtered in SQL (active, notify_new_posts, a tier that can
+    see the post, not already notified) and walked in chunks. Each chunk gets
+    its in-app and email Notification rows in one bulk_create, one WebSocket
+    push and batched email tasks. Progress is reported through the task state.
+    """
+    try:
+        post = StreamPost.objects.select_related('stream__practitioner').get(id=post_id)
+    except StreamPost.DoesNotExist:
+        logger.error(f"Stream post {post_id} not found")
+        return None
+
+    if not post.is_published:
+        return {'total': 0, 'in_app': 0, 'email': 0}
+
+    stream = post.stream
+    practitioner_name = stream.practitioner.display_name
+    notification_key = f'stream_post_{post.id}'
+    title = f"New post from {practitioner_name}"
+    message = post.title or post.content[:100]
+    metadata = {
+        'stream_id': str(stream.public_uuid),
+        'post_id': str(post.public_uuid),
+        'practitioner_name': practitioner_name,
+    }
+    template = ClientNotificationService.TEMPLATES['new_stream_post']
+    email_metadata = {
+        **metadata,
+        'template_path': template['path'],
+        'subject': template['subject'].format(practitioner_name=practitioner_name),
+        'template_data': {
+            **metadata,
+            'post_title': post.title or '',
+            'post_preview': post.teaser_text or post.content[:300],
+            'published_time': post.published_at.strftime('%B %d, %Y at %I:%M %p'),
+        },
+    }
+
+    stream_settings = NotificationSetting.objects.filter(
+        user_id=OuterRef('user_id'),
+        notification_type='stream'
+    )
+    subscriptions = StreamSubscription.objects.filter(
+        stream=stream,
+        status='active',
+        notify_new_posts=True,
+        tier__in=post.accessible_tiers()
+    ).exclude(
+        # Already notified by an earlier (retried) run
+        Exists(Notification.objects.filter(user_id=OuterRef('user_id'), notification_key=notification_key))
+    ).annotate(
+        in_app_off=Exists(stream_settings.filter(in_app_enabled=False)),
+        email_off=Exists(stream_settings.filter(email_enabled=False)),
+    )
+
+    total = subscriptions.count()
+    processed = in_app_count = email_count = 0
+    last_id = 0
+
+    while True:
+        chunk = list(
+            subscriptions.filter(id__gt=last_id).order_by('id').values_list(
+                'id', 'user_id', 'user__email', 'in_app_off', 'email_off'
+            )[:FANOUT_CHUNK_SIZE]
+        )
+        if not chunk:
+            break
+        last_id = chunk[-1][0]
+
+        now = timezone.now()
+        rows = []
+        for _, user_id, email, in_app_off, email_off in chunk:
+            common = {
+                'user_id': user_id,
+                'title': title,
+                'message': message,
+                'notification_type': 'stream',
+                'related_object_type': 'stream_post',
+                'related_object_id': str(post.public_uuid),
+                'notification_key': notification_key,
+            }
+            if not in_app_off:
+                rows.append(Notification(
+                    delivery_channel='in_app', status='sent', sent_at=now, metadata=metadata, **common
+                ))
+            if email and not email_off:
+                # Due now, so process_scheduled_notifications retries it if the batch send fails
+                rows.append(Notification(
+                    delivery_channel='email', status='pending', scheduled_for=now,
+                    metadata=email_metadata, **common
+                ))
+
+        with transaction.atomic():
+            created = Notification.objects.bulk_create(rows)
+
+        in_app = [n for n in created if n.delivery_channel == 'in_app']
+        email_ids = [n.id for n in created if n.delivery_channel == 'email']
+        _push_websocket_notifications(in_app)
+        for start in range(0, len(email_ids), EMAIL_BATCH_TASK_SIZE):
+            send_email_notification_batch.delay(email_ids[start:start + EMAIL_BATCH_TASK_SIZE])
+
+        processed += len(chunk)
+        in_app_count += len(in_app)
+        email_count += len(email_ids)
+        if self.request.id:
+            self.update_state(state='PROGRESS', meta={
+                'post_id': post_id,
+                'processed': processed,
+                'total': total,
+            })
+
+    logger.info(
+        f"Post {post_id} fan-out: {processed} subscribers, "
+        f"{in_app_count} in-app, {email_count} emails queued"
+    )
+    return {'total': processed, 'in_app': in_app_count, 'email': email_count}
+
+
+def _push_websocket_notifications(notifications):
+    """Send a chunk of in-app notifications over WebSocket in one event loop pass."""
+    if not notifications:
+        return
+
+    from channels.layers import get_channel_layer
+    from asgiref.sync import async_to_sync
+
+    channel_layer = get_channel_layer()
+    if channel_layer is None:
+        return
+
+    async def send_all():
+        for notification in notifications:
+            await channel_layer.group_send(
+                f"notifications_{notification.user_id}",
+                {
+                    "type": "notification.new",
+                    "notification": {
+                        "id": str(notification.id),
+                        "title": notification.title,
+                        "message": notification.message,
+                        "notification_type": notification.notification_type,
+                        "is_read": notification.is_read,
+                        "created_at": notification.created_at.isoformat(),
+                        "related_object_type": notification.related_object_type,
+                        "related_object_id": notification.related_object_id,
+                    }
+                }
+            )
+
+    try:
+        async_to_sync(send_all)()
+    except Exception as e:
+        logger.error(f"Error sending WebSocket notifications: {str(e)}")
+
+
+@shared_task
+def sync_post_feed(post_id: int):
+    """Write (or withdraw) a post's home feed entries for the stream's subscribers."""
+    try:
+        post = StreamPost.objects.get(id=post_id)
+    except StreamPost.DoesNotExist:
+        return 0  # deleted; its entries went with it
+
+    added = sync_post_entries(post)
+    logger.info(f"Post {post_id} added to {added} feeds")
+    return added
+
+
+@shared_task
+def flush_stream_view_counters():
+    """Write buffered post views and daily stream view analytics to the database."""
+    result = flush_view_counters()
+    if any(result.values()):
+        logger.info(f"Flushed stream view counters: {result}")
+    return result
@@ -0,0 +1,97 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from practitioners.models import Practitioner
+from streams.feed import sync_post_entries
+from streams.models import Stream, StreamFeedEntry, StreamPost, StreamSubscription
+from users.models import User
+
+
+class HomeFeedTestCase(TestCase):
+    """Feed entries follow posts and subscriptions, and the feed reads from them."""
+
+    def setUp(self):
+        self.streams = []
+        for name in ('Tide', 'Grove'):
+            practitioner_user = User.objects.create_user(email=f'{name.lower()}@example.com', password='testpass123')
+            practitioner = Practitioner.objects.create(user=practitioner_user, display_name=f'{name} Studio')
+            self.streams.append(Stream.objects.create(
+                practitioner=practitioner, title=f'{name} Studio', description='Weekly practice',
+                entry_tier_price_cents=500, premium_tier_price_cents=1500
+            ))
+        self.user = User.objects.create_user(email='feed-reader@example.com', password='testpass123')
+
+    def post(self, stream, tier_level, minutes_ago, **kwargs):
+        post = StreamPost.objects.create(
+            stream=stream, content='Breath work', post_type='post', tier_level=tier_level,
+            published_at=timezone.now() - timedelta(minutes=minutes_ago), **kwargs
+        )
+        sync_post_entries(post)  # normally run by the sync_post_feed task
+        return post
+
+    def subscribe(self, stream, tier):
+        now = timezone.now()
+        return StreamSubscription.objects.create(
+            user=self.user, stream=stream, tier=tier,
+            current_period_start=now, current_period_end=now + timedelta(days=30)
+        )
+
+    def feed_post_ids(self):
+        return set(StreamFeedEntry.objects.filter(user=self.user).values_list('post_id', flat=True))
+
+    def test_entries_follow_subscription_tier(self):
+        free = self.post(self.streams[0], 'free', 30)
+        entry = self.post(self.streams[0], 'entry', 20)
+        premium = self.post(self.streams[0], 'premium', 10)
+        self.post(self.streams[0], 'free', 5, is_published=False)
+
+        subscription = self.subscribe(self.streams[0], 'entry')
+        self.assertEqual(self.feed_post_ids(), {free.id, entry.id})
+
+        subscription.tier = 'premium'
+        subscription.save()
+        self.assertEqual(self.feed_post_ids(), {free.id, entry.id, premium.id})
+
+        subscription.tier = 'free'
+        subscription.save(update_fields=['tier'])
+        self.assertEqual(self.feed_post_ids(), {free.id})
+
+        subscription.status = 'canceled'
+        subscription.save()
+        self.assertEqual(self.feed_post_ids(), set())
+
+    def test_new_and_unpublished_posts_update_feeds(self):
+        self.subscribe(self.streams[0], 'free')
+        post = self.post(self.streams[0], 'free', 10)
+        self.post(self.streams[0], 'premium', 5)
+        self.assertEqual(self.feed_post_ids(), {post.id})
+
+        post.is_published = False
+        post.save()
+        sync_post_entries(post)
+        self.assertEqual(self.feed_post_ids(), set())
+
+    def test_subscribed_feed_pages_by_cursor(self):
+        self.subscribe(self.streams[0], 'premium')
+        self.subscribe(self.streams[1], 'free')
+        expected = [
+            self.post(self.streams[0], 'premium', 10),
+            self.post(self.streams[1], 'free', 20),
+            self.post(self.streams[0], 'free', 30),
+        ]
+        self.post(self.streams[1], 'premium', 15)  # above the subscription tier
+
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        response = client.get('/api/v1/stream-posts/', {'subscribed_only': 'true', 'page_size': 2})
+        self.assertEqual(response.status_code, 200)
+        first = response.data['data']
+        self.assertIsNotNone(first['next'])
+
+        second = client.get(first['next']).data['data']
+        self.assertIsNone(second['next'])
+        ids = [post['public_uuid'] for post in first['results'] + second['results']]
+        self.assertEqual(ids, [str(post.public_uuid) for post in expected])
@@ -0,0 +1,66 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from practitioners.models import Practitioner
+from streams.models import Stream, StreamPost, StreamPostLike, StreamPostSave
+from users.models import User
+
+
+class PostEngagementTestCase(TestCase):
+    """Like/save counters are stored, and list flags do not scale with engagement."""
+
+    def setUp(self):
+        practitioner_user = User.objects.create_user(email='engage-practitioner@example.com', password='testpass123')
+        practitioner = Practitioner.objects.create(user=practitioner_user, display_name='Engage Studio')
+        self.stream = Stream.objects.create(
+            practitioner=practitioner, title='Engage Studio', description='Weekly practice',
+            entry_tier_price_cents=500, premium_tier_price_cents=1500
+        )
+        self.posts = [
+            StreamPost.objects.create(stream=self.stream, content=f'Post {i}', post_type='post', tier_level='free')
+            for i in range(3)
+        ]
+        self.user = User.objects.create_user(email='engage-reader@example.com', password='testpass123')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def url(self, post, action):
+        return f'/api/v1/stream-posts/{post.public_uuid}/{action}/'
+
+    def test_like_and_save_toggle_counters(self):
+        post = self.posts[0]
+
+        response = self.client.post(self.url(post, 'like'))
+        self.assertEqual((response.data['liked'], response.data['like_count']), (True, 1))
+        response = self.client.post(self.url(post, 'save'))
+        self.assertEqual((response.data['saved'], response.data['save_count']), (True, 1))
+
+        response = self.client.post(self.url(post, 'like'))
+        self.assertEqual((response.data['liked'], response.data['like_count']), (False, 0))
+        response = self.client.post(self.url(post, 'save'))
+        self.assertEqual((response.data['saved'], response.data['save_count']), (False, 0))
+
+    def test_list_flags_use_one_query_regardless_of_likes(self):
+        for i in range(20):
+            fan = User.objects.create_user(email=f'fan{i}@example.com', password='testpass123')
+            StreamPostLike.objects.create(user=fan, post=self.posts[1])
+        StreamPostLike.objects.create(user=self.user, post=self.posts[1])
+        StreamPostSave.objects.create(user=self.user, post=self.posts[2])
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/v1/stream-posts/')
+        self.assertEqual(response.status_code, 200)
+
+        flags = {
+            post['id']: (post['is_liked'], post['is_saved'])
+            for post in response.data['data']['results']
+        }
+        self.assertEqual(flags, {
+            self.posts[0].id: (False, False),
+            self.posts[1].id: (True, False),
+            self.posts[2].id: (False, True),
+        })
+        like_queries = [q for q in queries.captured_queries if 'streams_streampostlike' in q['sql']]
+        self.assertEqual(len(like_queries), 1)
@@ -0,0 +1,83 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+
+from notifications.models import Notification, NotificationSetting
+from practitioners.models import Practitioner
+from streams.models import Stream, StreamPost, StreamSubscription
+from streams.tasks import fan_out_new_stream_post
+from users.models import User
+
+
+@mock.patch('streams.tasks._push_websocket_notifications')
+@mock.patch('streams.tasks.send_email_notification_batch')
+class NewPostFanOutTestCase(TestCase):
+    """New posts notify eligible subscribers with bulk-created rows."""
+
+    def setUp(self):
+        practitioner_user = User.objects.create_user(email='stream-practitioner@example.com', password='testpass123')
+        practitioner = Practitioner.objects.create(user=practitioner_user, display_name='Tide Studio')
+        self.stream = Stream.objects.create(
+            practitioner=practitioner, title='Tide Studio', description='Weekly practice',
+            entry_tier_price_cents=500, premium_tier_price_cents=1500
+        )
+        self.users = {}
+        for name, tier, status, notify in [
+            ('free', 'free', 'active', True),
+            ('entry', 'entry', 'active', True),
+            ('premium', 'premium', 'active', True),
+            ('muted', 'premium', 'active', False),
+            ('canceled', 'premium', 'canceled', True),
+        ]:
+            user = User.objects.create_user(email=f'stream-{name}@example.com', password='testpass123')
+            now = timezone.now()
+            StreamSubscription.objects.create(
+                user=user, stream=self.stream, tier=tier, status=status, notify_new_posts=notify,
+                current_period_start=now, current_period_end=now + timedelta(days=30)
+            )
+            self.users[name] = user
+
+    def post(self, tier_level):
+        return StreamPost.objects.create(
+            stream=self.stream, title='Morning flow', content='Twenty minutes of breath work',
+            post_type='post', tier_level=tier_level
+        )
+
+    def notified(self, post, channel):
+        return set(Notification.objects.filter(
+            notification_key=f'stream_post_{post.id}', delivery_channel=channel
+        ).values_list('user__email', flat=True))
+
+    def test_notifies_subscribers_with_access(self, email_task, push):
+        post = self.post('entry')
+
+        result = fan_out_new_stream_post(post.id)
+
+        expected = {'stream-entry@example.com', 'stream-premium@example.com'}
+        self.assertEqual(result, {'total': 2, 'in_app': 2, 'email': 2})
+        self.assertEqual(self.notified(post, 'in_app'), expected)
+        self.assertEqual(self.notified(post, 'email'), expected)
+        self.assertEqual(len(push.call_args[0][0]), 2)
+        email_ids = email_task.delay.call_args[0][0]
+        self.assertEqual(
+            set(Notification.objects.filter(id__in=email_ids).values_list('status', flat=True)),
+            {'pending'}
+        )
+        # Due now, so the every-minute scheduler retries them if the batch fails
+        self.assertFalse(Notification.objects.filter(id__in=email_ids, scheduled_for__isnull=True).exists())
+
+    def test_respects_channel_settings_and_is_idempotent(self, email_task, push):
+        NotificationSetting.objects.create(
+            user=self.users['free'], notification_type='stream', email_enabled=False
+        )
+        post = self.post('free')
+
+        fan_out_new_stream_post(post.id)
+        result = fan_out_new_stream_post(post.id)
+
+        self.assertEqual(result['total'], 0)
+        self.assertIn('stream-free@example.com', self.notified(post, 'in_app'))
+        self.assertNotIn('stream-free@example.com', self.notified(post, 'email'))
+        self.assertEqual(len(self.notified(post, 'in_app')), 3)
@@ -0,0 +1,65 @@
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from practitioners.models import Practitioner
+from streams.models import Stream, StreamPost, StreamTagCount
+from users.models import User
+
+
+class TagIndexTestCase(TestCase):
+    """Tag counts follow post edits, and popular tags are read from them."""
+
+    def setUp(self):
+        cache.clear()
+        practitioner_user = User.objects.create_user(email='tags-practitioner@example.com', password='testpass123')
+        practitioner = Practitioner.objects.create(user=practitioner_user, display_name='Tag Studio')
+        self.stream = Stream.objects.create(
+            practitioner=practitioner, title='Tag Studio', description='Weekly practice',
+            entry_tier_price_cents=500, premium_tier_price_cents=1500
+        )
+
+    def create_post(self, tags, **kwargs):
+        return StreamPost.objects.create(
+            stream=self.stream, content='Post', post_type='post', tier_level='free', tags=tags, **kwargs
+        )
+
+    def counts(self):
+        return dict(StreamTagCount.objects.filter(post_count__gt=0).values_list('tag', 'post_count'))
+
+    def test_counts_follow_post_changes(self):
+        first = self.create_post(['yoga', 'breath', 'yoga'])
+        self.create_post(['yoga'])
+        draft = self.create_post(['sleep'], is_published=False)
+        self.assertEqual(self.counts(), {'yoga': 2, 'breath': 1})
+
+        first.tags = ['breath', 'sleep']
+        first.save()
+        self.assertEqual(self.counts(), {'yoga': 1, 'breath': 1, 'sleep': 1})
+
+        draft.is_published = True
+        draft.save(update_fields=['is_published'])
+        self.assertEqual(self.counts(), {'yoga': 1, 'breath': 1, 'sleep': 2})
+
+        first.delete()
+        self.assertEqual(self.counts(), {'yoga': 1, 'sleep': 1})
+
+    def test_counter_updates_leave_tags_alone(self):
+        post = self.create_post(['yoga'])
+        post.view_count = 10
+        post.save(update_fields=['view_count'])
+        self.assertEqual(self.counts(), {'yoga': 1})
+
+    def test_popular_tags_endpoint(self):
+        self.create_post(['yoga', 'breath'])
+        self.create_post(['yoga'])
+
+        response = APIClient().get('/api/v1/stream-posts/popular_tags/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, [{'tag': 'yoga', 'count': 2}, {'tag': 'breath', 'count': 1}])
+
+        # Edits invalidate the cached list
+        self.create_post(['breath'])
+        self.create_post(['breath'])
+        response = APIClient().get('/api/v1/stream-posts/popular_tags/')
+        self.assertEqual(response.data[0], {'tag': 'breath', 'count': 3})
@@ -0,0 +1,47 @@
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from practitioners.models import Practitioner
+from streams.counters import flush_view_counters
+from streams.models import Stream, StreamAnalytics, StreamPost, StreamPostView
+from users.models import User
+
+
+@override_settings(REDIS_URL='')
+class PostViewCountersTestCase(TestCase):
+    """Without Redis, post views are written straight through."""
+
+    def setUp(self):
+        practitioner_user = User.objects.create_user(email='views-practitioner@example.com', password='testpass123')
+        practitioner = Practitioner.objects.create(user=practitioner_user, display_name='Views Studio')
+        self.stream = Stream.objects.create(
+            practitioner=practitioner, title='Views Studio', description='Weekly practice',
+            entry_tier_price_cents=500, premium_tier_price_cents=1500
+        )
+        self.post = StreamPost.objects.create(stream=self.stream, content='Post', post_type='post', tier_level='free')
+
+    def view_as(self, user):
+        client = APIClient()
+        client.force_authenticate(user=user)
+        response = client.post(f'/api/v1/stream-posts/{self.post.public_uuid}/view/')
+        self.assertEqual(response.status_code, 200)
+
+    def test_views_update_counts_and_analytics(self):
+        readers = [
+            User.objects.create_user(email=f'viewer{i}@example.com', password='testpass123')
+            for i in range(2)
+        ]
+        self.view_as(readers[0])
+        self.view_as(readers[0])
+        self.view_as(readers[1])
+
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.view_count, 3)
+        self.assertEqual(self.post.unique_view_count, 2)
+        self.assertEqual(StreamPostView.objects.filter(post=self.post).count(), 2)
+        analytics = StreamAnalytics.objects.get(stream=self.stream, date=timezone.now().date())
+        self.assertEqual(analytics.total_views, 3)
+
+        # Nothing was buffered
+        self.assertEqual(flush_view_counters(), {'posts': 0, 'viewers': 0, 'stream_days': 0})
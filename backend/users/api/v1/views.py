@@ -14,7 +14,7 @@ from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
 from django.utils.encoding import force_bytes, force_str
 from django.utils import timezone
 from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiResponse
-from django.db.models import Count, Q
+from django.db.models import Count
 from .serializers import (
     UserRegistrationSerializer,
     UserLoginSerializer,
@@ -1049,7 +1049,7 @@ def user_recommendations(request):
     from users.models import UserModalityPreference
     from services.models import Service
     from practitioners.models import Practitioner
-    from django.db.models import Avg, Count, Case, When, IntegerField
+    from django.db.models import Count, Case, When, IntegerField
 
     # Get limit from query params (default 6)
     services_limit = int(request.query_params.get('services_limit', 6))
@@ -1084,16 +1084,14 @@ def user_recommendations(request):
                 *priority_cases,
                 default=999,
                 output_field=IntegerField()
-            ),
-            reviews_count=Count('reviews'),
-            avg_rating=Avg('reviews__rating')
+            )
         ).select_related(
             'primary_practitioner__user',
             'category'
         ).prefetch_related('modalities').distinct().order_by(
             'modality_priority',
             '-is_featured',
-            '-avg_rating'
+            '-rating_avg'
         )[:services_limit]
 
         # Get practitioners matching user's modalities
@@ -1106,14 +1104,11 @@ def user_recommendations(request):
                 *priority_cases,
                 default=999,
                 output_field=IntegerField()
-            ),
-            reviews_count=Count('reviews'),
-            avg_rating=Avg('reviews__rating'),
-            services_count=Count('primary_services', filter=Q(primary_services__is_active=True))
+            )
         ).select_related('user').prefetch_related('modalities').distinct().order_by(
             'modality_priority',
             '-featured',
-            '-avg_rating'
+            '-rating_avg'
         )[:practitioners_limit]
 
         recommended_services = list(services_qs)
@@ -1131,15 +1126,13 @@ def user_recommendations(request):
         ).exclude(
             id__in=exclude_ids
         ).annotate(
-            reviews_count=Count('reviews'),
-            avg_rating=Avg('reviews__rating'),
             bookings_count=Count('bookings')
         ).select_related(
             'primary_practitioner__user',
             'category'
         ).prefetch_related('modalities').order_by(
             '-is_featured',
-            '-avg_rating',
+            '-rating_avg',
             '-bookings_count'
         )[:services_limit - len(recommended_services)]
 
@@ -1153,14 +1146,10 @@ def user_recommendations(request):
             is_verified=True
         ).exclude(
             id__in=exclude_ids
-        ).annotate(
-            reviews_count=Count('reviews'),
-            avg_rating=Avg('reviews__rating'),
-            services_count=Count('primary_services', filter=Q(primary_services__is_active=True))
         ).select_related('user').prefetch_related('modalities').order_by(
             '-featured',
-            '-avg_rating',
-            '-reviews_count'
+            '-rating_avg',
+            '-rating_count'
         )[:practitioners_limit - len(recommended_practitioners)]
 
         recommended_practitioners.extend(list(fallback_practitioners))
@@ -1177,8 +1166,8 @@ def user_recommendations(request):
             'price_cents': service.price_cents,
             'duration_minutes': service.duration_minutes,
             'image_url': service.image_url,
-            'average_rating': getattr(service, 'avg_rating', None),
-            'total_reviews': getattr(service, 'reviews_count', 0),
+            'average_rating': service.rating_avg,
+            'total_reviews': service.rating_count,
             'is_featured': service.is_featured,
             'service_type_code': service.service_type.code if service.service_type else None,
             'category': {
@@ -1209,9 +1198,9 @@ def user_recommendations(request):
             'profile_image_url': practitioner.profile_image_url,
             'is_verified': practitioner.is_verified,
             'is_featured': practitioner.featured,
-            'average_rating': getattr(practitioner, 'avg_rating', None),
-            'total_reviews': getattr(practitioner, 'reviews_count', 0),
-            'services_count': getattr(practitioner, 'services_count', 0),
+            'average_rating': practitioner.rating_avg,
+            'total_reviews': practitioner.rating_count,
+            'services_count': practitioner.active_service_count,
             'modalities': [
                 {'id': m.id, 'name': m.name, 'slug': m.slug}
                 for m in practitioner.modalities.all()
@@ -0,0 +1,325 @@
+"""
+Write-behind counters.
+
+Hot-path increments (views, downloads) go to Redis instead of the row, and a
+periodic job folds the accumulated deltas into the database in bulk:
+
+    post_views = BufferedCounter(StreamPost, 'view_count')
+    post_views.incr(post.id)        # request: one HINCRBY
+    post_views.flush()              # Celery beat: one UPDATE per 500 rows
+
+Flushing reads the pending deltas, applies them with F() expressions and
+only then subtracts exactly what was applied, so increments that arrive
+mid-flush are kept and a failed flush is retried next time. Each flush holds
+a Redis lock (flush_lock), so an overrunning run and the next scheduled one
+never apply the same deltas twice.
+
+Without REDIS_URL (local development, tests) there is no shared buffer, so
+incr() writes an atomic F() update straight away and flush() is a no-op.
+"""
+import json
+import logging
+import threading
+import uuid
+from contextlib import contextmanager
+from typing import Dict, Hashable, List, Optional
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Case, F, IntegerField, Value, When
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+# Rows per UPDATE when flushing
+FLUSH_BATCH_SIZE = 500
+
+# Seconds before a flush lock whose holder died is given up
+FLUSH_LOCK_TTL = 300
+
+# ARGV is pk1, delta1, pk2, delta2, ...
+ACKNOWLEDGE_SCRIPT = """
+for i = 1, #ARGV, 2 do
+    if redis.call('HINCRBY', KEYS[1], ARGV[i], -tonumber(ARGV[i + 1])) == 0 then
+        redis.call('HDEL', KEYS[1], ARGV[i])
+    end
+end
+return 0
+"""
+
+# Delete the lock only if this flusher still holds it
+RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_redis():
+    """Process-wide Redis client for counters, or None when Redis is not configured."""
+    global _client
+    url = getattr(settings, 'REDIS_URL', '')
+    if not url or redis is None:
+        return None
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = redis.Redis.from_url(url, decode_responses=True)
+    return _client
+
+
+@contextmanager
+def flush_lock(key: str, ttl: int = FLUSH_LOCK_TTL):
+    """
+    Yield True if this caller may flush, False while another flusher holds
+    `key`. The lock expires after `ttl` seconds in case its holder dies, so a
+    flush must finish well within that. Without Redis there is nothing shared
+    to protect and the lock is always granted.
+    """
+    client = get_redis()
+    if client is None:
+        yield True
+        return
+    token = uuid.uuid4().hex
+    if not client.set(key, token, nx=True, ex=ttl):
+        yield False
+        return
+    try:
+        yield True
+    finally:
+        client.eval(RELEASE_LOCK_SCRIPT, 1, key, token)
+
+
+class BufferedCounter:
+    """An integer column whose increments are buffered in a Redis hash keyed by pk."""
+
+    def __init__(self, model, field: str):
+        self.model = model
+        self.field = field
+        self.key = f'counters:{model._meta.label_lower}:{field}'
+        self.lock_key = f'{self.key}:lock'
+
+    def incr(self, pk, amount: int = 1) -> int:
+        """
+        Add to the counter for one row.
+
+        Returns the amount still waiting to be flushed for that row, so callers
+        can show stored value + pending.
+        """
+        client = get_redis()
+        if client is None:
+            self.model.objects.filter(pk=pk).update(**{self.field: F(self.field) + amount})
+            return 0
+        return client.hincrby(self.key, pk, amount)
+
+    def pending(self, pk) -> int:
+        """Increments for one row not yet written to the database."""
+        client = get_redis()
+        if client is None:
+            return 0
+        return int(client.hget(self.key, pk) or 0)
+
+    def flush(self) -> int:
+        """Write pending deltas to the database. Returns the number of rows updated."""
+        client = get_redis()
+        if client is None:
+            return 0
+
+        with flush_lock(self.lock_key) as acquired:
+            if not acquired:
+                logger.info(f"[Counters] {self.key} is being flushed elsewhere, skipping")
+                return 0
+            deltas = {int(pk): int(delta) for pk, delta in client.hgetall(self.key).items() if int(delta)}
+            items = list(deltas.items())
+            for start in range(0, len(items), FLUSH_BATCH_SIZE):
+                batch = dict(items[start:start + FLUSH_BATCH_SIZE])
+                self.model.objects.filter(pk__in=batch).update(**{
+                    self.field: F(self.field) + Case(
+                        *[When(pk=pk, then=Value(delta)) for pk, delta in batch.items()],
+                        default=Value(0),
+                        output_field=IntegerField(),
+                    )
+                })
+                self._acknowledge(client, batch)
+
+        if items:
+            logger.info(f"[Counters] Flushed {self.key} for {len(items)} rows")
+        return len(items)
+
+    def _acknowledge(self, client, applied: Dict[Hashable, int]):
+        """Subtract what was written, dropping fields that reach zero, in one atomic step."""
+        args = [item for pk, delta in applied.items() for item in (pk, delta)]
+        client.eval(ACKNOWLEDGE_SCRIPT, 1, self.key, *args)
+
+
+class BufferedUniqueCounter:
+    """
+    Approximate distinct counts (HyperLogLog) per key, e.g. viewers per stream per day.
+
+    Keys expire after `ttl` seconds so finished periods do not pile up.
+    """
+
+    def __init__(self, name: str, ttl: int = 3 * 24 * 3600):
+        self.prefix = f'hll:{name}'
+        self.ttl = ttl
+
+    def add(self, key: str, member) -> bool:
+        """Record a member; returns False when Redis is not configured."""
+        client = get_redis()
+        if client is None:
+            return False
+        redis_key = f'{self.prefix}:{key}'
+        pipe = client.pipeline()
+        pipe.pfadd(redis_key, member)
+        pipe.expire(redis_key, self.ttl)
+        pipe.execute()
+        return True
+
+    def add_new(self, key: str, member) -> Optional[bool]:
+        """
+        Record a member and report whether it was new to the key, e.g. to count
+        a page view once per viewer per day. HyperLogLog answers this
+        approximately: a rare new member can be taken for a repeat.
+
+        Returns None when Redis is not configured.
+        """
+        client = get_redis()
+        if client is None:
+            return None
+        redis_key = f'{self.prefix}:{key}'
+        pipe = client.pipeline()
+        pipe.pfadd(redis_key, member)
+        pipe.expire(redis_key, self.ttl)
+        added, _ = pipe.execute()
+        return bool(added)
+
+    def count(self, key: str) -> Optional[int]:
+        """Estimated distinct members, or None when Redis is not configured."""
+        client = get_redis()
+        if client is None:
+            return None
+        return client.pfcount(f'{self.prefix}:{key}')
+
+
+class BufferedHash:
+    """
+    A Redis hash filled on the hot path and drained whole by the flush job.
+
+    Use put() to keep the latest value per member (e.g. last view time per
+    post/user pair) or incr() to tally per member (e.g. views per stream-day).
+    A drained batch is returned again until acknowledged, so hold flushing()
+    around drain -> write -> acknowledge to keep two flushers from both
+    writing it.
+    """
+
+    def __init__(self, name: str):
+        self.key = f'pending:{name}'
+        self.draining_key = f'{self.key}:draining'
+        self.lock_key = f'{self.key}:lock'
+
+    def flushing(self):
+        """Flush lock for this hash; see flush_lock()."""
+        return flush_lock(self.lock_key)
+
+    def put(self, member: str, value: str) -> bool:
+        """Returns False when Redis is not configured."""
+        client = get_redis()
+        if client is None:
+            return False
+        client.hset(self.key, member, value)
+        return True
+
+    def incr(self, member: str, amount: int = 1) -> bool:
+        """Returns False when Redis is not configured."""
+        client = get_redis()
+        if client is None:
+            return False
+        client.hincrby(self.key, member, amount)
+        return True
+
+    def drain(self) -> Dict[str, str]:
+        """
+        Take everything buffered so far; new writes land in a fresh hash.
+
+        A batch that was drained but never acknowledged (failed flush) is
+        returned again first.
+        """
+        client = get_redis()
+        if client is None:
+            return {}
+        if not client.exists(self.draining_key):
+            try:
+                client.rename(self.key, self.draining_key)
+            except redis.ResponseError:
+                return {}  # nothing buffered
+        return client.hgetall(self.draining_key)
+
+    def acknowledge(self):
+        """Drop the drained batch once it has been written."""
+        client = get_redis()
+        if client is not None:
+            client.delete(self.draining_key)
+
+
+class BufferedQueue:
+    """
+    A Redis list of events appended on the hot path and written to the
+    database in batches by the flush job, e.g. search log rows:
+
+        searches.push({'query': 'yoga', ...})   # request: one RPUSH
+        with searches.flushing() as acquired:   # flush job
+            if acquired:
+                batch = searches.peek(500)
+                SearchLog.objects.bulk_create(...)
+                searches.acknowledge(len(batch))
+
+    Events stay in Redis until acknowledged, so a failed flush retries the
+    same batch and a stopping web process has nothing in memory to lose.
+    peek() and acknowledge() count from the head of the list, so only one
+    flusher may run at a time: hold flushing() around the loop.
+    """
+
+    def __init__(self, name: str, lock_ttl: int = FLUSH_LOCK_TTL):
+        self.key = f'pending:{name}'
+        self.lock_key = f'{self.key}:lock'
+        self.lock_ttl = lock_ttl
+
+    def flushing(self):
+        """Flush lock for this queue, held for at most `lock_ttl` seconds; see flush_lock()."""
+        return flush_lock(self.lock_key, self.lock_ttl)
+
+    def push(self, event: dict) -> bool:
+        """Returns False when Redis is not configured."""
+        client = get_redis()
+        if client is None:
+            return False
+        client.rpush(self.key, json.dumps(event, cls=DjangoJSONEncoder))
+        return True
+
+    def peek(self, count: int) -> List[dict]:
+        """The oldest `count` events, left in the queue."""
+        client = get_redis()
+        if client is None:
+            return []
+        return [json.loads(raw) for raw in client.lrange(self.key, 0, count - 1)]
+
+    def acknowledge(self, count: int):
+        """Drop the oldest `count` events once they have been written."""
+        client = get_redis()
+        if client is not None and count:
+            client.ltrim(self.key, count, -1)
+
+    def pending(self) -> int:
+        """Events not yet written."""
+        client = get_redis()
+        if client is None:
+            return 0
+        return client.llen(self.key)
@@ -0,0 +1,38 @@
+"""
+Rebuild the full-text search vectors for practitioners and services.
+
+Signals keep the vectors current and the migrations that add them fill them
+in; run this after bulk imports that bypass signals (seeding,
+queryset.update()).
+
+Usage:
+    python manage.py rebuild_search_index
+    python manage.py rebuild_search_index --only services
+"""
+import time as time_module
+
+from django.core.management.base import BaseCommand
+
+from practitioners.utils.search_index import update_practitioner_search_vectors
+from services.search import update_service_search_vectors
+
+
+class Command(BaseCommand):
+    help = 'Rebuild Practitioner and Service search vectors'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--only', choices=['practitioners', 'services'],
+                            help='Rebuild a single index')
+
+    def handle(self, *args, **options):
+        only = options['only']
+        if only in (None, 'practitioners'):
+            self._rebuild('practitioners', update_practitioner_search_vectors)
+        if only in (None, 'services'):
+            self._rebuild('services', update_service_search_vectors)
+
+    def _rebuild(self, label, update):
+        started = time_module.perf_counter()
+        count = update()
+        elapsed = time_module.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {count} {label} search vectors in {elapsed:.2f}s'))
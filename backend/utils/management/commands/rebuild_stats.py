@@ -0,0 +1,46 @@
+"""
+Rebuild the denormalized rating, service and session stats on practitioners
+and services.
+
+Signals keep the stats current; run this after bulk imports that bypass
+signals (seeding, queryset.update()) or to repair drift. Rows are processed in
+batches so each batch only holds its own row locks briefly.
+
+Usage:
+    python manage.py rebuild_stats
+    python manage.py rebuild_stats --only services --batch-size 1000
+"""
+import time as time_module
+
+from django.core.management.base import BaseCommand
+
+from practitioners.models import Practitioner
+from practitioners.utils.stats import update_practitioner_stats
+from services.models import Service
+from services.stats import update_service_stats
+
+
+class Command(BaseCommand):
+    help = 'Rebuild denormalized Practitioner and Service stats'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--only', choices=['practitioners', 'services'],
+                            help='Rebuild a single model')
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help='Rows updated per transaction')
+
+    def handle(self, *args, **options):
+        only = options['only']
+        if only in (None, 'practitioners'):
+            self._rebuild('practitioners', Practitioner, update_practitioner_stats, options['batch_size'])
+        if only in (None, 'services'):
+            self._rebuild('services', Service, update_service_stats, options['batch_size'])
+
+    def _rebuild(self, label, model, update, batch_size):
+        started = time_module.perf_counter()
+        ids = list(model.objects.order_by('pk').values_list('pk', flat=True))
+        count = 0
+        for start in range(0, len(ids), batch_size):
+            count += update(ids[start:start + batch_size])
+        elapsed = time_module.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt stats for {count} {label} in {elapsed:.2f}s'))
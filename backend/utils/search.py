@@ -0,0 +1,67 @@
+"""
+Postgres full-text search helpers shared by the DRF and FastAPI search endpoints.
+
+Practitioner and Service each store a weighted `search_vector` (GIN indexed)
+that is rebuilt by signals whenever the fields it covers change, and their
+names carry a trigram index so misspelled or partial queries still match.
+Build the vectors with `practitioners.utils.search_index` and
+`services.search`; query them with `apply_text_search`.
+"""
+import re
+from typing import Optional
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramWordSimilarity
+from django.db.models import F, Q, QuerySet
+from rest_framework.filters import OrderingFilter
+
+SEARCH_CONFIG = 'english'
+RELEVANCE_ORDERING = 'relevance'
+
+_TERM_RE = re.compile(r'[^\W_]+')
+
+
+def build_search_query(text: str) -> Optional[SearchQuery]:
+    """
+    Prefix-matching tsquery for user input ("yog med" -> yog:* & med:*), so
+    results update as the user types. Returns None when there is nothing to search.
+    """
+    terms = _TERM_RE.findall((text or '').lower())
+    if not terms:
+        return None
+    return SearchQuery(' & '.join(f'{term}:*' for term in terms), search_type='raw', config=SEARCH_CONFIG)
+
+
+def apply_text_search(queryset: QuerySet, text: str, trigram_field: str) -> QuerySet:
+    """
+    Filter `queryset` to rows whose search_vector matches `text`, or whose
+    `trigram_field` is a fuzzy match, and annotate `search_rank` for ordering.
+
+    Both predicates are served by GIN indexes, so no joins or DISTINCT are needed.
+    """
+    query = build_search_query(text)
+    if query is None:
+        return queryset
+
+    text = text.strip()
+    return queryset.filter(
+        Q(search_vector=query) | Q(**{f'{trigram_field}__trigram_word_similar': text})
+    ).annotate(
+        search_rank=SearchRank(F('search_vector'), query) + TrigramWordSimilarity(text, trigram_field)
+    )
+
+
+class RelevanceOrderingFilter(OrderingFilter):
+    """
+    OrderingFilter that also accepts `?ordering=relevance`, ordering by the
+    `search_rank` annotation added by `apply_text_search`. Without a text
+    search it falls back to the view's default ordering.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        if request.query_params.get(self.ordering_param) != RELEVANCE_ORDERING:
+            return super().filter_queryset(request, queryset, view)
+
+        default = list(self.get_default_ordering(view) or [])
+        if 'search_rank' in queryset.query.annotations:
+            return queryset.order_by('-search_rank', *default)
+        return queryset.order_by(*default) if default else queryset
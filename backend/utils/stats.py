@@ -0,0 +1,54 @@
+"""
+Helpers for the denormalized review and catalogue stats stored on
+Practitioner (`practitioners.utils.stats`) and Service (`services.stats`).
+
+Stats are recomputed from the source rows with one set-based UPDATE rather
+than incremented, so a missed signal can always be repaired by the
+`rebuild_stats` command.
+"""
+from decimal import Decimal
+from typing import Dict
+
+from django.db import transaction
+from django.db.models import (
+    Avg, Count, DecimalField, Expression, IntegerField, OuterRef, QuerySet, Subquery, Value
+)
+from django.db.models.functions import Coalesce
+
+
+def rating_stats(review_field: str) -> Dict[str, Expression]:
+    """
+    `rating_avg` / `rating_count` expressions over the published reviews whose
+    `review_field` points at the row being updated.
+    """
+    from reviews.models import Review
+
+    reviews = Review.objects.filter(**{review_field: OuterRef('pk')}, is_published=True).values(review_field)
+    return {
+        'rating_avg': Coalesce(
+            Subquery(reviews.annotate(value=Avg('rating')).values('value')[:1]),
+            Value(Decimal('0')),
+            output_field=DecimalField(max_digits=3, decimal_places=2)
+        ),
+        'rating_count': Coalesce(
+            Subquery(reviews.annotate(value=Count('pk')).values('value')[:1]),
+            Value(0),
+            output_field=IntegerField()
+        ),
+    }
+
+
+def locked_update(queryset: QuerySet, values: Dict[str, Expression]) -> int:
+    """
+    Lock the target rows, then apply `values`.
+
+    Taking the row locks first means the UPDATE statement's snapshot is taken
+    after any concurrent writer to the same rows has committed, so two
+    reviews landing at once cannot both write an aggregate that misses the
+    other. Rows are locked in primary-key order to avoid deadlocks.
+    """
+    with transaction.atomic():
+        locked = list(queryset.select_for_update().order_by('pk').values_list('pk', flat=True))
+        if not locked:
+            return 0
+        return queryset.model.objects.filter(pk__in=locked).update(**values)
@@ -353,24 +353,17 @@ async def calculate_practitioner_earnings(booking_id: str) -> Dict[str, Any]:
         commission_amount_cents = int(gross_amount_cents * commission_rate / 100)
         net_amount_cents = gross_amount_cents - commission_amount_cents
         
-        # Create earnings transaction
-        with transaction.atomic():
-            earnings = EarningsTransaction.objects.create(
-                practitioner=booking.practitioner,
-                booking=booking,
-                gross_amount_cents=gross_amount_cents,
-                commission_rate=commission_rate,
-                commission_amount_cents=commission_amount_cents,
-                net_amount_cents=net_amount_cents,
-                status='pending',
-                available_after=datetime.utcnow() + timedelta(hours=48),
-            )
-            
-            # Update practitioner balance
-            balance = booking.practitioner.earnings_balance
-            balance.pending_balance_cents += net_amount_cents
-            balance.lifetime_earnings_cents += net_amount_cents
-            balance.save()
+        # Create earnings transaction (saving it updates the practitioner balance)
+        earnings = EarningsTransaction.objects.create(
+            practitioner=booking.practitioner,
+            booking=booking,
+            gross_amount_cents=gross_amount_cents,
+            commission_rate=commission_rate,
+            commission_amount_cents=commission_amount_cents,
+            net_amount_cents=net_amount_cents,
+            status='pending',
+            available_after=datetime.utcnow() + timedelta(hours=48),
+        )
         
         return {
             'earnings_id': str(earnings.id),
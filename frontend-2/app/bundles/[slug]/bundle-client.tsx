@@ -12,6 +12,7 @@ import { Skeleton } from "@/components/ui/skeleton"
 import { Alert, AlertDescription } from "@/components/ui/alert"
 import { useQuery } from "@tanstack/react-query"
 import { publicServicesBySlugRetrieveOptions } from "@/src/client/@tanstack/react-query.gen"
+import { usePageView } from "@/hooks/use-page-view"
 import { useAuth } from "@/hooks/use-auth"
 import { useAuthModal } from "@/components/auth/auth-provider"
 import { userAddFavoriteService, userRemoveFavoriteService } from "@/src/client/sdk.gen"
@@ -39,6 +40,7 @@ export default function BundleDetailsPage({ params }: { params: Promise<{ slug:
     ...publicServicesBySlugRetrieveOptions({ path: { slug } }),
     staleTime: 1000 * 60 * 10, // 10 minutes cache
   })
+  usePageView("service", serviceData?.public_uuid)
 
   // Use real API data
   const bundle = serviceData
@@ -9,6 +9,7 @@ import { Skeleton } from "@/components/ui/skeleton"
 import { Alert, AlertDescription } from "@/components/ui/alert"
 import { useQuery, useMutation } from "@tanstack/react-query"
 import { publicServicesBySlugRetrieveOptions } from "@/src/client/@tanstack/react-query.gen"
+import { usePageView } from "@/hooks/use-page-view"
 import { userAddFavoriteService, userRemoveFavoriteService } from "@/src/client"
 import { useUserFavoriteServices } from "@/hooks/use-user-favorite-services"
 import { useAuth } from "@/hooks/use-auth"
@@ -177,6 +178,7 @@ export default function CourseDetailsPage({ params }: { params: Promise<{ slug:
     ...publicServicesBySlugRetrieveOptions({ path: { slug } }),
     staleTime: 1000 * 60 * 10, // 10 minutes cache
   })
+  usePageView("service", serviceData?.public_uuid)
 
   // Transform API data to component format
   const course = serviceData ? {
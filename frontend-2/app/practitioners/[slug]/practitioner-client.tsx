@@ -4,6 +4,7 @@ import { notFound } from "next/navigation"
 import Link from "next/link"
 import { useQuery } from "@tanstack/react-query"
 import { publicPractitionersBySlugRetrieveOptions } from "@/src/client/@tanstack/react-query.gen"
+import { usePageView } from "@/hooks/use-page-view"
 import PractitionerBookingPanel from "@/components/practitioners/practitioner-booking-panel"
 import {
   Breadcrumb,
@@ -25,6 +26,7 @@ export default function PractitionerPage({ params }: { params: Promise<{ slug: s
     ...publicPractitionersBySlugRetrieveOptions({ path: { slug } }),
     staleTime: 1000 * 60 * 10, // 10 minutes cache
   })
+  usePageView("practitioner", practitioner?.public_uuid)
 
   // Loading state
   if (isLoading) {
@@ -10,6 +10,7 @@ import { Alert, AlertDescription } from "@/components/ui/alert"
 import { Drawer, DrawerContent, DrawerHeader, DrawerTitle } from "@/components/ui/drawer"
 import { useQuery } from "@tanstack/react-query"
 import { publicServicesBySlugRetrieveOptions } from "@/src/client/@tanstack/react-query.gen"
+import { usePageView } from "@/hooks/use-page-view"
 import { useAuth } from "@/hooks/use-auth"
 import { useAuthModal } from "@/components/auth/auth-provider"
 import { userAddFavoriteService, userRemoveFavoriteService } from "@/src/client/sdk.gen"
@@ -37,6 +38,7 @@ export default function SessionDetailsPage({ params }: { params: Promise<{ slug:
     ...publicServicesBySlugRetrieveOptions({ path: { slug } }),
     staleTime: 1000 * 60 * 10, // 10 minutes cache
   })
+  usePageView("service", serviceData?.public_uuid)
 
   // Use real API data
   const service = serviceData
@@ -10,6 +10,7 @@ import { Skeleton } from "@/components/ui/skeleton"
 import { Alert, AlertDescription } from "@/components/ui/alert"
 import { useQuery, useMutation } from "@tanstack/react-query"
 import { publicServicesBySlugRetrieveOptions } from "@/src/client/@tanstack/react-query.gen"
+import { usePageView } from "@/hooks/use-page-view"
 import { useAuth } from "@/hooks/use-auth"
 import { useAuthModal } from "@/components/auth/auth-provider"
 import { userAddFavoriteService, userRemoveFavoriteService } from "@/src/client/sdk.gen"
@@ -37,6 +38,7 @@ export default function WorkshopPage({ params }: { params: Promise<{ slug: strin
     ...publicServicesBySlugRetrieveOptions({ path: { slug } }),
     staleTime: 1000 * 60 * 10, // 10 minutes cache
   })
+  usePageView("service", serviceData?.public_uuid)
 
   // Get upcoming sessions and calculate spots remaining
   const upcomingSessions = (serviceData?.sessions || [])
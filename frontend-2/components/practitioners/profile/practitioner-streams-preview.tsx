@@ -158,8 +158,9 @@ export default function PractitionerStreamsPreview({
   }
 
   const posts = data?.results?.map(mapApiPostToStreamPost) || []
-  const totalCount = data?.count || 0
-  const hasMore = totalCount > 4
+  // Newest-first posts page by cursor, so the list has no count; the stream keeps its own
+  const totalCount = streamData?.post_count || 0
+  const hasMore = data?.next != null
 
   // View all URL - go to streams page filtered by practitioner
   const viewAllUrl = `/streams?practitioner=${practitionerId}`
@@ -274,7 +275,7 @@ export default function PractitionerStreamsPreview({
         <div className="text-center pt-2">
           <Button variant="ghost" asChild className="text-olive-500 hover:text-olive-700 text-sm">
             <Link href={viewAllUrl}>
-              View All {totalCount} Posts from {practitionerName.split(' ')[0]}
+              View All {totalCount > 0 ? `${totalCount} ` : ''}Posts from {practitionerName.split(' ')[0]}
               <ArrowRight className="ml-2 h-4 w-4" />
             </Link>
           </Button>
@@ -92,23 +92,26 @@ export default function ContentFeed({
     isError,
   } = useInfiniteQuery({
     queryKey: ['streamPosts', query, contentType, practitionerId, tags, sort, showSubscribed, modality, user?.id],
-    queryFn: async ({ pageParam = 1 }) => {
+    queryFn: async ({ pageParam }: { pageParam: number | string }) => {
+      // Newest-first lists page by cursor, other sorts by page number
       const response = await streamPostsList({
         query: {
           ...queryParams,
-          page: pageParam
+          ...(typeof pageParam === 'string' ? { cursor: pageParam } : { page: pageParam })
         }
       })
       return response.data
     },
     getNextPageParam: (lastPage, pages) => {
       // Check if there's a next page
-      if (lastPage?.next) {
-        return pages.length + 1
+      const next = (lastPage as any)?.next
+      if (!next) {
+        return undefined
       }
-      return undefined
+      const cursor = new URL(next).searchParams.get('cursor')
+      return cursor ?? pages.length + 1
     },
-    initialPageParam: 1,
+    initialPageParam: 1 as number | string,
   })
 
   // Infinite scroll sentinel
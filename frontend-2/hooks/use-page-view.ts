@@ -0,0 +1,39 @@
+"use client"
+
+import { useEffect } from "react"
+import { publicPractitionersViewCreate, publicServicesViewCreate } from "@/src/client/sdk.gen"
+
+const VIEWER_SESSION_KEY = "viewerSessionId"
+
+// Stable anonymous id so the backend counts a visitor once per page per day
+function getViewerSessionId(): string | undefined {
+  try {
+    let sessionId = localStorage.getItem(VIEWER_SESSION_KEY)
+    if (!sessionId) {
+      sessionId = crypto.randomUUID()
+      localStorage.setItem(VIEWER_SESSION_KEY, sessionId)
+    }
+    return sessionId
+  } catch {
+    return undefined
+  }
+}
+
+/**
+ * Report a view of a public practitioner profile or service page once it has loaded.
+ * Counts feed the practitioner's analytics; failures are ignored.
+ */
+export function usePageView(kind: "practitioner" | "service", publicUuid?: string | null) {
+  useEffect(() => {
+    if (!publicUuid) return
+
+    const options = {
+      path: { public_uuid: publicUuid },
+      body: { session_id: getViewerSessionId() },
+    }
+    const request = kind === "practitioner"
+      ? publicPractitionersViewCreate(options)
+      : publicServicesViewCreate(options)
+    request.catch(() => {})
+  }, [kind, publicUuid])
+}